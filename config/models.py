@@ -16,17 +16,92 @@ MODEL_CONFIGS = {
         "name": "Gemini 2.5 Flash Preview 04-17",
         "description": "제미니 2.5 플래시 Preview 04-17 버전 - 개선된 성능의 빠른 응답 모델",
         "display_name": "제미니 2.5 플래시 Preview 04-17",
+        # 100만 토큰당 USD 가격 (input: 프롬프트, output: 응답, cached_input: 캐시된 프롬프트)
+        "pricing": {"input": 0.15, "output": 0.60, "cached_input": 0.0375},
+        # 자동 모델 선택 시 품질 하한과 비교하는 상대 품질 점수 (0~1)
+        "quality_score": 0.75,
+        # API 키당 분당 요청/토큰 할당량 (AIDEA_RATE_LIMIT_RPM / AIDEA_RATE_LIMIT_TPM 환경 변수로 덮어쓸 수 있음)
+        "rate_limit": {"requests_per_minute": 1000, "tokens_per_minute": 1000000},
     },
     ModelType.GEMINI_2_5_PRO_PREVIEW_0506: {
         "name": "Gemini 2.5 Pro Preview 05-06",
         "description": "제미니 2.5 프로 Preview 05-06 버전 - 최신 기능이 적용된 모델",
         "display_name": "제미니 2.5 프로 Preview 05-06",
+        "pricing": {"input": 1.25, "output": 10.00, "cached_input": 0.31},
+        "quality_score": 0.9,
+        "rate_limit": {"requests_per_minute": 150, "tokens_per_minute": 2000000},
     }
 }
 
 # 기본 모델 설정
 DEFAULT_MODEL = ModelType.GEMINI_2_5_FLASH_PREVIEW_0417
 
+# 자동 모델 선택(역할별 요청 시점 라우팅) 설정
+AUTO_ROUTING_CONFIG = {
+    # 최근 성능 지표를 계산할 호출 수
+    "window_size": 50,
+    # 이 수보다 표본이 적은 모델은 탐색 트래픽으로만 선택
+    "min_samples": 5,
+    # 통계 갱신을 위해 무작위 후보에 보내는 트래픽 비율
+    "exploration_rate": 0.1,
+    # 최근 오류율이 이 값을 넘는 모델은 (다른 후보가 있으면) 제외
+    "max_error_rate": 0.3,
+    # 점수 계산 시 p95 응답 시간의 가중치와 상한 (초)
+    "latency_weight": 0.4,
+    "latency_cap_seconds": 60.0,
+    # 품질 하한 (역할별 값이 없으면 default 사용). 예: {"final_summary": 0.85}
+    "quality_floor": {"default": 0.7},
+}
+
+# 프로세스 전역 레이트 리미터 설정 (API 키와 모델별 토큰 버킷)
+RATE_LIMIT_CONFIG = {
+    # False이면 모델 호출 전 대기 없이 바로 호출
+    "enabled": True,
+    # 할당량 대비 목표 사용률 (할당량 바로 아래에서 유지)
+    "target_utilization": 0.9,
+    # 버킷 용량 (초 단위 할당량). 짧은 순간에 몰리는 요청을 이 만큼만 허용
+    "burst_seconds": 10.0,
+    # 요청의 최대 출력 토큰이 지정되지 않았을 때 예약할 출력 토큰 수 (응답 후 실제 사용량으로 정산)
+    "expected_output_tokens": 2048,
+    # 할당량 초과(429) 응답 후 모든 호출을 멈추는 시간 (초)
+    "throttle_cooldown_seconds": 10.0,
+    # 할당량 초과 시 속도 배율 감소 비율과 하한, 초과가 없을 때 분당 회복량 (할당량을 모르는 키에 적응)
+    "throttle_backoff": 0.8,
+    "min_rate_scale": 0.2,
+    "rate_recovery_per_minute": 0.05,
+    # 차례가 아닌 대기 호출이 상태를 다시 확인하는 간격 (초)
+    "poll_interval_seconds": 0.05,
+}
+
+# 동일한 모델 요청 병합(single-flight) 설정
+REQUEST_COALESCING_CONFIG = {
+    # False이면 동일한 요청도 각자 모델을 호출
+    "enabled": True,
+    # temperature > 0(또는 미지정)인 요청은 응답이 매번 달라질 수 있으므로, 여기에 나열한 역할만 병합
+    # (예: ["marketer", "critic_summary"], "*"는 모든 역할. AIDEA_COALESCE_SAMPLED_ROLES 환경 변수로 덮어쓸 수 있음)
+    "sampled_roles": [],
+    # 같은 요청을 먼저 보낸 호출의 응답을 기다리는 최대 시간 (초과하면 직접 호출)
+    "follower_timeout_seconds": 300.0,
+}
+
+# 여러 API 키를 나눠 쓰는 키 풀 설정 (키 목록은 AIDEA_API_KEYS 환경 변수에 쉼표로 구분해 지정)
+API_KEY_POOL_CONFIG = {
+    # 연속 실패가 이 횟수에 이르면 키를 잠시 쉬게 함
+    "failure_threshold": 3,
+    # 연속 실패로 쉬는 키를 다시 쓰기까지의 시간 (초)
+    "unhealthy_cooldown_seconds": 30.0,
+    # 할당량 초과(429) 응답을 받은 키를 다시 쓰기까지의 시간 (초)
+    "throttle_cooldown_seconds": 10.0,
+    # 배정된 뒤 이 시간 안에 호출되지 않은 배정은 부하 계산에서 제외 (취소된 호출 정리)
+    "assignment_timeout_seconds": 120.0,
+}
+
+# MODEL_CONFIGS에 없는 모델에 적용할 API 키당 분당 할당량
+DEFAULT_MODEL_RATE_LIMIT = {"requests_per_minute": 60, "tokens_per_minute": 1000000}
+
+# MODEL_CONFIGS에 없는 모델(실험용 모델 등)에 적용할 가격 (100만 토큰당 USD)
+DEFAULT_MODEL_PRICING = {"input": 0.0, "output": 0.0, "cached_input": 0.0}
+
 # 모델 목록을 표시 이름과 함께 반환하는 함수
 def get_model_display_options():
     """
@@ -38,4 +113,49 @@ def get_model_display_options():
     options = {}
     for model_type in ModelType:
         options[MODEL_CONFIGS[model_type]["display_name"]] = model_type.value
-    return options 
\ No newline at end of file
+    return options 
+
+def get_model_quality_score(model_id):
+    """
+    모델 ID에 해당하는 상대 품질 점수를 반환합니다. 알 수 없는 모델은 0을 반환합니다.
+    
+    Args:
+        model_id (str): 모델 ID
+        
+    Returns:
+        float: 0~1 사이의 품질 점수
+    """
+    for model_type, config in MODEL_CONFIGS.items():
+        if model_type.value == model_id:
+            return config.get("quality_score", 0.0)
+    return 0.0
+
+def get_model_pricing(model_id):
+    """
+    모델 ID에 해당하는 토큰 가격을 반환합니다.
+    
+    Args:
+        model_id (str): 모델 ID (예: "gemini-2.5-flash-preview-04-17")
+        
+    Returns:
+        dict: input, output, cached_input 키를 가진 100만 토큰당 USD 가격
+    """
+    for model_type, config in MODEL_CONFIGS.items():
+        if model_type.value == model_id:
+            return config.get("pricing", DEFAULT_MODEL_PRICING)
+    return DEFAULT_MODEL_PRICING
+
+def get_model_rate_limit(model_id):
+    """
+    모델 ID에 해당하는 API 키당 분당 할당량을 반환합니다.
+    
+    Args:
+        model_id (str): 모델 ID
+        
+    Returns:
+        dict: requests_per_minute, tokens_per_minute 키를 가진 할당량
+    """
+    for model_type, config in MODEL_CONFIGS.items():
+        if model_type.value == model_id:
+            return config.get("rate_limit", DEFAULT_MODEL_RATE_LIMIT)
+    return DEFAULT_MODEL_RATE_LIMIT
@@ -65,6 +65,20 @@ ORCHESTRATOR_CONFIG = {
     "dialogue_summary_key": "dialogue_summary",  # 대화 요약이 저장될 키
 }
 
+# 1단계 중간 요약 설정
+# - mode "adaptive": 짧은 보고서는 그대로, 고른 중심 문장이 보고서의 제목 구획을 충분히 덮는 긴 보고서는
+#   추출 요약으로 로컬에서 요약하고 두 경우 모두 해당하지 않을 때만 LLM 요약 에이전트를 호출
+# - mode "llm": 항상 LLM 요약 에이전트를 호출
+INTERMEDIATE_SUMMARY_CONFIG = {
+    "mode": "adaptive",
+    "compact_report_max_tokens": 600,  # 이 토큰 수 이하의 보고서는 요약 없이 핵심 문장을 그대로 사용
+    "extractive_min_sentences": 6,  # 추출 요약에 필요한 최소 문장 수
+    "extractive_min_section_coverage": 0.8,  # 추출 요약에 필요한, 고른 문장이 들어 있는 제목 구획의 최소 비율
+    "key_points": 5,  # 핵심 포인트 최대 개수
+    "summary_sentences": 3,  # 종합 요약 문장 수
+    "max_point_chars": 200,  # 핵심 포인트 한 항목의 최대 길이
+}
+
 # 페르소나별 LLM 작업 구성
 PERSONA_LLM_TASKS = {
     PersonaType.ORCHESTRATOR: {
@@ -15,6 +15,9 @@ AIdea Lab Prompt Configuration Module
 import re
 from typing import List, Dict, Any
 
+# 한글 음절이 아닌 문자의 연속 구간 (한글 문자 수 = 전체 길이 - 이 구간 길이의 합. 글자마다 일치시키는 것보다 빠름)
+_NON_HANGUL_RUN_RE = re.compile(r'[^가-힣]+')
+
 
 def estimate_token_count(text: str) -> int:
     """
@@ -29,9 +32,12 @@ def estimate_token_count(text: str) -> int:
     if not text:
         return 0
     
-    # 한글과 영어의 비율에 따라 토큰 수를 다르게 계산
-    korean_chars = len(re.findall(r'[가-힣]', text))
+    # 한글과 영어의 비율에 따라 토큰 수를 다르게 계산 (ASCII 문자열은 한글이 없으므로 검사 생략)
     total_chars = len(text)
+    if text.isascii():
+        korean_chars = 0
+    else:
+        korean_chars = total_chars - sum(map(len, _NON_HANGUL_RUN_RE.findall(text)))
     english_chars = total_chars - korean_chars
     
     # 한글은 대략 1.5자당 1토큰, 영어는 4자당 1토큰으로 추정
@@ -56,13 +62,14 @@ def summarize_discussion_history(discussion_history: List[Dict[str, Any]], max_t
         return "아직 토론이 시작되지 않았습니다."
     
     # 전체 히스토리를 문자열로 구성
-    full_history = ""
+    history_parts = []
     for i, entry in enumerate(discussion_history, 1):
         speaker = entry.get("speaker", "알 수 없음")
         message = entry.get("message", "")
         timestamp = entry.get("timestamp", "")
         
-        full_history += f"\n{i}. **{speaker}** ({timestamp}):\n{message}\n"
+        history_parts.append(f"\n{i}. **{speaker}** ({timestamp}):\n{message}\n")
+    full_history = "".join(history_parts)
     
     # 현재 토큰 수 확인
     current_tokens = estimate_token_count(full_history)
@@ -81,24 +88,20 @@ def summarize_discussion_history(discussion_history: List[Dict[str, Any]], max_t
     older_entries = discussion_history[:-2]
     
     # 이전 항목들 요약
-    summary_text = f"이전 토론 요약 ({len(older_entries)}개 발언):\n"
+    summary_parts = [f"이전 토론 요약 ({len(older_entries)}개 발언):\n"]
     
     for entry in older_entries:
         speaker = entry.get("speaker", "알 수 없음")
         message = entry.get("message", "")
         # 각 메시지를 100자로 제한하여 요약
         truncated_message = message[:100] + "..." if len(message) > 100 else message
-        summary_text += f"- {speaker}: {truncated_message}\n"
+        summary_parts.append(f"- {speaker}: {truncated_message}\n")
     
-    # 최근 항목들 전체 포함
-    recent_text = "\n최근 토론 내용:\n"
-    for i, entry in enumerate(recent_entries, len(older_entries) + 1):
-        speaker = entry.get("speaker", "알 수 없음")
-        message = entry.get("message", "")
-        timestamp = entry.get("timestamp", "")
-        recent_text += f"\n{i}. **{speaker}** ({timestamp}):\n{message}\n"
+    # 최근 항목들 전체 포함 (번호가 이어지므로 전체 히스토리의 해당 부분을 그대로 사용)
+    summary_parts.append("\n최근 토론 내용:\n")
+    summary_parts.extend(history_parts[len(older_entries):])
     
-    return summary_text + recent_text
+    return "".join(summary_parts)
 
 
 def optimize_context_length(text: str, max_tokens: int = 2000) -> str:
@@ -150,16 +153,39 @@ def optimize_context_length(text: str, max_tokens: int = 2000) -> str:
         else:
             break
     
-    # 원래 순서대로 정렬하여 반환
-    original_order_lines = []
-    for line in lines:
-        if line in result_lines:
-            original_order_lines.append(line)
+    # 원래 순서대로 정렬하여 반환 (선택된 줄과 같은 내용의 줄은 모두 포함. 목록 대신 set으로 검사해 O(n))
+    selected_lines = set(result_lines)
+    original_order_lines = [line for line in lines if line in selected_lines]
     
     return '\n'.join(original_order_lines)
 
 
 # 2단계 토론 퍼실리테이터 프롬프트 제공자 함수
+def _log_phase2_prompt(persona: str, ctx, discussion_history: List[Dict[str, Any]], final_prompt: str) -> None:
+    """
+    2단계 프롬프트 제공자가 만든 최종 프롬프트를 DEBUG 레벨로 기록합니다.
+    토큰 수 추정과 프롬프트 원문은 "prompts" 컴포넌트의 DEBUG 로그가 켜져 있을 때만 계산됩니다.
+    
+    Args:
+        persona (str): 프롬프트를 만든 에이전트 (예: "facilitator", "marketer")
+        ctx: 세션 상태 컨텍스트
+        discussion_history (List[Dict[str, Any]]): 프롬프트에 사용된 토론 기록
+        final_prompt (str): 최종 프롬프트
+    """
+    # src.utils가 이 모듈의 estimate_token_count를 임포트하므로 호출 시점에 임포트
+    from src.utils.structured_logging import get_logger
+    
+    get_logger("prompts").debug(
+        "phase2 prompt built",
+        persona=persona,
+        model=lambda: ctx.state.get("selected_model", "알 수 없음"),
+        history_length=len(discussion_history),
+        prompt_length=len(final_prompt),
+        estimated_tokens=lambda: estimate_token_count(final_prompt),
+        prompt=final_prompt,
+    )
+
+
 def FACILITATOR_PHASE2_PROMPT_PROVIDER(ctx):
     """
     2단계 토론 퍼실리테이터를 위한 동적 프롬프트 생성 함수
@@ -403,11 +429,7 @@ def FACILITATOR_PHASE2_PROMPT_PROVIDER(ctx):
     final_prompt = optimize_context_length(prompt, max_tokens=3500)
     
     # 디버깅을 위해 최종 프롬프트 로깅
-    print(f"\n=== FACILITATOR PHASE2 PROMPT (모델: {ctx.state.get('selected_model', '알 수 없음')}) ===")
-    print(f"히스토리 길이: {len(discussion_history)}, 프롬프트 길이: {len(final_prompt)}")
-    print(f"추정 토큰 수: {estimate_token_count(final_prompt)}")
-    print(f"프롬프트 내용: {final_prompt[:500]}... (처음 500자)")
-    print("=== FACILITATOR PHASE2 PROMPT END ===\n")
+    _log_phase2_prompt("facilitator", ctx, discussion_history, final_prompt)
     
     return final_prompt
 
@@ -529,10 +551,7 @@ def MARKETER_PHASE2_PROMPT_PROVIDER(ctx):
     final_prompt = optimize_context_length(prompt, max_tokens=2500)
     
     # 디버깅 로그
-    print(f"\n=== MARKETER PHASE2 PROMPT (모델: {ctx.state.get('selected_model', '알 수 없음')}) ===")
-    print(f"히스토리 길이: {len(discussion_history)}, 프롬프트 길이: {len(final_prompt)}")
-    print(f"추정 토큰 수: {estimate_token_count(final_prompt)}")
-    print("=== MARKETER PHASE2 PROMPT END ===\n")
+    _log_phase2_prompt("marketer", ctx, discussion_history, final_prompt)
     
     return final_prompt
 
@@ -654,10 +673,7 @@ def CRITIC_PHASE2_PROMPT_PROVIDER(ctx):
     final_prompt = optimize_context_length(prompt, max_tokens=2500)
     
     # 디버깅 로그
-    print(f"\n=== CRITIC PHASE2 PROMPT (모델: {ctx.state.get('selected_model', '알 수 없음')}) ===")
-    print(f"히스토리 길이: {len(discussion_history)}, 프롬프트 길이: {len(final_prompt)}")
-    print(f"추정 토큰 수: {estimate_token_count(final_prompt)}")
-    print("=== CRITIC PHASE2 PROMPT END ===\n")
+    _log_phase2_prompt("critic", ctx, discussion_history, final_prompt)
     
     return final_prompt
 
@@ -779,10 +795,7 @@ def ENGINEER_PHASE2_PROMPT_PROVIDER(ctx):
     final_prompt = optimize_context_length(prompt, max_tokens=2500)
     
     # 디버깅 로그
-    print(f"\n=== ENGINEER PHASE2 PROMPT (모델: {ctx.state.get('selected_model', '알 수 없음')}) ===")
-    print(f"히스토리 길이: {len(discussion_history)}, 프롬프트 길이: {len(final_prompt)}")
-    print(f"추정 토큰 수: {estimate_token_count(final_prompt)}")
-    print("=== ENGINEER PHASE2 PROMPT END ===\n")
+    _log_phase2_prompt("engineer", ctx, discussion_history, final_prompt)
     
     return final_prompt
 
@@ -924,6 +937,24 @@ INTERMEDIATE_SUMMARY_PROMPT = """
 {text_to_summarize}
 """
 
+# 1단계 중간 요약 에이전트 프롬프트 (PHASE1_INTERMEDIATE_SUMMARY_PROMPT)
+# {report_content}에 원본 페르소나 보고서가 들어감. 1단계 결과 캐시 키의 프롬프트 지문에 포함됨
+PHASE1_INTERMEDIATE_SUMMARY_PROMPT = """
+당신은 아이디어 워크숍의 페르소나 보고서를 요약하는 전문가입니다.
+
+아래 텍스트는 워크숍 과정에서 특정 페르소나가 작성한 상세한 보고서입니다.
+이 보고서를 다른 AI 에이전트들이 활용할 수 있도록 간결하고 핵심적인 내용만 담아 요약해주세요.
+
+요약은 다음 형식을 준수해주세요:
+1. "**핵심 포인트:**" 제목 아래에 불릿 포인트로 5개 이내의 핵심 요점을 나열하세요.
+2. "**종합 요약:**" 제목 아래에 전체 내용을 2-3문장으로 요약하세요.
+
+간결하게 요약해주세요.
+
+분석할 텍스트:
+{report_content}
+"""
+
 
 # ======================================================================================
 # 페르소나별 시스템 프롬프트 (1단계 분석용)
@@ -1117,6 +1148,25 @@ ENGINEER_PROMPT = """
 이제 사용자가 제시한 아이디어를 현실적 엔지니어의 관점에서 기술적으로 분석하고, 실제 구현을 위한 구체적이고 실행 가능한 계획을 제시해주세요.
 """
 
+# 구조화된 보고서 형식 지침 (STRUCTURED_REPORT_FORMAT_PROMPT)
+# 구조화 보고서 모드에서 1단계 페르소나 프롬프트 뒤에 추가되며,
+# 응답의 핵심 포인트와 요약 구간으로 중간 요약을 모델 호출 없이 만듭니다.
+STRUCTURED_REPORT_FORMAT_PROMPT = """
+
+### 출력 형식 (반드시 준수):
+응답 전체를 아래 세 개의 태그 구간으로 나누어 작성하세요. 태그 이름과 순서를 바꾸지 말고, 태그 밖에는 아무것도 쓰지 마세요.
+
+<key_points>
+- 분석의 핵심 포인트 3-5개 (한 줄에 하나, 구체적인 내용)
+</key_points>
+<summary>
+전체 분석을 2-3문장으로 요약
+</summary>
+<analysis>
+위 구조에 따른 전체 분석 내용 (마크다운 사용 가능)
+</analysis>
+"""
+
 def FINAL_SUMMARY_PHASE2_PROMPT_PROVIDER(ctx):
     # 세션 상태에서 필요한 값들 가져오기
     initial_idea = ctx.state.get("initial_idea", "특정되지 않은 아이디어")
@@ -8,7 +8,7 @@
 import os
 from google.adk.agents import Agent
 from google.genai import types  # types 모듈 임포트 추가
-from config.prompts import CRITIC_PROMPT
+from config.prompts import CRITIC_PROMPT, STRUCTURED_REPORT_FORMAT_PROMPT
 from config.personas import PersonaType, PERSONA_CONFIGS
 from config.models import DEFAULT_MODEL
 
@@ -17,12 +17,13 @@ from config.models import DEFAULT_MODEL
 class CriticPersonaAgent:
     """비판적 분석가 페르소나 에이전트 클래스"""
     
-    def __init__(self, model_name=None):
+    def __init__(self, model_name=None, structured_report=False):
         """
         에이전트 초기화
         
         Args:
             model_name (str, optional): 사용할 모델 이름. 기본값은 DEFAULT_MODEL.value
+            structured_report (bool): True이면 핵심 포인트, 요약, 전체 분석을 태그 구간으로 나누어 응답하도록 지시
         """
         # 기본 모델 설정
         model_name = model_name or DEFAULT_MODEL.value
@@ -41,7 +42,7 @@ class CriticPersonaAgent:
             name="critic_agent",  # 영문자와 언더스코어만 사용
             model=model_name,  # 파라미터로 전달받은 모델 사용
             description=persona_config["description"],
-            instruction=CRITIC_PROMPT,  # 비판적 분석가 시스템 프롬프트
+            instruction=CRITIC_PROMPT + (STRUCTURED_REPORT_FORMAT_PROMPT if structured_report else ""),  # 비판적 분석가 시스템 프롬프트
             output_key=persona_config["output_key"],  # session.state에 저장될 키
             generate_content_config=generate_config  # 생성 설정 명시적으로 전달
         )
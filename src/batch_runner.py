@@ -0,0 +1,303 @@
+"""
+AIdea Lab 배치 분석 실행기
+
+이 모듈은 Streamlit 없이 여러 아이디어를 한 번에 분석하는 명령줄 실행기를 제공합니다.
+
+- 입력: 한 줄에 하나의 JSON 객체인 JSONL 파일 ("idea" 필수, "goal", "constraints", "values", "id" 선택)
+- 출력: 아이디어마다 1단계 결과(선택적으로 자동 진행한 2단계 토론 결과)를 담은 JSON 한 줄을
+  완료되는 순서대로 기록 (각 줄의 "index"는 입력 파일의 줄 번호, 0부터 시작)
+- 아이디어마다 별도의 SessionManager와 오케스트레이터를 사용하므로 동시 실행 수(--concurrency)만큼
+  병렬로 분석되며, 처리량은 API 할당량에 의해서만 제한됩니다.
+- --offset/--limit으로 입력의 일부만 처리하고, --resume이면 출력 파일에 이미 성공으로 기록된 줄을 건너뜁니다.
+
+사용 예:
+    python -m src.batch_runner ideas.jsonl -o results.jsonl --concurrency 8
+    python -m src.batch_runner ideas.jsonl -o results.jsonl --resume --phase2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, Set, TextIO, Tuple
+
+from dotenv import load_dotenv
+
+from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator
+from src.session_manager import SessionManager
+from src.session_store.phase1_cache import phase1_cache_key, phase1_similarity_text, phase1_variant_key
+from src.ui.adk_controller import AdkController, build_phase1_input
+from src.ui.discussion_controller import DiscussionController
+from src.ui.state_manager import AppStateManager
+
+BATCH_APP_NAME = "aidea-lab-batch"
+
+# 동시에 분석할 기본 아이디어 수
+DEFAULT_CONCURRENCY = 4
+
+# 2단계에서 퍼실리테이터가 사용자 의견을 요청할 때 자동으로 보낼 응답과 최대 응답 횟수
+DEFAULT_PHASE2_USER_RESPONSE = "별도 의견은 없습니다. 지금까지의 논의를 바탕으로 토론을 계속 진행해주세요."
+DEFAULT_PHASE2_MAX_USER_TURNS = 2
+
+PHASE2_AWAITING_USER_STATUS = "사용자 입력 대기"
+
+
+def read_ideas(path: str, offset: int = 0, limit: Optional[int] = None,
+               skip_indexes: Optional[Set[int]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    입력 JSONL 파일에서 분석할 아이디어를 읽습니다. 빈 줄은 건너뜁니다.
+
+    Args:
+        path (str): 입력 파일 경로 ("-"이면 표준 입력)
+        offset (int): 처리를 시작할 줄 번호 (0부터 시작)
+        limit (int, optional): 읽을 최대 아이디어 수
+        skip_indexes (Set[int], optional): 건너뛸 줄 번호 (이미 처리된 줄)
+
+    Returns:
+        Iterator[Tuple[int, Dict[str, Any]]]: (줄 번호, 입력 레코드). 해석할 수 없는 줄은 {"_error": ...} 레코드
+    """
+    skip_indexes = skip_indexes or set()
+    count = 0
+    with (contextlib.nullcontext(sys.stdin) if path == "-" else open(path, encoding="utf-8")) as input_file:
+        for index, line in enumerate(input_file):
+            if index < offset or index in skip_indexes or not line.strip():
+                continue
+            if limit is not None and count >= limit:
+                return
+            count += 1
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict) or not str(record.get("idea", "")).strip():
+                    raise ValueError("'idea' 필드가 없습니다.")
+            except ValueError as e:
+                record = {"_error": f"입력 줄을 해석할 수 없습니다: {e}"}
+            yield index, record
+
+
+def completed_indexes(output_path: str) -> Set[int]:
+    """
+    이전 실행의 출력 파일에서 성공으로 기록된 입력 줄 번호를 반환합니다 (--resume용).
+
+    Args:
+        output_path (str): 출력 파일 경로
+
+    Returns:
+        Set[int]: 처리가 끝난 줄 번호
+    """
+    indexes = set()
+    if not os.path.exists(output_path):
+        return indexes
+    with open(output_path, encoding="utf-8") as output_file:
+        for line in output_file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue  # 중단되며 잘린 마지막 줄
+            if isinstance(result, dict) and result.get("status") == "ok" and isinstance(result.get("index"), int):
+                indexes.add(result["index"])
+    return indexes
+
+
+async def _run_phase2(session_manager: SessionManager, session_id: str, orchestrator: AIdeaLabOrchestrator,
+                      user_response: str, max_user_turns: int) -> Dict[str, Any]:
+    """
+    2단계 토론을 실행합니다. 퍼실리테이터가 사용자 의견을 요청하면 user_response로 자동 응답합니다.
+
+    Returns:
+        Dict[str, Any]: {"status", "messages", "final_summary"}
+    """
+    session_manager.transition_to_phase2()
+    discussion_controller = DiscussionController(session_manager)
+    messages = []
+    pending_response = None
+    for _ in range(max_user_turns + 1):
+        # 토론 컨트롤러는 사용자 응답을 AppStateManager에서 읽음. 호출 직후 첫 대기 지점 전에 읽으므로
+        # 같은 이벤트 루프의 다른 아이디어와 값이 섞이지 않음
+        AppStateManager.set_awaiting_user_input_phase2(pending_response is not None)
+        AppStateManager.set_phase2_user_response(pending_response or "")
+        new_messages, status, _ = await discussion_controller.run_phase2_discussion(session_id, orchestrator)
+        messages.extend({"speaker": message.get("speaker"), "content": message.get("content")} for message in new_messages)
+        if status != PHASE2_AWAITING_USER_STATUS:
+            break
+        pending_response = user_response
+
+    session = session_manager.get_session(session_id)
+    return {
+        "status": status,
+        "messages": messages,
+        "final_summary": session.state.get("final_summary_report_phase2") if session else None,
+    }
+
+
+async def analyze_idea(index: int, record: Dict[str, Any], options: argparse.Namespace) -> Dict[str, Any]:
+    """
+    아이디어 하나를 분석하고 출력 레코드를 만듭니다. 예외는 레코드의 "error"로 기록합니다.
+
+    Args:
+        index (int): 입력 줄 번호
+        record (Dict[str, Any]): 입력 레코드
+        options (argparse.Namespace): 명령줄 옵션
+
+    Returns:
+        Dict[str, Any]: 출력 레코드
+    """
+    started_at = time.monotonic()
+    result = {"index": index, "id": record.get("id", index), "idea": record.get("idea"), "status": "error"}
+    if "_error" in record:
+        result["error"] = record["_error"]
+        return result
+
+    idea = str(record["idea"]).strip()
+    goal, constraints, values = (str(record.get(field) or "") for field in ("goal", "constraints", "values"))
+    try:
+        session_manager = SessionManager(app_name=BATCH_APP_NAME, user_id=f"batch-{index}")
+        session, session_id = session_manager.start_new_idea_session(
+            idea, user_goal=goal, user_constraints=constraints, user_values=values
+        )
+        if session is None:
+            raise RuntimeError("세션을 만들지 못했습니다.")
+
+        orchestrator = AIdeaLabOrchestrator(
+            model_name=options.model,
+            auto_route=options.auto_route,
+            structured_reports=options.structured_reports
+        )
+        cache_model_key = orchestrator.get_phase1_cache_model_key()
+        adk_controller = AdkController(session_manager)
+        success, _, processed_outputs = await adk_controller.execute_phase1_workflow(
+            session_id,
+            build_phase1_input(idea, goal, constraints, values),
+            orchestrator,
+            cache_key=phase1_cache_key(idea, goal, constraints, values, model=cache_model_key),
+            similarity_text=phase1_similarity_text(idea, goal, constraints, values),
+            cache_variant=phase1_variant_key(cache_model_key),
+            reuse_cached=not options.no_cache
+        )
+
+        state = session_manager.get_session(session_id).state
+        result["phase1"] = {
+            output_key: state.get(output_key)
+            for output_key in orchestrator.get_output_keys_phase1().values()
+            if output_key in processed_outputs
+        }
+        result["phase1_cache_hit"] = adk_controller.phase1_cache_hit
+        if not success:
+            result["error"] = "1단계 분석이 완료되지 않았습니다."
+        elif options.phase2:
+            result["phase2"] = await _run_phase2(
+                session_manager, session_id, orchestrator,
+                options.phase2_user_response, options.phase2_max_user_turns
+            )
+            if result["phase2"]["status"] != "완료":
+                result["error"] = f"2단계 토론 상태: {result['phase2']['status']}"
+        if "error" not in result:
+            result["status"] = "ok"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["elapsed_seconds"] = round(time.monotonic() - started_at, 3)
+    return result
+
+
+async def run_batch(options: argparse.Namespace, output_file: TextIO, progress_file: TextIO) -> Dict[str, int]:
+    """
+    입력의 아이디어를 최대 options.concurrency개씩 동시에 분석하고, 완료되는 순서대로 결과를 기록합니다.
+
+    Args:
+        options (argparse.Namespace): 명령줄 옵션
+        output_file (TextIO): 결과 JSONL을 쓸 파일
+        progress_file (TextIO): 진행 상황을 쓸 파일
+
+    Returns:
+        Dict[str, int]: {"ok": 성공 수, "error": 실패 수}
+    """
+    skip_indexes = completed_indexes(options.output) if options.resume and options.output != "-" else set()
+    if skip_indexes:
+        print(f"[batch] Resuming: skipping {len(skip_indexes)} completed ideas", file=progress_file, flush=True)
+
+    ideas = list(read_ideas(options.input, options.offset, options.limit, skip_indexes))
+    total = len(ideas)
+    counts = {"ok": 0, "error": 0}
+    started_at = time.monotonic()
+    semaphore = asyncio.Semaphore(max(1, options.concurrency))
+
+    async def worker(index: int, record: Dict[str, Any]) -> None:
+        async with semaphore:
+            result = await analyze_idea(index, record, options)
+        output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output_file.flush()
+        counts[result["status"]] += 1
+        done = counts["ok"] + counts["error"]
+        elapsed = time.monotonic() - started_at
+        print(
+            f"[batch] {done}/{total} (ok {counts['ok']}, error {counts['error']}) "
+            f"line {index} {result['status']} in {result.get('elapsed_seconds', 0):.1f}s, "
+            f"{done / elapsed * 60 if elapsed else 0:.1f} ideas/min",
+            file=progress_file, flush=True
+        )
+
+    await asyncio.gather(*(worker(index, record) for index, record in ideas))
+    return counts
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch_runner",
+        description="JSONL 파일의 아이디어를 Streamlit 없이 일괄 분석하고 결과를 JSONL로 기록합니다."
+    )
+    parser.add_argument("input", help='입력 JSONL 파일 ("-"이면 표준 입력)')
+    parser.add_argument("-o", "--output", default="-", help='출력 JSONL 파일 (기본값 "-": 표준 출력, 파일이면 이어서 씀)')
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시에 분석할 아이디어 수")
+    parser.add_argument("--offset", type=int, default=0, help="처리를 시작할 입력 줄 번호 (0부터 시작)")
+    parser.add_argument("--limit", type=int, default=None, help="처리할 최대 아이디어 수")
+    parser.add_argument("--resume", action="store_true", help="출력 파일에 성공으로 기록된 줄을 건너뜀")
+    parser.add_argument("--model", default=None, help="사용할 모델 (기본값: DEFAULT_MODEL)")
+    parser.add_argument("--auto-route", action="store_true", help="역할별 자동 모델 선택 사용")
+    parser.add_argument("--structured-reports", action="store_true", help="구조화된 페르소나 보고서 모드 사용")
+    parser.add_argument("--no-cache", action="store_true", help="1단계 결과 캐시를 조회하지 않음 (결과는 저장)")
+    parser.add_argument("--phase2", action="store_true", help="1단계 후 2단계 토론을 자동으로 진행")
+    parser.add_argument("--phase2-user-response", default=DEFAULT_PHASE2_USER_RESPONSE,
+                        help="2단계에서 사용자 의견 요청 시 보낼 자동 응답")
+    parser.add_argument("--phase2-max-user-turns", type=int, default=DEFAULT_PHASE2_MAX_USER_TURNS,
+                        help="2단계에서 자동 응답할 최대 횟수")
+    parser.add_argument("-v", "--verbose", action="store_true", help="분석 중 디버그 출력을 표준 오류로 표시")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    배치 분석 실행기 진입점
+
+    Returns:
+        int: 종료 코드 (실패한 아이디어가 있으면 1)
+    """
+    options = parse_args(argv)
+    load_dotenv()
+    if options.resume and options.output == "-":
+        print("--resume은 출력 파일(-o)을 지정해야 사용할 수 있습니다.", file=sys.stderr)
+        return 2
+
+    # Streamlit 없이 AppStateManager를 사용할 때 나오는 경고 생략
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    logging.getLogger("streamlit.runtime.state.session_state_proxy").setLevel(logging.ERROR)
+
+    progress_file = sys.stderr
+    with contextlib.ExitStack() as stack:
+        output_file = sys.stdout if options.output == "-" else stack.enter_context(
+            open(options.output, "a", encoding="utf-8")
+        )
+        # 컨트롤러의 디버그 출력이 결과 JSONL과 섞이지 않도록 분리
+        log_target = sys.stderr if options.verbose else stack.enter_context(open(os.devnull, "w"))
+        stack.enter_context(contextlib.redirect_stdout(log_target))
+        counts = asyncio.run(run_batch(options, output_file, progress_file))
+
+    print(f"[batch] Finished: ok {counts['ok']}, error {counts['error']}", file=progress_file)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,550 @@
+"""
+AIdea Lab 동시 사용자 부하 테스트
+
+이 모듈은 한 프로세스가 동시에 몇 명의 사용자를 처리할 수 있는지 가늠하기 위한 명령줄 부하 생성기를 제공합니다.
+
+- 가상 사용자마다 앱과 같은 순서로 SessionManager, AdkController, DiscussionController를 직접 호출합니다:
+  아이디어 제출(세션 생성) -> 1단계 분석 -> 2단계 전환 -> 사용자 응답을 포함한 여러 차례의 2단계 토론(최종 요약까지)
+- 모델은 기본값으로 실제 API 대신 가짜 모델("fake-"로 시작하는 이름)을 사용합니다. 호출마다 --latency초(±--jitter 비율)
+  기다린 뒤 응답하며(컨트롤러의 SSE 스트리밍 호출에는 부분 응답으로 나눠 보냄), 퍼실리테이터에게는 사용자별 진행 순서(--rounds번의 페르소나 발언 중 --user-replies번의 사용자 질문,
+  마지막에 최종 요약)대로 JSON을 응답합니다. 에이전트 그래프 캐시, 계측 콜백, 세션 저장소는 앱과 동일하게 동작합니다.
+- --users에 지정한 동시 사용자 수마다 한 번씩 실행해 다음을 보고합니다:
+  처리량(완료 세션/초), 단계별 지연 시간 백분위수(p50/p95/p99), 이벤트 루프 지연(--lag-interval 간격으로 측정한
+  sleep 초과 시간), 실행 중 RSS 최댓값. --memory-profile이면 단계 경계 메모리 스냅샷(src/utils/memory_profiler.py)도 찍고,
+  실행이 끝난 뒤 추적 시작 시점보다 늘어난 할당 위치를 보고합니다.
+- 모델 성능 기록은 임시 파일에 남겨 운영 중인 모델 라우팅 통계에 부하 테스트 호출이 섞이지 않게 하고,
+  가짜 모델로 실행할 때는 레이트 리미터를 끄고(--rate-limit이면 유지) API 키 검증 요청을 보내지 않습니다.
+  1단계 결과 캐시는 사용하지 않습니다.
+
+사용 예:
+    python -m src.load_test --users 1,8,32
+    python -m src.load_test --users 16 --latency 1.5 --rounds 6 --user-replies 2 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Sequence
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+from src.batch_runner import DEFAULT_PHASE2_USER_RESPONSE, PHASE2_AWAITING_USER_STATUS
+from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator
+from src.session_manager import SessionManager
+from src.ui.adk_controller import AdkController, build_phase1_input
+from src.ui.discussion_controller import DiscussionController
+from src.ui.state_manager import AppStateManager
+from src.utils import model_router, rate_limiter
+from src.utils.api_key_pool import mark_api_key_verified, use_api_key
+from src.utils.memory_profiler import configure_memory_profiling, is_memory_profiling_enabled, take_phase_snapshot
+from src.utils.model_monitor import AIModelMonitor
+
+LOAD_TEST_APP_NAME = "aidea-lab-load-test"
+DEFAULT_FAKE_MODEL = "fake-load-test"
+# 가짜 모델로 실행할 때 세션 키로 지정하는 API 키 (실제 API로 보내지 않음)
+FAKE_API_KEY = "aidea-load-test-fake-key"
+
+DEFAULT_USER_LEVELS = "1,4,16"
+# 가짜 모델 호출 1회의 기본 지연 시간(초)과 무작위 변동 비율
+DEFAULT_LATENCY_SECONDS = 0.5
+DEFAULT_JITTER = 0.2
+# 가짜 모델이 만드는 보고서/발언의 기본 길이 (자)
+DEFAULT_REPORT_CHARS = 1500
+# 사용자별 2단계 페르소나 발언 수와 그중 사용자에게 질문하는 횟수
+DEFAULT_ROUNDS = 4
+DEFAULT_USER_REPLIES = 1
+DEFAULT_LAG_INTERVAL_SECONDS = 0.05
+# SSE 스트리밍 호출에 가짜 모델이 보내는 부분 응답 수
+FAKE_STREAM_CHUNKS = 4
+
+# --memory-profile 보고서에 표시할 할당 위치 수
+MEMORY_REPORT_TOP = 5
+
+STAGES = ("submit", "phase1", "transition", "phase2_round", "session")
+PERCENTILES = (0.5, 0.95, 0.99)
+
+PERSONA_AGENTS = ("marketer_agent", "critic_agent", "engineer_agent")
+
+FAKE_REPORT_PARAGRAPHS = (
+    "**핵심 포인트:**\n- 목표 고객의 반복 구매 의향이 높습니다.\n- 초기 고객 확보 비용이 가장 큰 부담입니다.\n"
+    "- 3개월 안에 검증 가능한 최소 기능 제품을 만들 수 있습니다.",
+    "**종합 요약:** 시장성은 충분하지만 고객 확보 전략과 비용 구조를 먼저 검증해야 합니다.",
+    "시장 규모는 연 12% 성장 중이며, 경쟁사는 주로 대형 유통사입니다. 차별화 요소는 개인 맞춤 설계입니다.",
+    "배송 인프라 비용과 원가 변동이 가장 큰 위험 요소입니다. 초기에는 지역을 제한해 운영 비용을 줄여야 합니다.",
+)
+
+# 가짜 모델 설정 (configure_fake_model()로 변경)
+_fake_model_config: Dict[str, Any] = {
+    "latency_seconds": DEFAULT_LATENCY_SECONDS,
+    "jitter": DEFAULT_JITTER,
+    "report_chars": DEFAULT_REPORT_CHARS,
+}
+_fake_model_calls = 0
+
+# 가상 사용자별 퍼실리테이터 진행 순서 (사용자 태스크에서 지정하면 그 사용자의 모델 호출이 차례로 꺼내 씀)
+_facilitator_script: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "load_test_facilitator_script", default=None
+)
+
+
+def configure_fake_model(latency_seconds: float = DEFAULT_LATENCY_SECONDS, jitter: float = DEFAULT_JITTER,
+                         report_chars: int = DEFAULT_REPORT_CHARS) -> None:
+    """
+    가짜 모델의 응답 지연 시간과 응답 길이를 설정합니다.
+
+    Args:
+        latency_seconds (float): 호출 1회의 평균 지연 시간 (초)
+        jitter (float): 지연 시간의 무작위 변동 비율 (0.2이면 ±20%)
+        report_chars (int): 보고서/발언 응답의 길이 (자)
+    """
+    _fake_model_config.update(latency_seconds=max(latency_seconds, 0.0), jitter=max(jitter, 0.0),
+                              report_chars=max(report_chars, 1))
+
+
+def get_fake_model_call_count() -> int:
+    """프로세스 시작 이후 가짜 모델이 응답한 호출 수를 반환합니다."""
+    return _fake_model_calls
+
+
+def build_facilitator_script(rounds: int, user_replies: int) -> List[str]:
+    """
+    퍼실리테이터가 차례로 지정할 다음 발언자 목록을 만듭니다.
+    페르소나 발언 사이에 사용자 질문을 고르게 배치하고, 마지막은 최종 요약입니다.
+
+    Args:
+        rounds (int): 페르소나 발언 수
+        user_replies (int): 사용자에게 질문할 횟수 (페르소나 발언 수보다 많으면 발언 수만큼)
+
+    Returns:
+        List[str]: next_agent 값 목록
+    """
+    rounds = max(rounds, 1)
+    user_replies = min(max(user_replies, 0), rounds)
+    reply_after = {math.ceil((reply + 1) * rounds / (user_replies + 1)) for reply in range(user_replies)}
+    script = []
+    for turn in range(rounds):
+        script.append(PERSONA_AGENTS[turn % len(PERSONA_AGENTS)])
+        if turn + 1 in reply_after:
+            script.append("USER")
+    script.append("FINAL_SUMMARY")
+    return script
+
+
+def _fake_report(report_chars: int) -> str:
+    """핵심 포인트와 종합 요약을 포함한 지정 길이의 보고서를 만듭니다."""
+    header = "\n\n".join(FAKE_REPORT_PARAGRAPHS[:2])
+    body = "\n\n".join(FAKE_REPORT_PARAGRAPHS[2:])
+    text = header
+    while len(text) < report_chars:
+        text += "\n\n" + body
+    return text[:max(report_chars, len(header))]
+
+
+def _fake_facilitator_response() -> str:
+    """사용자별 진행 순서의 다음 발언자를 지정하는 퍼실리테이터 JSON 응답을 만듭니다."""
+    script = _facilitator_script.get()
+    next_agent = script.pop(0) if script else "FINAL_SUMMARY"
+    return json.dumps({
+        "next_agent": next_agent,
+        "message_to_next_agent_or_topic": "지금까지의 논의에서 가장 큰 위험 요소를 검토해주세요.",
+        "reasoning": "부하 테스트 진행 순서",
+    }, ensure_ascii=False)
+
+
+class FakeLoadTestLlm(BaseLlm):
+    """부하 테스트용 가짜 모델. 설정한 지연 시간 뒤에 퍼실리테이터 JSON 또는 보고서 텍스트를 응답합니다."""
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"fake-.*"]
+
+    async def generate_content_async(self, llm_request, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        global _fake_model_calls
+        latency = _fake_model_config["latency_seconds"]
+        jitter = _fake_model_config["jitter"]
+        await asyncio.sleep(max(latency * (1 + random.uniform(-jitter, jitter)), 0.0))
+
+        instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        if "message_to_next_agent_or_topic" in instruction:
+            text = _fake_facilitator_response()
+        else:
+            text = _fake_report(_fake_model_config["report_chars"])
+        _fake_model_calls += 1
+        if stream:
+            # SSE 스트리밍 호출이면 실제 모델처럼 부분 응답들 뒤에 전체 텍스트를 담은 최종 응답을 보냄
+            chunk_size = max(len(text) // FAKE_STREAM_CHUNKS, 1)
+            for start in range(0, len(text), chunk_size):
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text[start:start + chunk_size])]),
+                                  partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+LLMRegistry.register(FakeLoadTestLlm)
+LLMRegistry.resolve.cache_clear()
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    """값 목록의 백분위수를 nearest-rank 방식으로 계산합니다. 빈 목록이면 0을 반환합니다."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize_latencies(values: Sequence[float]) -> Dict[str, float]:
+    """
+    지연 시간(초) 목록을 보고서용 밀리초 통계로 요약합니다.
+
+    Args:
+        values (Sequence[float]): 지연 시간 목록 (초)
+
+    Returns:
+        Dict[str, float]: count, p50_ms, p95_ms, p99_ms, max_ms
+    """
+    summary = {"count": len(values)}
+    for fraction in PERCENTILES:
+        summary[f"p{round(fraction * 100)}_ms"] = round(_percentile(values, fraction) * 1000, 1)
+    summary["max_ms"] = round(max(values, default=0.0) * 1000, 1)
+    return summary
+
+
+def current_rss_bytes() -> int:
+    """현재 프로세스의 RSS(바이트)를 반환합니다. /proc을 읽을 수 없으면 0을 반환합니다."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss_bytes() -> int:
+    """프로세스 시작 이후 RSS 최댓값(바이트)을 반환합니다. 측정할 수 없으면 0을 반환합니다."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def _monitor_event_loop(interval: float, samples: Dict[str, List[float]], stop: asyncio.Event) -> None:
+    """interval마다 깨어나 예정보다 늦게 깨어난 시간(이벤트 루프 지연)과 RSS를 기록합니다."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples["lag"].append(max(loop.time() - started - interval, 0.0))
+        samples["rss"].append(current_rss_bytes())
+
+
+@contextlib.contextmanager
+def load_test_environment(fake_model: bool = True, keep_rate_limit: bool = False) -> Iterator[None]:
+    """
+    부하 테스트 동안 전역 모델 라우터를 테스트 전용 객체로 바꿉니다. 모델 성능 기록은 임시 디렉터리에 저장되어 끝나면 삭제됩니다.
+    가짜 모델이면 레이트 리미터를 끄고, 검증된 것으로 표시한 가짜 API 키를 세션 키로 지정해 키 검증 요청을 보내지 않습니다.
+    asyncio.run() 전에 진입해야 가상 사용자 태스크가 세션 키를 물려받습니다.
+
+    Args:
+        fake_model (bool): 가짜 모델로 실행하는지 여부
+        keep_rate_limit (bool): True이면 가짜 모델이어도 설정된 레이트 리미터를 그대로 사용
+    """
+    disable_rate_limit = fake_model and not keep_rate_limit
+    with contextlib.ExitStack() as stack:
+        log_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="aidea-load-test-"))
+        router = model_router.ModelRouter(AIModelMonitor(log_file_path=os.path.join(log_dir, "model_performance.json")))
+        with model_router._default_router_lock:
+            previous_router, model_router._default_router = model_router._default_router, router
+        if disable_rate_limit:
+            with rate_limiter._default_rate_limiter_lock:
+                previous_limiter = rate_limiter._default_rate_limiter
+                rate_limiter._default_rate_limiter = rate_limiter.RateLimiter(config={"enabled": False})
+        if fake_model:
+            mark_api_key_verified(FAKE_API_KEY)
+            stack.enter_context(use_api_key(FAKE_API_KEY))
+        try:
+            yield
+        finally:
+            with model_router._default_router_lock:
+                model_router._default_router = previous_router
+            if disable_rate_limit:
+                with rate_limiter._default_rate_limiter_lock:
+                    rate_limiter._default_rate_limiter = previous_limiter
+
+
+async def simulate_user(level: int, index: int, options: argparse.Namespace,
+                        stage_latencies: Dict[str, List[float]]) -> Dict[str, Any]:
+    """
+    가상 사용자 한 명의 아이디어 제출부터 2단계 최종 요약까지를 실행하고 단계별 지연 시간을 기록합니다.
+
+    Args:
+        level (int): 이 실행의 동시 사용자 수 (사용자 ID 구분용)
+        index (int): 사용자 번호
+        options (argparse.Namespace): 명령줄 옵션
+        stage_latencies (Dict[str, List[float]]): 단계 이름 -> 지연 시간 목록 (초). 이 함수가 추가함
+
+    Returns:
+        Dict[str, Any]: {"status": "ok" 또는 "error", "error": 오류 설명(실패 시)}
+    """
+    _facilitator_script.set(build_facilitator_script(options.rounds, options.user_replies))
+    # 요청 병합과 유사 입력 재사용이 일어나지 않도록 사용자마다 다른 아이디어 사용
+    idea = f"부하 테스트 아이디어 {level}-{index}: 1인 가구를 위한 맞춤형 식단 구독 서비스"
+    session_started = time.perf_counter()
+
+    def record(stage: str, started: float) -> None:
+        stage_latencies[stage].append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        session_manager = SessionManager(app_name=LOAD_TEST_APP_NAME, user_id=f"load-{level}-{index}")
+        session, session_id = session_manager.start_new_idea_session(idea)
+        record("submit", started)
+        if session is None:
+            raise RuntimeError("세션을 만들지 못했습니다.")
+
+        started = time.perf_counter()
+        orchestrator = AIdeaLabOrchestrator(model_name=options.model)
+        success, _, _ = await AdkController(session_manager).execute_phase1_workflow(
+            session_id, build_phase1_input(idea, "", "", ""), orchestrator
+        )
+        record("phase1", started)
+        if not success:
+            raise RuntimeError("1단계 분석이 완료되지 않았습니다.")
+        take_phase_snapshot("phase1_complete", session=lambda: session_manager.get_session(session_id),
+                            session_id=session_id)
+
+        started = time.perf_counter()
+        if not session_manager.transition_to_phase2():
+            raise RuntimeError("2단계로 전환하지 못했습니다.")
+        record("transition", started)
+        take_phase_snapshot("phase2_transition", session=lambda: session_manager.get_session(session_id),
+                            session_id=session_id)
+
+        discussion_controller = DiscussionController(session_manager)
+        pending_response = None
+        for _ in range(options.user_replies + 1):
+            started = time.perf_counter()
+            # 토론 컨트롤러가 첫 대기 지점 전에 읽으므로 다른 가상 사용자의 값과 섞이지 않음 (batch_runner와 동일)
+            AppStateManager.set_awaiting_user_input_phase2(pending_response is not None)
+            AppStateManager.set_phase2_user_response(pending_response or "")
+            _, status, _ = await discussion_controller.run_phase2_discussion(session_id, orchestrator)
+            record("phase2_round", started)
+            if status != PHASE2_AWAITING_USER_STATUS:
+                break
+            pending_response = DEFAULT_PHASE2_USER_RESPONSE
+        if status != "완료":
+            raise RuntimeError(f"2단계 토론 상태: {status}")
+        take_phase_snapshot("phase2_final_summary", session=lambda: session_manager.get_session(session_id),
+                            session_id=session_id)
+    except Exception as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    record("session", session_started)
+    return {"status": "ok"}
+
+
+async def run_level(users: int, options: argparse.Namespace) -> Dict[str, Any]:
+    """
+    users명의 가상 사용자를 동시에 실행하고 결과를 요약합니다.
+    --ramp-up이 있으면 사용자 시작 시각을 그 시간(초)에 걸쳐 고르게 나눕니다.
+
+    Args:
+        users (int): 동시 사용자 수
+        options (argparse.Namespace): 명령줄 옵션
+
+    Returns:
+        Dict[str, Any]: 처리량, 단계별 지연 시간, 이벤트 루프 지연, RSS를 담은 결과
+    """
+    stage_latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    samples: Dict[str, List[float]] = {"lag": [], "rss": []}
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_event_loop(options.lag_interval, samples, stop))
+    rss_start = current_rss_bytes()
+    calls_start = get_fake_model_call_count()
+
+    async def user(index: int) -> Dict[str, Any]:
+        if options.ramp_up > 0:
+            await asyncio.sleep(options.ramp_up * index / users)
+        return await simulate_user(users, index, options, stage_latencies)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(user(index) for index in range(users)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    completed = sum(1 for result in results if result["status"] == "ok")
+    errors = [result["error"] for result in results if result["status"] != "ok"]
+    level = {
+        "users": users,
+        "completed": completed,
+        "errors": len(errors),
+        "error_samples": list(dict.fromkeys(errors))[:3],
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_sessions_per_second": round(completed / elapsed, 3) if elapsed else 0.0,
+        "model_calls": get_fake_model_call_count() - calls_start,
+        "stages": {stage: summarize_latencies(values) for stage, values in stage_latencies.items()},
+        "event_loop_lag": summarize_latencies(samples["lag"]),
+        "rss_start_mb": round(rss_start / 2**20, 1),
+        "rss_peak_mb": round(max(samples["rss"] + [rss_start, current_rss_bytes()]) / 2**20, 1),
+    }
+    if is_memory_profiling_enabled():
+        # 모든 사용자가 끝난 뒤에도 추적 시작 시점보다 늘어난 할당은 남아 있는 세션 데이터 후보
+        report = take_phase_snapshot("load_level_complete", users=users)
+        level["memory"] = {
+            "traced_mb": round(report["traced_bytes"] / 2**20, 2),
+            "peak_traced_mb": round(report["peak_traced_bytes"] / 2**20, 2),
+            "active_sessions": report["active_sessions"],
+            "top_since_start": report["top_since_start"][:MEMORY_REPORT_TOP],
+        }
+    return level
+
+
+async def run_load_test(options: argparse.Namespace, progress_file: Any = None) -> Dict[str, Any]:
+    """
+    --users의 동시 사용자 수마다 차례로 부하 테스트를 실행합니다.
+
+    Args:
+        options (argparse.Namespace): 명령줄 옵션
+        progress_file (TextIO, optional): 단계별 진행 상황을 쓸 파일
+
+    Returns:
+        Dict[str, Any]: 실행 설정과 동시 사용자 수별 결과("levels")
+    """
+    configure_fake_model(options.latency, options.jitter, options.report_chars)
+    if options.memory_profile:
+        configure_memory_profiling(enabled=True)
+    levels = []
+    for users in options.users:
+        if progress_file:
+            print(f"[load] Running {users} concurrent user(s)...", file=progress_file, flush=True)
+        levels.append(await run_level(users, options))
+    return {
+        "model": options.model,
+        "latency_seconds": options.latency,
+        "jitter": options.jitter,
+        "rounds": options.rounds,
+        "user_replies": options.user_replies,
+        "levels": levels,
+        "process_peak_rss_mb": round(peak_rss_bytes() / 2**20, 1),
+    }
+
+
+def format_report(run: Dict[str, Any]) -> str:
+    """부하 테스트 결과를 사람이 읽을 보고서로 만듭니다."""
+    lines = [
+        f"Model: {run['model']} (latency {run['latency_seconds']}s ±{run['jitter'] * 100:.0f}%), "
+        f"{run['rounds']} persona turn(s) and {run['user_replies']} user reply(ies) per session",
+        "",
+        f"{'users':>5}  {'ok':>5}  {'err':>4}  {'elapsed s':>9}  {'sessions/s':>10}  {'calls/s':>8}  "
+        f"{'loop lag p99/max ms':>19}  {'peak RSS MB':>11}",
+    ]
+    for level in run["levels"]:
+        lag = level["event_loop_lag"]
+        calls_per_second = level["model_calls"] / level["elapsed_seconds"] if level["elapsed_seconds"] else 0.0
+        lines.append(
+            f"{level['users']:>5}  {level['completed']:>5}  {level['errors']:>4}  {level['elapsed_seconds']:>9.2f}  "
+            f"{level['throughput_sessions_per_second']:>10.3f}  {calls_per_second:>8.1f}  "
+            f"{lag['p99_ms']:>9.1f}/{lag['max_ms']:<9.1f}  {level['rss_peak_mb']:>11.1f}"
+        )
+
+    width = max(len(stage) for stage in STAGES)
+    for level in run["levels"]:
+        lines += ["", f"Stage latency with {level['users']} user(s) (ms):"]
+        for stage, summary in level["stages"].items():
+            lines.append(
+                f"  {stage:<{width}}  n={summary['count']:<5} p50 {summary['p50_ms']:>9.1f}  p95 {summary['p95_ms']:>9.1f}  "
+                f"p99 {summary['p99_ms']:>9.1f}  max {summary['max_ms']:>9.1f}"
+            )
+        for error in level["error_samples"]:
+            lines.append(f"  error: {error}")
+        memory = level.get("memory")
+        if memory:
+            lines.append(f"  traced memory {memory['traced_mb']:.2f} MB (peak {memory['peak_traced_mb']:.2f} MB), "
+                         f"{memory['active_sessions']} active session(s); top growth since start:")
+            for item in memory["top_since_start"]:
+                lines.append(f"    {item['size_diff_bytes'] / 1024:+10.1f} KB  {item['count_diff']:+7d}  {item['location']}")
+    lines += ["", f"Process peak RSS: {run['process_peak_rss_mb']:.1f} MB"]
+    return "\n".join(lines)
+
+
+def _parse_user_levels(value: str) -> List[int]:
+    try:
+        levels = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"쉼표로 구분한 정수 목록이어야 합니다: {value!r}")
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"동시 사용자 수는 1 이상이어야 합니다: {value!r}")
+    return levels
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.load_test",
+        description="가상 사용자를 동시에 실행해 컨트롤러 계층의 처리량, 단계별 지연 시간, 이벤트 루프 지연, RSS를 측정합니다."
+    )
+    parser.add_argument("-u", "--users", type=_parse_user_levels, default=_parse_user_levels(DEFAULT_USER_LEVELS),
+                        help=f"차례로 실행할 동시 사용자 수 목록 (기본값: {DEFAULT_USER_LEVELS})")
+    parser.add_argument("--model", default=DEFAULT_FAKE_MODEL,
+                        help='사용할 모델 (기본값: 가짜 모델. "fake-"로 시작하지 않으면 실제 API를 호출함)')
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_SECONDS, help="가짜 모델 호출 1회의 지연 시간 (초)")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="가짜 모델 지연 시간의 무작위 변동 비율")
+    parser.add_argument("--report-chars", type=int, default=DEFAULT_REPORT_CHARS, help="가짜 모델 응답 길이 (자)")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="세션별 2단계 페르소나 발언 수")
+    parser.add_argument("--user-replies", type=int, default=DEFAULT_USER_REPLIES, help="세션별 2단계 사용자 응답 수")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="사용자 시작 시각을 나눌 시간 (초, 기본값: 동시에 시작)")
+    parser.add_argument("--lag-interval", type=float, default=DEFAULT_LAG_INTERVAL_SECONDS,
+                        help="이벤트 루프 지연 측정 간격 (초)")
+    parser.add_argument("--memory-profile", action="store_true",
+                        help="tracemalloc으로 단계 경계마다 메모리 스냅샷을 찍고 늘어난 할당 위치를 보고 (실행이 느려짐)")
+    parser.add_argument("--rate-limit", action="store_true", help="설정된 레이트 리미터를 그대로 사용")
+    parser.add_argument("--json", action="store_true", help="보고서 대신 JSON으로 출력")
+    parser.add_argument("-v", "--verbose", action="store_true", help="실행 중 디버그 출력을 표준 오류로 표시")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    부하 테스트 진입점
+
+    Returns:
+        int: 종료 코드 (실패한 세션이 있으면 1)
+    """
+    options = parse_args(argv)
+    options.user_replies = min(max(options.user_replies, 0), max(options.rounds, 1))
+
+    # Streamlit 없이 AppStateManager를 사용할 때 나오는 경고 생략
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    logging.getLogger("streamlit.runtime.state.session_state_proxy").setLevel(logging.ERROR)
+    if not options.verbose:
+        # 앱에서도 나오는 ADK 실행기와 OpenTelemetry 컨텍스트 경고가 진행 상황과 섞이지 않도록 생략
+        logging.getLogger("google.adk.runners").setLevel(logging.ERROR)
+        logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    with contextlib.ExitStack() as stack:
+        # 컨트롤러의 디버그 출력이 보고서와 섞이지 않도록 분리
+        log_target = sys.stderr if options.verbose else stack.enter_context(open(os.devnull, "w"))
+        stack.enter_context(contextlib.redirect_stdout(log_target))
+        stack.enter_context(load_test_environment(fake_model=options.model.startswith("fake-"),
+                                                  keep_rate_limit=options.rate_limit))
+        run = asyncio.run(run_load_test(options, progress_file=sys.stderr))
+
+    print(json.dumps(run, indent=2, ensure_ascii=False) if options.json else format_report(run))
+    return 1 if any(level["errors"] for level in run["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
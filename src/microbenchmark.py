@@ -0,0 +1,352 @@
+"""
+AIdea Lab 마이크로벤치마크
+
+이 모듈은 LLM 호출마다 실행되는 순수 Python 함수(토큰 수 추정, 토론 기록 요약, 컨텍스트 길이 최적화,
+퍼실리테이터 응답 JSON 해석)의 실행 시간을 측정하고, 저장된 기준값과 비교하는 명령줄 벤치마크를 제공합니다.
+
+- 입력은 한국어/영어 고정 데이터입니다: 토론 기록 1, 15, 100개, 2천/2만 자 보고서,
+  일반적인 퍼실리테이터 응답과 정규식 역추적이나 후보 중복 검사를 유발하는 비정상 응답.
+- 각 항목은 호출 1회 시간(µs)으로 보고합니다. 다른 프로세스의 영향을 줄이기 위해 여러 번 측정한 값 중 최솟값을 씁니다.
+- 기준값(microbenchmark_baselines.json)에는 항목별 시간과 보정 작업 시간이 저장됩니다. 비교할 때는
+  보정 작업 시간의 비율로 기계 속도 차이를 맞춘 뒤, 기준값의 --threshold 배를 넘는 항목을 회귀로 보고합니다.
+  입력 크기에 비례하지 않는 복잡도 회귀(예: 목록 멤버십 검사로 인한 O(n²))는 큰 입력 항목에서 드러납니다.
+
+사용 예:
+    python -m src.microbenchmark
+    python -m src.microbenchmark --check --threshold 2.0
+    python -m src.microbenchmark --update-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config.prompts import estimate_token_count, optimize_context_length, summarize_discussion_history
+
+DEFAULT_BASELINE_FILE = os.path.join(os.path.dirname(__file__), "microbenchmark_baselines.json")
+DEFAULT_THRESHOLD = 2.0
+# 기준값보다 이 시간 이상 느려진 항목만 회귀로 판단 (수 µs 항목의 측정 잡음 무시)
+MIN_REGRESSION_US = 5.0
+DEFAULT_REPEAT = 5
+# 한 번 측정할 때 함수를 반복 호출하는 최소 시간 (초)
+MIN_SAMPLE_SECONDS = 0.02
+
+HISTORY_SIZES = (1, 15, 100)
+REPORT_SIZES = (2000, 20000)
+
+SPEAKERS = ("facilitator", "marketer_agent", "critic_agent", "engineer_agent", "user")
+
+KOREAN_PARAGRAPHS = (
+    "**핵심 포인트:** 1인 가구를 위한 식단 구독 서비스는 초기 고객 확보 비용이 높지만, 재구매율이 높아 장기적으로 수익성이 좋습니다.",
+    "시장 규모는 연 12% 성장 중이며, 경쟁사는 주로 대형 유통사입니다. 차별화 요소는 개인 맞춤 영양 설계입니다.",
+    "### 리스크\n배송 인프라 비용과 식재료 가격 변동이 가장 큰 위험 요소입니다. 초기에는 수도권으로 지역을 제한해야 합니다.",
+    "기술적으로는 추천 모델과 재고 관리 시스템이 필요하며, MVP는 3개월 안에 구현 가능합니다. 목표는 6개월 내 유료 고객 1천 명입니다.",
+    "사용자 제약사항(예산 5천만 원, 팀원 3명)을 고려하면 외주 개발보다 노코드 도구로 검증하는 것이 현실적입니다.",
+)
+ENGLISH_PARAGRAPHS = (
+    "**Key point:** A meal-kit subscription for single-person households has high acquisition costs but strong retention.",
+    "The market grows about 12% per year; incumbents are large retailers. Personalised nutrition planning is the main differentiator.",
+    "### Risks\nDelivery infrastructure and ingredient price swings are the biggest risks. Launch in one metro area first.",
+    "Technically we need a recommendation model and inventory management; an MVP is feasible within three months.",
+    "Given the constraints (a budget of $40k and a team of three), validating with no-code tools beats outsourcing development.",
+)
+
+FACILITATOR_JSON = (
+    '{"next_agent": "critic_agent", "message_to_next_agent_or_topic": "수익 모델의 위험 요소를 검토해주세요.", '
+    '"reasoning": "마케터가 제시한 가격 전략의 가정이 검증되지 않았습니다."}'
+)
+
+
+def _paragraphs(language: str) -> Sequence[str]:
+    return KOREAN_PARAGRAPHS if language == "ko" else ENGLISH_PARAGRAPHS
+
+
+def build_history(size: int, language: str = "ko") -> List[Dict[str, Any]]:
+    """
+    토론 기록 고정 데이터를 만듭니다.
+
+    Args:
+        size (int): 기록 항목 수
+        language (str): "ko" 또는 "en"
+
+    Returns:
+        List[Dict[str, Any]]: speaker, message, timestamp 키를 가진 토론 기록
+    """
+    paragraphs = _paragraphs(language)
+    history = []
+    for i in range(size):
+        message = "\n".join(paragraphs[(i + offset) % len(paragraphs)] for offset in range(1 + i % 3))
+        history.append({
+            "speaker": SPEAKERS[i % len(SPEAKERS)],
+            "message": message,
+            "timestamp": f"2025-05-20T10:{i // 60 % 60:02d}:{i % 60:02d}",
+        })
+    return history
+
+
+def build_report(length: int, language: str = "ko") -> str:
+    """
+    보고서 고정 데이터를 만듭니다. 제목, 강조 줄, 빈 줄, 반복되는 줄이 섞인 마크다운입니다.
+
+    Args:
+        length (int): 대략적인 글자 수
+        language (str): "ko" 또는 "en"
+
+    Returns:
+        str: 보고서 텍스트
+    """
+    paragraphs = _paragraphs(language)
+    lines = []
+    total = 0
+    i = 0
+    while total < length:
+        if i % 6 == 0:
+            line = f"### {i // 6 + 1}. " + ("분석 섹션" if language == "ko" else "Analysis section")
+        elif i % 6 == 5:
+            line = ""
+        else:
+            line = f"- {paragraphs[i % len(paragraphs)]}"
+        lines.append(line)
+        total += len(line) + 1
+        i += 1
+    return "\n".join(lines)[:length]
+
+
+def build_facilitator_outputs() -> Dict[str, str]:
+    """
+    퍼실리테이터 응답 고정 데이터를 만듭니다.
+
+    Returns:
+        Dict[str, str]: 이름 -> 응답 텍스트
+    """
+    return {
+        "plain": FACILITATOR_JSON,
+        "fenced_with_prose": f"다음 발언자를 결정했습니다.\n\n```json\n{FACILITATOR_JSON}\n```\n\n위 결정에 따라 진행합니다.",
+        # 닫히지 않은 중괄호가 많은 응답 (중괄호 스캔과 정규식 시작 위치가 많음)
+        "unbalanced_braces": "{ 검토 " * 2000 + FACILITATOR_JSON,
+        # 유효하지 않은 작은 JSON 객체가 많은 응답 (후보 중복 검사와 후보별 해석 실패)
+        "many_candidates": " ".join('{"step": %d}' % (i % 50) for i in range(500)) + " " + FACILITATOR_JSON,
+        # 백틱과 여는 중괄호가 반복되고 닫히지 않는 응답 (인라인 코드 정규식 역추적)
+        "unclosed_backticks": "`{ 예시 " * 2000 + FACILITATOR_JSON,
+        # 닫는 코드 블록 앞의 긴 공백 (코드 블록 정리 정규식 역추적)
+        "trailing_whitespace": "```json\n" + FACILITATOR_JSON + " " * 20000 + "\n```",
+    }
+
+
+def _new_discussion_controller():
+    """세션 관리자 없이 응답 해석 메서드만 쓰는 DiscussionController를 만듭니다."""
+    from src.ui.discussion_controller import DiscussionController
+
+    return DiscussionController.__new__(DiscussionController)
+
+
+def get_benchmark_cases() -> Dict[str, Callable[[], Any]]:
+    """
+    벤치마크 항목을 반환합니다.
+
+    Returns:
+        Dict[str, Callable[[], Any]]: 항목 이름 -> 인자 없이 호출할 함수
+    """
+    cases: Dict[str, Callable[[], Any]] = {}
+    for language in ("ko", "en"):
+        for length in REPORT_SIZES:
+            report = build_report(length, language)
+            cases[f"estimate_token_count/{language}/{length}"] = lambda report=report: estimate_token_count(report)
+            cases[f"optimize_context_length/{language}/{length}"] = (
+                lambda report=report: optimize_context_length(report, max_tokens=500)
+            )
+        for size in HISTORY_SIZES:
+            history = build_history(size, language)
+            cases[f"summarize_discussion_history/{language}/{size}"] = (
+                lambda history=history: summarize_discussion_history(history, max_tokens=2000)
+            )
+
+    controller = _new_discussion_controller()
+    for name, text in build_facilitator_outputs().items():
+        cases[f"parse_facilitator_response/{name}"] = lambda text=text: controller._parse_facilitator_response(text)
+        cases[f"clean_json_text/{name}"] = lambda text=text: controller._clean_json_text(text)
+    return cases
+
+
+def _calibration_workload() -> int:
+    """기계 속도 보정용 고정 작업 (문자열 처리, 정규식, dict 연산)"""
+    text = "보정 작업 calibration " * 200
+    counts: Dict[str, int] = {}
+    for word in re.findall(r"\w+", text):
+        counts[word] = counts.get(word, 0) + 1
+    return sum(len(line) for line in text.split(" ")) + len(counts)
+
+
+def measure(function: Callable[[], Any], repeat: int = DEFAULT_REPEAT) -> float:
+    """
+    함수 호출 1회 시간을 repeat 번 측정해 최솟값을 반환합니다 (timeit 권장 방식).
+
+    Args:
+        function (Callable[[], Any]): 측정할 함수
+        repeat (int): 측정 횟수
+
+    Returns:
+        float: 호출 1회 시간 (µs)
+    """
+    function()  # 정규식 컴파일 등 첫 호출 비용 제외
+    samples = []
+    for _ in range(max(1, repeat)):
+        calls = 0
+        started_at = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < MIN_SAMPLE_SECONDS:
+            function()
+            calls += 1
+            elapsed = time.perf_counter() - started_at
+        samples.append(elapsed / calls * 1e6)
+    return min(samples)
+
+
+def run_benchmarks(pattern: Optional[str] = None, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    벤치마크를 실행합니다.
+
+    Args:
+        pattern (str, optional): 이 정규식과 일치하는 항목만 실행
+        repeat (int): 항목별 측정 횟수
+
+    Returns:
+        Dict[str, Any]: calibration_us와 results(항목 이름 -> µs)
+    """
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        calibration_us = measure(_calibration_workload, repeat)
+        for name, function in get_benchmark_cases().items():
+            if pattern and not re.search(pattern, name):
+                continue
+            results[name] = measure(function, repeat)
+        # 보정 작업은 처음과 끝에 측정해 빠른 쪽을 사용 (측정 중 일시적인 부하의 영향 감소)
+        calibration_us = min(calibration_us, measure(_calibration_workload, repeat))
+    return {"calibration_us": calibration_us, "results": results}
+
+
+def load_baseline(path: str = DEFAULT_BASELINE_FILE) -> Optional[Dict[str, Any]]:
+    """저장된 기준값을 불러옵니다. 파일이 없으면 None을 반환합니다."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(run: Dict[str, Any], path: str = DEFAULT_BASELINE_FILE) -> None:
+    """측정 결과를 기준값으로 저장합니다."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "calibration_us": round(run["calibration_us"], 3),
+            "results": {name: round(us, 3) for name, us in sorted(run["results"].items())},
+        }, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def compare_to_baseline(run: Dict[str, Any], baseline: Dict[str, Any],
+                        threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    측정 결과를 기준값과 비교합니다. 기준값은 보정 작업 시간의 비율로 이 기계의 속도에 맞춥니다.
+
+    Args:
+        run (Dict[str, Any]): run_benchmarks() 결과
+        baseline (Dict[str, Any]): 저장된 기준값
+        threshold (float): 허용 배율
+
+    Returns:
+        List[Dict[str, Any]]: 기준값이 있는 항목의 name, us, baseline_us(보정 후), ratio,
+            regressed(배율이 threshold를 넘고 MIN_REGRESSION_US 이상 느려짐)
+    """
+    scale = run["calibration_us"] / baseline["calibration_us"] if baseline.get("calibration_us") else 1.0
+    comparisons = []
+    for name, us in run["results"].items():
+        baseline_us = baseline["results"].get(name)
+        if baseline_us is None:
+            continue
+        expected_us = baseline_us * scale
+        ratio = us / expected_us if expected_us > 0 else 0.0
+        comparisons.append({
+            "name": name,
+            "us": us,
+            "baseline_us": expected_us,
+            "ratio": ratio,
+            "regressed": ratio > threshold and us - expected_us > MIN_REGRESSION_US,
+        })
+    return comparisons
+
+
+def format_report(run: Dict[str, Any], comparisons: Optional[List[Dict[str, Any]]] = None) -> str:
+    """벤치마크 결과를 사람이 읽을 보고서로 만듭니다."""
+    by_name = {comparison["name"]: comparison for comparison in comparisons or []}
+    width = max((len(name) for name in run["results"]), default=0)
+    lines = [f"Calibration workload: {run['calibration_us']:.1f} us", ""]
+    for name, us in run["results"].items():
+        line = f"  {name:<{width}}  {us:12.1f} us"
+        comparison = by_name.get(name)
+        if comparison:
+            line += f"  baseline {comparison['baseline_us']:12.1f} us  x{comparison['ratio']:.2f}"
+            if comparison["regressed"]:
+                line += "  REGRESSION"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.microbenchmark",
+        description="LLM 호출마다 실행되는 순수 Python 함수의 실행 시간을 측정하고 기준값과 비교합니다."
+    )
+    parser.add_argument("-k", "--filter", help="이 정규식과 일치하는 항목만 실행")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT, help="항목별 측정 횟수")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_FILE, help="기준값 파일 경로")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀로 판단할 기준값 대비 배율")
+    parser.add_argument("--check", action="store_true", help="기준값 대비 회귀가 있으면 종료 코드 1로 종료")
+    parser.add_argument("--update-baseline", action="store_true", help="측정 결과를 기준값으로 저장")
+    parser.add_argument("--json", action="store_true", help="보고서 대신 JSON으로 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    마이크로벤치마크 진입점
+
+    Returns:
+        int: 종료 코드 (--check에서 회귀가 있으면 1)
+    """
+    options = parse_args(argv)
+    run = run_benchmarks(options.filter, options.repeat)
+
+    if options.update_baseline:
+        baseline = load_baseline(options.baseline) or {"results": {}}
+        if options.filter and baseline.get("calibration_us"):
+            # 일부 항목만 갱신하면 저장된 보정 시간에 맞춰 환산
+            scale = baseline["calibration_us"] / run["calibration_us"]
+            run = {
+                "calibration_us": baseline["calibration_us"],
+                "results": {**baseline["results"], **{name: us * scale for name, us in run["results"].items()}},
+            }
+        save_baseline(run, options.baseline)
+        print(f"Baseline saved to '{options.baseline}'")
+        return 0
+
+    baseline = load_baseline(options.baseline)
+    comparisons = compare_to_baseline(run, baseline, options.threshold) if baseline else []
+    regressions = [comparison["name"] for comparison in comparisons if comparison["regressed"]]
+
+    if options.json:
+        print(json.dumps({**run, "comparisons": comparisons, "regressions": regressions}, indent=2))
+    else:
+        print(format_report(run, comparisons))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above x{options.threshold}: {', '.join(regressions)}")
+    return 1 if options.check and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
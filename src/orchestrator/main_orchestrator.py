@@ -5,61 +5,171 @@ AIdea Lab 오케스트레이터
 그 결과를 조율하는 오케스트레이터 클래스를 구현합니다.
 """
 
+import hashlib
 import os
 import sys
-from typing import Dict, Any
+import threading
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from typing import Dict, Any, Callable, Hashable
 from google.adk.agents import Agent, SequentialAgent
 from google.adk.runners import Runner
 from google.genai import types  # types 모듈 임포트 추가
 
-from config.prompts import FINAL_SUMMARY_PROMPT
+import config.personas
+import config.prompts
+from config.prompts import FINAL_SUMMARY_PROMPT, PHASE1_INTERMEDIATE_SUMMARY_PROMPT
 from config.personas import PersonaType, PERSONA_CONFIGS, PERSONA_SEQUENCE, ORCHESTRATOR_CONFIG
 from config.models import DEFAULT_MODEL
 
 from src.agents.marketer_agent import MarketerPersonaAgent
 from src.agents.critic_agent import CriticPersonaAgent
 from src.agents.engineer_agent import EngineerPersonaAgent
+from src.utils.tracing import instrument_agent
+from src.utils.blob_store import instrument_agent_blob_interning
+from src.utils.token_accounting import instrument_agent_token_usage
+from src.utils.model_router import get_model_router, instrument_agent_model_monitoring
+from src.utils.api_key_pool import instrument_agent_api_key
+from src.utils.rate_limiter import instrument_agent_rate_limit
+from src.utils.request_coalescing import instrument_agent_request_coalescing
+from src.utils.local_summary import make_local_summary_callback
+from src.utils.structured_report import instrument_structured_report, make_structured_summary_callback
+from src.utils.structured_logging import get_logger
 
 # .env 파일은 애플리케이션의 메인 진입점(app.py)에서 로드됨
 
+logger = get_logger("orchestrator")
+
+# 1단계 워크플로우의 역할 (역할별 모델이 정해지면 워크플로우 구성이 결정됨)
+PHASE1_ROLES = ("marketer", "critic", "engineer", "marketer_summary", "critic_summary", "engineer_summary", "summary")
+
+# 프로세스 전역 에이전트 그래프 캐시의 최대 항목 수 (자동 모델 선택으로 역할별 모델 조합이 늘어날 때의 상한)
+AGENT_GRAPH_CACHE_MAX_ENTRIES = 64
+
+# 구성을 마친 에이전트 그래프: (그래프 종류, 역할별 모델, 실행 옵션, 프롬프트 버전) -> 에이전트
+# 에이전트는 실행 상태를 세션과 호출 컨텍스트에만 두므로, 구성 후 변경하지 않는 한 세션과 스레드 사이에 공유할 수 있음
+_agent_graph_cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+_agent_graph_cache_lock = threading.RLock()
+
+
+@lru_cache(maxsize=1)
+def agent_prompt_version() -> str:
+    """
+    에이전트 그래프에 쓰이는 프롬프트와 페르소나 설정(config/prompts.py, config/personas.py)의 버전을 반환합니다.
+    
+    Returns:
+        str: 두 설정 파일 내용의 sha256 앞 16자리
+    """
+    digest = hashlib.sha256()
+    for module in (config.prompts, config.personas):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def get_cached_agent_graph(key: Hashable, build: Callable[[], Any]) -> Any:
+    """
+    캐시된 에이전트 그래프를 반환하고, 없으면 build()로 한 번만 구성해 저장합니다.
+    동시에 같은 그래프를 요청해도 구성은 한 번만 일어납니다.
+    
+    Args:
+        key (Hashable): 그래프 키 (프롬프트 버전은 자동으로 추가됨)
+        build (Callable[[], Any]): 그래프를 구성하는 함수
+        
+    Returns:
+        Any: 구성된 에이전트 그래프 (호출자는 변경하지 않아야 함)
+    """
+    key = (key, agent_prompt_version())
+    with _agent_graph_cache_lock:
+        graph = _agent_graph_cache.get(key)
+        if graph is not None:
+            _agent_graph_cache.move_to_end(key)
+            return graph
+        graph = build()
+        _agent_graph_cache[key] = graph
+        while len(_agent_graph_cache) > AGENT_GRAPH_CACHE_MAX_ENTRIES:
+            _agent_graph_cache.popitem(last=False)
+        return graph
+
+
+def clear_agent_graph_cache() -> None:
+    """에이전트 그래프 캐시를 비웁니다 (프롬프트를 바꾼 뒤나 테스트에서 사용)."""
+    with _agent_graph_cache_lock:
+        _agent_graph_cache.clear()
+
+
+def get_agent_graph_cache_size() -> int:
+    """캐시된 에이전트 그래프 수를 반환합니다."""
+    with _agent_graph_cache_lock:
+        return len(_agent_graph_cache)
+
+
 class AIdeaLabOrchestrator:
     """아이디어 워크숍 오케스트레이터 클래스"""
     
-    def __init__(self, model_name=None):
+    def __init__(self, model_name=None, auto_route=False, model_router=None, structured_reports=False):
         """
         오케스트레이터 초기화
         
         Args:
             model_name (str, optional): 사용할 모델 이름. 기본값은 DEFAULT_MODEL.value
+            auto_route (bool): True이면 실행용 에이전트를 만들 때마다 역할별로 모델을 자동 선택
+            model_router (ModelRouter, optional): 자동 선택에 사용할 라우터. 기본값은 전역 라우터
+            structured_reports (bool): True이면 1단계 페르소나가 구조화된 보고서를 작성하고
+                중간 요약을 보고서에서 바로 만듦 (요약 LLM 호출 생략)
         """
-        # 기본 모델 설정
+        # 기본 모델 설정 (자동 선택 시에는 동점 및 근거 부족 시 사용하는 선호 모델)
         self.model_name = model_name or DEFAULT_MODEL.value
+        self.auto_route = auto_route
+        self.structured_reports = structured_reports
+        self.model_router = model_router or (get_model_router() if auto_route else None)
+        # 역할별로 마지막에 선택된 모델 (역할 -> (모델 ID, 선택 사유))
+        self.routed_models = {}
         
         # 오케스트레이터 설정 가져오기
         self.config = ORCHESTRATOR_CONFIG
         
-        # 페르소나 에이전트들 생성 - model_name 전달
-        self.marketer_agent = MarketerPersonaAgent(model_name=self.model_name)
-        self.critic_agent = CriticPersonaAgent(model_name=self.model_name)
-        self.engineer_agent = EngineerPersonaAgent(model_name=self.model_name)
-        
-        # 순차적으로 실행할 에이전트들의 순서 설정
-        self.agents = []
+        # 기본 워크플로우용 에이전트(페르소나, 요약, SequentialAgent)는 실행 경로(get_phase1_workflow 등)에서
+        # 쓰지 않으므로 처음 접근할 때 생성 (세션마다 오케스트레이터를 만드는 비용을 줄임)
+    
+    @cached_property
+    def marketer_agent(self):
+        """기본 워크플로우용 마케터 페르소나 에이전트 (처음 접근할 때 생성)"""
+        return MarketerPersonaAgent(model_name=self.model_name)
+    
+    @cached_property
+    def critic_agent(self):
+        """기본 워크플로우용 비판적 분석가 페르소나 에이전트 (처음 접근할 때 생성)"""
+        return CriticPersonaAgent(model_name=self.model_name)
+    
+    @cached_property
+    def engineer_agent(self):
+        """기본 워크플로우용 현실주의 엔지니어 페르소나 에이전트 (처음 접근할 때 생성)"""
+        return EngineerPersonaAgent(model_name=self.model_name)
+    
+    @cached_property
+    def agents(self):
+        """PERSONA_SEQUENCE 순서의 기본 워크플로우 페르소나 에이전트 목록 (처음 접근할 때 생성)"""
+        agents = []
         for persona_type in PERSONA_SEQUENCE:
             if persona_type == PersonaType.MARKETER:
-                self.agents.append(self.marketer_agent.get_agent())
+                agents.append(self.marketer_agent.get_agent())
             elif persona_type == PersonaType.CRITIC:
-                self.agents.append(self.critic_agent.get_agent())
+                agents.append(self.critic_agent.get_agent())
             elif persona_type == PersonaType.ENGINEER:
-                self.agents.append(self.engineer_agent.get_agent())
-        
+                agents.append(self.engineer_agent.get_agent())
+        return agents
+    
+    @cached_property
+    def summary_agent(self):
+        """기본 워크플로우용 최종 요약 에이전트 (처음 접근할 때 생성)"""
         # 최종 요약 생성을 위한 에이전트의 GenerationConfig 설정
         generate_config = types.GenerationConfig(
             temperature=self.config["temperature"],
             max_output_tokens=self.config["max_output_tokens"]
         )
         
-        self.summary_agent = Agent(
+        return Agent(
             name="summary_agent",
             model=self.model_name,
             description="최종 요약 생성 에이전트",
@@ -67,21 +177,67 @@ class AIdeaLabOrchestrator:
             output_key=self.config["summary_output_key"],
             generate_content_config=generate_config  # 생성 설정 명시적으로 전달
         )
-        
-        # SequentialAgent 생성하여 모든 페르소나 에이전트와 요약 에이전트를 포함
-        self.workflow_agent = SequentialAgent(
+    
+    @cached_property
+    def workflow_agent(self):
+        """모든 페르소나 에이전트와 요약 에이전트를 포함하는 SequentialAgent (처음 접근할 때 생성)"""
+        return SequentialAgent(
             name="aidea_lab_workflow",
             description="AIdea Lab 워크숍 시퀀스",
             sub_agents=[*self.agents, self.summary_agent]
         )
     
-    def create_intermediate_summarizer_agent(self, original_report_key: str, summary_output_key: str):
+    def _instrument_agent(self, agent):
+        """
+        에이전트에 동일 요청 병합, API 키 배정, 레이트 리미터와 모델 호출 계측 콜백(추적, 토큰 집계, 모델 성능 기록),
+        응답 텍스트의 블롭 저장소 등록 콜백을 연결합니다.
+        중복 요청이 할당량을 쓰지 않도록 병합을 가장 먼저, 리미터가 배정된 키의 할당량을 기다리도록 키 배정을 리미터 앞에,
+        대기 시간이 응답 시간 지표에 포함되지 않도록 리미터를 계측 콜백보다 먼저 연결합니다.
+        오케스트레이터가 실행용으로 반환하는 모든 에이전트는 이 메서드를 거칩니다.
+        
+        Args:
+            agent: ADK LlmAgent 객체
+            
+        Returns:
+            Agent: 계측 콜백이 연결된 같은 에이전트 객체
+        """
+        instrument_agent_request_coalescing(agent)
+        instrument_agent_api_key(agent)
+        instrument_agent_rate_limit(agent)
+        instrument_agent(agent)
+        instrument_agent_token_usage(agent)
+        instrument_agent_model_monitoring(agent)
+        return instrument_agent_blob_interning(agent)
+    
+    def _model_for(self, role: str) -> str:
+        """
+        역할에 사용할 모델 ID를 반환합니다.
+        자동 선택이 꺼져 있으면 항상 self.model_name을 반환합니다.
+        
+        Args:
+            role (str): 에이전트 역할 (예: "marketer", "marketer_summary", "facilitator")
+            
+        Returns:
+            str: 모델 ID
+        """
+        if not self.auto_route:
+            return self.model_name
+        
+        model, reason = self.model_router.select_model(role, self.model_name)
+        self.routed_models[role] = (model, reason)
+        print(f"Auto-routed model for {role}: {model} ({reason})")
+        return model
+    
+    def create_intermediate_summarizer_agent(self, original_report_key: str, summary_output_key: str, model_name: str = None):
         """
         각 페르소나의 상세 보고서를 짧게 요약하는 중간 요약 에이전트를 생성합니다.
+        보고서가 짧거나 추출 요약이 가능하면 before_model_callback이 로컬 요약을 반환하여
+        LLM 호출을 건너뜁니다 (INTERMEDIATE_SUMMARY_CONFIG 참고).
         
         Args:
             original_report_key (str): 원본 보고서의 상태 키 (예: "marketer_report_phase1")
             summary_output_key (str): 요약 결과를 저장할 상태 키 (예: "marketer_report_phase1_summary")
+            model_name (str, optional): 사용할 모델. 기본값은 역할("<페르소나>_summary")에 선택된 모델
             
         Returns:
             Agent: 중간 요약 에이전트 객체
@@ -94,8 +250,12 @@ class AIdeaLabOrchestrator:
             "gemini-2.5-pro-preview-05-06": 16000
         }
         
+        # 페르소나 이름 추출 (예: marketer_report_phase1 -> marketer)
+        persona_name = original_report_key.split("_")[0] if "_" in original_report_key else "unknown"
+        model_name = model_name or self._model_for(f"{persona_name}_summary")
+        
         # 현재 모델의 컨텍스트 제한 (기본값: 8000)
-        current_model_limit = MODEL_CONTEXT_LIMITS.get(self.model_name, 8000)
+        current_model_limit = MODEL_CONTEXT_LIMITS.get(model_name, 8000)
         
         # 동적 프롬프트 제공자 함수 생성
         def intermediate_summary_prompt_provider(ctx):
@@ -111,37 +271,22 @@ class AIdeaLabOrchestrator:
             # 원본 보고서 내용 가져오기
             original_report_content = ctx.state.get(original_report_key, "")
             
-            # marketer_report_phase1에 대한 상세 로깅
+            # marketer_report_phase1에 대한 상세 로깅 (처음과 마지막 500자는 DEBUG 레벨에서만 만듦)
             if original_report_key == "marketer_report_phase1":
-                print(f"DEBUG_MARKETER_STATE: Original report key: '{original_report_key}'")
-                print(f"DEBUG_MARKETER_STATE: Report content type: {type(original_report_content)}")
-                print(f"DEBUG_MARKETER_STATE: Report content length: {len(original_report_content) if original_report_content else 0} chars")
-                if original_report_content:
-                    # 처음 500자와 마지막 500자 로깅
-                    first_500 = original_report_content[:500] if len(original_report_content) > 500 else original_report_content
-                    last_500 = original_report_content[-500:] if len(original_report_content) > 500 else ""
-                    print(f"DEBUG_MARKETER_STATE: First 500 chars: '{first_500}'")
-                    if last_500:
-                        print(f"DEBUG_MARKETER_STATE: Last 500 chars: '{last_500}'")
+                if not original_report_content:
+                    logger.warning("marketer report is empty", report_key=original_report_key)
                 else:
-                    print(f"DEBUG_MARKETER_STATE: WARNING - Original report content is empty or None!")
+                    logger.debug(
+                        "marketer report for summary",
+                        report_key=original_report_key,
+                        content_type=lambda: type(original_report_content).__name__,
+                        length=len(original_report_content),
+                        head=lambda: original_report_content[:500],
+                        tail=lambda: original_report_content[-500:] if len(original_report_content) > 500 else None,
+                    )
             
             # 기본 요약 프롬프트 생성
-            prompt = f"""
-당신은 아이디어 워크숍의 페르소나 보고서를 요약하는 전문가입니다.
-
-아래 텍스트는 워크숍 과정에서 특정 페르소나가 작성한 상세한 보고서입니다.
-이 보고서를 다른 AI 에이전트들이 활용할 수 있도록 간결하고 핵심적인 내용만 담아 요약해주세요.
-
-요약은 다음 형식을 준수해주세요:
-1. "**핵심 포인트:**" 제목 아래에 불릿 포인트로 5개 이내의 핵심 요점을 나열하세요.
-2. "**종합 요약:**" 제목 아래에 전체 내용을 2-3문장으로 요약하세요.
-
-간결하게 요약해주세요.
-
-분석할 텍스트:
-{original_report_content}
-"""
+            prompt = PHASE1_INTERMEDIATE_SUMMARY_PROMPT.format(report_content=original_report_content)
             
             return prompt
         
@@ -155,31 +300,34 @@ class AIdeaLabOrchestrator:
             stop_sequences=[]  # 특별한 중단 시퀀스 없음
         )
         
-        # 페르소나 이름 추출 (예: marketer_report_phase1 -> marketer)
-        persona_name = original_report_key.split("_")[0] if "_" in original_report_key else "unknown"
-        
         # marketer_summary_agent 생성 시 상세 로깅 추가
         if original_report_key == "marketer_report_phase1":
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Creating intermediate summarizer agent")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Original report key: '{original_report_key}'")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Summary output key: '{summary_output_key}'")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Persona name: '{persona_name}'")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Model name: '{self.model_name}'")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Generate config:")
-            print(f"  - temperature: {generate_config.temperature}")
-            print(f"  - max_output_tokens: {generate_config.max_output_tokens}")
-            print(f"  - top_p: {generate_config.top_p}")
-            print(f"  - top_k: {generate_config.top_k}")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Using dynamic prompt provider for runtime state access")
+            logger.debug(
+                "creating marketer summary agent",
+                report_key=original_report_key,
+                output_key=summary_output_key,
+                model=model_name,
+                temperature=generate_config.temperature,
+                max_output_tokens=generate_config.max_output_tokens,
+                top_p=generate_config.top_p,
+                top_k=generate_config.top_k,
+            )
+        
+        # 모델 호출을 대신할 수 있는 콜백: 구조화 보고서에서 해석한 요약, 로컬 요약 순서로 시도
+        summary_callbacks = [make_local_summary_callback(original_report_key)]
+        if self.structured_reports:
+            summary_callbacks.insert(0, make_structured_summary_callback(summary_output_key))
         
         # 중간 요약 에이전트 생성 (동적 프롬프트 제공자 사용)
         intermediate_summary_agent = Agent(
             name=f"{persona_name}_summary_agent",
-            model=self.model_name,
+            model=model_name,
             description=f"{persona_name.capitalize()} 페르소나의 상세 보고서 중간 요약 에이전트",
             instruction=intermediate_summary_prompt_provider,  # 동적 프롬프트 제공자 사용
             output_key=summary_output_key,
-            generate_content_config=generate_config
+            generate_content_config=generate_config,
+            # 계측 콜백보다 먼저 실행되도록 생성 시 연결 (로컬 요약 시 모델 호출과 계측 모두 생략)
+            before_model_callback=summary_callbacks
         )
         
         # 디버깅 로그 출력
@@ -187,9 +335,8 @@ class AIdeaLabOrchestrator:
         print(f"Using dynamic prompt provider for runtime state access")
         
         if original_report_key == "marketer_report_phase1":
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Successfully created marketer_summary_agent")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Agent name: '{intermediate_summary_agent.name}'")
-            print(f"DEBUG_MARKETER_ORCHESTRATOR: Agent output_key: '{intermediate_summary_agent.output_key}'")
+            logger.debug("created marketer summary agent", agent=intermediate_summary_agent.name,
+                         output_key=intermediate_summary_agent.output_key)
         
         return intermediate_summary_agent
     
@@ -197,34 +344,57 @@ class AIdeaLabOrchestrator:
         """워크플로우 에이전트(SequentialAgent) 반환"""
         return self.workflow_agent
     
-    def get_phase1_workflow(self):
+    def get_phase1_workflow(self, output_keys=None):
         """
         1단계 분석용 워크플로우 에이전트를 반환합니다.
         
         1단계에서는 세 가지 페르소나 에이전트가 순차적으로 실행되고,
         마지막으로 최종 요약 에이전트가 실행됩니다.
         
+        Args:
+            output_keys (Iterable[str], optional): 지정하면 이 출력 키를 만드는 단계만 포함 (부분 재실행용,
+                get_phase1_stages_to_run() 참고). 기본값은 전체 단계
+        
+        Returns:
+            SequentialAgent: 1단계 워크플로우 에이전트 (프로세스 전역 캐시에서 공유되므로 변경하지 않아야 함)
+        """
+        # 역할별 모델을 먼저 정하고, 같은 구성의 워크플로우는 세션 사이에 재사용 (get_cached_agent_graph 참고)
+        # 부분 재실행 워크플로우는 에이전트가 한 부모에만 속할 수 있으므로 출력 키 조합별로 따로 구성
+        models = {role: self._model_for(role) for role in PHASE1_ROLES}
+        if output_keys is not None:
+            output_keys = frozenset(output_keys)
+        key = ("phase1", tuple(sorted(models.items())), self.structured_reports, output_keys)
+        return get_cached_agent_graph(key, lambda: self._build_phase1_workflow(models, output_keys))
+    
+    def _build_phase1_workflow(self, models, output_keys=None):
+        """
+        1단계 워크플로우 에이전트를 새로 구성합니다.
+        
+        Args:
+            models (Dict[str, str]): 역할(PHASE1_ROLES) -> 모델 ID
+            output_keys (Iterable[str], optional): 지정하면 이 출력 키를 만드는 단계만 포함
+        
         Returns:
             SequentialAgent: 1단계 워크플로우 에이전트
         """
         # 각 페르소나 에이전트의 1단계용 인스턴스 생성
-        # (기존 에이전트는 self.agents에 이미 저장되어 있지만, phase1 전용 에이전트를 생성)
+        # (기본 워크플로우용 self.agents와 별개로 phase1 전용 에이전트를 생성)
         phase1_agents = []
         
         # 마케터 에이전트 (1단계용)
-        marketer_agent_phase1 = MarketerPersonaAgent(model_name=self.model_name)
+        marketer_agent_phase1 = MarketerPersonaAgent(model_name=models["marketer"], structured_report=self.structured_reports)
         # 직접 에이전트 객체를 가져와서 output_key 설정
         marketer_agent = marketer_agent_phase1.get_agent()
         marketer_agent.output_key = "marketer_report_phase1"  # 명확한 Phase 1 접미사 추가
         
         # 비판적 분석가 에이전트 (1단계용)
-        critic_agent_phase1 = CriticPersonaAgent(model_name=self.model_name)
+        critic_agent_phase1 = CriticPersonaAgent(model_name=models["critic"], structured_report=self.structured_reports)
         # 직접 에이전트 객체를 가져와서 output_key 설정
         critic_agent = critic_agent_phase1.get_agent()
         critic_agent.output_key = "critic_report_phase1"  # 명확한 Phase 1 접미사 추가
         
         # 현실적 엔지니어 에이전트 (1단계용)
-        engineer_agent_phase1 = EngineerPersonaAgent(model_name=self.model_name)
+        engineer_agent_phase1 = EngineerPersonaAgent(model_name=models["engineer"], structured_report=self.structured_reports)
         # 직접 에이전트 객체를 가져와서 output_key 설정
         engineer_agent = engineer_agent_phase1.get_agent()
         engineer_agent.output_key = "engineer_report_phase1"  # 명확한 Phase 1 접미사 추가
@@ -242,19 +412,22 @@ class AIdeaLabOrchestrator:
         # 마케터 중간 요약 에이전트
         marketer_summary_agent = self.create_intermediate_summarizer_agent(
             original_report_key="marketer_report_phase1",
-            summary_output_key="marketer_report_phase1_summary"
+            summary_output_key="marketer_report_phase1_summary",
+            model_name=models["marketer_summary"]
         )
         
         # 비판적 분석가 중간 요약 에이전트
         critic_summary_agent = self.create_intermediate_summarizer_agent(
             original_report_key="critic_report_phase1",
-            summary_output_key="critic_report_phase1_summary"
+            summary_output_key="critic_report_phase1_summary",
+            model_name=models["critic_summary"]
         )
         
         # 현실적 엔지니어 중간 요약 에이전트
         engineer_summary_agent = self.create_intermediate_summarizer_agent(
             original_report_key="engineer_report_phase1",
-            summary_output_key="engineer_report_phase1_summary"
+            summary_output_key="engineer_report_phase1_summary",
+            model_name=models["engineer_summary"]
         )
         
         # 페르소나와 각각의 중간 요약 에이전트를 명확한 순서로 배치
@@ -319,20 +492,35 @@ class AIdeaLabOrchestrator:
         
         summary_agent_phase1 = Agent(
             name="summary_agent_phase1",
-            model=self.model_name,
+            model=models["summary"],
             description="1단계 아이디어 분석 요약 에이전트",
             instruction=summary_prompt,
             output_key="summary_report_phase1",  # 명확한 Phase 1 접미사 추가
             generate_content_config=summary_generate_config  # 생성 설정 명시적으로 전달
         )
         
+        # 부분 재실행이면 다시 만들 출력의 단계만 남김
+        workflow_agents = [*interleaved_agents, summary_agent_phase1]
+        if output_keys is not None:
+            output_keys = set(output_keys)
+            workflow_agents = [agent for agent in workflow_agents if agent.output_key in output_keys]
+            print(f"Partial phase1 workflow: {[agent.name for agent in workflow_agents]}")
+        
         # 1단계 전용 워크플로우 에이전트 생성 - 중간 요약 에이전트를 포함하도록 수정
         phase1_workflow_agent = SequentialAgent(
             name="aidea_lab_phase1_workflow",
             description="AIdea Lab 1단계 워크숍 시퀀스",
-            sub_agents=[*interleaved_agents, summary_agent_phase1]  # 페르소나와 중간요약이 번갈아가며 실행되는 에이전트 목록 사용
+            sub_agents=workflow_agents  # 페르소나와 중간요약이 번갈아가며 실행되는 에이전트 목록 사용
         )
         
+        for agent in phase1_workflow_agent.sub_agents:
+            self._instrument_agent(agent)
+        
+        # 구조화 보고서 해석 콜백은 계측 콜백 뒤에 연결 (토큰 집계가 원본 응답을 보도록)
+        if self.structured_reports:
+            for agent in (marketer_agent, critic_agent, engineer_agent):
+                instrument_structured_report(agent, f"{agent.output_key}_summary")
+        
         # 디버깅 로그 출력
         print(f"Created phase1 agents - Marketer output_key: {marketer_agent.output_key}")
         print(f"Created phase1 agents - Critic output_key: {critic_agent.output_key}")
@@ -347,6 +535,61 @@ class AIdeaLabOrchestrator:
         """요약 에이전트 반환"""
         return self.summary_agent
     
+    def get_phase1_cache_model_key(self):
+        """
+        1단계 결과 캐시 키에 사용할 실행 구성 식별자를 반환합니다.
+        자동 모델 선택 시에는 역할별 모델이 달라질 수 있고, 구조화 보고서 모드는 보고서 형식이 다르므로 별도 키를 사용합니다.
+        
+        Returns:
+            str: 캐시 키용 모델 식별자
+        """
+        cache_model_key = f"auto:{self.model_name}" if self.auto_route else self.model_name
+        if self.structured_reports:
+            cache_model_key += "+structured"
+        return cache_model_key
+    
+    def get_phase1_stage_dependencies(self):
+        """
+        1단계 각 출력이 만들어질 때 참조하는 다른 출력 키를 반환합니다.
+        중간 요약은 해당 페르소나 보고서를, 최종 요약은 모든 보고서와 중간 요약을 참조합니다.
+        
+        Returns:
+            Dict[str, List[str]]: 출력 키 -> 의존하는 출력 키 목록
+        """
+        output_keys = self.get_output_keys_phase1()
+        dependencies = {}
+        for persona_key in ("marketer", "critic", "engineer"):
+            dependencies[output_keys[persona_key]] = []
+            dependencies[output_keys[f"{persona_key}_summary"]] = [output_keys[persona_key]]
+        final_key = output_keys["summary_phase1"]
+        dependencies[final_key] = [key for key in output_keys.values() if key != final_key]
+        return dependencies
+    
+    def get_phase1_stages_to_run(self, valid_output_keys):
+        """
+        이미 유효한 출력을 제외하고 다시 실행해야 하는 1단계 출력 키를 반환합니다.
+        누락된 출력과, 누락된 출력에 의존하는 출력이 포함됩니다.
+        
+        Args:
+            valid_output_keys (Iterable[str]): 세션 상태에 유효하게 저장된 출력 키
+            
+        Returns:
+            List[str]: 다시 만들 출력 키 (get_output_keys_phase1() 순서)
+        """
+        dependencies = self.get_phase1_stage_dependencies()
+        valid_output_keys = set(valid_output_keys)
+        stages = {key for key in dependencies if key not in valid_output_keys}
+        
+        added = True
+        while added:
+            added = False
+            for key, required_keys in dependencies.items():
+                if key not in stages and any(required_key in stages for required_key in required_keys):
+                    stages.add(key)
+                    added = True
+        
+        return [key for key in self.get_output_keys_phase1().values() if key in stages]
+    
     def get_output_keys_phase1(self):
         """
         1단계 분석에 사용되는 모든 페르소나 에이전트의 출력 키 목록을 반환합니다.
@@ -373,21 +616,26 @@ class AIdeaLabOrchestrator:
         다음에 어떤 페르소나가 발언할지, 어떤 주제에 대해 토론할지를 결정합니다.
         
         Returns:
-            Agent: 토론 촉진자 에이전트
+            Agent: 토론 촉진자 에이전트 (프로세스 전역 캐시에서 공유되므로 변경하지 않아야 함)
         """
+        model_name = self._model_for("facilitator")
+        return get_cached_agent_graph(("phase2_facilitator", model_name), lambda: self._build_phase2_discussion_facilitator(model_name))
+    
+    def _build_phase2_discussion_facilitator(self, model_name):
+        """2단계 토론 촉진자 에이전트를 새로 구성합니다."""
         from src.agents.facilitator_agent import DiscussionFacilitatorAgent
         from config.prompts import FACILITATOR_PHASE2_PROMPT_PROVIDER
         
         # 2단계 토론 촉진자 에이전트 생성
         facilitator_agent = DiscussionFacilitatorAgent(
-            model_name=self.model_name,
+            model_name=model_name,
             instruction_provider=FACILITATOR_PHASE2_PROMPT_PROVIDER
         )
         
         # 디버깅 로그 출력
         print(f"Created phase2 facilitator agent with output_key: {facilitator_agent.get_output_key()}")
         
-        return facilitator_agent.get_agent()
+        return self._instrument_agent(facilitator_agent.get_agent())
     
     def get_phase2_persona_agent(self, persona_type):
         """
@@ -399,8 +647,19 @@ class AIdeaLabOrchestrator:
             persona_type (PersonaType): 페르소나 유형 (MARKETER, CRITIC, ENGINEER)
             
         Returns:
-            Agent: 해당 페르소나의 2단계 토론용 에이전트 객체
+            Agent: 해당 페르소나의 2단계 토론용 에이전트 객체 (프로세스 전역 캐시에서 공유되므로 변경하지 않아야 함)
         """
+        if persona_type not in (PersonaType.MARKETER, PersonaType.CRITIC, PersonaType.ENGINEER):
+            raise ValueError(f"지원되지 않는 페르소나 유형입니다: {persona_type}")
+        
+        model_name = self._model_for(persona_type.value)
+        return get_cached_agent_graph(
+            ("phase2_persona", persona_type.name, model_name),
+            lambda: self._build_phase2_persona_agent(persona_type, model_name)
+        )
+    
+    def _build_phase2_persona_agent(self, persona_type, model_name):
+        """2단계 토론용 페르소나 에이전트를 새로 구성합니다."""
         from config.prompts import (
             MARKETER_PHASE2_PROMPT_PROVIDER,
             CRITIC_PHASE2_PROMPT_PROVIDER,
@@ -418,7 +677,7 @@ class AIdeaLabOrchestrator:
             
             agent = Agent(
                 name="marketer_agent_phase2",
-                model=self.model_name,
+                model=model_name,
                 description="2단계 토론용 창의적 마케터 에이전트",
                 instruction=MARKETER_PHASE2_PROMPT_PROVIDER,  # 동적 프롬프트 제공자 함수
                 output_key="marketer_response_phase2",
@@ -435,7 +694,7 @@ class AIdeaLabOrchestrator:
             
             agent = Agent(
                 name="critic_agent_phase2",
-                model=self.model_name,
+                model=model_name,
                 description="2단계 토론용 비판적 분석가 에이전트",
                 instruction=CRITIC_PHASE2_PROMPT_PROVIDER,  # 동적 프롬프트 제공자 함수
                 output_key="critic_response_phase2",
@@ -452,7 +711,7 @@ class AIdeaLabOrchestrator:
             
             agent = Agent(
                 name="engineer_agent_phase2",
-                model=self.model_name,
+                model=model_name,
                 description="2단계 토론용 현실적 엔지니어 에이전트",
                 instruction=ENGINEER_PHASE2_PROMPT_PROVIDER,  # 동적 프롬프트 제공자 함수
                 output_key="engineer_response_phase2",
@@ -465,7 +724,7 @@ class AIdeaLabOrchestrator:
         # 디버깅 로그 출력
         print(f"Created phase2 {persona_type.name} agent with output_key: {agent.output_key}")
         
-        return agent
+        return self._instrument_agent(agent)
     
     def get_phase2_final_summary_agent(self):
         """
@@ -475,8 +734,13 @@ class AIdeaLabOrchestrator:
         최종 발전된 아이디어 및 실행 계획 보고서를 생성합니다.
         
         Returns:
-            Agent: 2단계 최종 요약 에이전트
+            Agent: 2단계 최종 요약 에이전트 (프로세스 전역 캐시에서 공유되므로 변경하지 않아야 함)
         """
+        model_name = self._model_for("final_summary")
+        return get_cached_agent_graph(("phase2_final_summary", model_name), lambda: self._build_phase2_final_summary_agent(model_name))
+    
+    def _build_phase2_final_summary_agent(self, model_name):
+        """2단계 최종 요약 에이전트를 새로 구성합니다."""
         from config.prompts import FINAL_SUMMARY_PHASE2_PROMPT_PROVIDER
         
         # 요약 에이전트의 GenerationConfig 생성
@@ -488,7 +752,7 @@ class AIdeaLabOrchestrator:
         # 2단계 최종 요약 에이전트 생성
         final_summary_agent = Agent(
             name="final_summary_agent_phase2",
-            model=self.model_name,
+            model=model_name,
             description="2단계 토론 최종 요약 에이전트",
             instruction=FINAL_SUMMARY_PHASE2_PROMPT_PROVIDER,  # 동적 프롬프트 제공자 함수
             output_key="final_summary_report_phase2",
@@ -498,4 +762,4 @@ class AIdeaLabOrchestrator:
         # 디버깅 로그 출력
         print(f"Created phase2 final summary agent with output_key: {final_summary_agent.output_key}")
         
-        return final_summary_agent 
\ No newline at end of file
+        return self._instrument_agent(final_summary_agent) 
\ No newline at end of file
@@ -5,14 +5,36 @@ AIdea Lab 세션 관리자
 담당하는 SessionManager 클래스를 제공합니다.
 """
 
+import os
 import uuid
 import logging
+import threading
+import weakref
 from google.adk.sessions import InMemorySessionService, Session
 from google.adk.events import Event, EventActions # EventActions와 함께 Event도 임포트합니다.
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Callable, List
+
+from src.utils.structured_logging import get_logger
+from src.session_store import (
+    CompactingInMemorySessionService,
+    SqliteSessionService,
+    SessionArchive,
+    write_session_archive,
+    DEFAULT_EVENT_COMPACTION_THRESHOLD,
+    DEFAULT_KEEP_RECENT_CONTENT_EVENTS,
+)
 
 # 모듈 레벨 로거 설정
 logger = logging.getLogger(__name__)
+# 세션 상태 전체처럼 큰 디버그 페이로드는 구조화 로거로 기록 (DEBUG 레벨이 꺼져 있으면 만들지 않음)
+state_logger = get_logger("session")
+
+# 여러 워커 프로세스가 공유할 SQLite 세션 저장소 경로를 지정하는 환경 변수
+SESSION_DB_PATH_ENV = "AIDEA_SESSION_DB_PATH"
+
+# 프로세스 안에 살아 있는 SessionManager 인스턴스 (메트릭 수집용, st.session_state를 거치지 않기 위함)
+_live_session_managers: "weakref.WeakSet[SessionManager]" = weakref.WeakSet()
+_live_session_managers_lock = threading.Lock()
 
 class SessionManager:
     """
@@ -20,18 +42,53 @@ class SessionManager:
     세션 관리자 클래스
     """
     
-    def __init__(self, app_name: str, user_id: str):
+    def __init__(self, app_name: str, user_id: str,
+                 event_compaction_threshold: Optional[int] = DEFAULT_EVENT_COMPACTION_THRESHOLD,
+                 keep_recent_content_events: int = DEFAULT_KEEP_RECENT_CONTENT_EVENTS,
+                 session_db_path: Optional[str] = None):
         """
         세션 관리자 초기화
         
         Args:
             app_name (str): 애플리케이션 이름
             user_id (str): 사용자 ID
+            event_compaction_threshold (int, optional): 이벤트 로그 압축 임계값. None이면 압축하지 않음
+            keep_recent_content_events (int): 압축 후 보존할 최근 콘텐츠 이벤트 수
+            session_db_path (str, optional): 공유 SQLite 세션 저장소 경로.
+                None이면 AIDEA_SESSION_DB_PATH 환경 변수를 사용하고, 둘 다 없으면 프로세스 내 메모리 저장소를 사용
         """
         self.app_name = app_name
         self.user_id = user_id
-        self.session_service = InMemorySessionService()
+        session_db_path = session_db_path or os.getenv(SESSION_DB_PATH_ENV)
+        if session_db_path:
+            self.session_service = SqliteSessionService(
+                db_path=session_db_path,
+                event_compaction_threshold=event_compaction_threshold,
+                keep_recent_content_events=keep_recent_content_events
+            )
+            logger.info(f"SessionManager: Using shared SQLite session store at '{session_db_path}'")
+        elif event_compaction_threshold is None:
+            self.session_service = InMemorySessionService()
+        else:
+            self.session_service = CompactingInMemorySessionService(
+                event_compaction_threshold=event_compaction_threshold,
+                keep_recent_content_events=keep_recent_content_events
+            )
         self.active_sessions: Dict[str, str] = {}  # 사용자별 active_session_id를 추적
+        with _live_session_managers_lock:
+            _live_session_managers.add(self)
+    
+    @staticmethod
+    def count_active_sessions() -> int:
+        """
+        프로세스 안의 모든 SessionManager가 추적 중인 활성 세션 수를 반환합니다.
+        
+        Returns:
+            int: 활성 세션 수
+        """
+        with _live_session_managers_lock:
+            managers = list(_live_session_managers)
+        return sum(len(manager.active_sessions) for manager in managers)
     
     def create_session(self, initial_state: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Session], str]: # initial_state 파라미터 추가
         """
@@ -147,6 +204,153 @@ class SessionManager:
             logger.exception(f"SessionManager: Error updating state for session ID '{current_session.id}'")
             return False
 
+    def is_shared_store(self) -> bool:
+        """여러 프로세스가 공유하는 세션 저장소를 사용 중인지 여부를 반환합니다."""
+        return isinstance(self.session_service, SqliteSessionService)
+
+    def watch_session_changes(self, listener: Callable[[Dict[str, Any]], None]) -> bool:
+        """
+        다른 워커 프로세스를 포함한 세션 변경 알림을 구독합니다.
+        이 관리자의 app_name/user_id에 해당하는 변경만 전달됩니다.
+        
+        Args:
+            listener (Callable): 변경 기록(session_id, change_type, version 등)을 받는 콜백
+            
+        Returns:
+            bool: 구독 성공 여부 (공유 저장소가 아니면 False)
+        """
+        if not self.is_shared_store():
+            logger.warning("SessionManager: Session change notifications require the shared SQLite session store.")
+            return False
+        
+        def filtered_listener(change: Dict[str, Any]) -> None:
+            if change["app_name"] == self.app_name and change["user_id"] == self.user_id:
+                listener(change)
+        
+        self.session_service.add_change_listener(filtered_listener)
+        return True
+
+    def export_session(self, path: str, session_id: Optional[str] = None) -> bool:
+        """
+        세션을 압축 바이너리 아카이브 파일로 내보냅니다.
+        큰 상태 값(보고서, 요약 등)은 별도 블롭으로 저장되어 불러올 때 지연 디코딩됩니다.
+        
+        Args:
+            path (str): 아카이브 파일 경로
+            session_id (str, optional): 내보낼 세션 ID. 기본값은 현재 활성 세션
+            
+        Returns:
+            bool: 내보내기 성공 여부
+        """
+        session = self.get_session(session_id)
+        if session is None:
+            logger.error(f"SessionManager: Cannot export, session '{session_id}' not found.")
+            return False
+        
+        try:
+            write_session_archive(session, path)
+            return True
+        except Exception as e:
+            logger.error(f"SessionManager: Error exporting session '{session.id}' to '{path}': {e}", exc_info=True)
+            return False
+
+    def export_all_sessions(self, directory: str) -> List[str]:
+        """
+        현재 앱/사용자의 모든 세션을 디렉토리에 세션별 아카이브 파일(<session_id>.aidea)로 내보냅니다.
+        
+        Args:
+            directory (str): 아카이브를 저장할 디렉토리
+            
+        Returns:
+            List[str]: 생성된 아카이브 파일 경로 목록
+        """
+        os.makedirs(directory, exist_ok=True)
+        sessions = self.session_service.list_sessions(app_name=self.app_name, user_id=self.user_id).sessions
+        
+        exported_paths = []
+        for session in sessions:
+            path = os.path.join(directory, f"{session.id}.aidea")
+            if self.export_session(path, session.id):
+                exported_paths.append(path)
+        logger.info(f"SessionManager: Exported {len(exported_paths)}/{len(sessions)} sessions to '{directory}'")
+        return exported_paths
+
+    @staticmethod
+    def open_session_archive(path: str) -> SessionArchive:
+        """
+        세션 아카이브를 지연 디코딩 모드로 엽니다. 세션 서비스에 등록하지 않고 읽기만 할 때 사용합니다.
+        
+        Args:
+            path (str): 아카이브 파일 경로
+            
+        Returns:
+            SessionArchive: archive.state[key], archive.events 접근 시 해당 부분만 디코딩되는 아카이브
+        """
+        return SessionArchive.open(path)
+
+    def import_session(self, path: str, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        아카이브 파일의 세션을 현재 앱/사용자의 세션 서비스로 불러옵니다.
+        
+        Args:
+            path (str): 아카이브 파일 경로
+            session_id (str, optional): 새 세션 ID. 기본값은 아카이브에 기록된 세션 ID
+            
+        Returns:
+            Optional[str]: 불러온 세션 ID, 실패 시 None
+        """
+        try:
+            archive = SessionArchive.open(path)
+        except Exception as e:
+            logger.error(f"SessionManager: Error reading session archive '{path}': {e}", exc_info=True)
+            return None
+        
+        session_id = session_id or archive.session_id
+        if self.session_service.get_session(app_name=self.app_name, user_id=self.user_id, session_id=session_id):
+            logger.error(f"SessionManager: Cannot import archive '{path}', session '{session_id}' already exists.")
+            return None
+        
+        # 최종 상태로 세션을 만든 뒤 이벤트를 순서대로 추가. 각 키의 마지막 state_delta가
+        # 최종 상태와 같으므로 재생 후에도 상태가 동일하게 유지됩니다.
+        session = self.session_service.create_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=session_id,
+            state=dict(archive.state)
+        )
+        for event in archive.events:
+            self.session_service.append_event(session=session, event=event)
+        
+        logger.info(f"SessionManager: Imported session '{session_id}' from '{path}' ({archive.event_count} events)")
+        return session_id
+
+    def compact_session_events(self, session_id: Optional[str] = None) -> int:
+        """
+        세션의 이벤트 로그를 임계값과 관계없이 즉시 압축합니다.
+        오래된 상태 전용 이벤트들은 하나의 스냅샷 이벤트로 접히며 session.state는 변하지 않습니다.
+        
+        Args:
+            session_id (str, optional): 압축할 세션 ID. 기본값은 현재 활성 세션
+            
+        Returns:
+            int: 제거된 이벤트 수 (압축을 지원하지 않거나 세션이 없으면 0)
+        """
+        if not isinstance(self.session_service, CompactingInMemorySessionService):
+            logger.warning("SessionManager: Event compaction is disabled for this session service.")
+            return 0
+        
+        session_id = session_id or self.get_active_session_id()
+        if session_id is None:
+            logger.warning("SessionManager: No session ID to compact.")
+            return 0
+        
+        storage_session = self.session_service._get_storage_session(self.app_name, self.user_id, session_id)
+        if storage_session is None:
+            logger.warning(f"SessionManager: Cannot compact, session '{session_id}' not found.")
+            return 0
+        
+        return self.session_service.compact_session(storage_session)
+
     def get_session_state_value(self, key: str, default: Any = None) -> Any:
         """
         현재 활성화된 세션 상태에서 값을 조회합니다.
@@ -247,7 +451,9 @@ class SessionManager:
             # 확인을 위해 다시 세션을 가져와 상태를 로깅
             verified_session = self.get_session(session_id_for_log) # 저장소에서 최신 세션 정보를 다시 가져옴
             if verified_session and verified_session.state.get("current_phase") == "phase2":
-                logger.info(f"SessionManager: Verified transition to phase2 for session ID '{session_id_for_log}'. State: {verified_session.state}")
+                logger.info(f"SessionManager: Verified transition to phase2 for session ID '{session_id_for_log}'.")
+                state_logger.debug("phase2 transition state", session_id=session_id_for_log,
+                                   state=lambda: dict(verified_session.state))
                 return True
             else:
                 current_phase_state = "N/A"
@@ -256,7 +462,8 @@ class SessionManager:
                     current_phase_state = verified_session.state.get("current_phase")
                     full_state_for_log = verified_session.state
                 logger.error(f"SessionManager: FAILED to verify transition to phase2 for session ID '{session_id_for_log}' after appending event. Expected 'phase2', got '{current_phase_state}'.")
-                logger.debug(f"SessionManager: Full state for session {session_id_for_log} after attempt: {full_state_for_log}")
+                state_logger.debug("phase2 transition failed state", session_id=session_id_for_log,
+                                   state=lambda: dict(full_state_for_log))
                 return False
         except Exception as e:
             logger.exception(f"SessionManager: Error appending phase2 transition event for session ID '{session_id_for_log}'")
@@ -278,6 +485,20 @@ class SessionManager:
             "available_session_keys": []
         }
         
+        if isinstance(self.session_service, SqliteSessionService):
+            debug_info["session_db_path"] = self.session_service.db_path
+            debug_info["conflict_retry_count"] = self.session_service.conflict_retry_count
+            debug_info["available_session_keys"] = [
+                session.id for session in self.session_service.list_sessions(app_name=self.app_name, user_id=self.user_id).sessions
+            ]
+            debug_info["total_stored_sessions"] = len(debug_info["available_session_keys"])
+            return debug_info
+        
+        if isinstance(self.session_service, CompactingInMemorySessionService):
+            debug_info["event_compaction_threshold"] = self.session_service.event_compaction_threshold
+            debug_info["keep_recent_content_events"] = self.session_service.keep_recent_content_events
+            debug_info["compaction_count"] = self.session_service.compaction_count
+        
         try:
             # InMemorySessionService의 내부 세션 저장소 확인
             session_service = self.session_service
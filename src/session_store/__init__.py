@@ -0,0 +1,44 @@
+"""
+AIdea Lab 세션 저장소 패키지
+
+이 패키지는 SessionManager가 사용하는 ADK 세션 서비스 구현과 관련 유틸리티를 제공합니다.
+"""
+
+from .compaction import (
+    CompactingInMemorySessionService,
+    compact_events,
+    DEFAULT_EVENT_COMPACTION_THRESHOLD,
+    DEFAULT_KEEP_RECENT_CONTENT_EVENTS,
+)
+from .sqlite_session_service import SqliteSessionService, SessionVersionConflictError
+from .archive import (
+    SessionArchive,
+    SessionArchiveFormatError,
+    encode_session_archive,
+    write_session_archive,
+)
+from .phase1_cache import (
+    Phase1ResultCache,
+    phase1_cache_key,
+    phase1_similarity_text,
+    phase1_variant_key,
+    get_phase1_cache,
+)
+
+__all__ = [
+    'CompactingInMemorySessionService',
+    'compact_events',
+    'DEFAULT_EVENT_COMPACTION_THRESHOLD',
+    'DEFAULT_KEEP_RECENT_CONTENT_EVENTS',
+    'SqliteSessionService',
+    'SessionVersionConflictError',
+    'SessionArchive',
+    'SessionArchiveFormatError',
+    'encode_session_archive',
+    'write_session_archive',
+    'Phase1ResultCache',
+    'phase1_cache_key',
+    'phase1_similarity_text',
+    'phase1_variant_key',
+    'get_phase1_cache',
+]
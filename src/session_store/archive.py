@@ -0,0 +1,249 @@
+"""
+AIdea Lab 세션 아카이브 모듈
+
+이 모듈은 종료된 세션을 감사 및 재처리 용도로 디스크에 보관할 수 있도록
+버전이 있는 압축 바이너리 포맷으로 세션을 내보내고 불러오는 기능을 제공합니다.
+
+파일 구조 (모든 정수는 big-endian):
+    MAGIC(8바이트) | 포맷 버전(uint16) | 코덱(uint8) | 헤더 길이(uint32) | 압축된 헤더 | 블롭들
+
+- 헤더는 세션 메타데이터, 작은 상태 값, 그리고 큰 상태 값/이벤트 블롭의 (offset, length) 인덱스를 담은 JSON입니다.
+- 큰 상태 값(페르소나 보고서, 요약 등)과 이벤트 목록은 각각 별도로 압축된 블롭으로 저장되어
+  접근할 때에만 압축 해제 및 디코딩됩니다.
+"""
+
+import json
+import logging
+import struct
+import time
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.adk.sessions.state import State
+
+# 모듈 레벨 로거 설정
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MAGIC = b"AIDEASES"
+ARCHIVE_FORMAT_VERSION = 1
+CODEC_ZLIB = 1
+
+# 이 크기(UTF-8 바이트)를 넘는 상태 값은 별도 블롭으로 저장하여 지연 디코딩
+DEFAULT_LAZY_FIELD_THRESHOLD = 2048
+
+_PREAMBLE = struct.Struct(">8sHBI")
+
+
+class SessionArchiveFormatError(ValueError):
+    """아카이브 파일이 손상되었거나 지원하지 않는 포맷인 경우 발생하는 예외"""
+    pass
+
+
+def _archived_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """세션 범위 상태만 남깁니다 (app:, user:, temp: 접두사 키는 세션에 속하지 않으므로 제외)."""
+    return {
+        key: value for key, value in state.items()
+        if not key.startswith((State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX))
+    }
+
+
+def encode_session_archive(session: Session, lazy_field_threshold: int = DEFAULT_LAZY_FIELD_THRESHOLD,
+                           compression_level: int = 6) -> bytes:
+    """
+    세션을 압축 바이너리 아카이브로 인코딩합니다.
+
+    Args:
+        session (Session): 내보낼 세션
+        lazy_field_threshold (int): 별도 블롭으로 저장할 상태 값의 최소 크기 (바이트)
+        compression_level (int): zlib 압축 레벨
+
+    Returns:
+        bytes: 아카이브 바이트열
+    """
+    blobs: List[bytes] = []
+    offset = 0
+
+    def add_blob(payload: bytes) -> Tuple[int, int]:
+        nonlocal offset
+        compressed = zlib.compress(payload, compression_level)
+        blobs.append(compressed)
+        location = (offset, len(compressed))
+        offset += len(compressed)
+        return location
+
+    inline_state: Dict[str, Any] = {}
+    lazy_fields: Dict[str, Tuple[int, int]] = {}
+    for key, value in _archived_state(session.state).items():
+        encoded_value = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(encoded_value) > lazy_field_threshold:
+            lazy_fields[key] = add_blob(encoded_value)
+        else:
+            inline_state[key] = value
+
+    events_payload = "[" + ",".join(event.model_dump_json(exclude_none=True) for event in session.events) + "]"
+    header = {
+        "app_name": session.app_name,
+        "user_id": session.user_id,
+        "session_id": session.id,
+        "last_update_time": session.last_update_time,
+        "exported_at": time.time(),
+        "event_count": len(session.events),
+        "state": inline_state,
+        "lazy_fields": lazy_fields,
+        "events": add_blob(events_payload.encode("utf-8")),
+    }
+    compressed_header = zlib.compress(json.dumps(header, ensure_ascii=False).encode("utf-8"), compression_level)
+
+    preamble = _PREAMBLE.pack(ARCHIVE_MAGIC, ARCHIVE_FORMAT_VERSION, CODEC_ZLIB, len(compressed_header))
+    return b"".join([preamble, compressed_header, *blobs])
+
+
+class SessionArchive:
+    """
+    세션 아카이브를 지연 디코딩 방식으로 읽는 클래스
+
+    생성 시에는 헤더만 압축 해제합니다. 큰 상태 값은 state[key]로 처음 접근할 때,
+    이벤트 목록은 events 속성에 처음 접근할 때 디코딩되며 이후에는 캐시됩니다.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        아카이브 바이트열로부터 헤더를 읽어 초기화
+
+        Args:
+            data (bytes): encode_session_archive()로 생성된 바이트열
+
+        Raises:
+            SessionArchiveFormatError: 매직 값, 버전, 코덱이 올바르지 않거나 헤더가 손상된 경우
+        """
+        if len(data) < _PREAMBLE.size:
+            raise SessionArchiveFormatError("Session archive is truncated.")
+
+        magic, version, codec, header_length = _PREAMBLE.unpack_from(data, 0)
+        if magic != ARCHIVE_MAGIC:
+            raise SessionArchiveFormatError("Not an AIdea Lab session archive.")
+        if version != ARCHIVE_FORMAT_VERSION:
+            raise SessionArchiveFormatError(f"Unsupported session archive version: {version}")
+        if codec != CODEC_ZLIB:
+            raise SessionArchiveFormatError(f"Unsupported session archive codec: {codec}")
+
+        header_end = _PREAMBLE.size + header_length
+        try:
+            self._header = json.loads(zlib.decompress(data[_PREAMBLE.size:header_end]))
+        except (zlib.error, ValueError) as e:
+            raise SessionArchiveFormatError(f"Corrupted session archive header: {e}") from e
+
+        self._blobs = memoryview(data)[header_end:]
+        self._events: Optional[List[Event]] = None
+        self.state = LazyArchiveState(self)
+
+    @classmethod
+    def open(cls, path: str) -> "SessionArchive":
+        """파일 경로에서 아카이브를 엽니다."""
+        with open(path, "rb") as archive_file:
+            return cls(archive_file.read())
+
+    @property
+    def app_name(self) -> str:
+        return self._header["app_name"]
+
+    @property
+    def user_id(self) -> str:
+        return self._header["user_id"]
+
+    @property
+    def session_id(self) -> str:
+        return self._header["session_id"]
+
+    @property
+    def last_update_time(self) -> float:
+        return self._header["last_update_time"]
+
+    @property
+    def exported_at(self) -> float:
+        return self._header["exported_at"]
+
+    @property
+    def event_count(self) -> int:
+        return self._header["event_count"]
+
+    @property
+    def events(self) -> List[Event]:
+        """이벤트 목록 (첫 접근 시 디코딩)"""
+        if self._events is None:
+            raw_events = json.loads(self._read_blob(self._header["events"]))
+            self._events = [Event.model_validate(raw_event) for raw_event in raw_events]
+        return self._events
+
+    def to_session(self) -> Session:
+        """모든 필드를 디코딩하여 ADK Session 객체로 변환합니다."""
+        return Session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            id=self.session_id,
+            state=dict(self.state),
+            events=list(self.events),
+            last_update_time=self.last_update_time
+        )
+
+    def _read_blob(self, location: Tuple[int, int]) -> bytes:
+        """(offset, length) 위치의 블롭을 압축 해제합니다."""
+        offset, length = location
+        if offset + length > len(self._blobs):
+            raise SessionArchiveFormatError("Session archive blob is out of range.")
+        return zlib.decompress(self._blobs[offset:offset + length])
+
+
+class LazyArchiveState(Mapping):
+    """큰 값을 접근 시점에 디코딩하는 아카이브 세션 상태 매핑"""
+
+    def __init__(self, archive: SessionArchive):
+        self._archive = archive
+        self._inline: Dict[str, Any] = archive._header["state"]
+        self._lazy_fields: Dict[str, List[int]] = archive._header["lazy_fields"]
+        self._decoded: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._inline:
+            return self._inline[key]
+        if key in self._decoded:
+            return self._decoded[key]
+        if key not in self._lazy_fields:
+            raise KeyError(key)
+        value = json.loads(self._archive._read_blob(self._lazy_fields[key]))
+        self._decoded[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._inline
+        yield from self._lazy_fields
+
+    def __len__(self) -> int:
+        return len(self._inline) + len(self._lazy_fields)
+
+    def is_decoded(self, key: str) -> bool:
+        """해당 키의 값이 이미 메모리에 디코딩되어 있는지 확인합니다."""
+        return key in self._inline or key in self._decoded
+
+
+def write_session_archive(session: Session, path: str,
+                          lazy_field_threshold: int = DEFAULT_LAZY_FIELD_THRESHOLD) -> int:
+    """
+    세션을 아카이브 파일로 저장합니다.
+
+    Args:
+        session (Session): 저장할 세션
+        path (str): 아카이브 파일 경로
+        lazy_field_threshold (int): 별도 블롭으로 저장할 상태 값의 최소 크기 (바이트)
+
+    Returns:
+        int: 기록된 바이트 수
+    """
+    data = encode_session_archive(session, lazy_field_threshold=lazy_field_threshold)
+    with open(path, "wb") as archive_file:
+        archive_file.write(data)
+    logger.info(f"Session archive written: '{session.id}' -> '{path}' ({len(data)} bytes, {len(session.events)} events)")
+    return len(data)
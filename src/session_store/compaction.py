@@ -0,0 +1,189 @@
+"""
+AIdea Lab 세션 이벤트 압축 모듈
+
+이 모듈은 세션의 이벤트 로그가 임계값을 넘으면 오래된 상태 전용 이벤트들을
+하나의 상태 스냅샷 이벤트로 접어 넣는 기능을 제공합니다.
+session.state는 이미 모든 state_delta가 반영된 결과이므로 압축 후에도 상태 의미는
+그대로 유지되며, 최근 N개의 콘텐츠 이벤트(LLM 대화 기록)는 원형 그대로 보존됩니다.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.state import State
+
+# 모듈 레벨 로거 설정
+logger = logging.getLogger(__name__)
+
+# 압축 기본값
+DEFAULT_EVENT_COMPACTION_THRESHOLD = 100  # 이벤트 수가 이 값을 넘으면 압축
+DEFAULT_KEEP_RECENT_CONTENT_EVENTS = 30  # 압축 후에도 보존할 최근 콘텐츠 이벤트 수
+
+# 스냅샷 이벤트 작성자 이름
+SNAPSHOT_EVENT_AUTHOR = "system_event_compactor"
+
+
+def is_content_event(event: Event) -> bool:
+    """
+    이벤트가 LLM 대화 기록에 사용되는 콘텐츠를 가지고 있는지 확인합니다.
+
+    Args:
+        event (Event): 검사할 이벤트
+
+    Returns:
+        bool: 콘텐츠(parts가 있는 content)를 가진 이벤트이면 True
+    """
+    return bool(event.content and event.content.parts)
+
+
+def is_snapshot_event(event: Event) -> bool:
+    """이전 압축으로 생성된 스냅샷 이벤트인지 확인합니다."""
+    return event.author == SNAPSHOT_EVENT_AUTHOR and not is_content_event(event)
+
+
+def find_compaction_cut_index(events: List[Event], keep_recent_content_events: int) -> int:
+    """
+    압축 경계 인덱스를 계산합니다.
+
+    경계 이전의 이벤트들은 스냅샷으로 접히고, 경계부터 끝까지는 그대로 유지됩니다.
+    경계는 최근 N번째 콘텐츠 이벤트의 위치이므로 tail에는 최대 N개의 콘텐츠 이벤트가 남습니다.
+
+    Args:
+        events (List[Event]): 세션 이벤트 목록
+        keep_recent_content_events (int): 보존할 최근 콘텐츠 이벤트 수
+
+    Returns:
+        int: 압축 경계 인덱스 (0이면 압축할 이벤트가 없음)
+    """
+    if keep_recent_content_events <= 0:
+        return len(events)
+
+    content_seen = 0
+    for index in range(len(events) - 1, -1, -1):
+        if is_content_event(events[index]):
+            content_seen += 1
+            if content_seen == keep_recent_content_events:
+                return index
+
+    # 보존할 콘텐츠 이벤트 수보다 콘텐츠가 적으면, 첫 콘텐츠 이벤트 이전의 상태 전용 이벤트만 압축
+    for index, event in enumerate(events):
+        if is_content_event(event):
+            return index
+    return len(events)
+
+
+def build_state_snapshot(events: List[Event]) -> Dict[str, Any]:
+    """
+    이벤트들의 state_delta를 순서대로 병합하여 하나의 상태 스냅샷을 만듭니다.
+    temp: 접두사 키는 세션 상태에 저장되지 않으므로 제외합니다.
+
+    Args:
+        events (List[Event]): 병합할 이벤트 목록 (시간 순)
+
+    Returns:
+        Dict[str, Any]: 병합된 state_delta
+    """
+    snapshot: Dict[str, Any] = {}
+    for event in events:
+        if not event.actions or not event.actions.state_delta:
+            continue
+        for key, value in event.actions.state_delta.items():
+            if key.startswith(State.TEMP_PREFIX):
+                continue
+            snapshot[key] = value
+    return snapshot
+
+
+def compact_events(events: List[Event], keep_recent_content_events: int = DEFAULT_KEEP_RECENT_CONTENT_EVENTS) -> List[Event]:
+    """
+    이벤트 목록을 [스냅샷 이벤트] + [최근 tail] 형태로 압축합니다.
+
+    스냅샷 이벤트의 state_delta는 접힌 이벤트들의 state_delta를 순서대로 병합한 것이므로,
+    압축된 이벤트 목록을 처음부터 재생해도 원본과 동일한 session.state가 만들어집니다.
+
+    Args:
+        events (List[Event]): 원본 이벤트 목록
+        keep_recent_content_events (int): 보존할 최근 콘텐츠 이벤트 수
+
+    Returns:
+        List[Event]: 압축된 이벤트 목록 (압축할 것이 없으면 원본 목록 그대로)
+    """
+    cut_index = find_compaction_cut_index(events, keep_recent_content_events)
+    folded_events = events[:cut_index]
+
+    # 이미 스냅샷 하나만 있는 경우처럼 접을 이벤트가 1개 이하면 압축하지 않음
+    if len(folded_events) <= 1:
+        return events
+
+    last_folded_event = folded_events[-1]
+    snapshot_event = Event(
+        author=SNAPSHOT_EVENT_AUTHOR,
+        invocation_id=last_folded_event.invocation_id,
+        actions=EventActions(state_delta=build_state_snapshot(folded_events)),
+        timestamp=last_folded_event.timestamp,  # 이벤트 시간 순서 유지
+        content=None
+    )
+    return [snapshot_event, *events[cut_index:]]
+
+
+class CompactingInMemorySessionService(InMemorySessionService):
+    """
+    이벤트 수가 임계값을 넘으면 저장소 세션의 이벤트 로그를 자동으로 압축하는
+    InMemorySessionService 확장 클래스
+
+    Runner가 세션 서비스에 직접 append_event를 호출하는 경우에도 압축이 적용되도록
+    세션 서비스 레벨에서 동작합니다. get_session의 deepcopy 비용과 세션당 메모리는
+    스냅샷 이벤트 + 짧은 tail 크기로 제한됩니다.
+    """
+
+    def __init__(self, event_compaction_threshold: int = DEFAULT_EVENT_COMPACTION_THRESHOLD,
+                 keep_recent_content_events: int = DEFAULT_KEEP_RECENT_CONTENT_EVENTS):
+        """
+        압축 세션 서비스 초기화
+
+        Args:
+            event_compaction_threshold (int): 압축을 시작할 이벤트 수 임계값
+            keep_recent_content_events (int): 압축 후 보존할 최근 콘텐츠 이벤트 수
+        """
+        super().__init__()
+        self.event_compaction_threshold = event_compaction_threshold
+        self.keep_recent_content_events = keep_recent_content_events
+        self.compaction_count = 0
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        """이벤트를 추가하고, 임계값을 넘으면 저장소 세션과 호출자 세션의 이벤트를 압축합니다."""
+        event = super().append_event(session=session, event=event)
+
+        if len(session.events) > self.event_compaction_threshold:
+            session.events = compact_events(session.events, self.keep_recent_content_events)
+
+        storage_session = self._get_storage_session(session.app_name, session.user_id, session.id)
+        if storage_session and len(storage_session.events) > self.event_compaction_threshold:
+            self.compact_session(storage_session)
+
+        return event
+
+    def compact_session(self, storage_session: Session) -> int:
+        """
+        저장소 세션의 이벤트 로그를 즉시 압축합니다.
+
+        Args:
+            storage_session (Session): 서비스 내부 저장소의 세션 객체
+
+        Returns:
+            int: 압축으로 제거된 이벤트 수
+        """
+        before_count = len(storage_session.events)
+        storage_session.events = compact_events(storage_session.events, self.keep_recent_content_events)
+        removed_count = before_count - len(storage_session.events)
+
+        if removed_count > 0:
+            self.compaction_count += 1
+            logger.info(f"CompactingInMemorySessionService: Compacted session '{storage_session.id}' events {before_count} -> {len(storage_session.events)}")
+        return removed_count
+
+    def _get_storage_session(self, app_name: str, user_id: str, session_id: str) -> Optional[Session]:
+        """서비스 내부 저장소의 세션 객체를 (복사 없이) 반환합니다."""
+        return self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
@@ -0,0 +1,415 @@
+"""
+AIdea Lab 1단계 분석 결과 캐시
+
+이 모듈은 같은 아이디어, 목표, 제약조건, 가치, 모델, 프롬프트로 1단계 분석을 다시 요청할 때
+7번의 LLM 호출을 반복하지 않도록 1단계 출력(페르소나 보고서, 중간 요약, 최종 요약)을
+로컬 SQLite 파일에 보관하는 영속 캐시를 제공합니다.
+
+- 캐시 키는 정규화된 입력과 프롬프트 템플릿 해시, 모델을 합친 sha256입니다.
+  프롬프트나 생성 설정이 바뀌면 키가 달라지므로 이전 결과는 자연스럽게 사용되지 않습니다.
+- 항목은 TTL이 지나면 만료되고, 전체 크기가 상한을 넘으면 가장 오래 사용되지 않은 항목부터 제거됩니다.
+- 키가 정확히 일치하지 않아도 같은 모델/프롬프트 구성에서 공백, 문장부호, 몇 글자만 다른 입력이면
+  find_similar()가 MinHash/LSH 색인으로 이전 항목을 찾아줍니다. 목표/제약조건/가치가 같으면 아이디어의
+  핵심 단어가 달라도 전체 입력의 유사도가 높게 나오므로, 아이디어 문장끼리의 유사도도 따로 확인합니다.
+  유사 항목은 자동으로 사용하지 않고, 호출하는 쪽이 사용자에게 이전 아이디어를 보여주고 재사용 여부를 묻습니다.
+  색인은 첫 조회 시 캐시 파일에서 최근 항목으로 만들어지며 항목 수 상한이 있습니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from config.personas import INTERMEDIATE_SUMMARY_CONFIG, ORCHESTRATOR_CONFIG, PERSONA_CONFIGS
+from config.prompts import (
+    CRITIC_PROMPT,
+    ENGINEER_PROMPT,
+    FINAL_SUMMARY_PROMPT,
+    MARKETER_PROMPT,
+    PHASE1_INTERMEDIATE_SUMMARY_PROMPT,
+    STRUCTURED_REPORT_FORMAT_PROMPT,
+)
+from src.utils.similarity_index import DEFAULT_MAX_INDEX_ENTRIES, MinHashLSHIndex, jaccard_similarity
+
+# 모듈 레벨 로거 설정
+logger = logging.getLogger(__name__)
+
+# 캐시 파일 경로 및 비활성화 환경 변수
+PHASE1_CACHE_PATH_ENV = "AIDEA_PHASE1_CACHE_PATH"
+PHASE1_CACHE_ENABLED_ENV = "AIDEA_PHASE1_CACHE_ENABLED"
+DEFAULT_PHASE1_CACHE_PATH = "logs/phase1_cache.sqlite3"
+
+# 기본 TTL (초)과 최대 캐시 크기 (바이트)
+DEFAULT_PHASE1_CACHE_TTL = 7 * 24 * 60 * 60
+DEFAULT_PHASE1_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 프롬프트 지문에 포함되지 않는 1단계 워크플로우 구성(에이전트 순서, 콜백 동작 등)이 바뀌면 올려서 기존 항목을 무효화
+PHASE1_CACHE_VERSION = 1
+
+# 유사 입력으로 이전 결과를 제안하기 위한 최소 추정 유사도 (전체 입력의 문자 3-gram 자카드)
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.8
+# 아이디어 문장끼리의 최소 유사도 (문자 3-gram 자카드, 정확히 계산). 예: "대학생 대상 중고 교재 거래 앱"과
+# "직장인 대상 중고 교재 거래 앱"은 추가 정보가 같으면 전체 유사도가 0.8을 넘지만 아이디어 유사도는 약 0.54
+DEFAULT_NEAR_DUPLICATE_IDEA_THRESHOLD = 0.8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS phase1_results (
+    cache_key TEXT PRIMARY KEY,
+    outputs TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access_at REAL NOT NULL,
+    input_text TEXT NOT NULL DEFAULT '',
+    variant TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_phase1_results_last_access ON phase1_results (last_access_at);
+"""
+
+
+def normalize_input_text(text: Optional[str]) -> str:
+    """
+    캐시 키 계산용으로 입력 텍스트를 정규화합니다 (유니코드 NFC, 앞뒤 공백 제거, 연속 공백 축약).
+
+    Args:
+        text (str, optional): 사용자 입력 텍스트
+
+    Returns:
+        str: 정규화된 텍스트
+    """
+    if not text:
+        return ""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _prompt_fingerprint() -> str:
+    """1단계 출력에 영향을 주는 프롬프트 템플릿과 생성 설정의 해시를 반환합니다."""
+    material = json.dumps({
+        "version": PHASE1_CACHE_VERSION,
+        "prompts": [MARKETER_PROMPT, CRITIC_PROMPT, ENGINEER_PROMPT, FINAL_SUMMARY_PROMPT, STRUCTURED_REPORT_FORMAT_PROMPT,
+                    PHASE1_INTERMEDIATE_SUMMARY_PROMPT],
+        "personas": {persona_type.value: config for persona_type, config in PERSONA_CONFIGS.items()},
+        "orchestrator": ORCHESTRATOR_CONFIG,
+        "intermediate_summary": INTERMEDIATE_SUMMARY_CONFIG,
+    }, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def phase1_variant_key(model: str = "") -> str:
+    """
+    입력 텍스트를 제외한 1단계 실행 구성(모델, 프롬프트)의 식별자를 계산합니다.
+    유사 입력 재사용은 이 값이 같은 항목 사이에서만 이루어집니다.
+
+    Args:
+        model (str): 모델 ID (자동 모델 선택, 구조화 보고서 모드 등 실행 방식이 다르면 구분되는 값을 전달)
+
+    Returns:
+        str: sha256 16진수 식별자
+    """
+    return hashlib.sha256(f"{model}|{_prompt_fingerprint()}".encode("utf-8")).hexdigest()
+
+
+def phase1_similarity_text(idea: str, user_goal: str = "", user_constraints: str = "",
+                           user_values: str = "") -> str:
+    """
+    유사 입력 색인에 사용할 텍스트를 만듭니다 (아이디어와 추가 정보를 줄 단위로 연결).
+
+    Args:
+        idea (str): 아이디어
+        user_goal (str): 목표
+        user_constraints (str): 제약조건
+        user_values (str): 가치
+
+    Returns:
+        str: 색인용 텍스트
+    """
+    return "\n".join(normalize_input_text(text) for text in (idea, user_goal, user_constraints, user_values))
+
+
+def _idea_from_similarity_text(input_text: str) -> str:
+    """phase1_similarity_text()로 만든 텍스트에서 아이디어(첫 줄)를 꺼냅니다."""
+    return input_text.split("\n", 1)[0]
+
+
+def phase1_cache_key(idea: str, user_goal: str = "", user_constraints: str = "",
+                     user_values: str = "", model: str = "") -> str:
+    """
+    1단계 분석 입력으로 캐시 키를 계산합니다.
+
+    Args:
+        idea (str): 아이디어
+        user_goal (str): 목표
+        user_constraints (str): 제약조건
+        user_values (str): 가치
+        model (str): 모델 ID (자동 모델 선택, 구조화 보고서 모드 등 실행 방식이 다르면 구분되는 값을 전달)
+
+    Returns:
+        str: sha256 16진수 캐시 키
+    """
+    material = json.dumps({
+        "idea": normalize_input_text(idea),
+        "goal": normalize_input_text(user_goal),
+        "constraints": normalize_input_text(user_constraints),
+        "values": normalize_input_text(user_values),
+        "model": model,
+        "prompts": _prompt_fingerprint(),
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class Phase1ResultCache:
+    """TTL과 크기 상한이 있는 SQLite 기반 1단계 결과 캐시"""
+
+    def __init__(self, db_path: str, ttl_seconds: float = DEFAULT_PHASE1_CACHE_TTL,
+                 max_bytes: int = DEFAULT_PHASE1_CACHE_MAX_BYTES):
+        """
+        1단계 결과 캐시 초기화
+
+        Args:
+            db_path (str): SQLite 데이터베이스 파일 경로
+            ttl_seconds (float): 항목 유효 시간 (초)
+            max_bytes (int): 캐시에 보관할 출력의 최대 총 크기 (UTF-8 바이트)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hit_count = 0
+        self.miss_count = 0
+        self._local = threading.local()
+        self._similarity_index: Optional[MinHashLSHIndex] = None
+        self._similarity_index_lock = threading.Lock()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(_SCHEMA)
+        self._migrate(connection)
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """유사 입력 색인용 컬럼이 없는 이전 캐시 파일에 컬럼을 추가합니다."""
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(phase1_results)")}
+        for column in ("input_text", "variant"):
+            if column not in columns:
+                connection.execute(f"ALTER TABLE phase1_results ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 SQLite 연결을 반환합니다."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def get(self, cache_key: str) -> Optional[Dict[str, str]]:
+        """
+        캐시된 1단계 출력을 조회합니다. 만료된 항목은 삭제하고 None을 반환합니다.
+
+        Args:
+            cache_key (str): phase1_cache_key()로 계산한 키
+
+        Returns:
+            Optional[Dict[str, str]]: output_key -> 응답 텍스트, 없으면 None
+        """
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute(
+            "SELECT outputs, created_at FROM phase1_results WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if row is None:
+            self.miss_count += 1
+            return None
+
+        outputs, created_at = row
+        if now - created_at > self.ttl_seconds:
+            connection.execute("DELETE FROM phase1_results WHERE cache_key = ?", (cache_key,))
+            self._unindex([cache_key])
+            self.miss_count += 1
+            return None
+
+        connection.execute("UPDATE phase1_results SET last_access_at = ? WHERE cache_key = ?", (now, cache_key))
+        self.hit_count += 1
+        return json.loads(outputs)
+
+    def put(self, cache_key: str, outputs: Dict[str, str], input_text: str = "", variant: str = "") -> None:
+        """
+        1단계 출력을 캐시에 저장하고 만료 항목 정리 및 크기 상한에 따른 제거를 수행합니다.
+
+        Args:
+            cache_key (str): phase1_cache_key()로 계산한 키
+            outputs (Dict[str, str]): output_key -> 응답 텍스트
+            input_text (str): 유사 입력 색인에 사용할 텍스트 (phase1_similarity_text()). 비어 있으면 색인하지 않음
+            variant (str): 실행 구성 식별자 (phase1_variant_key())
+        """
+        payload = json.dumps(outputs, ensure_ascii=False)
+        size_bytes = len(payload.encode("utf-8"))
+        if size_bytes > self.max_bytes:
+            logger.warning(f"Phase 1 result ({size_bytes} bytes) exceeds cache size limit; not cached.")
+            return
+
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO phase1_results "
+                "(cache_key, outputs, size_bytes, created_at, last_access_at, input_text, variant) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache_key, payload, size_bytes, now, now, input_text, variant)
+            )
+            removed_keys = [row[0] for row in connection.execute(
+                "SELECT cache_key FROM phase1_results WHERE created_at < ?", (now - self.ttl_seconds,)
+            )]
+            connection.execute("DELETE FROM phase1_results WHERE created_at < ?", (now - self.ttl_seconds,))
+            removed_keys.extend(self._evict_to_limit(connection))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        self._unindex(removed_keys)
+        if input_text:
+            with self._similarity_index_lock:
+                if self._similarity_index is not None:
+                    self._similarity_index.add(cache_key, input_text, tag=variant)
+
+    def _evict_to_limit(self, connection: sqlite3.Connection) -> List[str]:
+        """총 크기가 상한 이하가 될 때까지 가장 오래 사용되지 않은 항목을 제거하고 제거한 키를 반환합니다."""
+        total_bytes = connection.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM phase1_results").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return []
+
+        evicted = []
+        for cache_key, size_bytes in connection.execute(
+            "SELECT cache_key, size_bytes FROM phase1_results ORDER BY last_access_at"
+        ).fetchall():
+            if total_bytes <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM phase1_results WHERE cache_key = ?", (cache_key,))
+            total_bytes -= size_bytes
+            evicted.append(cache_key)
+        logger.info(f"Phase 1 cache evicted {len(evicted)} entries to stay under {self.max_bytes} bytes")
+        return evicted
+
+    def _unindex(self, cache_keys: List[str]) -> None:
+        """삭제된 항목을 유사 입력 색인에서 제거합니다."""
+        if not cache_keys:
+            return
+        with self._similarity_index_lock:
+            if self._similarity_index is not None:
+                for cache_key in cache_keys:
+                    self._similarity_index.remove(cache_key)
+
+    def _get_similarity_index(self) -> MinHashLSHIndex:
+        """유사 입력 색인을 반환합니다. 처음 호출될 때 최근 사용한 항목부터 색인을 만듭니다."""
+        with self._similarity_index_lock:
+            if self._similarity_index is None:
+                index = MinHashLSHIndex(max_entries=DEFAULT_MAX_INDEX_ENTRIES)
+                rows = self._connection().execute(
+                    "SELECT cache_key, input_text, variant FROM phase1_results "
+                    "WHERE input_text != '' AND created_at >= ? ORDER BY last_access_at DESC LIMIT ?",
+                    (time.time() - self.ttl_seconds, DEFAULT_MAX_INDEX_ENTRIES)
+                ).fetchall()
+                # 오래된 항목부터 추가하여 상한 초과 시 최근 항목이 남도록 함
+                for cache_key, input_text, variant in reversed(rows):
+                    index.add(cache_key, input_text, tag=variant)
+                self._similarity_index = index
+                logger.info(f"Phase 1 similarity index built with {len(index)} entries")
+            return self._similarity_index
+
+    def contains(self, cache_key: str) -> bool:
+        """
+        만료되지 않은 항목이 있는지 확인합니다. 적중/미스 횟수와 마지막 사용 시각은 바꾸지 않습니다.
+
+        Args:
+            cache_key (str): phase1_cache_key()로 계산한 키
+
+        Returns:
+            bool: 항목이 있으면 True
+        """
+        row = self._connection().execute(
+            "SELECT 1 FROM phase1_results WHERE cache_key = ? AND created_at >= ?",
+            (cache_key, time.time() - self.ttl_seconds)
+        ).fetchone()
+        return row is not None
+
+    def find_similar(self, input_text: str, variant: str = "",
+                     threshold: float = DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+                     idea_threshold: float = DEFAULT_NEAR_DUPLICATE_IDEA_THRESHOLD) -> Optional[Tuple[str, float, str]]:
+        """
+        같은 실행 구성에서 입력이 유사한 이전 1단계 항목을 찾습니다.
+        출력은 읽지 않으므로, 재사용하기로 하면 반환된 키로 get()을 호출합니다.
+
+        Args:
+            input_text (str): 조회할 입력 텍스트 (phase1_similarity_text())
+            variant (str): 실행 구성 식별자 (phase1_variant_key())
+            threshold (float): 전체 입력의 최소 추정 유사도 (0~1)
+            idea_threshold (float): 아이디어 문장끼리의 최소 유사도 (0~1)
+
+        Returns:
+            Optional[Tuple[str, float, str]]: (캐시 키, 아이디어 유사도, 이전 아이디어), 없으면 None
+        """
+        idea = _idea_from_similarity_text(input_text)
+        connection = self._connection()
+        for cache_key, _ in self._get_similarity_index().query(input_text, threshold, tag=variant):
+            row = connection.execute(
+                "SELECT input_text FROM phase1_results WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, time.time() - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                continue
+            previous_idea = _idea_from_similarity_text(row[0])
+            idea_similarity = jaccard_similarity(idea, previous_idea)
+            if idea_similarity >= idea_threshold:
+                return cache_key, idea_similarity, previous_idea
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        캐시 사용 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int]: 항목 수, 총 크기, 적중/미스 횟수
+        """
+        entry_count, total_bytes = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM phase1_results"
+        ).fetchone()
+        return {
+            "entry_count": entry_count,
+            "total_bytes": total_bytes,
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count,
+        }
+
+    def clear(self) -> None:
+        """모든 캐시 항목을 삭제합니다."""
+        self._connection().execute("DELETE FROM phase1_results")
+        with self._similarity_index_lock:
+            self._similarity_index = None
+
+
+_default_cache: Optional[Phase1ResultCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_phase1_cache() -> Optional[Phase1ResultCache]:
+    """
+    애플리케이션 전역 1단계 결과 캐시를 반환합니다.
+    AIDEA_PHASE1_CACHE_ENABLED=0이면 None을 반환합니다.
+
+    Returns:
+        Optional[Phase1ResultCache]: 캐시 또는 None
+    """
+    global _default_cache
+    if os.getenv(PHASE1_CACHE_ENABLED_ENV, "1").lower() in ("0", "false", "no"):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = Phase1ResultCache(os.getenv(PHASE1_CACHE_PATH_ENV, DEFAULT_PHASE1_CACHE_PATH))
+        return _default_cache
@@ -0,0 +1,504 @@
+"""
+AIdea Lab SQLite 공유 세션 서비스
+
+이 모듈은 여러 Streamlit 워커 프로세스가 하나의 세션 저장소를 안전하게 공유할 수 있도록
+SQLite(WAL 모드) 기반의 ADK 세션 서비스를 제공합니다.
+
+- append_event는 세션 행의 version을 비교하는 낙관적 동시성 제어와 재시도를 사용합니다.
+- 모든 세션 변경은 session_changes 테이블에 기록되며, 다른 프로세스는 변경 리스너를 통해
+  다른 워커에서 생성/수정된 세션을 감지할 수 있습니다. 변경 기록은 보존 기간이 지나면 삭제됩니다.
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    GetSessionConfig,
+    ListEventsResponse,
+    ListSessionsResponse,
+)
+from google.adk.sessions.state import State
+
+from src.session_store.compaction import compact_events, DEFAULT_KEEP_RECENT_CONTENT_EVENTS
+
+# 모듈 레벨 로거 설정
+logger = logging.getLogger(__name__)
+
+# 낙관적 동시성 재시도 기본값
+DEFAULT_MAX_APPEND_RETRIES = 8
+DEFAULT_CHANGE_POLL_INTERVAL = 0.5  # 초
+
+# 변경 기록 보존 기간 (초). 리스너는 폴링 주기마다 새 기록을 읽으므로 이보다 오래된 기록은 필요 없음
+DEFAULT_CHANGE_RETENTION_SECONDS = 10 * 60
+# 변경 기록을 이 건수만큼 추가할 때마다 보존 기간이 지난 기록을 삭제
+CHANGE_PRUNE_INTERVAL = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    last_update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, seq)
+);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE IF NOT EXISTS session_changes (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    change_type TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_session_changes_changed_at ON session_changes (changed_at);
+"""
+
+
+class SessionVersionConflictError(Exception):
+    """낙관적 동시성 재시도 횟수를 모두 소진한 경우 발생하는 예외"""
+    pass
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    여러 프로세스가 공유할 수 있는 SQLite 기반 ADK 세션 서비스
+
+    세션 상태는 sessions 테이블에 materialize된 JSON으로 저장되고, 이벤트는 events 테이블에
+    순번(seq)과 함께 저장됩니다. 세션 행의 version은 append_event마다 1씩 증가합니다.
+    """
+
+    def __init__(self, db_path: str, max_append_retries: int = DEFAULT_MAX_APPEND_RETRIES,
+                 event_compaction_threshold: Optional[int] = None,
+                 keep_recent_content_events: int = DEFAULT_KEEP_RECENT_CONTENT_EVENTS,
+                 change_poll_interval: float = DEFAULT_CHANGE_POLL_INTERVAL,
+                 change_retention_seconds: float = DEFAULT_CHANGE_RETENTION_SECONDS):
+        """
+        SQLite 세션 서비스 초기화
+
+        Args:
+            db_path (str): SQLite 데이터베이스 파일 경로
+            max_append_retries (int): 버전 충돌 시 append_event 최대 재시도 횟수
+            event_compaction_threshold (int, optional): 이벤트 압축 임계값. None이면 압축하지 않음
+            keep_recent_content_events (int): 압축 후 보존할 최근 콘텐츠 이벤트 수
+            change_poll_interval (float): 변경 리스너의 폴링 주기 (초)
+            change_retention_seconds (float): session_changes 기록 보존 기간 (초)
+        """
+        self.db_path = db_path
+        self.max_append_retries = max_append_retries
+        self.event_compaction_threshold = event_compaction_threshold
+        self.keep_recent_content_events = keep_recent_content_events
+        self.change_poll_interval = change_poll_interval
+        self.change_retention_seconds = change_retention_seconds
+        self.conflict_retry_count = 0
+
+        self._local = threading.local()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._listeners_lock = threading.Lock()
+        self._watcher_thread: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # 연결 관리
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 SQLite 연결을 반환합니다 (Streamlit 스크립트 스레드마다 별도 연결)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def close(self) -> None:
+        """변경 리스너를 중지하고 현재 스레드의 연결을 닫습니다."""
+        self._watcher_stop.set()
+        if self._watcher_thread and self._watcher_thread.is_alive():
+            self._watcher_thread.join(timeout=self.change_poll_interval * 4)
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # ------------------------------------------------------------------
+    # BaseSessionService 구현
+    # ------------------------------------------------------------------
+
+    def create_session(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None,
+                       session_id: Optional[str] = None) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        now = time.time()
+        session_state = dict(state or {})
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, version, last_update_time) VALUES (?, ?, ?, ?, 0, ?)",
+                (app_name, user_id, session_id, json.dumps(session_state, ensure_ascii=False), now)
+            )
+            self._record_change(connection, app_name, user_id, session_id, "created", 0)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=session_state, last_update_time=now)
+        return self._merge_state(connection, app_name, user_id, session)
+
+    def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                    config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id)
+        ).fetchone()
+        if row is None:
+            return None
+
+        query = "SELECT event FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+        params: List[Any] = [app_name, user_id, session_id]
+        if config and config.after_timestamp:
+            query += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        query += " ORDER BY seq"
+        events = [Event.model_validate_json(event_row[0]) for event_row in connection.execute(query, params)]
+        if config and config.num_recent_events:
+            events = events[-config.num_recent_events:]
+
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=json.loads(row[0]),
+            events=events,
+            last_update_time=row[1]
+        )
+        return self._merge_state(connection, app_name, user_id, session)
+
+    def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        rows = self._connection().execute(
+            "SELECT id, last_update_time FROM sessions WHERE app_name = ? AND user_id = ? ORDER BY last_update_time",
+            (app_name, user_id)
+        ).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=user_id, id=session_id, last_update_time=last_update_time)
+            for session_id, last_update_time in rows
+        ])
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                               (app_name, user_id, session_id))
+            deleted = connection.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                                         (app_name, user_id, session_id)).rowcount
+            if deleted:
+                self._record_change(connection, app_name, user_id, session_id, "deleted", -1)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def list_events(self, *, app_name: str, user_id: str, session_id: str) -> ListEventsResponse:
+        rows = self._connection().execute(
+            "SELECT event FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+            (app_name, user_id, session_id)
+        ).fetchall()
+        return ListEventsResponse(events=[Event.model_validate_json(row[0]) for row in rows])
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        """
+        이벤트를 호출자의 세션 객체와 공유 저장소 모두에 추가합니다.
+
+        저장소 쓰기는 낙관적 동시성 제어를 사용합니다. 현재 상태와 version을 읽고,
+        state_delta를 병합한 뒤 version이 그대로인 경우에만 갱신합니다. 다른 프로세스가
+        먼저 갱신했다면 최신 상태를 다시 읽어 재시도합니다.
+        """
+        if event.partial:
+            return event
+
+        # 호출자의 세션 객체 업데이트 (ADK 기본 동작)
+        super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        event_json = event.model_dump_json(exclude_none=True)
+        state_delta = dict(event.actions.state_delta) if event.actions and event.actions.state_delta else {}
+
+        connection = self._connection()
+        for attempt in range(self.max_append_retries):
+            row = connection.execute(
+                "SELECT state, version FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (session.app_name, session.user_id, session.id)
+            ).fetchone()
+            if row is None:
+                logger.warning(f"SqliteSessionService: Session '{session.id}' not found in store, event not persisted.")
+                return event
+
+            stored_state, version = json.loads(row[0]), row[1]
+            stored_state.update(self._session_scoped_delta(state_delta))
+
+            if self._try_commit_event(connection, session, event, event_json, state_delta, stored_state, version):
+                return event
+
+            # 버전 충돌: 다른 워커가 먼저 갱신함. 지터가 있는 백오프 후 재시도
+            self.conflict_retry_count += 1
+            logger.info(f"SqliteSessionService: Version conflict on session '{session.id}' (attempt {attempt + 1}/{self.max_append_retries}), retrying.")
+            time.sleep(min(0.2, 0.005 * (2 ** attempt)) * (0.5 + random.random()))
+
+        raise SessionVersionConflictError(
+            f"Failed to append event to session '{session.id}' after {self.max_append_retries} attempts due to concurrent updates."
+        )
+
+    # ------------------------------------------------------------------
+    # 변경 알림
+    # ------------------------------------------------------------------
+
+    def get_changes_since(self, last_change_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        지정한 change_id 이후의 세션 변경 기록을 반환합니다.
+
+        Args:
+            last_change_id (int): 마지막으로 처리한 변경 ID
+            limit (int): 한 번에 반환할 최대 변경 수
+
+        Returns:
+            List[Dict[str, Any]]: 변경 기록 목록 (change_id 오름차순)
+        """
+        rows = self._connection().execute(
+            "SELECT change_id, app_name, user_id, session_id, change_type, version, changed_at "
+            "FROM session_changes WHERE change_id > ? ORDER BY change_id LIMIT ?",
+            (last_change_id, limit)
+        ).fetchall()
+        return [
+            {
+                "change_id": change_id,
+                "app_name": app_name,
+                "user_id": user_id,
+                "session_id": session_id,
+                "change_type": change_type,
+                "version": version,
+                "changed_at": changed_at,
+            }
+            for change_id, app_name, user_id, session_id, change_type, version, changed_at in rows
+        ]
+
+    def get_latest_change_id(self) -> int:
+        """현재까지 기록된 마지막 변경 ID를 반환합니다."""
+        row = self._connection().execute("SELECT MAX(change_id) FROM session_changes").fetchone()
+        return row[0] or 0
+
+    def add_change_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        세션 변경 리스너를 등록합니다. 첫 리스너 등록 시 백그라운드 폴링 스레드가 시작됩니다.
+        리스너는 다른 프로세스를 포함한 모든 세션 변경마다 변경 기록 dict를 인자로 호출됩니다.
+
+        Args:
+            listener (Callable): 변경 기록을 받는 콜백 함수
+        """
+        with self._listeners_lock:
+            self._listeners.append(listener)
+            if self._watcher_thread is None or not self._watcher_thread.is_alive():
+                self._watcher_stop.clear()
+                self._watcher_thread = threading.Thread(
+                    target=self._watch_changes,
+                    name="sqlite-session-change-watcher",
+                    daemon=True
+                )
+                self._watcher_thread.start()
+
+    def remove_change_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """등록된 세션 변경 리스너를 제거합니다."""
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _watch_changes(self) -> None:
+        """PRAGMA data_version으로 다른 연결의 커밋을 감지하고 새 변경 기록을 리스너에 전달합니다."""
+        last_change_id = self.get_latest_change_id()
+        last_data_version = None
+        connection = self._connection()
+
+        while not self._watcher_stop.wait(self.change_poll_interval):
+            try:
+                data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+                if data_version == last_data_version:
+                    continue
+                last_data_version = data_version
+
+                for change in self.get_changes_since(last_change_id):
+                    last_change_id = change["change_id"]
+                    with self._listeners_lock:
+                        listeners = list(self._listeners)
+                    for listener in listeners:
+                        try:
+                            listener(change)
+                        except Exception:
+                            logger.exception("SqliteSessionService: Session change listener failed.")
+            except Exception:
+                logger.exception("SqliteSessionService: Error while polling session changes.")
+
+    # ------------------------------------------------------------------
+    # 내부 도우미
+    # ------------------------------------------------------------------
+
+    def _try_commit_event(self, connection: sqlite3.Connection, session: Session, event: Event, event_json: str,
+                          state_delta: Dict[str, Any], new_state: Dict[str, Any], expected_version: int) -> bool:
+        """version이 expected_version인 경우에만 상태와 이벤트를 커밋합니다. 충돌 시 False를 반환합니다."""
+        new_version = expected_version + 1
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            updated = connection.execute(
+                "UPDATE sessions SET state = ?, version = ?, last_update_time = ? "
+                "WHERE app_name = ? AND user_id = ? AND id = ? AND version = ?",
+                (json.dumps(new_state, ensure_ascii=False), new_version, event.timestamp,
+                 session.app_name, session.user_id, session.id, expected_version)
+            ).rowcount
+            if updated == 0:
+                connection.execute("ROLLBACK")
+                return False
+
+            connection.execute(
+                "INSERT INTO events (app_name, user_id, session_id, seq, timestamp, event) VALUES (?, ?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, new_version, event.timestamp, event_json)
+            )
+            self._apply_scoped_state(connection, session.app_name, session.user_id, state_delta)
+            self._maybe_compact(connection, session)
+            self._record_change(connection, session.app_name, session.user_id, session.id, "event_appended", new_version)
+            connection.execute("COMMIT")
+            return True
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _maybe_compact(self, connection: sqlite3.Connection, session: Session) -> None:
+        """이벤트 수가 임계값을 넘으면 저장된 이벤트 로그를 스냅샷 + tail로 압축합니다."""
+        if self.event_compaction_threshold is None:
+            return
+        key = (session.app_name, session.user_id, session.id)
+        event_count = connection.execute(
+            "SELECT COUNT(*) FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+        ).fetchone()[0]
+        if event_count <= self.event_compaction_threshold:
+            return
+
+        rows = connection.execute(
+            "SELECT seq, event FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq", key
+        ).fetchall()
+        events = [Event.model_validate_json(row[1]) for row in rows]
+        compacted = compact_events(events, self.keep_recent_content_events)
+        if compacted is events:
+            return
+
+        # 스냅샷은 마지막으로 접힌 이벤트의 seq를 이어받아 순서를 유지
+        folded_count = len(events) - (len(compacted) - 1)
+        snapshot_seq = rows[folded_count - 1][0]
+        connection.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq <= ?",
+            (*key, snapshot_seq)
+        )
+        connection.execute(
+            "INSERT INTO events (app_name, user_id, session_id, seq, timestamp, event) VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, snapshot_seq, compacted[0].timestamp, compacted[0].model_dump_json(exclude_none=True))
+        )
+        logger.info(f"SqliteSessionService: Compacted session '{session.id}' events {len(events)} -> {len(compacted)}")
+
+    @staticmethod
+    def _session_scoped_delta(state_delta: Dict[str, Any]) -> Dict[str, Any]:
+        """세션 상태에 저장될 키만 남긴 delta를 반환합니다 (temp:, app:, user: 접두사 제외)."""
+        return {
+            key: value for key, value in state_delta.items()
+            if not key.startswith((State.TEMP_PREFIX, State.APP_PREFIX, State.USER_PREFIX))
+        }
+
+    @staticmethod
+    def _apply_scoped_state(connection: sqlite3.Connection, app_name: str, user_id: str,
+                            state_delta: Dict[str, Any]) -> None:
+        """app:, user: 접두사 키를 각각의 공유 상태 테이블에 반영합니다 (쓰기 트랜잭션 내에서 호출)."""
+        app_delta = {key.removeprefix(State.APP_PREFIX): value for key, value in state_delta.items()
+                     if key.startswith(State.APP_PREFIX)}
+        user_delta = {key.removeprefix(State.USER_PREFIX): value for key, value in state_delta.items()
+                      if key.startswith(State.USER_PREFIX)}
+
+        if app_delta:
+            row = connection.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            app_state = json.loads(row[0]) if row else {}
+            app_state.update(app_delta)
+            connection.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                               (app_name, json.dumps(app_state, ensure_ascii=False)))
+        if user_delta:
+            row = connection.execute("SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                                     (app_name, user_id)).fetchone()
+            user_state = json.loads(row[0]) if row else {}
+            user_state.update(user_delta)
+            connection.execute("INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                               (app_name, user_id, json.dumps(user_state, ensure_ascii=False)))
+
+    @staticmethod
+    def _merge_state(connection: sqlite3.Connection, app_name: str, user_id: str, session: Session) -> Session:
+        """app:, user: 공유 상태를 세션 상태에 병합합니다."""
+        app_row = connection.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        if app_row:
+            for key, value in json.loads(app_row[0]).items():
+                session.state[State.APP_PREFIX + key] = value
+        user_row = connection.execute("SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                                      (app_name, user_id)).fetchone()
+        if user_row:
+            for key, value in json.loads(user_row[0]).items():
+                session.state[State.USER_PREFIX + key] = value
+        return session
+
+    def _record_change(self, connection: sqlite3.Connection, app_name: str, user_id: str, session_id: str,
+                       change_type: str, version: int) -> None:
+        """
+        세션 변경 기록을 추가합니다 (쓰기 트랜잭션 내에서 호출).
+        CHANGE_PRUNE_INTERVAL건마다 보존 기간이 지난 기록을 함께 삭제합니다.
+        """
+        now = time.time()
+        cursor = connection.execute(
+            "INSERT INTO session_changes (app_name, user_id, session_id, change_type, version, changed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (app_name, user_id, session_id, change_type, version, now)
+        )
+        if cursor.lastrowid % CHANGE_PRUNE_INTERVAL == 0:
+            connection.execute("DELETE FROM session_changes WHERE changed_at < ?",
+                               (now - self.change_retention_seconds,))
+
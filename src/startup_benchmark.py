@@ -0,0 +1,232 @@
+"""
+AIdea Lab 시작 시간 벤치마크
+
+이 모듈은 앱이 첫 화면을 그리기 전에 불러오는 모듈의 임포트 시간과, 세션마다 반복되는
+오케스트레이터 생성 및 1단계 워크플로우 구성(에이전트 그래프 캐시가 빈 상태와 적중한 상태) 시간을 측정하는 명령줄 벤치마크를 제공합니다.
+
+- 임포트 시간은 새 인터프리터를 `python -X importtime`으로 실행해 측정하므로 매번 콜드 스타트 기준입니다.
+  --repeat 번 실행해 전체 시간이 중앙값인 실행의 모듈별 시간을 보고합니다.
+- 보고서에는 누적 시간(하위 임포트 포함)과 자체 시간 기준 상위 모듈, 최상위 패키지별 합계가 포함됩니다.
+- 오케스트레이터 측정은 이 프로세스에서 모듈을 불러온 뒤(웜 상태) 생성과 워크플로우 구성을 반복한 중앙값입니다.
+
+Streamlit 스크립트(src/ui/app.py)는 임포트하면 화면 코드가 실행되므로, 기본값으로 앱이 임포트하는
+UI/컨트롤러/오케스트레이터 모듈을 측정합니다.
+
+사용 예:
+    python -m src.startup_benchmark
+    python -m src.startup_benchmark --repeat 5 --top 30 --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Sequence
+
+# 앱이 첫 화면을 그리기 전에 불러오는 모듈
+DEFAULT_MODULES = (
+    "src.ui.state_manager",
+    "src.ui.views",
+    "src.ui.adk_controller",
+    "src.ui.discussion_controller",
+    "src.orchestrator.main_orchestrator",
+    "src.session_store.phase1_cache",
+    "src.utils.metrics_server",
+    "src.utils.tracing",
+)
+
+DEFAULT_REPEAT = 3
+DEFAULT_TOP = 20
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """
+    `-X importtime` 출력(표준 오류)을 모듈별 기록으로 해석합니다.
+
+    Args:
+        text (str): importtime 출력
+
+    Returns:
+        List[Dict[str, Any]]: 임포트가 끝난 순서의 module, self_us, cumulative_us, depth 목록
+    """
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 머리글 줄
+        name = fields[2].rstrip()
+        entries.append({
+            "module": name.strip(),
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1]),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return entries
+
+
+def summarize_imports(entries: Sequence[Dict[str, Any]], top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """
+    모듈별 임포트 기록을 보고서용으로 요약합니다.
+
+    Args:
+        entries (Sequence[Dict[str, Any]]): parse_importtime() 결과
+        top (int): 상위 모듈 수
+
+    Returns:
+        Dict[str, Any]: total_ms, module_count, top_cumulative, top_self, packages(최상위 패키지별 자체 시간 합계, ms)
+    """
+    packages: Dict[str, float] = {}
+    for entry in entries:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry["self_us"] / 1000.0
+
+    def top_by(field: str) -> List[Dict[str, Any]]:
+        ranked = sorted(entries, key=lambda entry: entry[field], reverse=True)[:top]
+        return [{"module": entry["module"], "ms": entry[field] / 1000.0} for entry in ranked]
+
+    return {
+        "total_ms": sum(entry["self_us"] for entry in entries) / 1000.0,
+        "module_count": len(entries),
+        "top_cumulative": top_by("cumulative_us"),
+        "top_self": top_by("self_us"),
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]),
+    }
+
+
+def profile_imports(modules: Sequence[str], repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    새 인터프리터에서 모듈을 임포트하는 시간을 repeat 번 측정합니다.
+
+    Args:
+        modules (Sequence[str]): 임포트할 모듈 목록
+        repeat (int): 측정 횟수
+
+    Returns:
+        Dict[str, Any]: wall_seconds(실행별 전체 시간 목록)와 전체 시간이 중앙값인 실행의 entries
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_ROOT, os.getenv("PYTHONPATH")]))}
+    command = [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"]
+    runs = []
+    for _ in range(max(1, repeat)):
+        started_at = time.perf_counter()
+        completed = subprocess.run(command, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+        wall_seconds = time.perf_counter() - started_at
+        if completed.returncode != 0:
+            raise RuntimeError(f"Import failed: {completed.stderr.strip().splitlines()[-1:]}")
+        runs.append((wall_seconds, parse_importtime(completed.stderr)))
+    runs.sort(key=lambda run: run[0])
+    return {"wall_seconds": [run[0] for run in runs], "entries": runs[len(runs) // 2][1]}
+
+
+def benchmark_orchestrator(repeat: int = 20) -> Dict[str, float]:
+    """
+    세션마다 반복되는 오케스트레이터 생성과 1단계 워크플로우 구성 시간을 측정합니다 (웜 상태, 중앙값).
+
+    Args:
+        repeat (int): 측정 횟수
+
+    Returns:
+        Dict[str, float]: construct_ms, phase1_workflow_build_ms(캐시가 빈 상태), phase1_workflow_ms(캐시 적중)
+    """
+    from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator, clear_agent_graph_cache
+
+    construct_times = []
+    build_times = []
+    workflow_times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        AIdeaLabOrchestrator().get_phase1_workflow()  # 첫 호출의 지연 임포트 제외
+        for _ in range(max(1, repeat)):
+            started_at = time.perf_counter()
+            orchestrator = AIdeaLabOrchestrator()
+            construct_times.append(time.perf_counter() - started_at)
+            clear_agent_graph_cache()
+            started_at = time.perf_counter()
+            orchestrator.get_phase1_workflow()
+            build_times.append(time.perf_counter() - started_at)
+            started_at = time.perf_counter()
+            AIdeaLabOrchestrator().get_phase1_workflow()
+            workflow_times.append(time.perf_counter() - started_at)
+    return {
+        "construct_ms": statistics.median(construct_times) * 1000.0,
+        "phase1_workflow_build_ms": statistics.median(build_times) * 1000.0,
+        "phase1_workflow_ms": statistics.median(workflow_times) * 1000.0,
+    }
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """벤치마크 결과를 사람이 읽을 보고서로 만듭니다."""
+    imports = result["imports"]
+    wall = result["wall_seconds"]
+    lines = [
+        f"Cold import of {len(result['modules'])} modules: median {statistics.median(wall):.2f}s "
+        f"(min {wall[0]:.2f}s, max {wall[-1]:.2f}s, {len(wall)} runs)",
+        f"Import time (sum of self times): {imports['total_ms']:.0f} ms across {imports['module_count']} modules",
+        "",
+        "Top modules by cumulative time:",
+    ]
+    lines += [f"  {entry['ms']:9.1f} ms  {entry['module']}" for entry in imports["top_cumulative"]]
+    lines += ["", "Top modules by self time:"]
+    lines += [f"  {entry['ms']:9.1f} ms  {entry['module']}" for entry in imports["top_self"]]
+    lines += ["", "Self time by top-level package:"]
+    lines += [f"  {ms:9.1f} ms  {package}" for package, ms in imports["packages"].items()]
+    if "orchestrator" in result:
+        orchestrator = result["orchestrator"]
+        lines += [
+            "",
+            f"AIdeaLabOrchestrator(): {orchestrator['construct_ms']:.3f} ms",
+            f"get_phase1_workflow() build: {orchestrator['phase1_workflow_build_ms']:.3f} ms",
+            f"get_phase1_workflow() cached: {orchestrator['phase1_workflow_ms']:.3f} ms",
+        ]
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.startup_benchmark",
+        description="앱 시작 시 임포트 시간과 세션별 오케스트레이터 생성 시간을 측정합니다."
+    )
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES), help="임포트 시간을 측정할 모듈 (기본값: 앱이 불러오는 모듈)")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT, help="콜드 임포트 측정 횟수")
+    parser.add_argument("-n", "--top", type=int, default=DEFAULT_TOP, help="보고서에 표시할 상위 모듈 수")
+    parser.add_argument("--skip-orchestrator", action="store_true", help="오케스트레이터 생성 시간 측정 생략")
+    parser.add_argument("--json", action="store_true", help="보고서 대신 JSON으로 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    시작 시간 벤치마크 진입점
+
+    Returns:
+        int: 종료 코드
+    """
+    options = parse_args(argv)
+    try:
+        profile = profile_imports(options.modules, options.repeat)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    result: Dict[str, Any] = {
+        "modules": options.modules,
+        "wall_seconds": profile["wall_seconds"],
+        "imports": summarize_imports(profile["entries"], options.top),
+    }
+    if not options.skip_orchestrator:
+        result["orchestrator"] = benchmark_orchestrator()
+
+    print(json.dumps(result, indent=2) if options.json else format_report(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
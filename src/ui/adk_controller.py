@@ -7,7 +7,6 @@ ADK 연동 로직 캡슐화 모듈
 import asyncio
 import uuid
 import os
-import google.generativeai as genai
 from typing import Optional, Tuple, List, Dict, Any
 from google.adk.sessions import Session
 from google.genai import types
@@ -17,6 +16,45 @@ from google.adk.events import Event, EventActions
 # 프로젝트 내부 임포트
 from src.session_manager import SessionManager
 from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator
+from src.utils.blob_store import intern_text
+from src.utils.tracing import traced_event_stream
+from src.utils.model_router import STREAMING_RUN_CONFIG, monitored_event_stream
+from src.utils.api_key_pool import get_session_api_key, validate_api_key
+from src.utils.structured_logging import get_logger
+from src.session_store.phase1_cache import get_phase1_cache
+
+# 유효한 응답을 받지 못했을 때 저장하는 대체 응답 (부분 재실행 시 다시 만들 출력으로 취급)
+FALLBACK_RESPONSE_MARKER = "이 메시지는 자동 생성된 대체 응답입니다."
+FALLBACK_RESPONSE_TEMPLATE = "[{agent_name}에서 유효한 응답을 받지 못했습니다. " + FALLBACK_RESPONSE_MARKER + "]"
+SUMMARY_FALLBACK_RESPONSE = """**핵심 포인트:**
+- 이 보고서는 요약 중 오류가 발생하여 자동 생성되었습니다.
+- 원본 보고서의 내용을 참고해주세요.
+
+**종합 요약:**
+해당 페르소나의 원본 보고서에 대한 요약 생성에 실패했습니다. 원본 보고서를 직접 확인해주시기 바랍니다."""
+
+logger = get_logger("phase1")
+
+
+def build_phase1_input(idea: str, goal: str = "", constraints: str = "", values: str = "") -> types.Content:
+    """
+    1단계 워크플로우에 전달할 사용자 입력 메시지를 만듭니다.
+    
+    Args:
+        idea (str): 아이디어
+        goal (str): 목표
+        constraints (str): 제약조건
+        values (str): 가치
+        
+    Returns:
+        types.Content: 사용자 입력 메시지
+    """
+    content_parts = [types.Part(text=f"아이디어: {idea}")]
+    if goal: content_parts.append(types.Part(text=f"\n목표: {goal}"))
+    if constraints: content_parts.append(types.Part(text=f"\n제약조건: {constraints}"))
+    if values: content_parts.append(types.Part(text=f"\n가치: {values}"))
+    return types.Content(role="user", parts=content_parts)
+
 
 
 class AdkController:
@@ -37,31 +75,27 @@ class AdkController:
         self.session_manager = session_manager
         self.app_name = session_manager.app_name
         self.user_id = session_manager.user_id
+        # 마지막 1단계 실행이 캐시된 결과로 처리되었는지 여부와 재사용한 입력의 유사도 (정확히 일치하면 1.0)
+        self.phase1_cache_hit = False
+        self.phase1_cache_similarity: Optional[float] = None
     
     def _ensure_api_key_configured(self) -> bool:
         """
-        Google AI API 키가 올바르게 설정되어 있는지 확인하고, 필요시 재설정합니다.
+        이번 실행에 사용할 Google AI API 키(use_api_key()로 지정한 세션 키, 없으면 환경 변수의 키)가 유효한지 확인합니다.
         
         Returns:
-            bool: API 키 설정 성공 여부
+            bool: API 키 확인 성공 여부
         """
         try:
             # 현재 API 키 상태 확인
-            api_key = os.getenv("GOOGLE_API_KEY_USER_INPUT") or os.getenv("GOOGLE_API_KEY")
+            api_key = get_session_api_key() or os.getenv("GOOGLE_API_KEY_USER_INPUT") or os.getenv("GOOGLE_API_KEY")
             
             if not api_key or not api_key.strip():
                 print("❌ ADK Controller: API 키를 찾을 수 없습니다.")
                 return False
-                
-            # API 키 재설정
-            genai.configure(api_key=api_key.strip())
             
-            # 간단한 테스트로 유효성 검증
-            test_model = genai.GenerativeModel("gemini-2.0-flash")
-            response = test_model.generate_content("Hello")
-            
-            if response.text:
-                print(f"✅ ADK Controller: API 키 재확인 완료: {api_key[:10]}...")
+            # 간단한 테스트로 유효성 검증 (이미 검증한 키는 생략)
+            if validate_api_key(api_key):
                 return True
             else:
                 print("❌ ADK Controller: API 키는 유효하지만 응답 생성 실패")
@@ -71,7 +105,11 @@ class AdkController:
             print(f"❌ ADK Controller: API 키 확인 중 오류: {str(e)}")
             return False
     
-    async def execute_phase1_workflow(self, session_id: str, input_content: types.Content, orchestrator: AIdeaLabOrchestrator) -> Tuple[bool, List[Dict], set]:
+    async def execute_phase1_workflow(self, session_id: str, input_content: types.Content, orchestrator: AIdeaLabOrchestrator,
+                                      cache_key: Optional[str] = None, similarity_text: Optional[str] = None,
+                                      cache_variant: str = "", reuse_cached: bool = True,
+                                      reuse_similar: Optional[Tuple[str, float, str]] = None,
+                                      resume: bool = False) -> Tuple[bool, List[Dict], set]:
         """
         1단계 분석 워크플로우를 실행합니다.
         
@@ -79,12 +117,45 @@ class AdkController:
             session_id (str): 세션 ID
             input_content (types.Content): 입력 콘텐츠
             orchestrator (AIdeaLabOrchestrator): 오케스트레이터 인스턴스
+            cache_key (str, optional): 1단계 결과 캐시 키 (phase1_cache_key()). 지정하면 캐시된 결과를
+                세션 상태에 바로 채우고, 캐시에 없으면 실행 후 성공한 결과를 저장
+            similarity_text (str, optional): 유사 입력 색인용 텍스트 (phase1_similarity_text()). 결과를 저장할 때 함께 저장
+            cache_variant (str): 실행 구성 식별자 (phase1_variant_key())
+            reuse_cached (bool): False면 캐시를 조회하지 않고 새로 실행 (결과는 저장)
+            reuse_similar (Tuple[str, float, str], optional): 사용자가 재사용하기로 한 유사 입력 항목
+                (find_similar_phase1_result()의 결과). 지정하면 cache_key 대신 이 항목의 결과를 세션 상태에 채움
+            resume (bool): True면 이전 실행이 남긴 세션 상태에서 유효한 출력은 유지하고,
+                누락되었거나 대체 응답인 출력과 그에 의존하는 단계만 다시 실행 (캐시는 조회하지 않음)
             
         Returns:
-            Tuple[bool, List[Dict], set]: (성공 여부, 처리된 결과 리스트, 처리된 출력 키 집합)
+            Tuple[bool, List[Dict], set]: (성공 여부, 이번에 처리된 결과 리스트, 처리된 출력 키 집합 - 부분 재실행 시 유지된 출력 포함)
         """
         print(f"DEBUG: AdkController.execute_phase1_workflow - Starting with session_id: {session_id}")
         
+        self.phase1_cache_hit = False
+        self.phase1_cache_similarity = None
+        phase1_cache = get_phase1_cache() if cache_key else None
+        
+        valid_outputs: Dict[str, str] = {}
+        stages_to_run: Optional[List[str]] = None
+        if resume:
+            valid_outputs = self.get_valid_phase1_outputs(session_id, orchestrator)
+            stages_to_run = orchestrator.get_phase1_stages_to_run(valid_outputs)
+            print(f"INFO: Resuming Phase 1 for session '{session_id}'. Kept: {list(valid_outputs)}, re-running: {stages_to_run}")
+            if not stages_to_run:
+                return (True, [], set(valid_outputs))
+        
+        if phase1_cache is not None and reuse_cached and not resume:
+            expected_output_keys = set(orchestrator.get_output_keys_phase1().values())
+            lookup_key, similarity = (reuse_similar[0], reuse_similar[1]) if reuse_similar else (cache_key, 1.0)
+            cached_outputs = phase1_cache.get(lookup_key)
+            if cached_outputs and expected_output_keys <= set(cached_outputs):
+                restored = self._restore_phase1_from_cache(session_id, cached_outputs)
+                if restored is not None:
+                    self.phase1_cache_hit = True
+                    self.phase1_cache_similarity = similarity
+                    return restored
+        
         # API 키 설정 확인 및 재설정
         if not self._ensure_api_key_configured():
             print("ERROR: AdkController - API 키 설정 실패로 인해 Phase 1 실행을 중단합니다.")
@@ -110,7 +181,9 @@ class AdkController:
         try:
             # 오케스트레이터에서 출력 키 정보 가져오기
             output_keys_map = orchestrator.get_output_keys_phase1()
-            expected_sub_agent_output_count = len(output_keys_map)
+            # 이번 실행에서 만들 출력 키 (부분 재실행이면 다시 만들 단계의 출력만)
+            tracked_output_keys = set(stages_to_run) if stages_to_run is not None else set(output_keys_map.values())
+            expected_sub_agent_output_count = len(tracked_output_keys)
             
             print(f"DEBUG: Expected sub-agent output count: {expected_sub_agent_output_count}")
             print(f"DEBUG: Output keys to track from orchestrator: {output_keys_map}")
@@ -120,35 +193,45 @@ class AdkController:
             
             # Runner 생성 및 실행
             runner = Runner(
-                agent=orchestrator.get_phase1_workflow(),
+                agent=orchestrator.get_phase1_workflow(output_keys=stages_to_run),
                 app_name=self.app_name,
                 session_service=self.session_manager.session_service
             )
             
-            event_stream = runner.run_async(
-                user_id=self.user_id,
+            event_stream = traced_event_stream(
+                monitored_event_stream(runner.run_async(
+                    user_id=self.user_id,
+                    session_id=session_id,
+                    # 부분 재실행이면 입력 메시지가 이미 세션에 있으므로 다시 추가하지 않음
+                    new_message=None if resume else input_content,
+                    run_config=STREAMING_RUN_CONFIG
+                )),
+                "phase1.workflow",
                 session_id=session_id,
-                new_message=input_content
+                model=orchestrator.model_name
             )
             
             async for event in event_stream:
+                # SSE 부분 응답 이벤트는 출력 키 값을 담지 않으므로 건너뜀 (지연 지표는 monitored_event_stream이 기록)
+                if event.partial:
+                    continue
                 agent_author = getattr(event, 'author', 'N/A')
                 is_final_event = event.is_final_response() if hasattr(event, 'is_final_response') else False
                 event_actions = getattr(event, 'actions', None)
                 state_delta = getattr(event_actions, 'state_delta', None) if event_actions else None
                 
-                print(f"DEBUG_EVENT: Author='{agent_author}', IsFinal='{is_final_event}', HasStateDelta='{state_delta is not None}'")
+                logger.debug("event", author=agent_author, is_final=is_final_event, has_state_delta=state_delta is not None)
                 
                 if is_final_event and state_delta:
                     for output_key_in_delta, response_text in state_delta.items():
-                        if output_key_in_delta in output_keys_map.values() and output_key_in_delta not in processed_sub_agent_outputs:
-                            # 원본 페르소나 보고서인 경우 길이를 로그로 출력
+                        if output_key_in_delta in tracked_output_keys and output_key_in_delta not in processed_sub_agent_outputs:
+                            # 원본 페르소나 보고서는 길이를, 중간 요약은 원본 응답을 기록 (DEBUG 레벨에서만)
                             if "report_phase1" in output_key_in_delta and "_summary" not in output_key_in_delta:
-                                print(f"DEBUG_REPORT_LENGTH: Agent '{agent_author}', OutputKey: '{output_key_in_delta}', Length: {len(response_text)} chars")
-                            
-                            # 중간 요약 에이전트의 응답인 경우 원본 응답을 로그로 출력
+                                logger.debug("report received", author=agent_author, output_key=output_key_in_delta,
+                                             length=lambda: len(response_text))
                             if "report_phase1_summary" in output_key_in_delta:
-                                print(f"DEBUG_LLM_RAW_RESPONSE: Agent '{agent_author}', OutputKey: '{output_key_in_delta}', RawResponse: '{response_text}'")
+                                logger.debug("raw summary response", author=agent_author, output_key=output_key_in_delta,
+                                             response=response_text)
                             
                             print(f"DEBUG: Valid response text found for output_key '{output_key_in_delta}' from agent '{agent_author}'.")
                             
@@ -171,7 +254,20 @@ class AdkController:
                 print(f"WARNING: Workflow incomplete. Expected {expected_sub_agent_output_count}, processed {len(processed_sub_agent_outputs)}: {list(processed_sub_agent_outputs)}")
             
             print(f"DEBUG: AdkController.execute_phase1_workflow - Finished. WorkflowCompleted={workflow_completed}, AnyResponseProcessed={any_response_processed_successfully}")
-            return (workflow_completed and any_response_processed_successfully, processed_results, processed_sub_agent_outputs)
+            analysis_success = workflow_completed and any_response_processed_successfully
+            if phase1_cache is not None and analysis_success:
+                # 처리 순서(표시 순서)를 유지한 채 검증된 응답을 저장
+                outputs_to_cache = {result["output_key"]: result["response"] for result in processed_results}
+                if resume:
+                    merged_outputs = {**valid_outputs, **outputs_to_cache}
+                    outputs_to_cache = {key: merged_outputs[key] for key in output_keys_map.values() if key in merged_outputs}
+                phase1_cache.put(
+                    cache_key,
+                    outputs_to_cache,
+                    input_text=similarity_text or "",
+                    variant=cache_variant
+                )
+            return (analysis_success, processed_results, processed_sub_agent_outputs | set(valid_outputs))
         
         except Exception as e:
             print(f"ERROR in AdkController.execute_phase1_workflow: {str(e)}")
@@ -179,6 +275,89 @@ class AdkController:
             traceback.print_exc()
             return (False, [], processed_sub_agent_outputs)
     
+    def find_similar_phase1_result(self, cache_key: str, similarity_text: str,
+                                   cache_variant: str = "") -> Optional[Tuple[str, float, str]]:
+        """
+        키가 일치하는 1단계 결과가 없을 때 같은 구성의 유사한 이전 아이디어 항목을 찾습니다.
+        세션 상태에는 아무것도 쓰지 않으므로, 호출하는 쪽이 이전 아이디어를 보여주고 재사용 여부를 물은 뒤
+        execute_phase1_workflow()의 reuse_similar로 전달합니다.
+        
+        Args:
+            cache_key (str): 현재 입력의 캐시 키 (phase1_cache_key())
+            similarity_text (str): 현재 입력의 유사 입력 색인용 텍스트 (phase1_similarity_text())
+            cache_variant (str): 실행 구성 식별자 (phase1_variant_key())
+            
+        Returns:
+            Optional[Tuple[str, float, str]]: (캐시 키, 아이디어 유사도, 이전 아이디어), 키가 일치하는 결과가 있거나
+                유사 항목이 없으면 None
+        """
+        phase1_cache = get_phase1_cache()
+        if phase1_cache is None or phase1_cache.contains(cache_key):
+            return None
+        similar = phase1_cache.find_similar(similarity_text, cache_variant)
+        if similar is not None:
+            print(f"INFO: Found near-duplicate Phase 1 input (idea similarity {similar[1]:.2f})")
+        return similar
+    
+    def get_valid_phase1_outputs(self, session_id: str, orchestrator: AIdeaLabOrchestrator) -> Dict[str, str]:
+        """
+        세션 상태에 저장된 1단계 출력 중 다시 만들 필요가 없는 유효한 출력을 반환합니다.
+        비어 있거나, 응답 검증을 통과하지 못하거나, 대체 응답인 출력은 제외됩니다.
+        
+        Args:
+            session_id (str): 세션 ID
+            orchestrator (AIdeaLabOrchestrator): 오케스트레이터 인스턴스
+            
+        Returns:
+            Dict[str, str]: output_key -> 응답 텍스트
+        """
+        session = self.session_manager.get_session(session_id)
+        if session is None:
+            return {}
+        
+        valid_outputs = {}
+        for output_key in orchestrator.get_output_keys_phase1().values():
+            response_text = session.state.get(output_key)
+            if not isinstance(response_text, str) or response_text == SUMMARY_FALLBACK_RESPONSE \
+                    or FALLBACK_RESPONSE_MARKER in response_text:
+                continue
+            if self._validate_agent_response(response_text, output_key, output_key) == response_text:
+                valid_outputs[output_key] = response_text
+        return valid_outputs
+    
+    def _restore_phase1_from_cache(self, session_id: str, cached_outputs: Dict[str, str]) -> Optional[Tuple[bool, List[Dict], set]]:
+        """
+        캐시된 1단계 출력을 하나의 state_delta 이벤트로 세션 상태에 채웁니다.
+        
+        Args:
+            session_id (str): 세션 ID
+            cached_outputs (Dict[str, str]): output_key -> 응답 텍스트 (표시 순서)
+            
+        Returns:
+            Optional[Tuple[bool, List[Dict], set]]: execute_phase1_workflow()와 같은 형식의 결과, 실패 시 None
+        """
+        session = self.session_manager.get_session(session_id)
+        if session is None:
+            print(f"WARNING: Phase 1 cache hit but session '{session_id}' was not found. Running workflow instead.")
+            return None
+        
+        outputs = {output_key: intern_text(response) for output_key, response in cached_outputs.items()}
+        try:
+            self.session_manager.session_service.append_event(
+                session=session,
+                event=Event(author="phase1_cache", actions=EventActions(state_delta=outputs))
+            )
+        except Exception as e:
+            print(f"ERROR: Failed to restore cached Phase 1 results into session: {e}")
+            return None
+        
+        print(f"INFO: Phase 1 results restored from cache for session '{session_id}': {list(outputs)}")
+        processed_results = [
+            {"output_key": output_key, "response": response, "agent_name": "phase1_cache"}
+            for output_key, response in outputs.items()
+        ]
+        return (True, processed_results, set(outputs))
+    
     async def execute_phase2_facilitator(self, session_id: str, facilitator_agent) -> Optional[Dict[str, Any]]:
         """
         2단계 토론 퍼실리테이터를 실행합니다.
@@ -208,10 +387,15 @@ class AdkController:
             
             input_content = types.Content(role="user", parts=[types.Part(text="")])
             
-            event_stream = runner.run_async(
-                user_id=self.user_id,
-                session_id=session_id,
-                new_message=input_content
+            event_stream = traced_event_stream(
+                monitored_event_stream(runner.run_async(
+                    user_id=self.user_id,
+                    session_id=session_id,
+                    new_message=input_content,
+                    run_config=STREAMING_RUN_CONFIG
+                )),
+                "phase2.facilitator",
+                session_id=session_id
             )
             
             facilitator_response = None
@@ -275,10 +459,16 @@ class AdkController:
             
             input_content = types.Content(role="user", parts=[types.Part(text="")])
             
-            event_stream = runner.run_async(
-                user_id=self.user_id,
+            event_stream = traced_event_stream(
+                monitored_event_stream(runner.run_async(
+                    user_id=self.user_id,
+                    session_id=session_id,
+                    new_message=input_content,
+                    run_config=STREAMING_RUN_CONFIG
+                )),
+                "phase2.persona",
                 session_id=session_id,
-                new_message=input_content
+                persona=persona_name
             )
             
             async for event in event_stream:
@@ -326,15 +516,17 @@ class AdkController:
         Returns:
             str: 검증된 응답 텍스트 (대체 응답 포함)
         """
-        # marketer_report_phase1_summary 관련 상세 로깅 추가
+        # marketer_report_phase1_summary 관련 상세 로깅 (DEBUG 레벨에서만 미리보기를 만듦)
         if output_key == "marketer_report_phase1_summary":
-            print(f"DEBUG_MARKETER_SUMMARY: Starting validation for output_key '{output_key}'")
-            print(f"DEBUG_MARKETER_SUMMARY: Agent name: '{agent_name}'")
-            print(f"DEBUG_MARKETER_SUMMARY: Response type: {type(response_text)}")
-            print(f"DEBUG_MARKETER_SUMMARY: Response length: {len(response_text) if response_text else 0}")
-            print(f"DEBUG_MARKETER_SUMMARY: Response preview (first 200 chars): '{response_text[:200] if response_text else 'None'}'")
-            if response_text and len(response_text) > 200:
-                print(f"DEBUG_MARKETER_SUMMARY: Response end (last 200 chars): '{response_text[-200:]}'")
+            logger.debug(
+                "validating marketer summary",
+                agent=agent_name,
+                output_key=output_key,
+                response_type=lambda: type(response_text).__name__,
+                length=lambda: len(response_text) if response_text else 0,
+                head=lambda: response_text[:200] if response_text else None,
+                tail=lambda: response_text[-200:] if response_text and len(response_text) > 200 else None,
+            )
         
         # 중간 요약 응답인지 확인
         is_summary_response = "_summary" in output_key
@@ -352,7 +544,8 @@ class AdkController:
         else:
             basic_validation_failed = False
         
-        # 중간 요약 응답에 대한 추가 유효성 검사
+        # 중간 요약 응답에 대한 추가 유효성 검사 (형식 검사를 하지 않으면 None)
+        has_key_points = has_summary = None
         if is_summary_response and not basic_validation_failed:
             has_key_points = "핵심 포인트:" in response_text or "핵심 포인트" in response_text
             has_summary = "종합 요약:" in response_text or "종합 요약" in response_text
@@ -369,34 +562,27 @@ class AdkController:
         
         # marketer_summary 관련 추가 로깅
         if output_key == "marketer_report_phase1_summary":
-            print(f"DEBUG_MARKETER_SUMMARY: Validation result - basic_validation_failed: {basic_validation_failed}")
-            if is_summary_response:
-                print(f"DEBUG_MARKETER_SUMMARY: Format check - has_key_points: {has_key_points if 'has_key_points' in locals() else 'N/A'}")
-                print(f"DEBUG_MARKETER_SUMMARY: Format check - has_summary: {has_summary if 'has_summary' in locals() else 'N/A'}")
+            logger.debug("marketer summary validated", failed=basic_validation_failed,
+                         has_key_points=has_key_points, has_summary=has_summary)
         
         # 유효하지 않은 응답에 대한 대체 응답 생성
         if basic_validation_failed:
             print(f"WARNING: Invalid response from {agent_name} for {output_key}. Generating fallback response.")
             
             # 기본 대체 응답 생성
-            fallback_response = f"[{agent_name}에서 유효한 응답을 받지 못했습니다. 이 메시지는 자동 생성된 대체 응답입니다.]"
+            fallback_response = FALLBACK_RESPONSE_TEMPLATE.format(agent_name=agent_name)
             
             # 중간 요약 응답인 경우, 지정된 형식에 맞는 대체 응답 생성
             if is_summary_response:
-                fallback_response = """**핵심 포인트:**
-- 이 보고서는 요약 중 오류가 발생하여 자동 생성되었습니다.
-- 원본 보고서의 내용을 참고해주세요.
-
-**종합 요약:**
-해당 페르소나의 원본 보고서에 대한 요약 생성에 실패했습니다. 원본 보고서를 직접 확인해주시기 바랍니다."""
+                fallback_response = SUMMARY_FALLBACK_RESPONSE
             
             if output_key == "marketer_report_phase1_summary":
-                print(f"DEBUG_MARKETER_SUMMARY: Using fallback response: '{fallback_response}'")
+                logger.debug("marketer summary fallback", response=fallback_response)
             
             return fallback_response
         
         if output_key == "marketer_report_phase1_summary":
-            print(f"DEBUG_MARKETER_SUMMARY: Validation passed, returning original response")
+            logger.debug("marketer summary passed validation")
         
         return response_text
     
@@ -412,24 +598,29 @@ class AdkController:
         Returns:
             Dict[str, Any]: 처리된 응답 정보
         """
-        # marketer_report_phase1_summary 관련 상세 로깅 추가
+        # marketer_report_phase1_summary 관련 상세 로깅 (DEBUG 레벨에서만 미리보기를 만듦)
         if output_key == "marketer_report_phase1_summary":
-            print(f"DEBUG_PROCESS_RESPONSE: Starting processing for output_key '{output_key}'")
-            print(f"DEBUG_PROCESS_RESPONSE: Agent name: '{agent_name}'")
-            print(f"DEBUG_PROCESS_RESPONSE: Response_text type: {type(response_text)}")
-            print(f"DEBUG_PROCESS_RESPONSE: Response_text length: {len(response_text) if response_text else 0}")
-            print(f"DEBUG_PROCESS_RESPONSE: Response_text content preview: '{response_text[:300] if response_text else 'None'}...'")
+            logger.debug(
+                "processing marketer summary",
+                agent=agent_name,
+                output_key=output_key,
+                response_type=lambda: type(response_text).__name__,
+                length=lambda: len(response_text) if response_text else 0,
+                preview=lambda: response_text[:300] if response_text else None,
+            )
         
         # 응답 검증 및 필요 시 대체 응답 생성
-        validated_response = self._validate_agent_response(response_text, agent_name, output_key)
+        # 결과, UI 메시지, 대체 이벤트가 모두 같은 문자열 객체를 참조하도록 블롭 저장소에 등록
+        validated_response = intern_text(self._validate_agent_response(response_text, agent_name, output_key))
         
         # marketer_summary 관련 추가 로깅
         if output_key == "marketer_report_phase1_summary":
-            print(f"DEBUG_PROCESS_RESPONSE: Validated_response type: {type(validated_response)}")
-            print(f"DEBUG_PROCESS_RESPONSE: Validated_response length: {len(validated_response) if validated_response else 0}")
-            print(f"DEBUG_PROCESS_RESPONSE: Response changed: {validated_response != response_text}")
-            if validated_response != response_text:
-                print(f"DEBUG_PROCESS_RESPONSE: Fallback response used for '{output_key}'")
+            logger.debug(
+                "marketer summary processed",
+                output_key=output_key,
+                length=lambda: len(validated_response) if validated_response else 0,
+                fallback_used=lambda: validated_response != response_text,
+            )
         
         # 응답이 변경되었으면 세션 상태 업데이트
         if validated_response != response_text:
@@ -459,7 +650,7 @@ class AdkController:
         }
         
         if output_key == "marketer_report_phase1_summary":
-            print(f"DEBUG_PROCESS_RESPONSE: Final result for '{output_key}': {result}")
+            logger.debug("marketer summary result", output_key=output_key, result=lambda: result)
         
         return result
     
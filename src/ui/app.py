@@ -11,10 +11,6 @@ import asyncio
 import streamlit as st
 import time # stream_text_generator 에서 사용 (현재 직접 호출되지는 않음)
 from dotenv import load_dotenv
-from google.adk.runners import Runner # 실제 ADK Runner 임포트
-from google.genai import types
-from google.adk.events import Event, EventActions
-import google.generativeai as genai  # ADK 실행 직전 API 키 재설정을 위해 추가
 
 # 프로젝트 루트 디렉토리를 sys.path에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -22,7 +18,15 @@ from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator
 from src.session_manager import SessionManager
 from config.personas import PERSONA_CONFIGS, PersonaType, ORCHESTRATOR_CONFIG, PERSONA_SEQUENCE
 from config.models import get_model_display_options, MODEL_CONFIGS, ModelType, DEFAULT_MODEL
-from src.utils.model_monitor import AIModelMonitor, monitor_model_performance
+from src.utils.model_monitor import monitor_model_performance
+from src.utils.model_router import get_model_router
+from src.utils.metrics_server import start_metrics_server
+from src.utils.memory_profiler import configure_memory_profiling, take_phase_snapshot
+from src.utils.tracing import configure_tracing, trace_span
+from src.utils.token_accounting import token_ledger
+from src.utils.api_key_pool import use_api_key, validate_api_key
+from src.utils.structured_logging import get_logger
+from src.session_store.phase1_cache import phase1_cache_key, phase1_similarity_text, phase1_variant_key
 
 # state_manager 모듈에서 필요한 클래스와 함수들 import
 from src.ui.state_manager import (
@@ -36,12 +40,13 @@ from src.ui.state_manager import (
 )
 
 # ADK 컨트롤러 import 추가
-from src.ui.adk_controller import AdkController
+from src.ui.adk_controller import AdkController, build_phase1_input
 
 # views 모듈 import 추가
 from src.ui.views import (
     render_idle_view,
     render_phase1_pending_view,
+    render_phase1_similar_offer_view,
     render_phase1_complete_view,
     render_phase1_error_view,
     render_phase2_pending_view,
@@ -60,22 +65,19 @@ from src.ui.discussion_controller import DiscussionController
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
-# Google AI API 키 전역 설정 및 검증
+discussion_logger = get_logger("discussion")
+
+# Google AI API 키 검증
 def configure_google_ai_api():
-    """Google AI API 키를 전역으로 설정하고 검증합니다."""
+    """환경 변수의 Google AI API 키를 검증합니다 (키는 세션별로 지정되므로 전역 설정은 바꾸지 않음)."""
     try:
         # 환경 변수에서 API 키 가져오기 (우선순위: GOOGLE_API_KEY_USER_INPUT > GOOGLE_API_KEY)
         api_key = os.getenv("GOOGLE_API_KEY_USER_INPUT") or os.getenv("GOOGLE_API_KEY")
         
         if api_key and api_key.strip():
-            # API 키 설정
-            genai.configure(api_key=api_key.strip())
-            
             # 간단한 테스트로 API 키 유효성 검증
             try:
-                test_model = genai.GenerativeModel("gemini-2.0-flash")
-                response = test_model.generate_content("Hello")
-                if response.text:
+                if validate_api_key(api_key):
                     print(f"✅ Google AI API 키 설정 성공: {api_key[:10]}...")
                     return True
                 else:
@@ -126,8 +128,17 @@ persona_avatars = {
 
 print(f"Initialized persona avatars: {persona_avatars}")
 
-# 모델 모니터링 인스턴스 생성
-model_monitor = AIModelMonitor(log_file_path="logs/model_performance.json")
+# 모델 모니터링 인스턴스 (에이전트 모델 호출 기록 및 자동 모델 선택과 같은 인스턴스 사용)
+model_monitor = get_model_router().monitor
+
+# 로컬 파일 추적 설정 (AIDEA_TRACING_ENABLED 또는 AIDEA_TRACE_FILE 환경 변수로 활성화)
+configure_tracing()
+
+# Prometheus 형식 메트릭 엔드포인트 (AIDEA_METRICS_PORT 환경 변수로 활성화)
+start_metrics_server()
+
+# 단계 경계 메모리 스냅샷 (AIDEA_MEMORY_PROFILE 환경 변수로 활성화)
+configure_memory_profiling()
 
 # monitor_model_performance 데코레이터 적용 (기존 함수 앞에 추가)
 @monitor_model_performance(model_monitor)
@@ -145,19 +156,14 @@ def run_phase1_analysis_and_update_ui():
         return
     
     try:
-        # ADK 에이전트 실행 직전에 사용자 API 키로 다시 설정
+        # ADK 에이전트는 이 세션의 사용자 API 키로 실행 (use_api_key 범위 안에서 실행)
         user_api_key = AppStateManager.get_user_api_key()
         if user_api_key:
             try:
-                genai.configure(api_key=user_api_key)
-                print(f"✅ API 키 재설정 완료 (Phase 1): {user_api_key[:10]}...")
-                
-                # API 키 유효성 재검증
-                test_model = genai.GenerativeModel("gemini-2.0-flash")
-                response = test_model.generate_content("Hello")
-                if not response.text:
+                # API 키 유효성 재검증 (이미 검증한 키는 생략)
+                if not validate_api_key(user_api_key):
                     raise Exception("API 키는 유효하지만 응답 생성 실패")
-                print("✅ API 키 유효성 재검증 완료")
+                print(f"✅ API 키 확인 완료 (Phase 1): {user_api_key[:10]}...")
                 
             except Exception as e:
                 print(f"❌ API 키 재설정 또는 검증 실패: {str(e)}")
@@ -172,14 +178,13 @@ def run_phase1_analysis_and_update_ui():
             st.rerun()
             return
         
-        orchestrator = AIdeaLabOrchestrator(model_name=AppStateManager.get_selected_model())
+        orchestrator = AIdeaLabOrchestrator(
+            model_name=AppStateManager.get_selected_model(),
+            auto_route=AppStateManager.get_state('auto_model_routing', False),
+            structured_reports=AppStateManager.get_state('structured_persona_reports', False)
+        )
         print(f"Created local orchestrator with model: {AppStateManager.get_selected_model()}")
         
-        # 분석 상태 업데이트
-        AppStateManager.change_analysis_phase("phase1_running")
-        AppStateManager.show_system_message("phase1_start")
-        print("Phase 1 analysis initiated by user")
-        
         # 사용자 입력 데이터 가져오기
         idea_text = AppStateManager.get_current_idea()
         user_goal = AppStateManager.get_user_goal()
@@ -187,13 +192,57 @@ def run_phase1_analysis_and_update_ui():
         user_values = AppStateManager.get_user_values()
         print(f"Analyzing idea: {idea_text}, Goal: {user_goal}, Constraints: {user_constraints}, Values: {user_values}")
         
-        # 새 세션 시작
-        session_object, session_id_string = AppStateManager.get_session_manager().start_new_idea_session(
-            idea_text,
-            user_goal=user_goal,
-            user_constraints=user_constraints,
-            user_values=user_values
-        )
+        # AdkController 초기화
+        adk_controller = AdkController(AppStateManager.get_session_manager())
+        print("AdkController initialized successfully")
+        
+        # 같은 입력/모델/프롬프트의 이전 결과가 있으면 재사용하기 위한 캐시 키
+        cache_model_key = orchestrator.get_phase1_cache_model_key()
+        phase1_key = phase1_cache_key(idea_text, user_goal, user_constraints, user_values, model=cache_model_key)
+        similarity_text = phase1_similarity_text(idea_text, user_goal, user_constraints, user_values)
+        cache_variant = phase1_variant_key(cache_model_key)
+        # '새로 분석하기'를 누른 경우에는 이전 결과를 재사용하지 않음
+        reuse_cached = not AppStateManager.get_state('bypass_phase1_cache', False)
+        AppStateManager.set_state('bypass_phase1_cache', False)
+        
+        # '다시 시도'인 경우 이전 실행의 세션을 이어서 누락된 단계만 실행
+        resume = AppStateManager.get_state('resume_phase1', False)
+        AppStateManager.set_state('resume_phase1', False)
+        
+        # 키가 일치하는 결과가 없고 유사한 이전 아이디어의 결과가 있으면, 세션을 만들기 전에 재사용 여부를 먼저 물음
+        similar_offer = AppStateManager.get_state('phase1_similar_offer')
+        similar_choice = AppStateManager.get_state('phase1_similar_choice')
+        AppStateManager.set_state('phase1_similar_offer', None)
+        AppStateManager.set_state('phase1_similar_choice', None)
+        if reuse_cached and not resume and similar_choice is None:
+            similar = adk_controller.find_similar_phase1_result(phase1_key, similarity_text, cache_variant)
+            if similar is not None:
+                AppStateManager.offer_similar_phase1_result(similar)
+                st.rerun()
+                return
+        reuse_similar = similar_offer if similar_choice == "reuse" else None
+        
+        # 분석 상태 업데이트
+        AppStateManager.change_analysis_phase("phase1_running")
+        AppStateManager.show_system_message("phase1_start")
+        print("Phase 1 analysis initiated by user")
+        
+        previous_session_id = AppStateManager.get_adk_session_id() if resume else None
+        session_object = AppStateManager.get_session_manager().get_session(previous_session_id) if previous_session_id else None
+        
+        if session_object:
+            session_id_string = previous_session_id
+            AppStateManager.get_session_manager().set_active_session_id(session_id_string)
+            AppStateManager.show_system_message("phase1_resume")
+        else:
+            resume = False
+            # 새 세션 시작
+            session_object, session_id_string = AppStateManager.get_session_manager().start_new_idea_session(
+                idea_text,
+                user_goal=user_goal,
+                user_constraints=user_constraints,
+                user_values=user_values
+            )
         
         if not session_object or not session_id_string:
             print("ERROR: Failed to start new idea session in SessionManager.")
@@ -205,29 +254,38 @@ def run_phase1_analysis_and_update_ui():
         AppStateManager.set_adk_session_id(session_id_string)
         print(f"New session started with ID: {session_id_string}, initial state verified in SessionManager.")
         
-        # AdkController 초기화
-        adk_controller = AdkController(AppStateManager.get_session_manager())
-        print("AdkController initialized successfully")
-        
         # 입력 내용 준비
-        content_parts = [types.Part(text=f"아이디어: {idea_text}")]
-        if user_goal: content_parts.append(types.Part(text=f"\n목표: {user_goal}"))
-        if user_constraints: content_parts.append(types.Part(text=f"\n제약조건: {user_constraints}"))
-        if user_values: content_parts.append(types.Part(text=f"\n가치: {user_values}"))
-        
-        input_content_for_runner = types.Content(role="user", parts=content_parts)
+        input_content_for_runner = build_phase1_input(idea_text, user_goal, user_constraints, user_values)
         print(f"Prepared input_content_for_runner: {input_content_for_runner}")
         
         # AdkController를 사용하여 분석 실행
-        with st.spinner("1단계 분석을 진행 중입니다..."):
+        with st.spinner("1단계 분석을 진행 중입니다..."), use_api_key(user_api_key), \
+                trace_span("phase1.analysis", session_id=session_id_string, model=orchestrator.model_name):
             analysis_success, processed_results, processed_outputs = asyncio.run(
                 adk_controller.execute_phase1_workflow(
                     session_id_string,
                     input_content_for_runner,
-                    orchestrator
+                    orchestrator,
+                    cache_key=phase1_key,
+                    similarity_text=similarity_text,
+                    cache_variant=cache_variant,
+                    reuse_cached=reuse_cached,
+                    reuse_similar=reuse_similar,
+                    resume=resume
                 )
             )
         
+        AppStateManager.set_state('phase1_result_reused', adk_controller.phase1_cache_hit)
+        if adk_controller.phase1_cache_hit:
+            if adk_controller.phase1_cache_similarity < 1.0:
+                AppStateManager.add_message(
+                    "system",
+                    SYSTEM_MESSAGES["phase1_similar_hit"].format(similarity=adk_controller.phase1_cache_similarity),
+                    avatar="ℹ️"
+                )
+            else:
+                AppStateManager.show_system_message("phase1_cache_hit")
+        
         # UI에 결과 표시
         if processed_results:
             output_keys_map = orchestrator.get_output_keys_phase1()
@@ -255,7 +313,7 @@ def run_phase1_analysis_and_update_ui():
                     
                     # 페르소나 응답 표시 (intro 메시지가 있든 없든 항상 표시)
                     print(f"INFO: Using avatar '{avatar_char}' for persona '{persona_key_for_display}'")
-                    AppStateManager.add_message("assistant", AppStateManager.process_text_for_display(response), avatar=avatar_char)
+                    AppStateManager.add_message("assistant", response, avatar=avatar_char, hard_line_breaks=True)
                 else:
                     print(f"WARNING: Could not map output_key '{output_key}' to persona_key for UI display.")
         
@@ -269,6 +327,14 @@ def run_phase1_analysis_and_update_ui():
             AppStateManager.change_analysis_phase("phase1_error")
             AppStateManager.show_system_message("phase1_error")
         
+        take_phase_snapshot(
+            "phase1_complete",
+            session=lambda: AppStateManager.get_session_manager().get_session(session_id_string),
+            messages=AppStateManager.get_messages,
+            session_id=session_id_string,
+            success=analysis_success
+        )
+        
         AppStateManager.set_analyzed_idea(idea_text)
         st.rerun()  # UI 갱신
         
@@ -311,19 +377,14 @@ def handle_phase2_discussion():
                 print(f"WARNING: Unexpected analysis phase '{AppStateManager.get_analysis_phase()}' for handle_phase2_discussion")
                 return
         
-        # ADK 에이전트 실행 직전에 사용자 API 키로 다시 설정
+        # ADK 에이전트는 이 세션의 사용자 API 키로 실행 (use_api_key 범위 안에서 실행)
         user_api_key = AppStateManager.get_user_api_key()
         if user_api_key:
             try:
-                genai.configure(api_key=user_api_key)
-                print(f"✅ API 키 재설정 완료 (Phase 2): {user_api_key[:10]}...")
-                
-                # API 키 유효성 재검증
-                test_model = genai.GenerativeModel("gemini-2.0-flash")
-                response = test_model.generate_content("Hello")
-                if not response.text:
+                # API 키 유효성 재검증 (이미 검증한 키는 생략)
+                if not validate_api_key(user_api_key):
                     raise Exception("API 키는 유효하지만 응답 생성 실패")
-                print("✅ API 키 유효성 재검증 완료")
+                print(f"✅ API 키 확인 완료 (Phase 2): {user_api_key[:10]}...")
                 
             except Exception as e:
                 print(f"❌ API 키 재설정 또는 검증 실패: {str(e)}")
@@ -339,7 +400,10 @@ def handle_phase2_discussion():
             return
         
         # 오케스트레이터 생성
-        orchestrator = AIdeaLabOrchestrator(model_name=AppStateManager.get_selected_model())
+        orchestrator = AIdeaLabOrchestrator(
+            model_name=AppStateManager.get_selected_model(),
+            auto_route=AppStateManager.get_state('auto_model_routing', False)
+        )
         print(f"Created local orchestrator with model: {AppStateManager.get_selected_model()}")
         
         # 세션 ID 가져오기
@@ -367,6 +431,12 @@ def handle_phase2_discussion():
             
             # 세션 상태를 phase2로 전환
             AppStateManager.get_session_manager().transition_to_phase2()
+            take_phase_snapshot(
+                "phase2_transition",
+                session=lambda: AppStateManager.get_session_manager().get_session(session_id_string),
+                messages=AppStateManager.get_messages,
+                session_id=session_id_string
+            )
             
             # Streamlit 세션 상태 업데이트
             AppStateManager.change_analysis_phase("phase2_running")
@@ -386,13 +456,16 @@ def handle_phase2_discussion():
             
             discussion_controller = DiscussionController(session_manager)
             
-            discussion_messages, discussion_status, user_prompt = asyncio.run(discussion_controller.run_phase2_discussion(
-                session_id_string,
-                orchestrator
-            ))
+            with use_api_key(user_api_key), \
+                    trace_span("phase2.discussion", session_id=session_id_string, model=orchestrator.model_name):
+                discussion_messages, discussion_status, user_prompt = asyncio.run(discussion_controller.run_phase2_discussion(
+                    session_id_string,
+                    orchestrator
+                ))
             
-            # DEBUG 로그 추가: DiscussionController가 반환하는 메시지 확인
-            print(f"DEBUG_APP: Received discussion_messages from controller: {discussion_messages}")
+            # DiscussionController가 반환하는 메시지 확인 (메시지 내용은 DEBUG 레벨에서만 만듦)
+            discussion_logger.debug("messages received from controller", count=len(discussion_messages),
+                                    messages=lambda: discussion_messages)
             
             # 각 메시지마다 새로 rerun할 필요 없이 한 번에 모든 메시지를 UI에 추가
             print(f"DEBUG: Received {len(discussion_messages)} messages from DiscussionController")
@@ -411,8 +484,19 @@ def handle_phase2_discussion():
             # 토론이 완료된 경우
             AppStateManager.change_analysis_phase("phase2_complete")
             AppStateManager.show_system_message("phase2_complete")
+            
+            # 세션 전체(1단계 + 2단계)의 토큰 사용량 및 비용 요약 표시
+            cost_summary = token_ledger.format_session_summary(session_id_string)
+            if cost_summary:
+                AppStateManager.add_message("system", cost_summary, avatar="💰")
             AppStateManager.set_phase2_discussion_complete(True)
             AppStateManager.set_phase2_summary_complete(True)
+            take_phase_snapshot(
+                "phase2_final_summary",
+                session=lambda: AppStateManager.get_session_manager().get_session(session_id_string),
+                messages=AppStateManager.get_messages,
+                session_id=session_id_string
+            )
         elif discussion_status == "사용자 입력 대기":
             # 사용자 입력이 필요한 경우
             AppStateManager.change_analysis_phase("phase2_user_input")
@@ -482,6 +566,9 @@ def main():
                     AppStateManager.change_analysis_phase("idle")
                     st.rerun()
 
+        elif current_analysis_phase == "phase1_similar_offer":
+            render_phase1_similar_offer_view()
+            
         elif current_analysis_phase == "phase1_complete":
             render_phase1_complete_view()
 
@@ -12,10 +12,39 @@ import logging
 from google.adk.runners import Runner
 from google.genai import types
 from src.ui.state_manager import AppStateManager, SYSTEM_MESSAGES
+from src.utils.blob_store import intern_text
+from src.utils.tracing import traced_event_stream
+from src.utils.model_router import STREAMING_RUN_CONFIG, monitored_event_stream
+from src.utils.metrics_server import increment_counter
+from src.utils.memory_profiler import take_phase_snapshot
+from src.utils.rate_limiter import get_rate_limiter
+from src.utils.structured_logging import get_logger
 from config.personas import PersonaType
 from datetime import datetime
 import time
 
+# 퍼실리테이터 응답에서 JSON 후보를 찾는 정규식 (응답마다 사용하므로 미리 컴파일)
+# 코드 블록/인라인 코드 안의 JSON은 백틱을 넘지 않도록 제한해, 닫히지 않은 백틱이 반복되는 응답에서도 선형 시간에 끝남
+_BRACE_RE = re.compile(r'[{}]')
+_JSON_OBJECT_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+_CODE_BLOCK_JSON_RES = (
+    re.compile(r'```json\s*(\{[^`]*?\})\s*```', re.DOTALL),
+    re.compile(r'```\s*(\{[^`]*?\})\s*```', re.DOTALL),
+    re.compile(r'`(\{[^`]*?\})`', re.DOTALL),
+)
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
+discussion_logger = get_logger("discussion")
+# 스트리밍 조각은 호출마다 수십~수백 개이므로 별도 컴포넌트로 레벨과 샘플링을 지정
+stream_logger = get_logger("discussion.stream")
+
+
+def _event_text(event) -> str:
+    """이벤트 내용의 텍스트 파트를 이어 붙입니다."""
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text)
+
 
 class DiscussionController:
     """
@@ -81,7 +110,7 @@ class DiscussionController:
                 # 새 항목 추가
                 new_entry = {
                     "speaker": speaker,
-                    "content": content,
+                    "content": intern_text(content),
                     "timestamp": datetime.now().isoformat()  # 타임스탬프 추가
                 }
                 updated_discussion_history = current_discussion_history + [new_entry]
@@ -172,6 +201,15 @@ class DiscussionController:
             while current_round <= max_discussion_rounds:
                 current_round += 1
                 print(f"DEBUG: Starting discussion round {current_round}/{max_discussion_rounds}")
+                increment_counter("aidea_discussion_rounds_total", "Phase 2 discussion rounds started.")
+                # 메모리 프로파일링이 켜져 있을 때만 세션을 조회해 이전 라운드까지의 크기를 기록
+                take_phase_snapshot(
+                    "phase2_round",
+                    session=lambda: self.session_manager.get_session(session_id_string),
+                    messages=AppStateManager.get_messages,
+                    session_id=session_id_string,
+                    round=current_round
+                )
                 
                 next_agent_str = None
                 topic_for_next = ""
@@ -185,10 +223,17 @@ class DiscussionController:
                     input_content = types.Content(role="user", parts=[types.Part(text="")])
                     print("토론 퍼실리테이터가 다음 단계를 결정하고 있습니다...")
                     
-                    event_stream = runner.run_async(
-                        user_id=self.user_id,
+                    event_stream = traced_event_stream(
+                        monitored_event_stream(runner.run_async(
+                            user_id=self.user_id,
+                            session_id=session_id_string,
+                            new_message=input_content,
+                            run_config=STREAMING_RUN_CONFIG
+                        )),
+                        "phase2.facilitator_round",
                         session_id=session_id_string,
-                        new_message=input_content
+                        round=current_round,
+                        retry_count=0
                     )
                     
                     facilitator_response_content_full = ""
@@ -201,15 +246,12 @@ class DiscussionController:
                             async for event in event_stream:
                                 event_actions = getattr(event, 'actions', None)
                                 
-                                # 스트리밍 텍스트 처리
-                                if (event_actions and 
-                                    hasattr(event_actions, 'content_delta') and 
-                                    event_actions.content_delta and 
-                                    hasattr(event_actions.content_delta, 'parts')):
-                                    delta_content = event_actions.content_delta
-                                    if delta_content.parts and hasattr(delta_content.parts[0], 'text'):
-                                        facilitator_response_content_full += delta_content.parts[0].text
-                                        print(f"DEBUG: Facilitator streaming: {delta_content.parts[0].text}")
+                                # 스트리밍 텍스트 처리 (SSE 부분 응답 이벤트. 최종 이벤트의 출력 키 값이 있으면 그 값을 사용)
+                                if event.partial:
+                                    delta_text = _event_text(event)
+                                    facilitator_response_content_full += delta_text
+                                    stream_logger.debug("facilitator delta", text=delta_text)
+                                    continue
                                 
                                 # 최종 응답 처리
                                 if event.is_final_response() if hasattr(event, 'is_final_response') else False:
@@ -228,7 +270,7 @@ class DiscussionController:
                                             facilitator_thinking_process = parsed_facilitator_json.get("reasoning", "")
                                             print(f"DEBUG: Parsed facilitator response - next_agent: {next_agent_str}, topic_for_next: {topic_for_next}")
                                             
-                                            facilitator_display_content = f"{facilitator_thinking_process}\n\n다음 토론 주제: {topic_for_next}\n다음 발언자: {self.agent_name_map.get(next_agent_str, next_agent_str)}"
+                                            facilitator_display_content = intern_text(f"{facilitator_thinking_process}\n\n다음 토론 주제: {topic_for_next}\n다음 발언자: {self.agent_name_map.get(next_agent_str, next_agent_str)}")
                                             facilitator_message = {
                                                 "role": "assistant", "content": facilitator_display_content,
                                                 "avatar": self.agent_to_avatar_map["facilitator"], "speaker": "facilitator",
@@ -264,10 +306,17 @@ class DiscussionController:
                                                     session_service=self.session_manager.session_service
                                                 )
                                                 retry_input = types.Content(role="user", parts=[types.Part(text=retry_prompt)])
-                                                event_stream = retry_runner.run_async(
-                                                    user_id=self.user_id,
+                                                event_stream = traced_event_stream(
+                                                    monitored_event_stream(retry_runner.run_async(
+                                                        user_id=self.user_id,
+                                                        session_id=session_id_string,
+                                                        new_message=retry_input,
+                                                        run_config=STREAMING_RUN_CONFIG
+                                                    )),
+                                                    "phase2.facilitator_round",
                                                     session_id=session_id_string,
-                                                    new_message=retry_input
+                                                    round=current_round,
+                                                    retry_count=retry_count + 1
                                                 )
                                                 
                                                 # 응답 내용 초기화 후 재시도
@@ -373,8 +422,15 @@ class DiscussionController:
                     
                     print(f"{self.agent_name_map.get(next_agent_str, next_agent_str)}가 응답을 준비하고 있습니다...")
 
-                    event_stream_persona = runner_persona.run_async(
-                        user_id=self.user_id, session_id=session_id_string, new_message=input_for_persona
+                    event_stream_persona = traced_event_stream(
+                        monitored_event_stream(runner_persona.run_async(
+                            user_id=self.user_id, session_id=session_id_string, new_message=input_for_persona,
+                            run_config=STREAMING_RUN_CONFIG
+                        )),
+                        "phase2.persona_turn",
+                        session_id=session_id_string,
+                        round=current_round,
+                        persona=next_agent_str
                     )
                     
                     persona_response_content_full = ""
@@ -386,15 +442,12 @@ class DiscussionController:
                             async for event_persona in event_stream_persona:
                                 event_actions = getattr(event_persona, 'actions', None)
                                 
-                                # 스트리밍 텍스트 처리
-                                if (event_actions and 
-                                    hasattr(event_actions, 'content_delta') and 
-                                    event_actions.content_delta and 
-                                    hasattr(event_actions.content_delta, 'parts')):
-                                    delta_content = event_actions.content_delta
-                                    if delta_content.parts and hasattr(delta_content.parts[0], 'text'):
-                                        persona_response_content_full += delta_content.parts[0].text
-                                        print(f"DEBUG: Persona agent ({next_agent_str}) streaming: {delta_content.parts[0].text}")
+                                # 스트리밍 텍스트 처리 (SSE 부분 응답 이벤트. 최종 이벤트의 출력 키 값이 있으면 그 값을 사용)
+                                if event_persona.partial:
+                                    delta_text = _event_text(event_persona)
+                                    persona_response_content_full += delta_text
+                                    stream_logger.debug("persona delta", agent=next_agent_str, text=delta_text)
+                                    continue
                                 
                                 # 최종 응답 처리
                                 if event_persona.is_final_response() if hasattr(event_persona, 'is_final_response') else False:
@@ -407,7 +460,9 @@ class DiscussionController:
                                                 print(f"DEBUG: Found response for key: {persona_agent.output_key}")
                                     
                                     if persona_response_content_full:
-                                        print(f"DEBUG: Persona agent ({next_agent_str}) final response: {persona_response_content_full}")
+                                        discussion_logger.debug("persona final response", agent=next_agent_str,
+                                                                response=persona_response_content_full)
+                                        persona_response_content_full = intern_text(persona_response_content_full)
                                         
                                         persona_message = {
                                             "role": "assistant", "content": persona_response_content_full,
@@ -479,7 +534,9 @@ class DiscussionController:
                                 retry_count += 1
                                 if retry_count < max_retries:
                                     print(f"Retrying due to rate limit... (Attempt {retry_count + 1}/{max_retries})")
-                                    await asyncio.sleep(10)  # 레이트 리미트 시 더 긴 대기
+                                    # 대기는 레이트 리미터가 담당 (초과가 보고된 키와 모델의 호출은 재개 시점까지 함께 대기)
+                                    if not get_rate_limiter().config["enabled"]:
+                                        await asyncio.sleep(10)
                                 else:
                                     rate_limit_message = SYSTEM_MESSAGES.get("rate_limit_error", 
                                         f"API 사용량 한도로 인해 {self.agent_name_map.get(next_agent_str, next_agent_str)}의 응답을 받을 수 없습니다. 잠시 후 다시 시도해주세요.")
@@ -594,10 +651,15 @@ class DiscussionController:
             print("최종 요약을 생성하고 있습니다...")
             
             # 최종 요약 에이전트 실행
-            event_stream = runner.run_async(
-                user_id=self.user_id,
-                session_id=session_id_string,
-                new_message=input_content
+            event_stream = traced_event_stream(
+                monitored_event_stream(runner.run_async(
+                    user_id=self.user_id,
+                    session_id=session_id_string,
+                    new_message=input_content,
+                    run_config=STREAMING_RUN_CONFIG
+                )),
+                "phase2.final_summary",
+                session_id=session_id_string
             )
             
             # 최종 요약 처리
@@ -611,8 +673,8 @@ class DiscussionController:
                 if is_final_event and state_delta:
                     # final_summary_candidate를 통해 상세 로깅
                     final_summary_candidate = state_delta.get("final_summary_report_phase2", "KEY_NOT_FOUND")
-                    print(f"DEBUG_SUMMARY: final_summary_candidate: {final_summary_candidate}")
-                    print(f"DEBUG_SUMMARY: type(final_summary_candidate): {type(final_summary_candidate)}")
+                    discussion_logger.debug("final summary candidate", summary=final_summary_candidate,
+                                            summary_type=lambda: type(final_summary_candidate).__name__)
                     
                     # 유효한 문자열인지 확인
                     if (final_summary_candidate != "KEY_NOT_FOUND" and 
@@ -620,7 +682,7 @@ class DiscussionController:
                         isinstance(final_summary_candidate, str) and 
                         final_summary_candidate.strip()):
                         
-                        final_summary = final_summary_candidate
+                        final_summary = intern_text(final_summary_candidate)
                         
                         # 최종 요약 소개 메시지 추가
                         if persona_first_appearance.get("final_summary", True):
@@ -704,39 +766,32 @@ class DiscussionController:
             raise ValueError("응답 텍스트가 비어있습니다.")
         
         # 원본 텍스트 로깅
-        print(f"DEBUG: Raw facilitator response: {response_text}")
+        discussion_logger.debug("raw facilitator response", response=response_text)
         
         # 1. 먼저 전체 텍스트에서 JSON 객체 추출 시도
         json_candidates = []
         
-        # 방법 1: 중괄호로 감싸진 영역 찾기 (가장 바깥쪽부터)
+        # 방법 1: 중괄호로 감싸진 영역 찾기 (가장 바깥쪽부터, 중괄호 위치만 순회)
         brace_count = 0
         start_idx = -1
-        for i, char in enumerate(response_text):
-            if char == '{':
+        for match in _BRACE_RE.finditer(response_text):
+            i = match.start()
+            if match.group() == '{':
                 if brace_count == 0:
                     start_idx = i
                 brace_count += 1
-            elif char == '}':
+            else:
                 brace_count -= 1
                 if brace_count == 0 and start_idx != -1:
                     json_candidates.append(response_text[start_idx:i+1])
                     start_idx = -1
         
         # 방법 2: 정규식으로 JSON 패턴 찾기
-        json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-        regex_matches = re.findall(json_pattern, response_text, re.DOTALL)
-        json_candidates.extend(regex_matches)
+        json_candidates.extend(_JSON_OBJECT_RE.findall(response_text))
         
         # 방법 3: 마크다운 코드 블록 내부 검사
-        code_block_patterns = [
-            r'```json\s*(\{.*?\})\s*```',
-            r'```\s*(\{.*?\})\s*```',
-            r'`(\{.*?\})`'
-        ]
-        for pattern in code_block_patterns:
-            matches = re.findall(pattern, response_text, re.DOTALL)
-            json_candidates.extend(matches)
+        for pattern in _CODE_BLOCK_JSON_RES:
+            json_candidates.extend(pattern.findall(response_text))
         
         # 방법 4: 단순히 첫 번째 { 부터 마지막 } 까지 (기존 방식)
         start_idx = response_text.find('{')
@@ -744,14 +799,12 @@ class DiscussionController:
         if start_idx != -1 and end_idx != -1 and start_idx <= end_idx:
             json_candidates.append(response_text[start_idx:end_idx + 1])
         
-        # 후보들을 중복 제거하고 정리
-        unique_candidates = []
-        for candidate in json_candidates:
-            candidate = candidate.strip()
-            if candidate and candidate not in unique_candidates:
-                unique_candidates.append(candidate)
+        # 후보들을 중복 제거하고 정리 (찾은 순서 유지)
+        unique_candidates = list(dict.fromkeys(
+            candidate for candidate in (candidate.strip() for candidate in json_candidates) if candidate
+        ))
         
-        print(f"DEBUG: Found {len(unique_candidates)} JSON candidates")
+        discussion_logger.debug("facilitator JSON candidates found", count=len(unique_candidates))
         
         # 각 후보에 대해 파싱 시도
         parsing_errors = []
@@ -759,7 +812,8 @@ class DiscussionController:
             try:
                 # 텍스트 정리
                 cleaned_candidate = self._clean_json_text(candidate)
-                print(f"DEBUG: Trying candidate {i+1}: {cleaned_candidate[:100]}...")
+                discussion_logger.debug("trying facilitator JSON candidate", index=i + 1,
+                                        candidate=lambda: cleaned_candidate[:100])
                 
                 parsed_json = json.loads(cleaned_candidate)
                 
@@ -784,23 +838,23 @@ class DiscussionController:
                 if "reasoning" not in parsed_json:
                     parsed_json["reasoning"] = ""
                 
-                print(f"DEBUG: Successfully parsed JSON with candidate {i+1}")
+                discussion_logger.debug("parsed facilitator JSON", candidate=i + 1)
                 return parsed_json
                 
             except json.JSONDecodeError as e:
                 error_msg = f"Candidate {i+1} JSON 파싱 실패: {str(e)}"
                 parsing_errors.append(error_msg)
-                print(f"DEBUG: {error_msg}")
+                discussion_logger.debug("facilitator JSON candidate rejected", error=error_msg)
                 continue
             except ValueError as e:
                 error_msg = f"Candidate {i+1} 검증 실패: {str(e)}"
                 parsing_errors.append(error_msg)
-                print(f"DEBUG: {error_msg}")
+                discussion_logger.debug("facilitator JSON candidate rejected", error=error_msg)
                 continue
             except Exception as e:
                 error_msg = f"Candidate {i+1} 예상치 못한 오류: {str(e)}"
                 parsing_errors.append(error_msg)
-                print(f"DEBUG: {error_msg}")
+                discussion_logger.debug("facilitator JSON candidate rejected", error=error_msg)
                 continue
         
         # 모든 후보가 실패한 경우
@@ -820,10 +874,11 @@ class DiscussionController:
         # 앞뒤 공백 제거
         cleaned = json_text.strip()
         
-        # 마크다운 코드 블록 표시 제거
+        # 마크다운 코드 블록 표시 제거 (끝의 표시는 정규식 대신 비교해 긴 공백에서의 역추적을 피함)
         cleaned = re.sub(r'^```json\s*', '', cleaned)
         cleaned = re.sub(r'^```\s*', '', cleaned)
-        cleaned = re.sub(r'\s*```$', '', cleaned)
+        if cleaned.endswith('```'):
+            cleaned = cleaned[:-3].rstrip()
         
         # 백틱 제거
         cleaned = cleaned.strip('`')
@@ -832,7 +887,7 @@ class DiscussionController:
         cleaned = cleaned.strip()
         
         # 제어 문자 제거 (개행, 탭 등은 유지)
-        cleaned = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', cleaned)
+        cleaned = _CONTROL_CHARS_RE.sub('', cleaned)
         
         return cleaned
     
@@ -1,7 +1,8 @@
 import streamlit as st
 import os
-import google.generativeai as genai
 from config.models import DEFAULT_MODEL
+from src.utils.blob_store import intern_text
+from src.utils.api_key_pool import validate_api_key
 
 # 시스템 안내 메시지 템플릿 정의
 SYSTEM_MESSAGES = {
@@ -12,6 +13,10 @@ SYSTEM_MESSAGES = {
     "engineer_intro": "**⚙️ 현실주의 엔지니어의 의견:**",
     "summary_phase1_intro": "**📝 최종 요약 및 종합:**",
     "phase1_complete": "**1단계 분석이 완료되었습니다.**",
+    "phase1_cache_hit": "**같은 입력의 이전 분석 결과를 재사용했습니다.** 새로 분석하려면 아래 '새로 분석하기' 버튼을 눌러주세요.",
+    "phase1_similar_offer": "**유사한 이전 아이디어(유사도 {similarity:.0%})의 분석 결과가 있습니다.** 이전 결과를 재사용할지, 이 아이디어를 새로 분석할지 선택해주세요.",
+    "phase1_similar_hit": "**유사한 이전 아이디어(유사도 {similarity:.0%})의 분석 결과를 재사용했습니다.** 이 아이디어만의 분석이 필요하면 아래 '새로 분석하기' 버튼을 눌러주세요.",
+    "phase1_resume": "**이전 분석에서 완료된 결과는 유지하고, 누락된 단계만 다시 분석합니다.**",
     "phase1_error": "**분석 중 오류가 발생했습니다.** 다시 시도하거나 새로운 아이디어를 입력해주세요.",
     # 중간 요약 소개 메시지 추가
     "marketer_summary_intro": "**📄 마케터 보고서 요약:**",
@@ -29,6 +34,20 @@ SYSTEM_MESSAGES = {
     "phase2_error": "**토론 중 오류가 발생했습니다.** 다시 시도하거나 새로운 아이디어를 입력해주세요."
 }
 
+# 공유 세션 저장소 사용 시 브라우저 URL에 ADK 세션 ID를 보관하는 쿼리 파라미터 이름
+SESSION_QUERY_PARAM = "sid"
+
+# 다른 워커에서 세션을 복원할 때 다시 표시할 1단계 결과 (페르소나 키, session.state 출력 키, 아바타)
+PHASE1_RESTORE_ORDER = [
+    ("marketer", "marketer_report_phase1", "💡"),
+    ("marketer_summary", "marketer_report_phase1_summary", "📄"),
+    ("critic", "critic_report_phase1", "🔍"),
+    ("critic_summary", "critic_report_phase1_summary", "📄"),
+    ("engineer", "engineer_report_phase1", "⚙️"),
+    ("engineer_summary", "engineer_report_phase1_summary", "📄"),
+    ("summary_phase1", "summary_report_phase1", "📝"),
+]
+
 # 애플리케이션 상태 관리를 위한 클래스
 class AppStateManager:
     """
@@ -98,6 +117,9 @@ class AppStateManager:
         # API 키 초기화 (환경 변수에서 기본값 로드)
         AppStateManager.initialize_api_key()
         
+        # 다른 워커 프로세스에서 시작된 세션이면 공유 저장소에서 복원
+        AppStateManager.restore_shared_session()
+        
         # 웰컴 메시지 추가 (messages 배열이 비어있을 때만)
         if not st.session_state.messages:
             try:
@@ -120,7 +142,9 @@ class AppStateManager:
             'current_idea', 'analyzed_idea', 'analysis_phase', 
             'adk_session_id', 'user_goal', 'user_constraints', 'user_values',
             'proceed_to_phase2', 'awaiting_user_input_phase2', 'phase2_user_prompt',
-            'phase2_discussion_complete', 'phase2_summary_complete'
+            'phase2_discussion_complete', 'phase2_summary_complete',
+            'phase1_result_reused', 'bypass_phase1_cache', 'resume_phase1',
+            'phase1_similar_offer', 'phase1_similar_choice'
         ]
         
         # 상태 재설정
@@ -128,6 +152,13 @@ class AppStateManager:
             if key in st.session_state:
                 del st.session_state[key]
         
+        # 이전 대화의 미리보기 캐시 제거
+        st.session_state.pop('chat_preview_cache', None)
+        
+        # 공유 세션 복원 대상에서 이전 세션 제외
+        if SESSION_QUERY_PARAM in st.query_params:
+            del st.query_params[SESSION_QUERY_PARAM]
+        
         # 기본 상태 재초기화
         AppStateManager.initialize_session_state()
         
@@ -147,8 +178,78 @@ class AppStateManager:
         # st.rerun()  # 세션 재시작 후 UI 갱신 - 콜백 내에서는 작동하지 않음
     
     @staticmethod
-    def add_message(role, content, avatar=None):
-        """메시지 추가"""
+    def restore_shared_session():
+        """
+        공유 세션 저장소를 사용하는 경우, URL 쿼리 파라미터의 세션 ID로 ADK 세션과 UI 상태를 복원합니다.
+        로드 밸런서가 요청을 다른 Streamlit 워커로 보내 st.session_state가 비어 있어도
+        아이디어, 추가 정보, 분석 단계와 1단계 결과 메시지를 이어서 사용할 수 있습니다.
+        
+        Returns:
+            bool: 세션을 복원했으면 True
+        """
+        session_manager = AppStateManager.get_session_manager()
+        if not session_manager or not session_manager.is_shared_store():
+            return False
+        
+        # 이미 이 워커에서 세션을 사용 중이면 복원할 필요 없음
+        if st.session_state.get('adk_session_id'):
+            return False
+        
+        session_id = st.query_params.get(SESSION_QUERY_PARAM)
+        if not session_id:
+            return False
+        
+        session = session_manager.get_session(session_id)
+        if session is None:
+            print(f"WARNING: Shared session '{session_id}' from query params not found. Starting fresh.")
+            del st.query_params[SESSION_QUERY_PARAM]
+            return False
+        
+        print(f"Restoring shared session '{session_id}' from session store")
+        session_manager.set_active_session_id(session_id)
+        state = session.state
+        st.session_state.adk_session_id = session_id
+        st.session_state.current_idea = state.get("initial_idea", "")
+        st.session_state.analyzed_idea = state.get("initial_idea", "")
+        st.session_state.user_goal = state.get("user_goal", "")
+        st.session_state.user_constraints = state.get("user_constraints", "")
+        st.session_state.user_values = state.get("user_values", "")
+        
+        restored_messages = []
+        for persona_key, output_key, avatar in PHASE1_RESTORE_ORDER:
+            response = state.get(output_key)
+            if not response:
+                continue
+            intro_content = SYSTEM_MESSAGES.get(f"{persona_key}_intro")
+            if intro_content:
+                restored_messages.append({"role": "system", "content": intro_content, "avatar": "ℹ️"})
+            restored_messages.append({
+                "role": "assistant",
+                "content": intern_text(response),
+                "avatar": avatar,
+                "hard_line_breaks": True
+            })
+        if restored_messages:
+            st.session_state.messages = restored_messages
+            st.session_state.pop('chat_preview_cache', None)
+        
+        if state.get("current_phase") == "phase2":
+            st.session_state.analysis_phase = "phase2_pending_start"
+        elif state.get("summary_report_phase1"):
+            st.session_state.analysis_phase = "phase1_complete"
+        return True
+    
+    @staticmethod
+    def add_message(role, content, avatar=None, hard_line_breaks=False):
+        """
+        메시지 추가
+        
+        Args:
+            role (str): 메시지 역할 (user, assistant, system)
+            content (str): 메시지 내용. 큰 텍스트는 블롭 저장소의 정규 객체로 저장되어 세션 상태와 공유됨
+            avatar (str, optional): 아바타
+            hard_line_breaks (bool): 렌더링 시 process_text_for_display로 줄바꿈을 유지할지 여부
+        """
         if content is None:
             print(f"Skipping add_message for role {role} because content is None.")
             return
@@ -156,7 +257,9 @@ class AppStateManager:
         print(f"Adding message - Role: {role}, Avatar: {avatar}, Content preview: {str(content)[:70]}...")
         
         # 메시지 객체 생성
-        message_obj = {"role": role, "content": content, "avatar": avatar}
+        message_obj = {"role": role, "content": intern_text(content), "avatar": avatar}
+        if hard_line_breaks:
+            message_obj["hard_line_breaks"] = True
         
         # 현재 메시지 목록 가져오기
         if 'messages' not in st.session_state:
@@ -271,7 +374,28 @@ class AppStateManager:
     
     @staticmethod
     def retry_analysis():
-        """분석 재시도"""
+        """분석 재시도 (이전 실행에서 완료된 단계는 유지하고 누락된 단계만 다시 실행)"""
+        AppStateManager.set_state('resume_phase1', True)
+        AppStateManager.change_analysis_phase("phase1_pending_start")
+        # st.rerun() - 콜백 내에서는 작동하지 않음
+    
+    @staticmethod
+    def rerun_analysis_fresh():
+        """재사용한 이전 결과 대신 현재 아이디어를 새로 분석"""
+        AppStateManager.set_state('bypass_phase1_cache', True)
+        AppStateManager.change_analysis_phase("phase1_pending_start")
+        # st.rerun() - 콜백 내에서는 작동하지 않음
+    
+    @staticmethod
+    def offer_similar_phase1_result(similar):
+        """유사한 이전 아이디어의 1단계 결과를 재사용할지 사용자에게 묻는 단계로 전환"""
+        AppStateManager.set_state('phase1_similar_offer', similar)
+        AppStateManager.change_analysis_phase("phase1_similar_offer")
+    
+    @staticmethod
+    def choose_similar_phase1_result(reuse):
+        """유사한 이전 아이디어의 결과 재사용 여부를 기록하고 1단계 분석을 시작"""
+        AppStateManager.set_state('phase1_similar_choice', "reuse" if reuse else "fresh")
         AppStateManager.change_analysis_phase("phase1_pending_start")
         # st.rerun() - 콜백 내에서는 작동하지 않음
     
@@ -350,6 +474,14 @@ class AppStateManager:
     def set_adk_session_id(session_id):
         """ADK 세션 ID 설정"""
         st.session_state.adk_session_id = session_id
+        
+        # 공유 세션 저장소 사용 시 다른 워커에서도 세션을 찾을 수 있도록 URL에 기록
+        session_manager = AppStateManager.get_session_manager()
+        if session_manager and session_manager.is_shared_store():
+            if session_id:
+                st.query_params[SESSION_QUERY_PARAM] = session_id
+            elif SESSION_QUERY_PARAM in st.query_params:
+                del st.query_params[SESSION_QUERY_PARAM]
     
     @staticmethod
     def get_user_goal():
@@ -468,14 +600,8 @@ class AppStateManager:
             return False
         
         try:
-            # API 키 설정 시도
-            genai.configure(api_key=api_key.strip())
-            
-            # 간단한 테스트 요청으로 API 키 유효성 검증
-            test_model = genai.GenerativeModel("gemini-2.0-flash")
-            response = test_model.generate_content("Hello")
-            
-            if response.text:
+            # 간단한 테스트 요청으로 API 키 유효성 검증 (전역 설정은 바꾸지 않고, 이 세션의 키로만 저장)
+            if validate_api_key(api_key):
                 # 성공
                 AppStateManager.set_state('user_api_key', api_key.strip())
                 AppStateManager.set_state('api_key_configured', True)
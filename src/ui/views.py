@@ -8,6 +8,11 @@ AIdea Lab UI Views Module
 import streamlit as st
 from src.ui.state_manager import AppStateManager, SYSTEM_MESSAGES
 
+# 채팅 렌더링 윈도우 설정
+CHAT_RECENT_WINDOW = 12  # 항상 전체 내용으로 렌더링할 최근 메시지 수
+CHAT_HISTORY_PAGE_SIZE = 20  # 이전 메시지 페이지당 메시지 수
+CHAT_PREVIEW_LENGTH = 120  # 이전 메시지 미리보기 글자 수
+
 
 def render_idle_view():
     """
@@ -60,6 +65,40 @@ def render_phase1_pending_view():
         st.rerun()
 
 
+def render_phase1_similar_offer_view():
+    """
+    유사한 이전 아이디어의 1단계 결과를 재사용할지 묻는 UI를 렌더링합니다.
+    이전 아이디어를 함께 보여주며, 사용자가 재사용을 선택하기 전에는 세션 상태에 아무것도 쓰지 않습니다.
+    """
+    offer = AppStateManager.get_state('phase1_similar_offer')
+    if not offer:
+        AppStateManager.change_analysis_phase("phase1_pending_start")
+        st.rerun()
+        return
+    
+    _, similarity, previous_idea = offer
+    st.info(SYSTEM_MESSAGES["phase1_similar_offer"].format(similarity=similarity))
+    st.markdown(f"**이전 아이디어:** {previous_idea}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button(
+            "♻️ 이전 결과 재사용",
+            key="reuse_similar_phase1_button",
+            use_container_width=True,
+            on_click=AppStateManager.choose_similar_phase1_result,
+            args=(True,)
+        )
+    with col2:
+        st.button(
+            "🔄 새로 분석하기",
+            key="skip_similar_phase1_button",
+            use_container_width=True,
+            on_click=AppStateManager.choose_similar_phase1_result,
+            args=(False,)
+        )
+
+
 def render_phase1_complete_view():
     """
     1단계 분석 완료 상태의 UI를 렌더링합니다.
@@ -82,6 +121,15 @@ def render_phase1_complete_view():
             use_container_width=True,
             on_click=lambda: AppStateManager.restart_session(keep_messages=False)
         )
+    
+    # 캐시된(또는 유사 입력의) 이전 결과를 보여준 경우 새 분석 선택지 제공
+    if AppStateManager.get_state('phase1_result_reused', False):
+        st.button(
+            "🔄 새로 분석하기",
+            key="fresh_phase1_analysis_button",
+            use_container_width=True,
+            on_click=AppStateManager.rerun_analysis_fresh
+        )
 
 
 def render_phase1_error_view():
@@ -179,24 +227,105 @@ def render_phase2_error_view():
 def render_chat_messages():
     """
     채팅 메시지들을 렌더링합니다.
+    
+    기본 모드에서는 최근 CHAT_RECENT_WINDOW개의 메시지만 전체 내용으로 렌더링하고,
+    그 이전 메시지는 접힌 영역에서 페이지 단위로 한 줄 미리보기만 표시합니다.
+    따라서 대화가 길어져도 매 rerun마다 렌더링하는 마크다운 양이 일정하게 유지됩니다.
     """
-    if AppStateManager.get_messages():
-        for idx, message in enumerate(AppStateManager.get_messages()):
-            role = message.get("role", "")
-            msg_content = message.get("content", "")
-            avatar = message.get("avatar", None)
-            
-            try:
-                if role == "user":
-                    st.chat_message(role, avatar="🧑‍💻").write(msg_content)
-                elif role == "assistant":
-                    st.chat_message(role, avatar=avatar).write(msg_content)
-                elif role == "system":
-                    # 시스템 메시지를 chat_message로 표시
-                    st.chat_message("assistant", avatar=avatar if avatar else "ℹ️").markdown(f"_{msg_content}_")
-            except Exception as e:
-                print(f"Error rendering message (idx: {idx}): Role={role}, Avatar={avatar}, Exc={e}")
-                st.error(f"메시지 렌더링 중 오류 발생: {str(msg_content)[:30]}...")
+    messages = AppStateManager.get_messages()
+    if not messages:
+        return
+    
+    if AppStateManager.get_state('chat_render_full', False) or len(messages) <= CHAT_RECENT_WINDOW:
+        _render_message_range(messages, 0, len(messages))
+        return
+    
+    history_end = len(messages) - CHAT_RECENT_WINDOW
+    _render_collapsed_history(messages, history_end)
+    _render_message_range(messages, history_end, len(messages))
+
+
+def _render_message_range(messages, start, end):
+    """messages[start:end] 범위의 메시지를 전체 내용으로 렌더링합니다."""
+    for idx in range(start, end):
+        message = messages[idx]
+        role = message.get("role", "")
+        msg_content = message.get("content", "")
+        avatar = message.get("avatar", None)
+        if message.get("hard_line_breaks"):
+            # 표시용 변환은 렌더링 시점에만 수행하여 저장된 내용은 세션 상태와 같은 객체로 유지
+            msg_content = AppStateManager.process_text_for_display(msg_content)
+        
+        try:
+            if role == "user":
+                st.chat_message(role, avatar="🧑‍💻").write(msg_content)
+            elif role == "assistant":
+                st.chat_message(role, avatar=avatar).write(msg_content)
+            elif role == "system":
+                # 시스템 메시지를 chat_message로 표시
+                st.chat_message("assistant", avatar=avatar if avatar else "ℹ️").markdown(f"_{msg_content}_")
+        except Exception as e:
+            print(f"Error rendering message (idx: {idx}): Role={role}, Avatar={avatar}, Exc={e}")
+            st.error(f"메시지 렌더링 중 오류 발생: {str(msg_content)[:30]}...")
+
+
+def _render_collapsed_history(messages, history_end):
+    """
+    최근 윈도우 이전의 메시지를 접힌 영역에 페이지 단위로 렌더링합니다.
+    선택한 페이지의 미리보기만 렌더링하며, 전체 내용은 사용자가 요청한 페이지에 대해서만 표시합니다.
+    """
+    page_count = (history_end + CHAT_HISTORY_PAGE_SIZE - 1) // CHAT_HISTORY_PAGE_SIZE
+    
+    with st.expander(f"📜 이전 메시지 {history_end}개", expanded=False):
+        page = 1
+        if page_count > 1:
+            page = st.number_input(
+                "페이지",
+                min_value=1,
+                max_value=page_count,
+                value=page_count,
+                key="chat_history_page"
+            )
+        start = (page - 1) * CHAT_HISTORY_PAGE_SIZE
+        end = min(start + CHAT_HISTORY_PAGE_SIZE, history_end)
+        
+        if st.checkbox("전체 내용 보기", key="chat_history_show_full"):
+            _render_message_range(messages, start, end)
+        else:
+            st.markdown(_get_history_page_preview(messages, start, end))
+
+
+def _get_history_page_preview(messages, start, end):
+    """
+    이전 메시지 페이지의 미리보기 마크다운을 반환합니다.
+    완료된 메시지는 변하지 않으므로 가득 찬 페이지의 미리보기는 session_state에 캐시됩니다.
+    마지막 페이지는 메시지가 늘어날 때마다 범위가 바뀌므로 캐시하지 않습니다(페이지 크기 이하의 짧은 미리보기).
+    메시지 목록이 교체되면(세션 재시작/복원) AppStateManager가 캐시를 비웁니다.
+    """
+    if end - start < CHAT_HISTORY_PAGE_SIZE:
+        return _build_history_preview(messages, start, end)
+    
+    preview_cache = AppStateManager.get_state('chat_preview_cache')
+    if preview_cache is None:
+        preview_cache = {}
+        AppStateManager.set_state('chat_preview_cache', preview_cache)
+    
+    cache_key = (start, end)
+    if cache_key not in preview_cache:
+        preview_cache[cache_key] = _build_history_preview(messages, start, end)
+    return preview_cache[cache_key]
+
+
+def _build_history_preview(messages, start, end):
+    """messages[start:end] 범위의 메시지를 한 줄 미리보기 목록 마크다운으로 만듭니다."""
+    lines = []
+    for message in messages[start:end]:
+        avatar = message.get("avatar") or ("🧑‍💻" if message.get("role") == "user" else "ℹ️")
+        text = " ".join(str(message.get("content", "")).split())
+        if len(text) > CHAT_PREVIEW_LENGTH:
+            text = text[:CHAT_PREVIEW_LENGTH] + "…"
+        lines.append(f"- {avatar} {text}")
+    return "\n".join(lines)
 
 
 def render_sidebar():
@@ -205,10 +334,10 @@ def render_sidebar():
     API 키 설정, 모델 선택 및 성능 정보를 표시합니다.
     """
     from config.models import get_model_display_options, MODEL_CONFIGS, ModelType
-    from src.utils.model_monitor import AIModelMonitor
+    from src.utils.model_router import get_model_router
     
-    # 모델 모니터링 인스턴스 (app.py에서 전달받을 수도 있지만, 여기서 직접 생성)
-    model_monitor = AIModelMonitor(log_file_path="logs/model_performance.json")
+    # 모델 모니터링 인스턴스 (에이전트 모델 호출이 기록되는 전역 인스턴스)
+    model_monitor = get_model_router().monitor
     
     # 모델 성능 정보 가져오기
     model_recommendations = model_monitor.get_model_recommendations()
@@ -319,6 +448,23 @@ def render_sidebar():
         # 선택된 모델의 내부 ID
         selected_model_id = model_options[selected_display_name]
         
+        auto_routing = st.toggle(
+            "역할별 자동 모델 선택",
+            key="auto_model_routing",
+            help="켜면 최근 p95 응답 시간과 오류율을 바탕으로 에이전트 역할마다 모델을 자동으로 고릅니다. 선택한 모델은 판단 근거가 부족할 때 사용됩니다."
+        )
+        if auto_routing:
+            for model_id in model_options.values():
+                stats = model_monitor.get_recent_stats(model_id)
+                if stats["samples"]:
+                    st.caption(f"{model_id}: p95 {stats['p95_response_time']:.1f}초 · 오류율 {stats['error_rate']:.0%} ({stats['samples']}회)")
+        
+        st.toggle(
+            "구조화된 페르소나 보고서",
+            key="structured_persona_reports",
+            help="켜면 1단계 페르소나가 핵심 포인트, 요약, 전체 분석을 나누어 작성하고 중간 요약을 보고서에서 바로 만들어 요약용 모델 호출을 생략합니다."
+        )
+        
         # 모델 성능 정보 표시 (미니멀한 스타일)
         if selected_model_id in model_recommendations:
             recommendation = model_recommendations[selected_model_id]
@@ -328,6 +474,16 @@ def render_sidebar():
                 success_rate = recommendation["success_rate"]
                 avg_time = recommendation["avg_response_time"]
                 
+                # 첫 텍스트 응답까지 시간 (스트림 지연 지표가 있는 경우에만 표시)
+                first_content = model_monitor.get_stream_stats(selected_model_id)["time_to_first_content"]
+                first_content_row = ""
+                if first_content["count"]:
+                    first_content_row = f"""
+                        <div style="display: flex; justify-content: space-between; align-items: center; margin-top: 2px;">
+                            <span style="font-size: 13px;">첫 응답 (p50 / p95)</span>
+                            <span style="color: #495057; font-weight: 500;">{first_content['p50']:.1f}초 / {first_content['p95']:.1f}초</span>
+                        </div>"""
+                
                 # 성과 지표 색상
                 perf_color = "#00C851" if success_rate > 0.9 else "#ffbb33" if success_rate > 0.7 else "#ff4444"
                 
@@ -348,7 +504,7 @@ def render_sidebar():
                         <div style="display: flex; justify-content: space-between; align-items: center; margin-top: 2px;">
                             <span style="font-size: 13px;">응답시간</span>
                             <span style="color: #495057; font-weight: 500;">{avg_time:.1f}초</span>
-                        </div>
+                        </div>{first_content_row}
                     </div>
                     """,
                     unsafe_allow_html=True
@@ -374,6 +530,14 @@ def render_sidebar():
                 """,
                 unsafe_allow_html=True
             )
+        
+        # === 대화 표시 섹션 ===
+        st.markdown("### 💬 대화 표시")
+        st.toggle(
+            "전체 대화 한 번에 표시",
+            key="chat_render_full",
+            help=f"끄면 최근 {CHAT_RECENT_WINDOW}개 메시지만 전체 내용으로 표시하고 이전 메시지는 접어 둡니다."
+        )
 
 
 def render_app_header():
@@ -5,5 +5,19 @@ AIdea Lab 유틸리티 패키지
 """
 
 from .model_monitor import AIModelMonitor, monitor_model_performance
+from .blob_store import BlobStore, default_blob_store, instrument_agent_blob_interning, intern_text, intern_value
+from .token_accounting import TokenLedger, token_ledger
+from .similarity_index import MinHashLSHIndex
 
-__all__ = ['AIModelMonitor', 'monitor_model_performance'] 
\ No newline at end of file
+__all__ = [
+    'AIModelMonitor',
+    'monitor_model_performance',
+    'BlobStore',
+    'default_blob_store',
+    'instrument_agent_blob_interning',
+    'intern_text',
+    'intern_value',
+    'TokenLedger',
+    'token_ledger',
+    'MinHashLSHIndex',
+]
@@ -0,0 +1,43 @@
+"""
+AIdea Lab 에이전트 콜백 도우미
+
+이 모듈은 추적, 토큰 집계 등 여러 기능이 같은 LlmAgent에 모델 콜백을
+서로 덮어쓰지 않고 추가할 수 있도록 하는 도우미 함수를 제공합니다.
+"""
+
+from typing import Any, Callable, List, Optional
+
+
+def _append_callback(existing: Any, callback: Callable) -> List[Callable]:
+    """기존 콜백(단일/목록/None)에 콜백을 중복 없이 추가한 목록을 반환합니다."""
+    if existing is None:
+        callbacks = []
+    elif isinstance(existing, list):
+        callbacks = list(existing)
+    else:
+        callbacks = [existing]
+    if callback not in callbacks:
+        callbacks.append(callback)
+    return callbacks
+
+
+def attach_model_callbacks(agent: Any, before: Optional[Callable] = None, after: Optional[Callable] = None) -> Any:
+    """
+    LlmAgent의 before/after 모델 콜백 목록에 콜백을 추가합니다. 이미 연결된 콜백은 다시 추가하지 않습니다.
+
+    ADK는 목록의 콜백을 순서대로 호출하고, None이 아닌 값을 반환하는 첫 콜백에서 멈춥니다.
+    따라서 관찰용 콜백은 항상 None을 반환해야 합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+        before (Callable, optional): before_model_callback에 추가할 콜백
+        after (Callable, optional): after_model_callback에 추가할 콜백
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    if before is not None:
+        agent.before_model_callback = _append_callback(agent.before_model_callback, before)
+    if after is not None:
+        agent.after_model_callback = _append_callback(agent.after_model_callback, after)
+    return agent
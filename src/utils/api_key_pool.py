@@ -0,0 +1,415 @@
+"""
+AIdea Lab API 키 풀 모듈
+
+이 모듈은 여러 Google API 키를 나눠 쓰는 키 풀과, 모델 호출마다 키를 골라 그 키의 클라이언트로
+호출하는 ADK 모델 클래스(PooledGemini)를 제공합니다.
+
+- 키 목록은 AIDEA_API_KEYS 환경 변수(쉼표 구분)와 GOOGLE_API_KEY(_USER_INPUT)에서 읽습니다.
+- 키마다 진행 중인 호출 수, 배정된 호출 수, 연속 실패, 쉬는 시간(할당량 초과나 연속 실패 후)을 추적하고,
+  호출은 쉬고 있지 않은 키 중 부하가 가장 적은 키에 배정합니다. 유효하지 않은 키는 더 쓰지 않습니다.
+- 키는 레이트 리미터보다 먼저 배정되므로(instrument_agent_api_key) 레이트 리미터는 키마다 별도의 할당량을 추적합니다.
+- 사용자가 사이드바에서 입력한 키처럼 풀에 없는 세션 전용 키는 use_api_key()로 지정하며,
+  그 범위 안의 호출은 풀의 키 대신 그 키만 사용합니다. 전역 genai.configure()를 쓰지 않으므로
+  한 세션의 키가 다른 세션의 호출에 쓰이지 않습니다.
+
+SSE 스트리밍 호출이 부분 응답만 보내고 최종 응답 없이 끝나면(google-adk 0.5는 종료 사유가 STOP일 때만 최종 응답을 만듦)
+PooledGemini가 모은 텍스트로 최종 응답을 만들어 출력 키가 저장되도록 합니다.
+
+ADK는 "gemini-*" 모델 이름을 모델 레지스트리로 해석하므로, 이 모듈을 임포트하면 해당 이름이 PooledGemini로 등록됩니다.
+"""
+
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from google.adk.models import Gemini, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import Client, types
+
+from config.models import API_KEY_POOL_CONFIG
+from src.utils.agent_callbacks import attach_model_callbacks
+
+API_KEYS_ENV = "AIDEA_API_KEYS"
+
+# API 키 유효성 검증에 사용하는 모델
+VALIDATION_MODEL = "gemini-2.0-flash"
+
+_THROTTLE_MARKERS = ("429", "resource_exhausted", "resource exhausted", "rate limit", "quota")
+_INVALID_KEY_MARKERS = ("api_key_invalid", "api key not valid", "permission_denied", "401", "403")
+
+# use_api_key()로 지정한 세션 전용 API 키
+_session_api_key: contextvars.ContextVar = contextvars.ContextVar("aidea_session_api_key", default=None)
+# 현재 모델 호출에 배정된 키: {"api_key": str, "ticket": object, "started": bool}
+_call_assignment: contextvars.ContextVar = contextvars.ContextVar("aidea_call_api_key", default=None)
+
+
+def is_rate_limit_error(error: Any) -> bool:
+    """예외나 오류 코드가 할당량 초과(429)를 나타내는지 확인합니다."""
+    text = str(error).lower()
+    return any(marker in text for marker in _THROTTLE_MARKERS)
+
+
+def is_invalid_api_key_error(error: Any) -> bool:
+    """예외가 유효하지 않거나 권한이 없는 API 키를 나타내는지 확인합니다."""
+    text = str(error).lower()
+    return any(marker in text for marker in _INVALID_KEY_MARKERS)
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    """로그와 메트릭에 쓸 API 키 식별자를 반환합니다 (키 자체는 노출하지 않음)."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def load_api_keys_from_env() -> List[str]:
+    """
+    환경 변수에서 키 풀에 넣을 API 키 목록을 읽습니다 (중복 제거, 순서 유지).
+
+    Returns:
+        List[str]: AIDEA_API_KEYS, GOOGLE_API_KEY_USER_INPUT, GOOGLE_API_KEY 순서의 키 목록
+    """
+    candidates = (os.getenv(API_KEYS_ENV) or "").split(",")
+    candidates += [os.getenv("GOOGLE_API_KEY_USER_INPUT") or "", os.getenv("GOOGLE_API_KEY") or ""]
+    api_keys: List[str] = []
+    for candidate in candidates:
+        api_key = candidate.strip()
+        if api_key and api_key not in api_keys:
+            api_keys.append(api_key)
+    return api_keys
+
+
+class _KeyState:
+    """키 하나의 부하와 상태"""
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.key_id = api_key_fingerprint(api_key)
+        self.in_flight = 0
+        # 배정되었지만 아직 호출하지 않은 배정 (레이트 리미터 대기 중): 배정 표 -> 배정 시각
+        self.assigned: Dict[object, float] = {}
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.disabled = False
+        self.calls = 0
+        self.failures = 0
+        self.throttled = 0
+
+    def load(self, now: float, assignment_timeout: float) -> int:
+        for ticket in [ticket for ticket, assigned_at in self.assigned.items() if now - assigned_at > assignment_timeout]:
+            del self.assigned[ticket]
+        return self.in_flight + len(self.assigned)
+
+
+class ApiKeyPool:
+    """여러 API 키의 부하와 상태를 추적하고 호출할 키를 고르는 키 풀"""
+
+    def __init__(self, api_keys: Optional[List[str]] = None, config: Optional[Dict[str, Any]] = None):
+        """
+        키 풀 초기화
+
+        Args:
+            api_keys (List[str], optional): 풀에 넣을 API 키 목록. 기본값은 load_api_keys_from_env()
+            config (Dict[str, Any], optional): 풀 설정. 기본값은 API_KEY_POOL_CONFIG
+        """
+        self.config = {**API_KEY_POOL_CONFIG, **(config or {})}
+        self._keys: Dict[str, _KeyState] = {}
+        self._lock = threading.Lock()
+        for api_key in (api_keys if api_keys is not None else load_api_keys_from_env()):
+            self.add_key(api_key)
+
+    def add_key(self, api_key: str) -> None:
+        """풀에 API 키를 추가합니다 (이미 있으면 무시)."""
+        api_key = api_key.strip()
+        with self._lock:
+            if api_key and api_key not in self._keys:
+                self._keys[api_key] = _KeyState(api_key)
+
+    def __contains__(self, api_key: Optional[str]) -> bool:
+        with self._lock:
+            return bool(api_key) and api_key.strip() in self._keys
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+    def _is_healthy(self, state: _KeyState, now: float) -> bool:
+        return not state.disabled and state.unhealthy_until <= now
+
+    def assign_key(self) -> Dict[str, Any]:
+        """
+        호출할 키를 골라 배정합니다. 쉬고 있지 않은 키 중 부하(진행 중 + 배정된 호출)가 가장 적고
+        호출 수가 적은 키를 고르며, 모든 키가 쉬고 있으면 가장 먼저 돌아오는 키를 고릅니다.
+
+        Returns:
+            Dict[str, Any]: start_call()/finish_call()에 넘길 배정. 쓸 수 있는 키가 없으면 api_key가 None
+        """
+        now = time.monotonic()
+        timeout = self.config["assignment_timeout_seconds"]
+        with self._lock:
+            states = [state for state in self._keys.values() if not state.disabled]
+            if not states:
+                return {"api_key": None, "ticket": None, "started": False}
+            healthy = [state for state in states if self._is_healthy(state, now)]
+            if healthy:
+                state = min(healthy, key=lambda s: (s.load(now, timeout), s.calls))
+            else:
+                state = min(states, key=lambda s: s.unhealthy_until)
+            ticket = object()
+            state.assigned[ticket] = now
+            return {"api_key": state.api_key, "ticket": ticket, "started": False}
+
+    def start_call(self, assignment: Dict[str, Any]) -> None:
+        """배정된 호출이 모델 호출을 시작했음을 기록합니다."""
+        with self._lock:
+            state = self._keys.get(assignment["api_key"] or "")
+            if state is None or assignment["started"]:
+                return
+            assignment["started"] = True
+            state.assigned.pop(assignment["ticket"], None)
+            state.in_flight += 1
+            state.calls += 1
+
+    def finish_call(self, assignment: Dict[str, Any], error: Optional[BaseException] = None) -> None:
+        """
+        모델 호출 결과를 키 상태에 반영합니다.
+
+        Args:
+            assignment (Dict[str, Any]): start_call()에 넘긴 배정
+            error (BaseException, optional): 호출이 실패했으면 그 예외
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._keys.get(assignment["api_key"] or "")
+            if state is None or not assignment["started"]:
+                return
+            state.in_flight = max(0, state.in_flight - 1)
+            if error is None:
+                state.consecutive_failures = 0
+                return
+            state.failures += 1
+            if is_invalid_api_key_error(error):
+                state.disabled = True
+                message = "disabled (invalid key)"
+            elif is_rate_limit_error(error):
+                state.throttled += 1
+                state.unhealthy_until = max(state.unhealthy_until, now + self.config["throttle_cooldown_seconds"])
+                message = f"paused for {self.config['throttle_cooldown_seconds']:.0f}s (quota exceeded)"
+            else:
+                state.consecutive_failures += 1
+                if state.consecutive_failures < self.config["failure_threshold"]:
+                    return
+                state.consecutive_failures = 0
+                state.unhealthy_until = now + self.config["unhealthy_cooldown_seconds"]
+                message = f"paused for {self.config['unhealthy_cooldown_seconds']:.0f}s (repeated failures)"
+        print(f"WARNING: API key pool: key {state.key_id} {message}.")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        키별 상태를 반환합니다 (메트릭 노출용).
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 키 식별자 -> in_flight, assigned, calls, failures, throttled, healthy
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                state.key_id: {
+                    "in_flight": state.in_flight,
+                    "assigned": len(state.assigned),
+                    "calls": state.calls,
+                    "failures": state.failures,
+                    "throttled": state.throttled,
+                    "healthy": self._is_healthy(state, now),
+                }
+                for state in self._keys.values()
+            }
+
+
+_default_pool: Optional[ApiKeyPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_api_key_pool() -> ApiKeyPool:
+    """애플리케이션 전역 API 키 풀을 반환합니다 (처음 호출할 때 환경 변수에서 키를 읽음)."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ApiKeyPool()
+        return _default_pool
+
+
+@contextmanager
+def use_api_key(api_key: Optional[str]) -> Iterator[None]:
+    """
+    이 범위 안에서 실행되는 모델 호출이 사용할 세션 전용 API 키를 지정합니다.
+    풀에 있는 키이거나 비어 있으면 풀에서 키를 고릅니다. asyncio.run()과 태스크는 시작 시점의 지정을 물려받습니다.
+
+    Args:
+        api_key (str, optional): 세션 전용 API 키
+    """
+    token = _session_api_key.set((api_key or "").strip() or None)
+    try:
+        yield
+    finally:
+        _session_api_key.reset(token)
+
+
+def get_session_api_key() -> Optional[str]:
+    """use_api_key()로 지정된 세션 전용 API 키를 반환합니다."""
+    return _session_api_key.get()
+
+
+def _new_assignment() -> Dict[str, Any]:
+    session_key = _session_api_key.get()
+    pool = get_api_key_pool()
+    if session_key and session_key not in pool:
+        return {"api_key": session_key, "ticket": None, "started": False}
+    return pool.assign_key()
+
+
+def current_api_key_id() -> str:
+    """
+    현재 모델 호출에 배정된 API 키의 식별자를 반환합니다. 배정 전이면 세션 키나 환경 변수의 키를 기준으로 합니다.
+
+    Returns:
+        str: API 키 식별자 (키가 없으면 "default")
+    """
+    assignment = _call_assignment.get()
+    api_key = assignment["api_key"] if assignment else None
+    if not api_key:
+        api_key = (_session_api_key.get() or os.getenv("GOOGLE_API_KEY_USER_INPUT")
+                   or os.getenv("GOOGLE_API_KEY") or "").strip()
+    return api_key_fingerprint(api_key) if api_key else "default"
+
+
+def _assign_api_key(callback_context: Any, llm_request: Any) -> None:
+    """모델 호출에 사용할 API 키를 배정합니다 (LlmAgent before_model_callback)."""
+    _call_assignment.set(_new_assignment())
+    return None
+
+
+def instrument_agent_api_key(agent: Any) -> Any:
+    """
+    LlmAgent에 API 키 배정 콜백을 연결합니다.
+    레이트 리미터가 배정된 키의 할당량을 기다리도록 레이트 리미터보다 먼저 연결합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, before=_assign_api_key)
+
+
+# API 키 -> 클라이언트 (키마다 하나를 만들어 재사용)
+_clients: Dict[str, Client] = {}
+_clients_lock = threading.Lock()
+# 유효성 검증을 마친 API 키 식별자 (같은 키로 반복 실행할 때 검증용 모델 호출을 생략)
+_verified_key_ids: set = set()
+
+
+def get_client(api_key: Optional[str], headers: Optional[Dict[str, str]] = None) -> Client:
+    """
+    API 키의 genai 클라이언트를 반환합니다.
+
+    Args:
+        api_key (str, optional): API 키. None이면 환경 변수의 키를 쓰는 기본 클라이언트
+        headers (Dict[str, str], optional): 클라이언트를 처음 만들 때 붙일 HTTP 헤더
+
+    Returns:
+        Client: genai 클라이언트
+    """
+    cache_key = api_key or ""
+    with _clients_lock:
+        client = _clients.get(cache_key)
+        if client is None:
+            http_options = types.HttpOptions(headers=headers) if headers else None
+            client = Client(api_key=api_key, http_options=http_options) if api_key else Client(http_options=http_options)
+            _clients[cache_key] = client
+        return client
+
+
+def validate_api_key(api_key: str) -> bool:
+    """
+    API 키로 짧은 요청을 보내 유효성을 검증합니다. 검증에 성공한 키는 다시 호출하지 않습니다.
+    전역 설정을 바꾸지 않으므로 다른 세션의 키에 영향을 주지 않습니다.
+
+    Args:
+        api_key (str): 검증할 API 키
+
+    Returns:
+        bool: 응답이 생성되었는지 여부 (요청 자체가 실패하면 예외를 그대로 전달)
+    """
+    api_key = api_key.strip()
+    key_id = api_key_fingerprint(api_key)
+    if key_id in _verified_key_ids:
+        return True
+    response = get_client(api_key).models.generate_content(model=VALIDATION_MODEL, contents="Hello")
+    if not response.text:
+        return False
+    _verified_key_ids.add(key_id)
+    return True
+
+
+def mark_api_key_verified(api_key: str) -> None:
+    """
+    API 키를 검증을 마친 키로 표시합니다. 이후 validate_api_key()는 검증 요청 없이 성공합니다.
+    실제 API를 호출하지 않는 가짜 모델로 실행할 때(부하 테스트 등) 사용합니다.
+
+    Args:
+        api_key (str): 표시할 API 키
+    """
+    _verified_key_ids.add(api_key_fingerprint(api_key.strip()))
+
+
+class PooledGemini(Gemini):
+    """호출마다 배정된 API 키(풀 또는 세션 전용 키)의 클라이언트로 Gemini를 호출하는 ADK 모델"""
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        assignment = _call_assignment.get()
+        if assignment is None or assignment["started"]:
+            # 배정 콜백이 연결되지 않은 에이전트이거나 같은 배정으로 다시 호출하는 경우
+            assignment = _new_assignment()
+            _call_assignment.set(assignment)
+
+        pool = get_api_key_pool()
+        delegate = _KeyedGemini(model=self.model, api_key=assignment["api_key"])
+        pool.start_call(assignment)
+        error: Optional[BaseException] = None
+        # 아직 최종 응답으로 모으지 않은 부분 응답 텍스트 (SSE 스트리밍)
+        pending_text = ""
+        try:
+            async for response in delegate.generate_content_async(llm_request, stream):
+                if response.content and response.content.parts:
+                    if response.partial:
+                        pending_text += "".join(part.text for part in response.content.parts if part.text)
+                    else:
+                        pending_text = ""
+                yield response
+            if pending_text:
+                # google-adk 0.5의 Gemini는 종료 사유가 STOP일 때만 부분 응답을 최종 응답으로 모아 보내므로
+                # (MAX_TOKENS 등) 최종 응답이 없으면 출력 키가 저장되도록 모은 텍스트로 최종 응답을 만듦
+                yield LlmResponse(content=types.ModelContent(parts=[types.Part.from_text(text=pending_text)]))
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            pool.finish_call(assignment, error)
+
+
+class _KeyedGemini(Gemini):
+    """지정한 API 키의 클라이언트를 쓰는 Gemini (키가 없으면 환경 변수의 키)"""
+
+    api_key: Optional[str] = None
+
+    @property
+    def api_client(self) -> Client:
+        return get_client(self.api_key, self._tracking_headers)
+
+
+LLMRegistry.register(PooledGemini)
+LLMRegistry.resolve.cache_clear()
@@ -0,0 +1,174 @@
+"""
+AIdea Lab 대용량 텍스트 블롭 저장소
+
+이 모듈은 페르소나 보고서, 요약, 토론 발언처럼 큰 에이전트 출력 텍스트를
+내용 해시(sha256) 기준으로 한 번만 보관하는 블롭 저장소를 제공합니다.
+
+같은 내용의 텍스트를 intern()하면 항상 동일한 문자열 객체가 반환되므로,
+ADK 이벤트의 state_delta, session.state, UI 메시지 목록, 토론 기록이
+각자 사본을 갖는 대신 하나의 문자열을 참조하게 됩니다.
+
+모델 응답은 instrument_agent_blob_interning()이 연결하는 after_model_callback에서 intern합니다.
+ADK는 이 콜백 뒤에 응답으로 이벤트(event.content)와 output_key의 state_delta를 만들므로,
+이벤트와 세션 상태가 처음부터 정규 객체를 참조합니다.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.utils.agent_callbacks import attach_model_callbacks
+
+# 이 길이(문자 수) 미만의 텍스트는 중복 제거 이득보다 해시 비용이 크므로 그대로 사용
+DEFAULT_MIN_BLOB_LENGTH = 256
+
+# 저장소가 보관할 최대 텍스트 용량 (문자 수 기준, 초과 시 가장 오래 사용되지 않은 블롭부터 제거)
+DEFAULT_MAX_BLOB_CHARS = 32 * 1024 * 1024
+
+
+class BlobStore:
+    """
+    내용 주소 기반 텍스트 블롭 저장소
+
+    저장소에서 제거된 블롭도 이를 참조하는 구조가 있는 한 메모리에 남아 있으며,
+    이후 같은 내용이 다시 intern()되면 새 정규 객체로 등록됩니다.
+    """
+
+    def __init__(self, min_blob_length: int = DEFAULT_MIN_BLOB_LENGTH,
+                 max_blob_chars: int = DEFAULT_MAX_BLOB_CHARS):
+        """
+        블롭 저장소 초기화
+
+        Args:
+            min_blob_length (int): 중복 제거 대상이 되는 최소 텍스트 길이
+            max_blob_chars (int): 저장소가 보관할 최대 텍스트 용량 (문자 수)
+        """
+        self.min_blob_length = min_blob_length
+        self.max_blob_chars = max_blob_chars
+        self._blobs: "OrderedDict[str, str]" = OrderedDict()
+        self._total_chars = 0
+        self._lock = threading.Lock()
+        self.hit_count = 0
+        self.saved_chars = 0
+
+    @staticmethod
+    def digest(text: str) -> str:
+        """텍스트의 내용 주소(sha256 16진수 문자열)를 반환합니다."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def intern(self, text: Any) -> Any:
+        """
+        텍스트를 저장소에 등록하고 정규 문자열 객체를 반환합니다.
+
+        Args:
+            text (Any): 등록할 텍스트. 문자열이 아니거나 짧은 텍스트는 그대로 반환
+
+        Returns:
+            Any: 같은 내용에 대해 항상 동일한 문자열 객체
+        """
+        if not isinstance(text, str) or len(text) < self.min_blob_length:
+            return text
+
+        key = self.digest(text)
+        with self._lock:
+            canonical = self._blobs.get(key)
+            if canonical is not None:
+                self._blobs.move_to_end(key)
+                if canonical is not text:
+                    self.hit_count += 1
+                    self.saved_chars += len(text)
+                return canonical
+
+            self._blobs[key] = text
+            self._total_chars += len(text)
+            while self._total_chars > self.max_blob_chars and len(self._blobs) > 1:
+                _, evicted = self._blobs.popitem(last=False)
+                self._total_chars -= len(evicted)
+        return text
+
+    def intern_value(self, value: Any) -> Any:
+        """
+        dict/list 안의 문자열까지 재귀적으로 intern()합니다 (토론 기록 같은 구조화된 상태 값용).
+
+        Args:
+            value (Any): intern할 값
+
+        Returns:
+            Any: 큰 문자열이 정규 객체로 교체된 값 (컨테이너는 새로 만들어짐)
+        """
+        if isinstance(value, str):
+            return self.intern(value)
+        if isinstance(value, dict):
+            return {key: self.intern_value(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.intern_value(item) for item in value]
+        return value
+
+    def get(self, key: str) -> Any:
+        """내용 주소로 블롭을 조회합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            return self._blobs.get(key)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        저장소 사용 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int]: 블롭 수, 보관 중인 문자 수, 중복 적중 수, 절약한 문자 수
+        """
+        with self._lock:
+            return {
+                "blob_count": len(self._blobs),
+                "stored_chars": self._total_chars,
+                "hit_count": self.hit_count,
+                "saved_chars": self.saved_chars,
+            }
+
+    def clear(self) -> None:
+        """저장소를 비웁니다."""
+        with self._lock:
+            self._blobs.clear()
+            self._total_chars = 0
+
+
+# 애플리케이션 전역 블롭 저장소
+default_blob_store = BlobStore()
+
+
+def intern_text(text: Any) -> Any:
+    """전역 블롭 저장소에 텍스트를 등록하고 정규 문자열 객체를 반환합니다."""
+    return default_blob_store.intern(text)
+
+
+def intern_value(value: Any) -> Any:
+    """전역 블롭 저장소를 사용해 dict/list 안의 큰 문자열을 재귀적으로 intern()합니다."""
+    return default_blob_store.intern_value(value)
+
+
+def _intern_response_text(callback_context: Any, llm_response: Any) -> Optional[Any]:
+    """
+    최종 모델 응답의 텍스트 파트를 정규 문자열 객체로 바꿉니다 (LlmAgent after_model_callback).
+    ADK는 텍스트 파트가 하나인 응답의 텍스트를 그대로 output_key 값으로 저장하므로,
+    이벤트, state_delta, session.state가 같은 객체를 참조합니다. 부분 응답(스트리밍 조각)은 건너뜁니다.
+    """
+    if llm_response.partial or not llm_response.content or not llm_response.content.parts:
+        return None
+    for part in llm_response.content.parts:
+        if part.text:
+            part.text = intern_text(part.text)
+    # 나머지 콜백(토큰 집계, 성능 기록)도 실행되도록 응답을 직접 바꾸고 None 반환
+    return None
+
+
+def instrument_agent_blob_interning(agent: Any) -> Any:
+    """
+    LlmAgent에 모델 응답 텍스트를 블롭 저장소에 등록하는 after_model_callback을 연결합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, after=_intern_response_text)
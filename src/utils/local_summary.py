@@ -0,0 +1,191 @@
+"""
+AIdea Lab 로컬 중간 요약 모듈
+
+이 모듈은 1단계 페르소나 보고서의 중간 요약을 LLM 호출 없이 로컬에서 만드는 기능을 제공합니다.
+
+- 보고서가 짧으면(INTERMEDIATE_SUMMARY_CONFIG["compact_report_max_tokens"] 이하) 보고서 문장을 그대로
+  핵심 포인트와 종합 요약으로 사용합니다.
+- 보고서가 길면 다른 문장과 공유하는 어휘가 많은 문장(보고서의 중심 내용)을 골라 추출 요약을 만듭니다.
+  단, 고른 문장이 보고서의 제목 구획을 충분히 고르게 덮을 때만 사용합니다. 중심 문장이 일부 구획에
+  몰려 있으면 추출 요약이 보고서의 나머지 관점을 빠뜨리므로 LLM 요약을 사용합니다.
+- 결과는 LLM 요약과 같은 "**핵심 포인트:** / **종합 요약:**" 형식이므로 AdkController의 응답 검증을 통과합니다.
+
+make_local_summary_callback()은 중간 요약 에이전트의 before_model_callback으로 사용되며,
+로컬 요약을 만들 수 있으면 LlmResponse를 반환하여 모델 호출을 건너뜁니다.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from config.personas import INTERMEDIATE_SUMMARY_CONFIG
+from config.prompts import estimate_token_count
+from src.utils.blob_store import intern_text
+
+# 문장 경계: 줄바꿈 또는 문장부호 뒤의 공백
+_SENTENCE_BOUNDARY = re.compile(r"\n+|(?<=[.!?])\s+")
+# 줄 앞의 제목/목록/번호 표시
+_LINE_MARKER = re.compile(r"^\s*(?:#{1,6}\s*|[-*•]\s+|\d+[.)]\s+)")
+_NUMBER_MARKER = re.compile(r"^\d+[.)]\s+")
+_WORD = re.compile(r"\w{2,}", re.UNICODE)
+
+# 문장으로 취급할 최소 길이 (제목이나 목록 머리말 제외)
+MIN_SENTENCE_CHARS = 15
+
+
+def _is_heading(line: str) -> bool:
+    """마크다운 제목이나 (번호가 붙은) 굵은 글씨만으로 된 줄, 콜론으로 끝나는 짧은 줄인지 확인합니다."""
+    stripped = line.strip()
+    if stripped.startswith("#"):
+        return True
+    if re.fullmatch(r"\*\*[^*]+\*\*:?", _NUMBER_MARKER.sub("", stripped)):
+        return True
+    return stripped.endswith(":") and len(stripped) < 40
+
+
+def split_sections(text: str) -> List[List[str]]:
+    """
+    보고서를 제목 줄 기준의 구획으로 나누고, 구획마다 마크다운 표시를 제거한 문장 목록을 만듭니다.
+
+    Args:
+        text (str): 보고서 텍스트
+
+    Returns:
+        List[List[str]]: 구획별 문장 목록 (제목, 너무 짧은 조각, 중복 문장, 문장이 없는 구획 제외, 원래 순서)
+    """
+    sections: List[List[str]] = [[]]
+    seen = set()
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continue
+        if _is_heading(line):
+            if sections[-1]:
+                sections.append([])
+            continue
+        line = _LINE_MARKER.sub("", line).replace("**", "").strip()
+        for sentence in _SENTENCE_BOUNDARY.split(line):
+            sentence = sentence.strip()
+            if len(sentence) >= MIN_SENTENCE_CHARS and sentence not in seen:
+                seen.add(sentence)
+                sections[-1].append(sentence)
+    return [section for section in sections if section]
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    보고서를 마크다운 표시를 제거한 문장 목록으로 나눕니다.
+
+    Args:
+        text (str): 보고서 텍스트
+
+    Returns:
+        List[str]: 문장 목록 (제목, 너무 짧은 조각, 중복 문장 제외, 원래 순서)
+    """
+    return [sentence for section in split_sections(text) for sentence in section]
+
+
+def _rank_sentences(sentences: List[str]) -> List[int]:
+    """
+    다른 문장과 공유하는 어휘가 많은 순서로 문장 인덱스를 정렬합니다.
+    동점이면 앞에 나온 문장을 우선합니다.
+    """
+    sentence_words = [set(word.lower() for word in _WORD.findall(sentence)) for sentence in sentences]
+    document_frequency = Counter(word for words in sentence_words for word in words)
+
+    def score(index: int) -> float:
+        words = sentence_words[index]
+        if not words:
+            return 0.0
+        shared = sum(document_frequency[word] - 1 for word in words)
+        return shared / math.sqrt(len(words))
+
+    return sorted(range(len(sentences)), key=lambda index: (-score(index), index))
+
+
+def _section_coverage(sections: List[List[str]], selected_indexes: Set[int]) -> float:
+    """
+    고른 문장(전체 문장 목록의 인덱스)이 한 개 이상 들어 있는 구획의 비율을 계산합니다.
+    제목이 없는 보고서는 구획이 하나이므로 구조를 확인할 수 없어 0으로 봅니다.
+    """
+    if len(sections) < 2:
+        return 0.0
+    covered = set()
+    start = 0
+    for section_index, section in enumerate(sections):
+        if any(start <= index < start + len(section) for index in selected_indexes):
+            covered.add(section_index)
+        start += len(section)
+    return len(covered) / len(sections)
+
+
+def _truncate(sentence: str, max_chars: int) -> str:
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 1].rstrip() + "…"
+
+
+def summarize_report_locally(report: str, config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    보고서를 "핵심 포인트 / 종합 요약" 형식으로 로컬에서 요약합니다.
+
+    Args:
+        report (str): 페르소나 보고서
+        config (Dict[str, Any], optional): 요약 설정. 기본값은 INTERMEDIATE_SUMMARY_CONFIG
+
+    Returns:
+        Optional[str]: 요약 텍스트, 로컬 요약이 적합하지 않으면 None (LLM 요약 사용).
+            긴 보고서는 문장이 extractive_min_sentences 이상이고, 고른 문장이 들어 있는 제목 구획의 비율이
+            extractive_min_section_coverage 이상일 때만 추출 요약이 적합하다고 봅니다.
+    """
+    config = {**INTERMEDIATE_SUMMARY_CONFIG, **(config or {})}
+    if config["mode"] != "adaptive":
+        return None
+
+    sections = split_sections(report)
+    sentences = [sentence for section in sections for sentence in section]
+    if not sentences:
+        return None
+
+    is_compact = estimate_token_count(report) <= config["compact_report_max_tokens"]
+    if not is_compact and len(sentences) < config["extractive_min_sentences"]:
+        return None
+
+    ranking = _rank_sentences(sentences)
+    key_point_indexes = sorted(ranking[:config["key_points"]])
+    summary_indexes = list(range(min(config["summary_sentences"], len(sentences)))) if is_compact \
+        else sorted(ranking[:config["summary_sentences"]])
+
+    if not is_compact and _section_coverage(sections, set(key_point_indexes) | set(summary_indexes)) \
+            < config["extractive_min_section_coverage"]:
+        return None
+
+    key_points = "\n".join(f"- {_truncate(sentences[index], config['max_point_chars'])}" for index in key_point_indexes)
+    overview = " ".join(sentences[index] for index in summary_indexes)
+    return f"**핵심 포인트:**\n{key_points}\n\n**종합 요약:**\n{overview}"
+
+
+def make_local_summary_callback(original_report_key: str, config: Optional[Dict[str, Any]] = None) -> Callable:
+    """
+    중간 요약 에이전트용 before_model_callback을 만듭니다.
+    세션 상태의 원본 보고서를 로컬에서 요약할 수 있으면 그 요약을 모델 응답으로 반환하여 LLM 호출을 건너뜁니다.
+
+    Args:
+        original_report_key (str): 원본 보고서의 상태 키 (예: "marketer_report_phase1")
+        config (Dict[str, Any], optional): 요약 설정. 기본값은 INTERMEDIATE_SUMMARY_CONFIG
+
+    Returns:
+        Callable: before_model_callback 함수
+    """
+    def local_summary_callback(callback_context: Any, llm_request: Any) -> Optional[LlmResponse]:
+        report = callback_context.state.get(original_report_key, "")
+        summary = summarize_report_locally(report, config) if isinstance(report, str) else None
+        if summary is None:
+            return None
+
+        print(f"INFO: Summarized '{original_report_key}' locally ({len(report)} chars); skipping LLM summarizer call.")
+        # before_model_callback이 응답을 반환하면 after_model_callback(블롭 저장소 등록)이 실행되지 않으므로 직접 등록
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=intern_text(summary))]))
+
+    return local_summary_callback
@@ -0,0 +1,262 @@
+"""
+AIdea Lab 단계별 메모리 프로파일링 모듈
+
+이 모듈은 오래 실행되는 프로세스의 메모리 증가 원인(남아 있는 세션, 이벤트, 메시지 목록 등)을 찾기 위한
+선택적 메모리 프로파일링을 제공합니다.
+
+- AIDEA_MEMORY_PROFILE=1이면 tracemalloc 추적을 시작하고, 단계 경계(1단계 완료, 2단계 전환,
+  2단계 라운드마다, 최종 요약 후)에서 스냅샷을 찍습니다. 꺼져 있으면 take_phase_snapshot()은 아무 일도 하지 않습니다.
+- 스냅샷마다 이전 스냅샷 및 추적 시작 시점과 비교해 파일:줄별로 가장 많이 늘어난 할당 위치를 보고합니다.
+- 해당 세션의 객체 크기(session.state 키별, events, st.session_state.messages)와 프로세스의 활성 세션 수를 함께 기록합니다.
+- 보고서는 구조화 로거("memory" 컴포넌트, INFO)로 기록하고, 최근 보고서는 get_memory_reports()로 조회할 수 있습니다.
+
+설정은 다음 환경 변수로 합니다.
+- AIDEA_MEMORY_PROFILE=1: 메모리 프로파일링 사용
+- AIDEA_MEMORY_PROFILE_FRAMES=<수>: 할당마다 저장할 호출 스택 프레임 수 (기본값: 1, 늘리면 추적 비용도 늘어남)
+- AIDEA_MEMORY_PROFILE_TOP=<수>: 보고할 할당 위치 수 (기본값: 10)
+"""
+
+import collections
+import os
+import sys
+import threading
+import tracemalloc
+import types
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from src.session_manager import SessionManager
+from src.utils.structured_logging import get_logger
+
+MEMORY_PROFILE_ENV = "AIDEA_MEMORY_PROFILE"
+MEMORY_PROFILE_FRAMES_ENV = "AIDEA_MEMORY_PROFILE_FRAMES"
+MEMORY_PROFILE_TOP_ENV = "AIDEA_MEMORY_PROFILE_TOP"
+
+DEFAULT_FRAMES = 1
+DEFAULT_TOP = 10
+# 보관할 최근 보고서 수
+MAX_REPORTS = 100
+# 세션 상태에서 크기순으로 보고할 키 수
+TOP_STATE_KEYS = 5
+
+# 공유 객체(모듈, 클래스, 함수)는 세션 크기에 포함하지 않음
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+# 보고서에서 제외할 할당 위치 (프로파일러 자체와 임포트). Snapshot.filter_traces()는 추적 수에 비례해 느리므로
+# 집계 결과에서 제외
+_EXCLUDED_FILES = (tracemalloc.__file__, __file__)
+_EXCLUDED_PREFIXES = ("<frozen importlib", "<unknown>")
+
+logger = get_logger("memory")
+
+_lock = threading.Lock()
+_enabled = False
+_top = DEFAULT_TOP
+# 스냅샷의 할당 위치("파일:줄") -> (크기, 할당 수). 스냅샷 전체 대신 집계 결과만 보관
+_baseline_statistics: Optional[Dict[str, Tuple[int, int]]] = None
+_previous_statistics: Optional[Dict[str, Tuple[int, int]]] = None
+_reports: Deque[Dict[str, Any]] = collections.deque(maxlen=MAX_REPORTS)
+
+
+def configure_memory_profiling(enabled: Optional[bool] = None, frames: Optional[int] = None,
+                               top: Optional[int] = None) -> bool:
+    """
+    메모리 프로파일링을 설정합니다. 켜면 tracemalloc 추적을 시작하고 비교 기준 스냅샷을 찍습니다.
+    인자를 지정하지 않은 항목은 환경 변수 설정을 따르며, 이미 켜져 있으면 다시 설정하지 않습니다.
+
+    Args:
+        enabled (bool, optional): 사용 여부
+        frames (int, optional): 할당마다 저장할 호출 스택 프레임 수
+        top (int, optional): 보고할 할당 위치 수
+
+    Returns:
+        bool: 메모리 프로파일링이 켜져 있으면 True
+    """
+    global _enabled, _top, _baseline_statistics, _previous_statistics
+
+    if enabled is None:
+        enabled = os.getenv(MEMORY_PROFILE_ENV, "").lower() in ("1", "true", "yes")
+    if not enabled:
+        return _enabled
+
+    with _lock:
+        if _enabled:
+            return True
+        _top = top or int(os.getenv(MEMORY_PROFILE_TOP_ENV) or DEFAULT_TOP)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or int(os.getenv(MEMORY_PROFILE_FRAMES_ENV) or DEFAULT_FRAMES))
+        _baseline_statistics = _previous_statistics = _take_statistics()
+        _enabled = True
+    print(f"Memory profiling enabled (tracemalloc, {tracemalloc.get_traceback_limit()} frame(s))")
+    return True
+
+
+def stop_memory_profiling() -> None:
+    """메모리 프로파일링을 끄고 tracemalloc 추적과 저장된 스냅샷, 보고서를 정리합니다."""
+    global _enabled, _baseline_statistics, _previous_statistics
+    with _lock:
+        _enabled = False
+        _baseline_statistics = _previous_statistics = None
+        _reports.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def is_memory_profiling_enabled() -> bool:
+    """메모리 프로파일링이 켜져 있는지 확인합니다."""
+    return _enabled
+
+
+def get_memory_reports() -> List[Dict[str, Any]]:
+    """최근 단계 경계 보고서 목록을 오래된 순서로 반환합니다."""
+    with _lock:
+        return list(_reports)
+
+
+def _take_statistics() -> Dict[str, Tuple[int, int]]:
+    """스냅샷을 찍어 할당 위치(파일:줄)별 크기와 할당 수로 집계합니다."""
+    statistics = {}
+    for stat in tracemalloc.take_snapshot().statistics("lineno"):
+        frame = stat.traceback[0]
+        if frame.filename in _EXCLUDED_FILES or frame.filename.startswith(_EXCLUDED_PREFIXES):
+            continue
+        statistics[f"{frame.filename}:{frame.lineno}"] = (stat.size, stat.count)
+    return statistics
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    객체와 객체가 참조하는 컨테이너, 속성 값의 크기 합계(바이트)를 계산합니다.
+    같은 객체는 한 번만 세며, 모듈/클래스/함수는 공유 객체로 보고 제외합니다.
+
+    Args:
+        obj (Any): 크기를 잴 객체
+
+    Returns:
+        int: 크기 합계 (바이트)
+    """
+    seen = set()
+    total = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, collections.deque)):
+            pending.extend(current)
+        elif hasattr(current, "__dict__"):
+            # pydantic 모델(ADK Session, Event)은 필드 값을 __dict__에 저장
+            pending.append(vars(current))
+    return total
+
+
+def session_size_breakdown(session: Any = None, messages: Optional[List[Any]] = None) -> Dict[str, Any]:
+    """
+    세션 하나가 붙잡고 있는 객체의 크기를 구분해 계산합니다.
+
+    Args:
+        session: ADK 세션 객체 (state, events 속성)
+        messages (List[Any], optional): UI 메시지 목록 (st.session_state.messages)
+
+    Returns:
+        Dict[str, Any]: state_bytes, state_top_keys(키 -> 바이트), events, events_bytes, messages, messages_bytes
+    """
+    breakdown: Dict[str, Any] = {}
+    if session is not None:
+        state = dict(getattr(session, "state", None) or {})
+        key_sizes = {key: deep_sizeof(value) for key, value in state.items()}
+        breakdown["state_bytes"] = deep_sizeof(state)
+        breakdown["state_top_keys"] = dict(sorted(key_sizes.items(), key=lambda item: item[1], reverse=True)[:TOP_STATE_KEYS])
+        events = list(getattr(session, "events", None) or [])
+        breakdown["events"] = len(events)
+        breakdown["events_bytes"] = deep_sizeof(events)
+    if messages is not None:
+        breakdown["messages"] = len(messages)
+        breakdown["messages_bytes"] = deep_sizeof(messages)
+    return breakdown
+
+
+def _top_growth(statistics: Dict[str, Tuple[int, int]], reference: Dict[str, Tuple[int, int]],
+                limit: int) -> List[Dict[str, Any]]:
+    """기준 집계 대비 가장 많이 늘어난 할당 위치(파일:줄)를 반환합니다."""
+    growth = []
+    for location, (size, count) in statistics.items():
+        reference_size, reference_count = reference.get(location, (0, 0))
+        if size > reference_size:
+            growth.append({
+                "location": location,
+                "size_diff_bytes": size - reference_size,
+                "count_diff": count - reference_count,
+                "size_bytes": size,
+            })
+    growth.sort(key=lambda item: item["size_diff_bytes"], reverse=True)
+    return growth[:limit]
+
+
+def _format_growth(growth: List[Dict[str, Any]]) -> str:
+    return "; ".join(f"{item['location']} {item['size_diff_bytes'] / 1024:+.1f} KB ({item['count_diff']:+d})"
+                     for item in growth)
+
+
+def take_phase_snapshot(boundary: str, session: Union[Any, Callable[[], Any], None] = None,
+                        messages: Union[List[Any], Callable[[], List[Any]], None] = None,
+                        session_id: Optional[str] = None, **labels: Any) -> Optional[Dict[str, Any]]:
+    """
+    단계 경계에서 메모리 스냅샷을 찍고, 할당 위치별 증가량과 세션 객체 크기를 보고합니다.
+    메모리 프로파일링이 꺼져 있으면 아무 일도 하지 않습니다.
+
+    Args:
+        boundary (str): 단계 경계 이름 (예: "phase1_complete", "phase2_transition", "phase2_round", "phase2_final_summary")
+        session: ADK 세션 객체. 세션 조회 비용을 피하려면 인자 없는 함수로 넘김 (켜져 있을 때만 호출)
+        messages: UI 메시지 목록 또는 그 목록을 반환하는 인자 없는 함수
+        session_id (str, optional): 세션 ID
+        **labels: 보고서에 함께 기록할 값 (예: round=3)
+
+    Returns:
+        Optional[Dict[str, Any]]: 보고서. 꺼져 있으면 None
+    """
+    global _previous_statistics
+
+    if not _enabled:
+        return None
+    session = session() if callable(session) else session
+    messages = messages() if callable(messages) else messages
+    sizes = session_size_breakdown(session, messages)
+
+    with _lock:
+        if not _enabled:
+            return None
+        statistics = _take_statistics()
+        traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        report = {
+            "boundary": boundary,
+            "session_id": session_id or getattr(session, "id", None),
+            **labels,
+            "traced_bytes": traced_bytes,
+            "peak_traced_bytes": peak_bytes,
+            "active_sessions": SessionManager.count_active_sessions(),
+            "sizes": sizes,
+            "top_since_previous": _top_growth(statistics, _previous_statistics, _top),
+            "top_since_start": _top_growth(statistics, _baseline_statistics, _top),
+        }
+        _previous_statistics = statistics
+        _reports.append(report)
+
+    logger.info(
+        "phase snapshot",
+        boundary=boundary,
+        session_id=report["session_id"],
+        **labels,
+        traced_mb=round(traced_bytes / 2**20, 2),
+        peak_mb=round(peak_bytes / 2**20, 2),
+        active_sessions=report["active_sessions"],
+        sizes=sizes,
+        top_since_previous=lambda: _format_growth(report["top_since_previous"]),
+        top_since_start=lambda: _format_growth(report["top_since_start"]),
+    )
+    return report
@@ -0,0 +1,253 @@
+"""
+AIdea Lab 메트릭 노출 모듈
+
+이 모듈은 실행 중인 Streamlit 프로세스의 지연 시간, 오류, 토큰 지표를 Prometheus 텍스트 노출 형식으로
+제공하는 경량 HTTP 엔드포인트를 백그라운드 스레드에서 실행합니다.
+
+지표는 AIModelMonitor, SessionManager, 모델 라우터, 토큰 장부에서 직접 읽으며
+st.session_state에는 접근하지 않으므로 Streamlit 스크립트 재실행에 영향을 주지 않습니다.
+
+활성화: AIDEA_METRICS_PORT=<포트> (바인드 주소는 AIDEA_METRICS_HOST, 기본값 127.0.0.1)
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from src.session_manager import SessionManager
+from src.utils.api_key_pool import get_api_key_pool
+from src.utils.model_monitor import LATENCY_HISTOGRAM_BUCKETS
+from src.utils.model_router import get_in_flight_call_count, get_model_router
+from src.utils.rate_limiter import get_rate_limiter
+from src.utils.token_accounting import token_ledger
+
+METRICS_PORT_ENV = "AIDEA_METRICS_PORT"
+METRICS_HOST_ENV = "AIDEA_METRICS_HOST"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 애플리케이션 코드가 증가시키는 카운터: (이름, 레이블 튜플) -> 값
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+_counter_help: Dict[str, str] = {}
+_counters_lock = threading.Lock()
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def increment_counter(name: str, help_text: str, value: float = 1.0, **labels: str) -> None:
+    """
+    메트릭 카운터를 증가시킵니다.
+
+    Args:
+        name (str): 메트릭 이름 (예: "aidea_discussion_rounds_total")
+        help_text (str): 메트릭 설명 (HELP 줄)
+        value (float): 증가량
+        **labels: 레이블
+    """
+    key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+    with _counters_lock:
+        _counter_help.setdefault(name, help_text)
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _MetricWriter:
+    """Prometheus 텍스트 노출 형식으로 지표를 모으는 도우미"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def header(self, name: str, metric_type: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {metric_type}")
+
+    def sample(self, name: str, value: float, **labels: str) -> None:
+        self.lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                  series: Dict[Tuple[str, ...], Dict]) -> None:
+        self.header(name, "histogram", help_text)
+        for label_values, histogram in sorted(series.items()):
+            labels = dict(zip(label_names, label_values))
+            cumulative = 0
+            for upper_bound, count in zip(LATENCY_HISTOGRAM_BUCKETS, histogram["buckets"]):
+                cumulative += count
+                self.sample(f"{name}_bucket", cumulative, **labels, le=_format_value(upper_bound))
+            self.sample(f"{name}_bucket", histogram["count"], **labels, le="+Inf")
+            self.sample(f"{name}_sum", histogram["sum"], **labels)
+            self.sample(f"{name}_count", histogram["count"], **labels)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics() -> str:
+    """
+    현재 지표를 Prometheus 텍스트 노출 형식으로 만듭니다.
+
+    Returns:
+        str: 노출 형식 텍스트
+    """
+    writer = _MetricWriter()
+    snapshot = get_model_router().monitor.get_metrics_snapshot()
+
+    writer.header("aidea_model_calls_total", "counter", "Model API calls by outcome.")
+    for model, stats in sorted(snapshot["success_rates"].items()):
+        writer.sample("aidea_model_calls_total", stats["success"], model=model, outcome="success")
+        writer.sample("aidea_model_calls_total", stats["total"] - stats["success"], model=model, outcome="error")
+
+    writer.header("aidea_model_errors_total", "counter", "Failed model API calls by error type.")
+    for model, errors in sorted(snapshot["error_counts"].items()):
+        for error_type, count in sorted(errors.items()):
+            writer.sample("aidea_model_errors_total", count, model=model, error_type=error_type)
+
+    histograms = snapshot["histograms"]
+    writer.histogram("aidea_model_response_seconds", "Model call latency.", ("model",),
+                     histograms.get("response_seconds", {}))
+    writer.histogram("aidea_model_time_to_first_event_seconds", "Time from model call start to its first event.",
+                     ("model", "role"), histograms.get("time_to_first_event_seconds", {}))
+    writer.histogram("aidea_model_time_to_first_content_seconds", "Time from model call start to first streamed text chunk.",
+                     ("model", "role"), histograms.get("time_to_first_content_seconds", {}))
+    writer.histogram("aidea_model_inter_delta_gap_seconds", "Gap between consecutive streamed text chunks of one model call.",
+                     ("model", "role"), histograms.get("inter_delta_gap_seconds", {}))
+    writer.histogram("aidea_model_stream_duration_seconds", "Time from model call start to its last event.",
+                     ("model", "role"), histograms.get("stream_duration_seconds", {}))
+
+    writer.header("aidea_model_calls_in_flight", "gauge", "Model calls waiting for a response.")
+    writer.sample("aidea_model_calls_in_flight", get_in_flight_call_count())
+
+    writer.header("aidea_active_sessions", "gauge", "Active idea sessions tracked by SessionManager instances.")
+    writer.sample("aidea_active_sessions", SessionManager.count_active_sessions())
+
+    rate_limit_stats = sorted(get_rate_limiter().get_stats().items())
+    writer.header("aidea_rate_limit_granted_total", "counter", "Model calls admitted by the rate limiter.")
+    for (api_key_id, model), stats in rate_limit_stats:
+        writer.sample("aidea_rate_limit_granted_total", stats["granted"], api_key=api_key_id, model=model)
+    writer.header("aidea_rate_limit_wait_seconds_total", "counter", "Time model calls spent waiting in the rate limiter.")
+    for (api_key_id, model), stats in rate_limit_stats:
+        writer.sample("aidea_rate_limit_wait_seconds_total", stats["wait_seconds"], api_key=api_key_id, model=model)
+    writer.header("aidea_rate_limit_throttled_total", "counter", "Quota exceeded (429) responses reported to the rate limiter.")
+    for (api_key_id, model), stats in rate_limit_stats:
+        writer.sample("aidea_rate_limit_throttled_total", stats["throttled"], api_key=api_key_id, model=model)
+    writer.header("aidea_rate_limit_waiting", "gauge", "Model calls currently waiting in the rate limiter.")
+    for (api_key_id, model), stats in rate_limit_stats:
+        writer.sample("aidea_rate_limit_waiting", stats["waiting"], api_key=api_key_id, model=model)
+
+    api_key_stats = sorted(get_api_key_pool().get_stats().items())
+    writer.header("aidea_api_key_calls_total", "counter", "Model calls dispatched to each pooled API key.")
+    for api_key_id, stats in api_key_stats:
+        writer.sample("aidea_api_key_calls_total", stats["calls"], api_key=api_key_id)
+    writer.header("aidea_api_key_failures_total", "counter", "Failed model calls on each pooled API key.")
+    for api_key_id, stats in api_key_stats:
+        writer.sample("aidea_api_key_failures_total", stats["failures"], api_key=api_key_id)
+    writer.header("aidea_api_key_in_flight", "gauge", "Model calls in flight or assigned on each pooled API key.")
+    for api_key_id, stats in api_key_stats:
+        writer.sample("aidea_api_key_in_flight", stats["in_flight"] + stats["assigned"], api_key=api_key_id)
+    writer.header("aidea_api_key_healthy", "gauge", "Whether each pooled API key is accepting calls (1) or paused (0).")
+    for api_key_id, stats in api_key_stats:
+        writer.sample("aidea_api_key_healthy", int(stats["healthy"]), api_key=api_key_id)
+
+    token_totals = token_ledger.aggregate("model")
+    writer.header("aidea_tokens_total", "counter", "Model tokens by kind.")
+    for model, totals in sorted(token_totals.items()):
+        for kind in ("prompt", "candidate", "cached"):
+            writer.sample("aidea_tokens_total", totals[f"{kind}_tokens"], model=model, kind=kind)
+    writer.header("aidea_cost_usd_total", "counter", "Estimated model cost in USD.")
+    for model, totals in sorted(token_totals.items()):
+        writer.sample("aidea_cost_usd_total", totals["cost_usd"], model=model)
+
+    with _counters_lock:
+        counters = sorted(_counters.items())
+        counter_help = dict(_counter_help)
+    written_headers = set()
+    for (name, labels), value in counters:
+        if name not in written_headers:
+            writer.header(name, "counter", counter_help[name])
+            written_headers.add(name)
+        writer.sample(name, value, **dict(labels))
+
+    return writer.text()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """/metrics 요청에 노출 형식 텍스트로 응답하는 HTTP 핸들러"""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 스크레이프 요청마다 콘솔 로그를 남기지 않음
+        pass
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[int]:
+    """
+    메트릭 HTTP 서버를 백그라운드 데몬 스레드로 시작합니다. 여러 번 호출해도 한 번만 시작됩니다.
+
+    Args:
+        port (int, optional): 포트. None이면 AIDEA_METRICS_PORT 환경 변수를 따르며, 없으면 시작하지 않음 (0은 임의 포트)
+        host (str, optional): 바인드 주소. None이면 AIDEA_METRICS_HOST 또는 127.0.0.1
+
+    Returns:
+        Optional[int]: 서버가 바인드된 포트, 비활성화 상태면 None
+    """
+    global _server
+
+    if port is None:
+        port_setting = os.getenv(METRICS_PORT_ENV)
+        if not port_setting:
+            return _server.server_address[1] if _server else None
+        try:
+            port = int(port_setting)
+        except ValueError:
+            print(f"Invalid {METRICS_PORT_ENV} value {port_setting!r}; metrics server not started")
+            return None
+    host = host or os.getenv(METRICS_HOST_ENV, DEFAULT_METRICS_HOST)
+
+    with _server_lock:
+        if _server is not None:
+            return _server.server_address[1]
+        try:
+            server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        except OSError as e:
+            print(f"Failed to start metrics server on {host}:{port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="aidea-metrics-server", daemon=True).start()
+        _server = server
+        print(f"Metrics endpoint enabled at http://{host}:{server.server_address[1]}/metrics")
+        return server.server_address[1]
+
+
+def stop_metrics_server() -> None:
+    """실행 중인 메트릭 서버를 종료합니다."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
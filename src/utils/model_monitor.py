@@ -7,11 +7,28 @@ AIdea Lab 모델 성능 모니터링 시스템
 
 import time
 import asyncio
+import math
+import threading
 from typing import Dict, List, Any, Optional, Tuple
 import json
 import os
 from datetime import datetime
 
+# 모델별로 보관할 최대 호출 기록 수 (초과 시 오래된 기록부터 제거)
+MAX_CALL_HISTORY = 1000
+
+# 최근 성능 지표(p95 응답 시간, 오류율)를 계산할 기본 호출 수
+DEFAULT_RECENT_WINDOW = 50
+
+# 점수 계산 시 p95 응답 시간의 상한 (초). 이 값 이상이면 응답 시간 점수는 0
+DEFAULT_LATENCY_CAP = 60.0
+
+# 스트림 지연 지표 이름
+STREAM_METRICS = ("time_to_first_event", "time_to_first_content", "inter_delta_gap", "stream_duration")
+
+# 지연 시간 히스토그램 버킷 상한 (초)
+LATENCY_HISTOGRAM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
 class AIModelMonitor:
     """AI 모델 성능 모니터링 클래스"""
     
@@ -25,7 +42,15 @@ class AIModelMonitor:
         self.response_times: Dict[str, List[float]] = {}
         self.success_rates: Dict[str, Dict[str, int]] = {}
         self.error_counts: Dict[str, Dict[str, int]] = {}
+        # 최근 호출 결과 (1: 성공, 0: 실패) - 누적 성공률과 달리 최근 오류율 계산에 사용
+        self.recent_outcomes: Dict[str, List[int]] = {}
+        # 이벤트 스트림 지연 지표: 모델 -> 역할 -> 지표 이름 -> 측정값(초) 목록
+        self.stream_timings: Dict[str, Dict[str, Dict[str, List[float]]]] = {}
+        # 프로세스 시작 이후의 지연 시간 히스토그램 (파일에 저장하지 않음):
+        # 지표 이름 -> 레이블 값 튜플 -> {"buckets": 버킷별 개수, "sum": 합계, "count": 개수}
+        self.histograms: Dict[str, Dict[Tuple[str, ...], Dict[str, Any]]] = {}
         self.log_file_path = log_file_path or "model_performance_logs.json"
+        self._lock = threading.RLock()
         
         # 기존 로그 파일 로드 (있는 경우)
         self._load_logs()
@@ -39,6 +64,8 @@ class AIModelMonitor:
                     self.response_times = logs.get('response_times', {})
                     self.success_rates = logs.get('success_rates', {})
                     self.error_counts = logs.get('error_counts', {})
+                    self.recent_outcomes = logs.get('recent_outcomes', {})
+                    self.stream_timings = logs.get('stream_timings', {})
                 print(f"Loaded existing model performance logs from {self.log_file_path}")
             except Exception as e:
                 print(f"Error loading model performance logs: {e}")
@@ -50,8 +77,13 @@ class AIModelMonitor:
                 'response_times': self.response_times,
                 'success_rates': self.success_rates,
                 'error_counts': self.error_counts,
+                'recent_outcomes': self.recent_outcomes,
+                'stream_timings': self.stream_timings,
                 'last_updated': datetime.now().isoformat()
             }
+            log_dir = os.path.dirname(self.log_file_path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
             with open(self.log_file_path, 'w') as f:
                 json.dump(logs, f, indent=2)
         except Exception as e:
@@ -67,28 +99,169 @@ class AIModelMonitor:
             response_time (float): 응답 시간 (초)
             error_type (str, optional): 에러 유형 (실패 시)
         """
-        # 모델 초기화 (첫 기록인 경우)
-        if model_name not in self.response_times:
-            self.response_times[model_name] = []
-            self.success_rates[model_name] = {"success": 0, "total": 0}
-            self.error_counts[model_name] = {}
-        
-        # 응답 시간 기록
-        self.response_times[model_name].append(response_time)
-        
-        # 성공률 업데이트
-        self.success_rates[model_name]["total"] += 1
-        if success:
-            self.success_rates[model_name]["success"] += 1
-        # 에러 유형 카운트
-        elif error_type:
-            if error_type not in self.error_counts[model_name]:
-                self.error_counts[model_name][error_type] = 0
-            self.error_counts[model_name][error_type] += 1
-        
-        # 정기적으로 로그 저장
-        if self.success_rates[model_name]["total"] % 10 == 0:
-            self._save_logs()
+        with self._lock:
+            # 모델 초기화 (첫 기록인 경우)
+            if model_name not in self.response_times:
+                self.response_times[model_name] = []
+                self.success_rates[model_name] = {"success": 0, "total": 0}
+                self.error_counts[model_name] = {}
+            
+            # 응답 시간 및 최근 호출 결과 기록 (최대 MAX_CALL_HISTORY개 유지)
+            self.response_times[model_name].append(response_time)
+            del self.response_times[model_name][:-MAX_CALL_HISTORY]
+            outcomes = self.recent_outcomes.setdefault(model_name, [])
+            outcomes.append(1 if success else 0)
+            del outcomes[:-MAX_CALL_HISTORY]
+            self._observe("response_seconds", (model_name,), response_time)
+            
+            # 성공률 업데이트
+            self.success_rates[model_name]["total"] += 1
+            if success:
+                self.success_rates[model_name]["success"] += 1
+            # 에러 유형 카운트
+            elif error_type:
+                if error_type not in self.error_counts[model_name]:
+                    self.error_counts[model_name][error_type] = 0
+                self.error_counts[model_name][error_type] += 1
+            
+            # 정기적으로 로그 저장
+            if self.success_rates[model_name]["total"] % 10 == 0:
+                self._save_logs()
+    
+    def record_stream_timing(self, model_name: str, role: str, time_to_first_event: float,
+                             time_to_first_content: Optional[float], inter_delta_gaps: List[float],
+                             stream_duration: float) -> None:
+        """
+        모델 호출 한 건의 이벤트 스트림 지연 지표를 기록합니다.
+        
+        Args:
+            model_name (str): 모델 이름
+            role (str): 에이전트 역할 (예: "marketer", "facilitator")
+            time_to_first_event (float): 모델 호출 시작부터 첫 이벤트까지 시간 (초)
+            time_to_first_content (float, optional): 모델 호출 시작부터 첫 텍스트 이벤트까지 시간 (초)
+            inter_delta_gaps (List[float]): 연속된 텍스트 이벤트 사이 간격 목록 (초)
+            stream_duration (float): 모델 호출 시작부터 마지막 이벤트까지 시간 (초)
+        """
+        measurements = {
+            "time_to_first_event": [time_to_first_event],
+            "time_to_first_content": [time_to_first_content] if time_to_first_content is not None else [],
+            "inter_delta_gap": list(inter_delta_gaps),
+            "stream_duration": [stream_duration],
+        }
+        with self._lock:
+            role_timings = self.stream_timings.setdefault(model_name, {}).setdefault(role, {})
+            for metric, values in measurements.items():
+                history = role_timings.setdefault(metric, [])
+                history.extend(values)
+                del history[:-MAX_CALL_HISTORY]
+                for value in values:
+                    self._observe(f"{metric}_seconds", (model_name, role), value)
+    
+    def _observe(self, metric: str, labels: Tuple[str, ...], value: float) -> None:
+        """히스토그램에 측정값을 추가합니다. 호출 측에서 self._lock을 잡고 있어야 합니다."""
+        histogram = self.histograms.setdefault(metric, {}).setdefault(labels, {
+            "buckets": [0] * len(LATENCY_HISTOGRAM_BUCKETS), "sum": 0.0, "count": 0
+        })
+        for index, upper_bound in enumerate(LATENCY_HISTOGRAM_BUCKETS):
+            if value <= upper_bound:
+                histogram["buckets"][index] += 1
+                break
+        histogram["sum"] += value
+        histogram["count"] += 1
+    
+    def get_metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        메트릭 노출용으로 현재 카운터와 히스토그램의 사본을 반환합니다.
+        
+        Returns:
+            Dict[str, Any]: success_rates, error_counts, histograms 사본
+        """
+        with self._lock:
+            return {
+                "success_rates": {model: dict(stats) for model, stats in self.success_rates.items()},
+                "error_counts": {model: dict(errors) for model, errors in self.error_counts.items()},
+                "histograms": {
+                    metric: {labels: {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]}
+                             for labels, h in series.items()}
+                    for metric, series in self.histograms.items()
+                },
+            }
+    
+    def get_stream_stats(self, model_name: str, role: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        이벤트 스트림 지연 지표의 분포(p50, p95, 최대값)를 반환합니다.
+        
+        Args:
+            model_name (str): 모델 이름
+            role (str, optional): 에이전트 역할. None이면 모든 역할을 합산
+            
+        Returns:
+            Dict[str, Dict[str, float]]: 지표 이름 -> {"count", "p50", "p95", "max"}
+        """
+        with self._lock:
+            model_timings = self.stream_timings.get(model_name, {})
+            roles = [role] if role is not None else list(model_timings)
+            merged = {metric: [] for metric in STREAM_METRICS}
+            for role_name in roles:
+                for metric, values in model_timings.get(role_name, {}).items():
+                    merged.setdefault(metric, []).extend(values)
+        
+        return {
+            metric: {
+                "count": len(values),
+                "p50": _percentile(values, 0.5),
+                "p95": _percentile(values, 0.95),
+                "max": max(values) if values else 0.0,
+            }
+            for metric, values in merged.items()
+        }
+    
+    def get_recent_stats(self, model_name: str, window: int = DEFAULT_RECENT_WINDOW) -> Dict[str, Any]:
+        """
+        최근 호출 기준의 모델 성능 지표를 반환합니다.
+        
+        Args:
+            model_name (str): 모델 이름
+            window (int): 지표를 계산할 최근 호출 수
+            
+        Returns:
+            Dict[str, Any]: samples(표본 수), error_rate(최근 오류율), p95_response_time(초)
+        """
+        with self._lock:
+            recent_times = list(self.response_times.get(model_name, [])[-window:])
+            recent_outcomes = list(self.recent_outcomes.get(model_name, [])[-window:])
+            cumulative = dict(self.success_rates.get(model_name, {"success": 0, "total": 0}))
+        
+        if recent_outcomes:
+            error_rate = 1 - sum(recent_outcomes) / len(recent_outcomes)
+        else:
+            # 이전 버전 로그처럼 최근 결과가 없으면 누적 성공률 사용
+            error_rate = 1 - cumulative["success"] / cumulative["total"] if cumulative["total"] else 0
+        
+        return {
+            "samples": len(recent_times),
+            "error_rate": error_rate,
+            "p95_response_time": _percentile(recent_times, 0.95),
+        }
+    
+    def score_model(self, model_name: str, window: int = DEFAULT_RECENT_WINDOW,
+                    latency_cap: float = DEFAULT_LATENCY_CAP, latency_weight: float = 0.2) -> float:
+        """
+        최근 오류율과 p95 응답 시간으로 모델 점수를 계산합니다 (높을수록 좋음).
+        
+        Args:
+            model_name (str): 모델 이름
+            window (int): 지표를 계산할 최근 호출 수
+            latency_cap (float): 응답 시간 점수가 0이 되는 p95 응답 시간 (초)
+            latency_weight (float): 응답 시간 점수의 가중치 (나머지는 성공률)
+            
+        Returns:
+            float: 모델 점수
+        """
+        stats = self.get_recent_stats(model_name, window)
+        success_rate = 1 - stats["error_rate"]
+        latency_penalty = min(stats["p95_response_time"], latency_cap) / latency_cap
+        return success_rate * (1 - latency_weight) - latency_penalty * latency_weight
     
     def get_model_performance(self, model_name: str) -> Dict[str, Any]:
         """
@@ -170,15 +343,12 @@ class AIModelMonitor:
         best_model = None
         best_score = -1
         
-        for model, stats in self.success_rates.items():
+        for model, stats in list(self.success_rates.items()):
             if stats["total"] < 5:
                 continue  # 충분한 데이터가 없는 모델은 제외
             
-            success_rate = stats["success"] / stats["total"] if stats["total"] > 0 else 0
-            avg_response_time = sum(self.response_times[model]) / len(self.response_times[model]) if self.response_times[model] else 0
-            
-            # 성능 점수 계산 (성공률 80%, 응답 시간 20%)
-            score = (success_rate * 0.8) - (min(avg_response_time, 10) / 10 * 0.2)
+            # 성능 점수 계산 (최근 성공률 80%, 최근 p95 응답 시간 20%)
+            score = self.score_model(model)
             
             if score > best_score:
                 best_score = score
@@ -189,6 +359,14 @@ class AIModelMonitor:
         
         return None
 
+def _percentile(values: List[float], fraction: float) -> float:
+    """값 목록의 백분위수를 nearest-rank 방식으로 계산합니다. 빈 목록이면 0을 반환합니다."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[rank]
+
 # 모니터링 측정 데코레이터
 def monitor_model_performance(monitor: AIModelMonitor):
     """
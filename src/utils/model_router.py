@@ -0,0 +1,311 @@
+"""
+AIdea Lab 자동 모델 선택 모듈
+
+이 모듈은 AIModelMonitor의 최근 성능 지표(p95 응답 시간, 오류율)와 설정된 품질 하한을 바탕으로
+오케스트레이터가 에이전트 역할별로 요청 시점에 모델을 선택하는 ModelRouter를 제공합니다.
+
+모델 호출 결과는 에이전트 모델 콜백(instrument_agent_model_monitoring)으로 모니터에 기록되고,
+호출 도중 예외로 끝난 요청과 이벤트 스트림 지연 지표(첫 이벤트/첫 텍스트까지 시간, 텍스트 간격,
+스트림 소요 시간)는 monitored_event_stream()이 모델과 역할별로 기록합니다.
+지연 지표가 첫 토큰 도착 시각을 반영하도록 컨트롤러는 Runner를 STREAMING_RUN_CONFIG(SSE 스트리밍)로 실행합니다.
+"""
+
+import contextvars
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+
+from config.models import AUTO_ROUTING_CONFIG, ModelType, get_model_quality_score
+from src.utils.agent_callbacks import attach_model_callbacks
+from src.utils.model_monitor import AIModelMonitor
+from src.utils.api_key_pool import current_api_key_id
+from src.utils.rate_limiter import get_rate_limiter, is_rate_limit_error, release_rate_limit_reservation
+from src.utils.request_coalescing import abandon_flights, flight_scope, publish_stream_event
+from src.utils.token_accounting import agent_role_from_name, discard_pending_prompt
+from src.utils.tracing import end_agent_spans
+
+# 모델 성능 로그 파일 (사이드바 성능 표시와 같은 파일 사용)
+MODEL_PERFORMANCE_LOG_PATH = "logs/model_performance.json"
+
+# 계측되는 Runner 실행 설정. SSE 모드에서는 모델 응답이 부분 응답 이벤트(partial)로 나뉘어 도착하고,
+# 마지막에 전체 텍스트를 담은 최종 이벤트가 옵니다 (출력 키 저장과 최종 응답 처리는 최종 이벤트 기준)
+STREAMING_RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+
+
+class ModelRouter:
+    """에이전트 역할별로 모델을 선택하는 라우터 클래스"""
+
+    def __init__(self, monitor: AIModelMonitor, candidates: Optional[Sequence[str]] = None,
+                 config: Optional[Dict[str, Any]] = None, rng: Optional[random.Random] = None):
+        """
+        모델 라우터 초기화
+
+        Args:
+            monitor (AIModelMonitor): 성능 지표를 제공하는 모니터
+            candidates (Sequence[str], optional): 후보 모델 ID 목록. 기본값은 ModelType의 모든 모델
+            config (Dict[str, Any], optional): 라우팅 설정. 기본값은 AUTO_ROUTING_CONFIG
+            rng (random.Random, optional): 탐색용 난수 생성기 (테스트용)
+        """
+        self.monitor = monitor
+        self.candidates = list(candidates or [model_type.value for model_type in ModelType])
+        self.config = {**AUTO_ROUTING_CONFIG, **(config or {})}
+        self._rng = rng or random.Random()
+        self._rng_lock = threading.Lock()
+
+    def get_quality_floor(self, role: str) -> float:
+        """역할에 적용되는 품질 하한을 반환합니다."""
+        floors = self.config["quality_floor"]
+        return floors.get(role, floors.get("default", 0.0))
+
+    def select_model(self, role: str, preferred_model: str) -> Tuple[str, str]:
+        """
+        역할에 사용할 모델을 선택합니다.
+
+        품질 하한을 만족하는 후보 중 (1) exploration_rate 확률로 무작위 후보를,
+        (2) 그 외에는 표본이 충분하고 오류율이 허용 범위인 후보 중 점수가 가장 높은 모델을 선택합니다.
+        판단할 근거가 없으면 사용자가 선택한 모델을 사용합니다.
+
+        Args:
+            role (str): 에이전트 역할 (예: "marketer", "facilitator", "final_summary")
+            preferred_model (str): 사용자가 선택한 모델 ID (동점 및 근거 부족 시 사용)
+
+        Returns:
+            Tuple[str, str]: (선택된 모델 ID, 선택 사유)
+        """
+        quality_floor = self.get_quality_floor(role)
+        eligible = [model for model in self.candidates if get_model_quality_score(model) >= quality_floor]
+        if not eligible:
+            return preferred_model, "no_candidate_meets_quality_floor"
+
+        with self._rng_lock:
+            explore = len(eligible) > 1 and self._rng.random() < self.config["exploration_rate"]
+            if explore:
+                return self._rng.choice(eligible), "exploration"
+
+        window = self.config["window_size"]
+        measured: List[Tuple[str, Dict[str, Any]]] = []
+        for model in eligible:
+            stats = self.monitor.get_recent_stats(model, window)
+            if stats["samples"] >= self.config["min_samples"]:
+                measured.append((model, stats))
+        if not measured:
+            fallback = preferred_model if preferred_model in eligible else eligible[0]
+            return fallback, "insufficient_data"
+
+        healthy = [(model, stats) for model, stats in measured if stats["error_rate"] <= self.config["max_error_rate"]]
+        if not healthy:
+            # 모든 후보가 불안정하면 오류율이 가장 낮은 모델 사용
+            model, _ = min(measured, key=lambda item: item[1]["error_rate"])
+            return model, "all_degraded"
+
+        def score(item: Tuple[str, Dict[str, Any]]) -> Tuple[float, bool]:
+            model, _ = item
+            model_score = self.monitor.score_model(
+                model,
+                window=window,
+                latency_cap=self.config["latency_cap_seconds"],
+                latency_weight=self.config["latency_weight"]
+            )
+            return model_score, model == preferred_model
+
+        model, _ = max(healthy, key=score)
+        return model, "best_score"
+
+
+_default_router: Optional[ModelRouter] = None
+_default_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """애플리케이션 전역 모델 라우터를 반환합니다 (첫 호출 시 성능 로그를 로드하여 생성)."""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter(AIModelMonitor(log_file_path=MODEL_PERFORMANCE_LOG_PATH))
+        return _default_router
+
+
+# 진행 중인 모델 호출: (invocation_id, agent_name) -> 호출 정보
+_pending_calls: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_pending_lock = threading.Lock()
+
+# monitored_event_stream() 안에서 시작된 모델 호출 목록
+_call_scope: contextvars.ContextVar = contextvars.ContextVar("aidea_model_call_scope", default=None)
+
+
+def get_in_flight_call_count() -> int:
+    """현재 진행 중인(응답을 기다리는) 모델 호출 수를 반환합니다."""
+    with _pending_lock:
+        return len(_pending_calls)
+
+
+def _start_model_call(callback_context: Any, llm_request: Any) -> None:
+    """모델 호출 시작 시각을 기록합니다 (LlmAgent before_model_callback)."""
+    agent = callback_context._invocation_context.agent
+    call = {
+        "model": llm_request.model or agent.canonical_model.model,
+        "invocation_id": callback_context.invocation_id,
+        "agent_name": callback_context.agent_name,
+        "api_key_id": current_api_key_id(),
+        "start_time": time.perf_counter(),
+        "finished": False,
+        "first_event_time": None,
+        "first_content_time": None,
+        "last_content_time": None,
+        "last_event_time": None,
+        "inter_delta_gaps": [],
+    }
+    with _pending_lock:
+        _pending_calls[(callback_context.invocation_id, callback_context.agent_name)] = call
+    scope = _call_scope.get()
+    if scope is not None:
+        scope.append(call)
+    return None
+
+
+def _finish_model_call(callback_context: Any, llm_response: Any) -> None:
+    """최종 모델 응답의 성공 여부와 응답 시간을 모니터에 기록합니다 (LlmAgent after_model_callback)."""
+    if llm_response.partial:
+        return None
+
+    with _pending_lock:
+        call = _pending_calls.pop((callback_context.invocation_id, callback_context.agent_name), None)
+    if call is None:
+        return None
+
+    call["finished"] = True
+    get_model_router().monitor.record_api_call(
+        call["model"],
+        success=not llm_response.error_code,
+        response_time=time.perf_counter() - call["start_time"],
+        error_type=llm_response.error_code
+    )
+    return None
+
+
+def _has_text(event: Any) -> bool:
+    """이벤트가 텍스트 내용(부분 응답 또는 전체 응답)을 담고 있는지 확인합니다."""
+    return bool(event.content and event.content.parts and any(part.text for part in event.content.parts))
+
+
+def _track_stream_event(scope: List[Dict[str, Any]], event: Any, now: float) -> None:
+    """
+    이벤트를 작성한 에이전트의 가장 최근 모델 호출에 이벤트 도착 시각을 기록합니다.
+    텍스트 간격은 부분 응답 이벤트 사이에서만 기록합니다 (부분 응답 뒤의 최종 이벤트는 같은 텍스트를 모은 것이므로 제외).
+    """
+    call = next((call for call in reversed(scope) if call["agent_name"] == event.author), None)
+    if call is None:
+        return
+
+    if call["first_event_time"] is None:
+        call["first_event_time"] = now
+    call["last_event_time"] = now
+    if _has_text(event):
+        if call["first_content_time"] is None:
+            call["first_content_time"] = now
+        elif event.partial:
+            call["inter_delta_gaps"].append(now - call["last_content_time"])
+        call["last_content_time"] = now
+
+
+def _record_stream_timings(monitor: AIModelMonitor, scope: List[Dict[str, Any]]) -> None:
+    """스트림에서 이벤트를 받은 모델 호출들의 지연 지표를 모니터에 기록합니다."""
+    for call in scope:
+        if call["first_event_time"] is None:
+            continue
+        start_time = call["start_time"]
+        monitor.record_stream_timing(
+            call["model"],
+            agent_role_from_name(call["agent_name"]),
+            time_to_first_event=call["first_event_time"] - start_time,
+            time_to_first_content=(call["first_content_time"] - start_time) if call["first_content_time"] is not None else None,
+            inter_delta_gaps=call["inter_delta_gaps"],
+            stream_duration=call["last_event_time"] - start_time
+        )
+
+
+async def monitored_event_stream(event_stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """
+    ADK Runner 이벤트 스트림을 감싸 모델 호출별 스트림 지연 지표와 예외로 중단된 호출을 모니터에 기록합니다.
+
+    지연 지표는 모델 호출 시작(before_model_callback) 시점을 기준으로 한 첫 이벤트까지 시간,
+    첫 텍스트 이벤트(첫 토큰)까지 시간, 연속된 부분 응답 이벤트 사이 간격, 마지막 이벤트까지 시간입니다.
+    Runner를 STREAMING_RUN_CONFIG로 실행해야 부분 응답 이벤트가 오며, 그렇지 않으면 호출당 텍스트 이벤트가
+    하나이므로 첫 텍스트까지 시간이 전체 응답 시간과 같고 간격은 기록되지 않습니다.
+
+    ADK는 모델 호출이 예외로 끝나면 after_model_callback을 호출하지 않으므로,
+    레이트 리밋 등으로 실패한 호출은 이 래퍼를 통해서만 오류율에 반영되며,
+    할당량 초과(429)로 실패한 호출은 레이트 리미터에도 보고되어 같은 키와 모델의 호출이 함께 속도를 줄입니다.
+    스트림이 끝나면 이런 호출이 남긴 레이트 리미터 예약(정산 또는 반환)과 프롬프트 추정을 정리하고,
+    열려 있는 추적 스팬은 오류 상태로 닫아 내보냅니다.
+
+    또한 스트림 안에서 동일 요청 병합의 리더로 등록된 호출의 최종 응답을 기다리는 다른 호출들에게 공개하고,
+    스트림이 끝날 때 응답을 공개하지 못한 리더를 정리합니다.
+
+    Args:
+        event_stream (AsyncIterator): runner.run_async()가 반환한 이벤트 스트림
+
+    Yields:
+        Event: 원본 이벤트
+    """
+    scope: List[Dict[str, Any]] = []
+    token = _call_scope.set(scope)
+    flights: List[Dict[str, Any]] = []
+    flight_token = flight_scope.set(flights)
+    monitor = get_model_router().monitor
+    throttled = False
+    error: Optional[BaseException] = None
+    try:
+        async for event in event_stream:
+            _track_stream_event(scope, event, time.perf_counter())
+            publish_stream_event(flights, event)
+            yield event
+    except Exception as e:
+        error = e
+        throttled = is_rate_limit_error(e)
+        for call in scope:
+            if not call["finished"]:
+                call["finished"] = True
+                if throttled:
+                    get_rate_limiter().report_throttled(call["model"], api_key_id=call["api_key_id"])
+                monitor.record_api_call(
+                    call["model"],
+                    success=False,
+                    response_time=time.perf_counter() - call["start_time"],
+                    error_type=type(e).__name__
+                )
+        raise
+    finally:
+        abandon_flights(flights)
+        _record_stream_timings(monitor, scope)
+        scope_ids = {id(call) for call in scope}
+        with _pending_lock:
+            for key in [key for key, call in _pending_calls.items() if id(call) in scope_ids]:
+                del _pending_calls[key]
+        for call in scope:
+            # 예외나 취소로 after_model_callback이 호출되지 않은 호출의 콜백 상태 정리 (정상 종료한 호출은 이미 정리됨)
+            release_rate_limit_reservation(call["invocation_id"], call["agent_name"], throttled=throttled)
+            discard_pending_prompt(call["invocation_id"], call["agent_name"])
+            end_agent_spans(call["invocation_id"], call["agent_name"], error)
+        for context_var, context_token in ((_call_scope, token), (flight_scope, flight_token)):
+            try:
+                context_var.reset(context_token)
+            except ValueError:
+                # 다른 컨텍스트에서 스트림이 정리되는 경우
+                pass
+
+
+def instrument_agent_model_monitoring(agent: Any) -> Any:
+    """
+    LlmAgent에 모델 호출 성능 기록 콜백을 연결합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, before=_start_model_call, after=_finish_model_call)
@@ -0,0 +1,323 @@
+"""
+AIdea Lab 프로세스 전역 레이트 리미터
+
+이 모듈은 모든 세션과 에이전트의 모델 호출이 공유하는 토큰 버킷 레이트 리미터를 제공합니다.
+
+- API 키(api_key_pool이 호출마다 배정한 키)와 모델 쌍마다 분당 요청 수와 분당 토큰 수 두 가지 버킷을 두고,
+  할당량(config.models의 rate_limit)에 target_utilization을 곱한 속도로 채워 할당량 바로 아래에서 호출하도록 합니다.
+- 대기 중인 호출은 세션별 대기열에 들어가고, 세션들이 돌아가며(라운드 로빈) 차례를 받으므로
+  한 세션이 버킷을 독점하지 않습니다.
+- 토큰은 호출 전에 프롬프트 추정치와 예상 출력 토큰만큼 예약하고, 응답 후 실제 사용량으로 정산합니다.
+- 할당량 초과(429) 응답을 받으면 해당 버킷의 모든 호출을 잠시 멈추고 속도 배율을 낮춘 뒤,
+  초과 없이 시간이 지나면 배율을 천천히 회복합니다 (할당량을 모르는 키에도 적응).
+
+Streamlit은 세션마다 다른 스레드의 이벤트 루프에서 실행되므로 상태는 threading.Lock으로 보호하고,
+대기는 각 호출의 이벤트 루프에서 asyncio.sleep으로 합니다.
+
+instrument_agent_rate_limit()은 LlmAgent의 before/after 모델 콜백으로 리미터를 연결합니다.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from config.models import RATE_LIMIT_CONFIG, get_model_rate_limit
+from src.utils.agent_callbacks import attach_model_callbacks
+from src.utils.api_key_pool import current_api_key_id, is_rate_limit_error
+from src.utils.token_accounting import estimate_call_prompt, estimate_response_tokens
+
+RATE_LIMIT_RPM_ENV = "AIDEA_RATE_LIMIT_RPM"
+RATE_LIMIT_TPM_ENV = "AIDEA_RATE_LIMIT_TPM"
+
+
+class _Bucket:
+    """API 키와 모델 하나의 요청/토큰 버킷과 세션별 대기열"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, config: Dict[str, Any], now: float):
+        utilization = config["target_utilization"]
+        self.request_rate = requests_per_minute * utilization / 60.0
+        self.token_rate = tokens_per_minute * utilization / 60.0
+        self.request_capacity = max(1.0, self.request_rate * config["burst_seconds"])
+        self.token_capacity = max(1.0, self.token_rate * config["burst_seconds"])
+        self.requests = self.request_capacity
+        self.tokens = self.token_capacity
+        self.rate_scale = 1.0
+        self.updated_at = now
+        self.blocked_until = 0.0
+        self.last_throttled_at: Optional[float] = None
+        # 세션 ID -> 대기 중인 호출 표. 맨 앞 세션의 맨 앞 호출이 다음 차례
+        self.waiters: "OrderedDict[str, Deque[object]]" = OrderedDict()
+        self.granted = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def refill(self, now: float, config: Dict[str, Any]) -> None:
+        elapsed = max(0.0, now - self.updated_at)
+        self.updated_at = now
+        if self.rate_scale < 1.0 and self.last_throttled_at is not None and now - self.last_throttled_at > 60.0:
+            self.rate_scale = min(1.0, self.rate_scale + config["rate_recovery_per_minute"] * elapsed / 60.0)
+        self.requests = min(self.request_capacity, self.requests + self.request_rate * self.rate_scale * elapsed)
+        self.tokens = min(self.token_capacity, self.tokens + self.token_rate * self.rate_scale * elapsed)
+
+    def is_next(self, session_id: str, ticket: object) -> bool:
+        first_session = next(iter(self.waiters), None)
+        return first_session == session_id and self.waiters[session_id][0] is ticket
+
+    def remove(self, session_id: str, ticket: object, rotate: bool = False) -> None:
+        queue = self.waiters.get(session_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(ticket)
+        except ValueError:
+            return
+        if not queue:
+            del self.waiters[session_id]
+        elif rotate:
+            # 같은 세션의 다음 호출은 다른 세션들 뒤로
+            self.waiters.move_to_end(session_id)
+
+    def time_until_available(self, tokens: float) -> float:
+        """요청 1개와 tokens만큼의 여유가 생길 때까지 남은 시간 (버킷 용량보다 큰 요청은 가득 찼을 때 허용)"""
+        needed_tokens = min(tokens, self.token_capacity)
+        request_wait = max(0.0, 1.0 - self.requests) / (self.request_rate * self.rate_scale)
+        token_wait = max(0.0, needed_tokens - self.tokens) / (self.token_rate * self.rate_scale)
+        return max(request_wait, token_wait)
+
+
+class RateLimiter:
+    """API 키와 모델별 토큰 버킷을 관리하는 프로세스 전역 레이트 리미터"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        레이트 리미터 초기화
+
+        Args:
+            config (Dict[str, Any], optional): 리미터 설정. 기본값은 RATE_LIMIT_CONFIG
+        """
+        self.config = {**RATE_LIMIT_CONFIG, **(config or {})}
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, api_key_id: str, model: str, now: float) -> _Bucket:
+        key = (api_key_id, model)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = get_model_rate_limit(model)
+            requests_per_minute = float(os.getenv(RATE_LIMIT_RPM_ENV) or limit["requests_per_minute"])
+            tokens_per_minute = float(os.getenv(RATE_LIMIT_TPM_ENV) or limit["tokens_per_minute"])
+            bucket = _Bucket(requests_per_minute, tokens_per_minute, self.config, now)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, model: str, tokens: int, session_id: str = "", api_key_id: Optional[str] = None) -> float:
+        """
+        호출 1개와 tokens만큼의 할당량을 얻을 때까지 기다립니다. 같은 버킷을 기다리는 세션들은 돌아가며 차례를 받습니다.
+
+        Args:
+            model (str): 모델 ID
+            tokens (int): 예약할 토큰 수 (프롬프트 추정치 + 예상 출력)
+            session_id (str): 공정한 차례 배분에 사용할 세션 ID
+            api_key_id (str, optional): API 키 식별자. 기본값은 current_api_key_id()
+
+        Returns:
+            float: 대기한 시간 (초)
+        """
+        if not self.config["enabled"]:
+            return 0.0
+
+        api_key_id = api_key_id or current_api_key_id()
+        started_at = time.monotonic()
+        ticket = object()
+        with self._lock:
+            bucket = self._get_bucket(api_key_id, model, started_at)
+            bucket.waiters.setdefault(session_id, deque()).append(ticket)
+
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    bucket.refill(now, self.config)
+                    if now < bucket.blocked_until:
+                        delay = bucket.blocked_until - now
+                    elif not bucket.is_next(session_id, ticket):
+                        delay = self.config["poll_interval_seconds"]
+                    else:
+                        delay = bucket.time_until_available(tokens)
+                        if delay <= 0:
+                            bucket.requests -= 1.0
+                            bucket.tokens -= tokens
+                            bucket.remove(session_id, ticket, rotate=True)
+                            waited = now - started_at
+                            bucket.granted += 1
+                            bucket.wait_seconds += waited
+                            return waited
+                await asyncio.sleep(delay)
+        except BaseException:
+            # 취소되거나 실패한 호출은 대기열에서 제거하여 다른 세션의 차례를 막지 않음
+            with self._lock:
+                bucket.remove(session_id, ticket)
+            raise
+
+    def settle(self, model: str, reserved_tokens: int, actual_tokens: int, api_key_id: Optional[str] = None) -> None:
+        """
+        예약한 토큰을 실제 사용량으로 정산합니다 (남은 예약분은 돌려주고 초과분은 차감).
+
+        Args:
+            model (str): 모델 ID
+            reserved_tokens (int): acquire()에서 예약한 토큰 수
+            actual_tokens (int): 실제 사용한 토큰 수
+            api_key_id (str, optional): API 키 식별자
+        """
+        if not self.config["enabled"]:
+            return
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._get_bucket(api_key_id or current_api_key_id(), model, now)
+            bucket.refill(now, self.config)
+            bucket.tokens = min(bucket.token_capacity, bucket.tokens + reserved_tokens - actual_tokens)
+
+    def report_throttled(self, model: str, api_key_id: Optional[str] = None) -> None:
+        """
+        할당량 초과(429) 응답을 기록합니다. 버킷을 비우고 잠시 모든 호출을 멈춘 뒤 더 낮은 속도로 재개합니다.
+
+        Args:
+            model (str): 모델 ID
+            api_key_id (str, optional): API 키 식별자
+        """
+        if not self.config["enabled"]:
+            return
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._get_bucket(api_key_id or current_api_key_id(), model, now)
+            bucket.refill(now, self.config)
+            # 같은 초과에 대한 여러 호출의 보고는 한 번만 반영
+            if now < bucket.blocked_until:
+                return
+            bucket.rate_scale = max(self.config["min_rate_scale"], bucket.rate_scale * self.config["throttle_backoff"])
+            bucket.requests = min(bucket.requests, 0.0)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.blocked_until = now + self.config["throttle_cooldown_seconds"]
+            bucket.last_throttled_at = now
+            bucket.throttled += 1
+        print(f"WARNING: Rate limit reached for model '{model}'. Pausing calls for "
+              f"{self.config['throttle_cooldown_seconds']:.0f}s and reducing rate to {bucket.rate_scale:.0%}.")
+
+    def get_stats(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        버킷별 상태를 반환합니다 (메트릭 노출용).
+
+        Returns:
+            Dict[Tuple[str, str], Dict[str, Any]]: (API 키 식별자, 모델) -> granted, throttled, wait_seconds, waiting, rate_scale
+        """
+        with self._lock:
+            return {
+                key: {
+                    "granted": bucket.granted,
+                    "throttled": bucket.throttled,
+                    "wait_seconds": bucket.wait_seconds,
+                    "waiting": sum(len(queue) for queue in bucket.waiters.values()),
+                    "rate_scale": bucket.rate_scale,
+                }
+                for key, bucket in self._buckets.items()
+            }
+
+
+_default_rate_limiter: Optional[RateLimiter] = None
+_default_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """애플리케이션 전역 레이트 리미터를 반환합니다."""
+    global _default_rate_limiter
+    with _default_rate_limiter_lock:
+        if _default_rate_limiter is None:
+            _default_rate_limiter = RateLimiter()
+        return _default_rate_limiter
+
+
+# 진행 중인 모델 호출의 예약: (invocation_id, agent_name) -> (모델, API 키 식별자, 예약 토큰 수, 프롬프트 추정 토큰 수)
+_reservations: Dict[Tuple[str, str], Tuple[str, str, int, int]] = {}
+_reservations_lock = threading.Lock()
+
+
+async def _acquire_rate_limit(callback_context: Any, llm_request: Any) -> None:
+    """모델 호출 전에 레이트 리미터의 차례를 기다립니다 (LlmAgent before_model_callback)."""
+    limiter = get_rate_limiter()
+    invocation_context = callback_context._invocation_context
+    model = llm_request.model or invocation_context.agent.canonical_model.model
+    config = getattr(llm_request, "config", None)
+    expected_output_tokens = getattr(config, "max_output_tokens", None) or limiter.config["expected_output_tokens"]
+    prompt_tokens = estimate_call_prompt(callback_context, llm_request)[1]
+    reserved_tokens = prompt_tokens + expected_output_tokens
+    api_key_id = current_api_key_id()
+
+    waited = await limiter.acquire(model, reserved_tokens, session_id=invocation_context.session.id, api_key_id=api_key_id)
+    if waited >= 1.0:
+        print(f"INFO: Rate limiter delayed '{callback_context.agent_name}' by {waited:.1f}s.")
+    with _reservations_lock:
+        _reservations[(callback_context.invocation_id, callback_context.agent_name)] = (model, api_key_id, reserved_tokens, prompt_tokens)
+    return None
+
+
+def _settle_rate_limit(callback_context: Any, llm_response: Any) -> None:
+    """응답의 실제 토큰 사용량으로 예약을 정산하고, 할당량 초과 응답을 보고합니다 (LlmAgent after_model_callback)."""
+    if llm_response.partial:
+        return None
+
+    with _reservations_lock:
+        reservation = _reservations.pop((callback_context.invocation_id, callback_context.agent_name), None)
+    if reservation is None:
+        return None
+
+    model, api_key_id, reserved_tokens, prompt_tokens = reservation
+    limiter = get_rate_limiter()
+    if llm_response.error_code and is_rate_limit_error(llm_response.error_code):
+        limiter.report_throttled(model, api_key_id=api_key_id)
+        return None
+
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None and usage.total_token_count:
+        actual_tokens = usage.total_token_count
+    else:
+        actual_tokens = prompt_tokens + estimate_response_tokens(llm_response)
+    limiter.settle(model, reserved_tokens, actual_tokens, api_key_id=api_key_id)
+    return None
+
+
+def release_rate_limit_reservation(invocation_id: str, agent_name: str, throttled: bool = False) -> None:
+    """
+    응답 없이 끝난(예외, 취소) 모델 호출의 예약을 정리합니다 (monitored_event_stream에서 호출).
+    ADK는 모델 호출이 예외로 끝나면 after_model_callback을 호출하지 않으므로 _settle_rate_limit 대신 정산합니다.
+    할당량 초과로 끝난 호출은 report_throttled()가 버킷을 이미 비웠으므로 돌려주지 않고,
+    그 외에는 프롬프트 추정치만 사용한 것으로 보고 나머지 예약을 돌려줍니다.
+
+    Args:
+        invocation_id (str): 호출의 invocation ID
+        agent_name (str): 에이전트 이름
+        throttled (bool): 할당량 초과(429)로 끝났는지 여부
+    """
+    with _reservations_lock:
+        reservation = _reservations.pop((invocation_id, agent_name), None)
+    if reservation is None or throttled:
+        return
+
+    model, api_key_id, reserved_tokens, prompt_tokens = reservation
+    get_rate_limiter().settle(model, reserved_tokens, prompt_tokens, api_key_id=api_key_id)
+
+
+def instrument_agent_rate_limit(agent: Any) -> Any:
+    """
+    LlmAgent에 레이트 리미터 콜백을 연결합니다.
+    대기 시간이 응답 시간 지표에 포함되지 않도록 다른 계측 콜백보다 먼저 연결합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, before=_acquire_rate_limit, after=_settle_rate_limit)
@@ -0,0 +1,171 @@
+"""
+AIdea Lab 동일 모델 요청 병합 모듈
+
+이 모듈은 이미 진행 중인 모델 호출과 바이트 단위로 같은 요청(모델, 생성 설정, 렌더링된 프롬프트와 대화 내용)을
+감지하여, 중복 요청은 모델을 다시 호출하지 않고 먼저 보낸 호출(리더)의 응답을 함께 받도록 합니다(single-flight).
+
+- 중복 요청(팔로워)은 before_model_callback에서 리더의 응답을 기다렸다가 그 사본을 모델 응답으로 반환하므로
+  모델 호출, 레이트 리미터 할당량, 이후 계측 콜백을 모두 건너뜁니다.
+- 리더의 응답은 monitored_event_stream()이 리더 에이전트의 최종 이벤트를 받을 때 공개되므로,
+  팔로워는 after 콜백(구조화 보고서 해석 등)까지 적용된 최종 내용을 받습니다.
+- 리더가 실패하거나 취소되면 팔로워는 각자 모델을 호출합니다. 팔로워가 취소되어도 리더와 다른 팔로워에는 영향이 없습니다.
+- temperature > 0(또는 미지정)인 요청은 응답이 매번 달라질 수 있으므로 REQUEST_COALESCING_CONFIG["sampled_roles"]에
+  나열한 역할만 병합합니다.
+
+리더 등록은 monitored_event_stream() 안에서 실행되는 호출에만 적용되며, 스트림이 끝나면 정리됩니다.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from google.adk.models import LlmResponse
+
+from config.models import REQUEST_COALESCING_CONFIG
+from src.utils.agent_callbacks import attach_model_callbacks
+from src.utils.token_accounting import agent_role_from_name
+
+COALESCE_SAMPLED_ROLES_ENV = "AIDEA_COALESCE_SAMPLED_ROLES"
+
+# 진행 중인 리더 호출: 요청 지문 -> 호출 정보
+_in_flight: Dict[str, Dict[str, Any]] = {}
+_in_flight_lock = threading.Lock()
+
+# monitored_event_stream() 안에서 등록된 리더 호출 목록
+flight_scope: contextvars.ContextVar = contextvars.ContextVar("aidea_request_flight_scope", default=None)
+
+
+class LeaderCallFailed(Exception):
+    """리더 호출이 응답을 공개하지 못하고 끝났음을 팔로워에게 알리는 예외"""
+
+
+def request_fingerprint(llm_request: Any) -> str:
+    """
+    모델 요청의 지문을 계산합니다. 모델, 생성 설정(시스템 지시문 포함), 대화 내용이 같으면 같은 지문이 나옵니다.
+
+    Args:
+        llm_request: ADK LlmRequest 객체
+
+    Returns:
+        str: SHA-256 지문
+    """
+    payload = llm_request.model_dump(mode="json", exclude={"tools_dict", "live_connect_config"}, exclude_none=True)
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _sampled_roles() -> List[str]:
+    setting = os.getenv(COALESCE_SAMPLED_ROLES_ENV)
+    if setting is not None:
+        return [role.strip() for role in setting.split(",") if role.strip()]
+    return REQUEST_COALESCING_CONFIG["sampled_roles"]
+
+
+def is_coalescible(agent_name: str, llm_request: Any) -> bool:
+    """
+    요청을 병합해도 되는지 확인합니다. 결정적 요청(temperature 0)이거나 병합을 허용한 역할이어야 합니다.
+
+    Args:
+        agent_name (str): 에이전트 이름
+        llm_request: ADK LlmRequest 객체
+
+    Returns:
+        bool: 병합 가능 여부
+    """
+    if not REQUEST_COALESCING_CONFIG["enabled"]:
+        return False
+    config = getattr(llm_request, "config", None)
+    temperature = getattr(config, "temperature", None) if config else None
+    if temperature is not None and temperature <= 0:
+        return True
+    roles = _sampled_roles()
+    return "*" in roles or agent_role_from_name(agent_name) in roles
+
+
+def get_in_flight_request_count() -> int:
+    """현재 다른 호출이 응답을 공유받을 수 있는 진행 중인 리더 호출 수를 반환합니다."""
+    with _in_flight_lock:
+        return len(_in_flight)
+
+
+async def _coalesce_request(callback_context: Any, llm_request: Any) -> Optional[LlmResponse]:
+    """같은 요청이 진행 중이면 그 응답을 기다려 반환하고, 아니면 리더로 등록합니다 (LlmAgent before_model_callback)."""
+    scope = flight_scope.get()
+    if scope is None or not is_coalescible(callback_context.agent_name, llm_request):
+        return None
+
+    key = request_fingerprint(llm_request)
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        if flight is None:
+            flight = {"key": key, "agent_name": callback_context.agent_name,
+                      "future": concurrent.futures.Future(), "followers": 0}
+            _in_flight[key] = flight
+            scope.append(flight)
+            return None
+        flight["followers"] += 1
+
+    try:
+        # shield: 이 호출이 취소되어도 공유 결과는 취소하지 않음
+        response = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(flight["future"])),
+            REQUEST_COALESCING_CONFIG["follower_timeout_seconds"]
+        )
+    except (asyncio.TimeoutError, LeaderCallFailed):
+        print(f"INFO: Shared request for '{callback_context.agent_name}' did not complete; calling the model directly.")
+        return None
+
+    print(f"INFO: Reused in-flight response for identical request from '{callback_context.agent_name}'.")
+    return response.model_copy(deep=True)
+
+
+def _finish_flight(flight: Dict[str, Any], response: Optional[LlmResponse]) -> None:
+    with _in_flight_lock:
+        if _in_flight.get(flight["key"]) is flight:
+            del _in_flight[flight["key"]]
+    if not flight["future"].done():
+        if response is not None:
+            flight["future"].set_result(response)
+        else:
+            flight["future"].set_exception(LeaderCallFailed(flight["agent_name"]))
+
+
+def publish_stream_event(scope: List[Dict[str, Any]], event: Any) -> None:
+    """
+    리더 에이전트의 최종 응답 이벤트를 기다리는 팔로워들에게 공개합니다 (monitored_event_stream에서 호출).
+
+    Args:
+        scope (List[Dict[str, Any]]): 스트림 안에서 등록된 리더 호출 목록
+        event: ADK 이벤트
+    """
+    if event.partial or not event.content or not event.content.parts:
+        return
+    for flight in scope:
+        if flight["agent_name"] == event.author and not flight["future"].done():
+            _finish_flight(flight, LlmResponse(content=event.content.model_copy(deep=True)))
+            return
+
+
+def abandon_flights(scope: List[Dict[str, Any]]) -> None:
+    """응답을 공개하지 못한 리더 호출을 정리하고, 기다리던 팔로워들이 직접 호출하도록 합니다."""
+    for flight in scope:
+        if not flight["future"].done():
+            _finish_flight(flight, None)
+
+
+def instrument_agent_request_coalescing(agent: Any) -> Any:
+    """
+    LlmAgent에 동일 요청 병합 콜백을 연결합니다.
+    팔로워가 레이트 리미터 할당량을 쓰지 않도록 레이트 리미터보다 먼저 연결합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, before=_coalesce_request)
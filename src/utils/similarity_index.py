@@ -0,0 +1,215 @@
+"""
+AIdea Lab 유사 아이디어 색인
+
+이 모듈은 과거에 분석한 아이디어 텍스트 중 공백, 문장부호, 몇 단어만 다른 유사 아이디어를
+빠르게 찾기 위한 MinHash/LSH 색인을 제공합니다.
+
+- 텍스트는 정규화(소문자, 문장부호/공백 제거) 후 문자 3-gram 집합으로 변환됩니다 (한국어에도 동작).
+- 각 집합은 num_perm개의 해시 최솟값으로 이루어진 MinHash 서명으로 요약되며, 두 서명이 일치하는 비율이
+  원래 집합의 자카드 유사도 추정치가 됩니다.
+- 서명을 band 단위로 나눈 LSH 버킷으로 후보만 비교하므로 색인 크기와 무관하게 빠르게 조회됩니다.
+- 외부 서비스 없이 동작하며, max_entries를 넘으면 가장 오래된 항목부터 제거되어 메모리 사용량이 제한됩니다.
+"""
+
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# MinHash 순열 수와 LSH band 수 (band당 행 수 = num_perm / bands)
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+
+# 색인에 보관할 최대 항목 수
+DEFAULT_MAX_INDEX_ENTRIES = 20000
+
+# 문자 n-gram 크기
+SHINGLE_SIZE = 3
+
+# 메르센 소수 (2^31 - 1): 32비트 해시와 31비트 계수의 곱이 uint64 범위 안에 머무름
+_MERSENNE_PRIME = (1 << 31) - 1
+
+_NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_for_similarity(text: str) -> str:
+    """유사도 비교용으로 텍스트를 정규화합니다 (NFKC, 소문자, 문장부호와 공백 제거)."""
+    return _NON_WORD_PATTERN.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def shingle_hashes(text: str, shingle_size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    정규화된 텍스트의 문자 n-gram 집합을 32비트 해시 배열로 반환합니다.
+
+    Args:
+        text (str): 원본 텍스트
+        shingle_size (int): n-gram 크기
+
+    Returns:
+        np.ndarray: 중복이 제거된 uint64 해시 배열 (빈 텍스트면 빈 배열)
+    """
+    normalized = normalize_for_similarity(text)
+    if not normalized:
+        return np.empty(0, dtype=np.uint64)
+    if len(normalized) <= shingle_size:
+        shingles = {normalized}
+    else:
+        shingles = {normalized[i:i + shingle_size] for i in range(len(normalized) - shingle_size + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def jaccard_similarity(first: str, second: str, shingle_size: int = SHINGLE_SIZE) -> float:
+    """
+    두 텍스트의 문자 n-gram 자카드 유사도를 정확히 계산합니다 (짧은 텍스트 비교용).
+
+    Args:
+        first (str): 첫 번째 텍스트
+        second (str): 두 번째 텍스트
+        shingle_size (int): n-gram 크기
+
+    Returns:
+        float: 유사도 (0~1, 둘 다 비어 있으면 0)
+    """
+    first_hashes = shingle_hashes(first, shingle_size)
+    second_hashes = shingle_hashes(second, shingle_size)
+    union = np.union1d(first_hashes, second_hashes).size
+    if union == 0:
+        return 0.0
+    return np.intersect1d(first_hashes, second_hashes).size / union
+
+
+class MinHashLSHIndex:
+    """MinHash 서명과 LSH 버킷을 사용하는 유사 텍스트 색인"""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS,
+                 max_entries: int = DEFAULT_MAX_INDEX_ENTRIES, seed: int = 1):
+        """
+        유사 텍스트 색인 초기화
+
+        Args:
+            num_perm (int): MinHash 순열(해시 함수) 수
+            bands (int): LSH band 수 (num_perm의 약수여야 함)
+            max_entries (int): 보관할 최대 항목 수 (초과 시 가장 오래된 항목부터 제거)
+            seed (int): 해시 계수 난수 시드 (같은 시드의 색인끼리만 서명을 비교할 수 있음)
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.max_entries = max_entries
+
+        rng = np.random.default_rng(seed)
+        self._coef_a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._coef_b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        # key -> (서명, 태그). 삽입 순서로 오래된 항목을 제거
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, str]]" = OrderedDict()
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        텍스트의 MinHash 서명을 계산합니다.
+
+        Args:
+            text (str): 원본 텍스트
+
+        Returns:
+            Optional[np.ndarray]: uint32 서명 배열, 비교할 내용이 없으면 None
+        """
+        hashes = shingle_hashes(text)
+        if hashes.size == 0:
+            return None
+        permuted = (np.outer(hashes, self._coef_a) + self._coef_b) % _MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows_per_band
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key: str, text: str, tag: str = "") -> bool:
+        """
+        텍스트를 색인에 추가합니다. 같은 키가 있으면 교체합니다.
+
+        Args:
+            key (str): 항목 키 (예: 1단계 결과 캐시 키)
+            text (str): 색인할 텍스트
+            tag (str): 조회 시 일치해야 하는 태그 (예: 모델/프롬프트 구성)
+
+        Returns:
+            bool: 추가 여부 (비교할 내용이 없는 텍스트는 추가하지 않음)
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return False
+
+        with self._lock:
+            self._remove_locked(key)
+            self._entries[key] = (signature, tag)
+            for band, band_key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove_locked(oldest_key)
+        return True
+
+    def remove(self, key: str) -> None:
+        """색인에서 항목을 제거합니다."""
+        with self._lock:
+            self._remove_locked(key)
+
+    def _remove_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band, band_key in enumerate(self._band_keys(entry[0])):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, text: str, threshold: float = 0.8, tag: Optional[str] = None,
+              limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        유사한 텍스트의 키를 추정 자카드 유사도가 높은 순으로 반환합니다.
+
+        Args:
+            text (str): 조회할 텍스트
+            threshold (float): 최소 추정 유사도 (0~1)
+            tag (str, optional): 지정하면 태그가 같은 항목만 반환
+            limit (int): 최대 결과 수
+
+        Returns:
+            List[Tuple[str, float]]: (키, 추정 유사도) 목록
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        with self._lock:
+            candidates: Set[str] = set()
+            for band, band_key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(band_key, ()))
+            scored = []
+            for key in candidates:
+                candidate_signature, candidate_tag = self._entries[key]
+                if tag is not None and candidate_tag != tag:
+                    continue
+                similarity = float(np.count_nonzero(candidate_signature == signature)) / self.num_perm
+                if similarity >= threshold:
+                    scored.append((key, similarity))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
@@ -0,0 +1,308 @@
+"""
+AIdea Lab 구조화 로깅 모듈
+
+이 모듈은 요청 경로(스트리밍 응답 처리, 프롬프트 생성, 단계 전환)의 디버그 출력을 위한
+레벨 기반 구조화 로깅을 제공합니다.
+
+- 로그는 `aidea.<컴포넌트>` 로거로 기록되며, 컴포넌트별 레벨과 DEBUG 샘플링 비율을 지정할 수 있습니다.
+- 필드 값에 인자 없는 함수를 넘기면 해당 레벨이 켜져 있고 샘플링에 포함될 때만 호출합니다.
+  따라서 꺼진 레벨의 디버그 페이로드(전체 프롬프트, 상태 dict 등)는 만들지 않습니다.
+- 요청 경로에서는 레코드를 큐에 넣기만 하고, 문자열 변환과 길이 제한, 출력은 백그라운드 스레드가 합니다.
+  큐가 가득 차면 기다리지 않고 레코드를 버립니다 (get_dropped_count()).
+
+설정은 다음 환경 변수로 합니다.
+- AIDEA_LOG_LEVEL=<레벨>: 기본 레벨 (기본값: INFO)
+- AIDEA_LOG_LEVELS=<컴포넌트=레벨,...>: 컴포넌트별 레벨 (예: "discussion.stream=DEBUG,prompts=DEBUG")
+- AIDEA_LOG_SAMPLE_RATES=<컴포넌트=비율,...>: 컴포넌트별 DEBUG 로그 샘플링 비율 (예: "discussion.stream=0.1")
+- AIDEA_LOG_FILE=<경로>: 지정한 파일에 기록 (기본값: 표준 출력)
+- AIDEA_LOG_FORMAT=json: 한 줄에 하나의 JSON 객체로 기록 (기본값: text)
+
+컴포넌트 설정은 하위 컴포넌트에도 적용됩니다 (예: "discussion"은 "discussion.stream"에도 적용).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO
+
+LOG_LEVEL_ENV = "AIDEA_LOG_LEVEL"
+LOG_LEVELS_ENV = "AIDEA_LOG_LEVELS"
+LOG_SAMPLE_RATES_ENV = "AIDEA_LOG_SAMPLE_RATES"
+LOG_FILE_ENV = "AIDEA_LOG_FILE"
+LOG_FORMAT_ENV = "AIDEA_LOG_FORMAT"
+
+ROOT_LOGGER_NAME = "aidea"
+DEFAULT_LOG_LEVEL = "INFO"
+# 백그라운드 기록 스레드가 밀릴 때 쌓아 둘 최대 레코드 수 (넘치면 버림)
+QUEUE_MAX_SIZE = 10000
+# 기록 시 필드 값 하나의 최대 길이 (자)
+MAX_FIELD_LENGTH = 2000
+
+_configure_lock = threading.Lock()
+_queue: Optional[queue.Queue] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_sample_rates: Dict[str, float] = {}
+_dropped_count = 0
+
+
+def _parse_component_settings(value: Optional[str]) -> Dict[str, str]:
+    """"컴포넌트=값,..." 형식의 설정을 dict로 변환합니다."""
+    settings = {}
+    for item in (value or "").split(","):
+        component, _, setting = item.partition("=")
+        if component.strip() and setting.strip():
+            settings[component.strip()] = setting.strip()
+    return settings
+
+
+def _resolve(value: Any) -> Any:
+    """지연 필드(인자 없는 함수)를 값으로 바꿉니다."""
+    if callable(value):
+        try:
+            return value()
+        except Exception as e:
+            return f"<error: {e}>"
+    return value
+
+
+def _field_text(value: Any) -> str:
+    """필드 값을 길이 제한된 문자열로 변환합니다."""
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > MAX_FIELD_LENGTH:
+        text = f"{text[:MAX_FIELD_LENGTH]}... ({len(text)} chars)"
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """구조화 로그 레코드를 텍스트 한 줄 또는 JSON 한 줄로 변환하는 포매터"""
+
+    def __init__(self, json_format: bool = False):
+        super().__init__()
+        self.json_format = json_format
+
+    def format(self, record: logging.LogRecord) -> str:
+        component = getattr(record, "component", record.name)
+        fields = getattr(record, "fields", {})
+        if self.json_format:
+            entry = {
+                "time": round(record.created, 6),
+                "level": record.levelname,
+                "component": component,
+                "event": record.getMessage(),
+            }
+            entry.update({key: value if isinstance(value, (bool, int, float)) or value is None else _field_text(value)
+                          for key, value in fields.items()})
+            return json.dumps(entry, ensure_ascii=False)
+
+        timestamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        parts = [f"{timestamp} {record.levelname} [{component}] {record.getMessage()}"]
+        parts += [f"{key}={_field_text(value)}" for key, value in fields.items()]
+        return " ".join(parts)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """기록할 때의 sys.stdout에 쓰는 핸들러 (Streamlit, pytest 등이 표준 출력을 바꿔도 따라감)"""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+
+class _BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """레코드를 문자열로 변환하지 않고 큐에 넣는 핸들러 (변환과 출력은 QueueListener 스레드에서 수행)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _dropped_count
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped_count += 1
+
+
+def configure_logging(level: Optional[str] = None, component_levels: Optional[Dict[str, str]] = None,
+                      sample_rates: Optional[Dict[str, float]] = None, log_file: Optional[str] = None,
+                      json_format: Optional[bool] = None, stream: Optional[TextIO] = None,
+                      force: bool = False) -> None:
+    """
+    구조화 로깅을 설정합니다. 여러 번 호출해도 한 번만 설정되며, force=True이면 기존 설정을 정리하고 다시 설정합니다.
+    인자를 지정하지 않은 항목은 환경 변수 설정을 따릅니다.
+
+    Args:
+        level (str, optional): 기본 레벨 (예: "INFO")
+        component_levels (Dict[str, str], optional): 컴포넌트 -> 레벨
+        sample_rates (Dict[str, float], optional): 컴포넌트 -> DEBUG 로그 샘플링 비율 (0~1)
+        log_file (str, optional): 기록할 파일 경로
+        json_format (bool, optional): True이면 JSON 한 줄 형식으로 기록
+        stream (TextIO, optional): 파일 대신 기록할 스트림
+        force (bool): True이면 다시 설정
+    """
+    global _queue, _listener, _sample_rates
+
+    with _configure_lock:
+        if _listener is not None and not force:
+            return
+        _shutdown_listener()
+
+        root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+        for component in list(logging.root.manager.loggerDict):
+            if component.startswith(f"{ROOT_LOGGER_NAME}."):
+                logging.getLogger(component).setLevel(logging.NOTSET)
+        root_logger.setLevel((level or os.getenv(LOG_LEVEL_ENV) or DEFAULT_LOG_LEVEL).upper())
+        if component_levels is None:
+            component_levels = _parse_component_settings(os.getenv(LOG_LEVELS_ENV))
+        for component, component_level in component_levels.items():
+            logging.getLogger(f"{ROOT_LOGGER_NAME}.{component}").setLevel(component_level.upper())
+
+        if sample_rates is None:
+            sample_rates = {component: float(rate) for component, rate in
+                            _parse_component_settings(os.getenv(LOG_SAMPLE_RATES_ENV)).items()}
+        _sample_rates = dict(sample_rates)
+
+        log_file = log_file or os.getenv(LOG_FILE_ENV)
+        if stream is not None:
+            output_handler = logging.StreamHandler(stream)
+        elif log_file:
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            output_handler = logging.FileHandler(log_file, encoding="utf-8")
+        else:
+            output_handler = _StdoutHandler()
+        if json_format is None:
+            json_format = os.getenv(LOG_FORMAT_ENV, "").lower() == "json"
+        output_handler.setFormatter(StructuredFormatter(json_format=json_format))
+
+        _queue = queue.Queue(QUEUE_MAX_SIZE)
+        for handler in list(root_logger.handlers):
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(_BackgroundQueueHandler(_queue))
+        root_logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(_queue, output_handler)
+        _listener.start()
+
+
+def _shutdown_listener() -> None:
+    """백그라운드 기록 스레드를 남은 레코드를 모두 기록한 뒤 멈춥니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def shutdown_logging() -> None:
+    """남은 로그를 모두 기록하고 구조화 로깅을 정리합니다."""
+    with _configure_lock:
+        _shutdown_listener()
+
+
+def flush_logging() -> None:
+    """큐에 쌓인 로그가 모두 기록될 때까지 기다립니다."""
+    if _queue is not None and _listener is not None:
+        _queue.join()
+
+
+def get_dropped_count() -> int:
+    """큐가 가득 차서 버린 로그 레코드 수를 반환합니다."""
+    return _dropped_count
+
+
+atexit.register(shutdown_logging)
+
+
+class ComponentLogger:
+    """컴포넌트 하나의 구조화 로거 (get_logger()로 생성)"""
+
+    def __init__(self, component: str):
+        self.component = component
+        self.logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.{component}")
+
+    def _sample_rate(self) -> float:
+        """컴포넌트(또는 가장 가까운 상위 컴포넌트)의 DEBUG 샘플링 비율을 반환합니다."""
+        component = self.component
+        while component:
+            if component in _sample_rates:
+                return _sample_rates[component]
+            component = component.rpartition(".")[0]
+        return 1.0
+
+    def is_enabled(self, level: int = logging.DEBUG) -> bool:
+        """
+        이 레벨의 로그가 기록되는지 확인합니다. DEBUG 이하 레벨은 샘플링도 적용합니다.
+        여러 줄의 디버그 출력을 한 번에 건너뛸 때 사용합니다.
+
+        Args:
+            level (int): 로그 레벨
+
+        Returns:
+            bool: 기록되면 True
+        """
+        if _listener is None:
+            configure_logging()
+        if not self.logger.isEnabledFor(level):
+            return False
+        if level <= logging.DEBUG:
+            rate = self._sample_rate()
+            return rate >= 1.0 or random.random() < rate
+        return True
+
+    def log(self, level: int, event: str, **fields: Any) -> None:
+        """
+        구조화 로그를 기록합니다.
+
+        Args:
+            level (int): 로그 레벨
+            event (str): 이벤트 설명
+            **fields: 로그 필드. 인자 없는 함수는 기록될 때만 호출해 값을 만듦
+        """
+        if not self.is_enabled(level):
+            return
+        self.logger.log(level, event, extra={
+            "component": self.component,
+            "fields": {key: _resolve(value) for key, value in fields.items()},
+        })
+
+    def debug(self, event: str, **fields: Any) -> None:
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields: Any) -> None:
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields: Any) -> None:
+        self.log(logging.ERROR, event, **fields)
+
+
+_loggers: Dict[str, ComponentLogger] = {}
+
+
+def get_logger(component: str) -> ComponentLogger:
+    """
+    컴포넌트의 구조화 로거를 반환합니다. 모듈 수준에서 만들어 두고 사용하며,
+    로깅 설정(환경 변수)은 처음 로그를 기록할 때 적용됩니다.
+
+    Args:
+        component (str): 컴포넌트 이름 (예: "discussion.stream", "prompts")
+
+    Returns:
+        ComponentLogger: 구조화 로거
+    """
+    logger = _loggers.get(component)
+    if logger is None:
+        logger = _loggers.setdefault(component, ComponentLogger(component))
+    return logger
@@ -0,0 +1,142 @@
+"""
+AIdea Lab 구조화된 페르소나 보고서 모듈
+
+이 모듈은 구조화 보고서 모드에서 1단계 페르소나 에이전트가 반환하는 태그 구간
+(<key_points>, <summary>, <analysis>)을 해석하여 중간 요약을 모델 호출 없이 만드는 기능을 제공합니다.
+
+- 페르소나 에이전트의 after_model_callback(instrument_structured_report)이 응답을 해석하여
+  보고서 본문은 <analysis> 구간으로 바꾸고, 핵심 포인트와 요약으로 만든 중간 요약을 세션 상태에 보관합니다.
+- 중간 요약 에이전트의 before_model_callback(make_structured_summary_callback)이 보관된 요약을
+  모델 응답으로 반환하여 LLM 요약 호출을 건너뜁니다.
+- 응답이 형식을 따르지 않으면 원본 응답을 그대로 보고서로 사용하고 기존 요약 단계가 실행됩니다.
+"""
+
+import re
+from typing import Any, Callable, Dict, Optional
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from src.utils.agent_callbacks import attach_model_callbacks
+from src.utils.blob_store import intern_text
+
+# 응답의 태그 구간 이름
+STRUCTURED_SECTIONS = ("key_points", "summary", "analysis")
+
+# 해석한 중간 요약을 보관하는 세션 상태 키 접미사 (예: "marketer_report_phase1_summary_structured")
+STRUCTURED_SUMMARY_STATE_SUFFIX = "_structured"
+
+
+def structured_summary_state_key(summary_output_key: str) -> str:
+    """중간 요약 출력 키에 대응하는, 해석한 요약을 보관하는 세션 상태 키를 반환합니다."""
+    return f"{summary_output_key}{STRUCTURED_SUMMARY_STATE_SUFFIX}"
+
+
+def parse_structured_report(text: str) -> Optional[Dict[str, str]]:
+    """
+    태그 구간으로 작성된 보고서를 해석합니다.
+
+    Args:
+        text (str): 페르소나 응답 텍스트
+
+    Returns:
+        Optional[Dict[str, str]]: 구간 이름 -> 내용, 구간이 하나라도 없거나 비어 있으면 None
+    """
+    if not text:
+        return None
+
+    sections = {}
+    for section in STRUCTURED_SECTIONS:
+        match = re.search(rf"<{section}>(.*?)(?:</{section}>|(?=<(?:{'|'.join(STRUCTURED_SECTIONS)})>)|\Z)", text, re.DOTALL)
+        content = match.group(1).strip() if match else ""
+        if not content:
+            return None
+        sections[section] = content
+    return sections
+
+
+def format_structured_summary(sections: Dict[str, str]) -> str:
+    """
+    해석한 보고서의 핵심 포인트와 요약을 중간 요약 형식("핵심 포인트 / 종합 요약")으로 만듭니다.
+
+    Args:
+        sections (Dict[str, str]): parse_structured_report()의 결과
+
+    Returns:
+        str: 중간 요약 텍스트
+    """
+    key_points = []
+    for line in sections["key_points"].splitlines():
+        line = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip()
+        if line:
+            key_points.append(f"- {line}")
+    return "**핵심 포인트:**\n" + "\n".join(key_points) + f"\n\n**종합 요약:**\n{sections['summary']}"
+
+
+def make_structured_report_callback(summary_output_key: str) -> Callable:
+    """
+    구조화 보고서를 해석하는 페르소나 에이전트용 after_model_callback을 만듭니다.
+
+    Args:
+        summary_output_key (str): 중간 요약 출력 키 (예: "marketer_report_phase1_summary")
+
+    Returns:
+        Callable: after_model_callback 함수
+    """
+    def structured_report_callback(callback_context: Any, llm_response: Any) -> None:
+        if llm_response.partial or not llm_response.content or not llm_response.content.parts:
+            return None
+
+        text = "".join(part.text or "" for part in llm_response.content.parts)
+        sections = parse_structured_report(text)
+        if sections is None:
+            print(f"WARNING: Structured report for '{summary_output_key}' did not follow the section format; "
+                  f"the summarizer stage will run instead.")
+            # 같은 세션의 이전 실행에서 보관한 요약이 사용되지 않도록 비움
+            callback_context.state[structured_summary_state_key(summary_output_key)] = ""
+            return None
+
+        callback_context.state[structured_summary_state_key(summary_output_key)] = format_structured_summary(sections)
+        # 나머지 콜백(토큰 집계, 성능 기록)도 실행되도록 응답을 직접 바꾸고 None 반환.
+        # 블롭 저장소 등록 콜백보다 뒤에 실행되므로 바꾼 텍스트도 직접 등록
+        llm_response.content = types.Content(role=llm_response.content.role, parts=[types.Part(text=intern_text(sections["analysis"]))])
+        return None
+
+    return structured_report_callback
+
+
+def instrument_structured_report(agent: Any, summary_output_key: str) -> Any:
+    """
+    페르소나 에이전트에 구조화 보고서 해석 콜백을 연결합니다.
+    다른 계측 콜백이 원본 응답을 볼 수 있도록 계측 콜백을 연결한 뒤에 호출합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+        summary_output_key (str): 중간 요약 출력 키
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, after=make_structured_report_callback(summary_output_key))
+
+
+def make_structured_summary_callback(summary_output_key: str) -> Callable:
+    """
+    중간 요약 에이전트용 before_model_callback을 만듭니다.
+    페르소나 보고서에서 해석한 요약이 세션 상태에 있으면 그 요약을 모델 응답으로 반환하여 LLM 호출을 건너뜁니다.
+
+    Args:
+        summary_output_key (str): 중간 요약 출력 키
+
+    Returns:
+        Callable: before_model_callback 함수
+    """
+    def structured_summary_callback(callback_context: Any, llm_request: Any) -> Optional[LlmResponse]:
+        summary = callback_context.state.get(structured_summary_state_key(summary_output_key))
+        if not summary:
+            return None
+
+        print(f"INFO: Using summary derived from structured report for '{summary_output_key}'; skipping LLM summarizer call.")
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=summary)]))
+
+    return structured_summary_callback
@@ -0,0 +1,389 @@
+"""
+AIdea Lab 토큰 및 비용 집계 모듈
+
+이 모듈은 모든 모델 호출의 토큰 사용량(프롬프트, 응답, 캐시된 프롬프트)을 기록하고
+에이전트 역할, output_key, 단계, 세션, 모델별로 집계하여 비용을 계산하는 기능을 제공합니다.
+
+모델 응답에 usage_metadata가 있으면 그 값을 사용하고, 없으면(google-adk 0.5.0의 LlmResponse는
+usage_metadata를 전달하지 않음) config.prompts.estimate_token_count로 추정하며
+해당 기록에는 estimated=True가 표시됩니다.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.models import get_model_pricing
+from config.prompts import estimate_token_count
+from src.utils.agent_callbacks import attach_model_callbacks
+
+# 메모리에 보관할 최대 호출 기록 수 (초과 시 오래된 기록부터 제거, 집계에는 영향 없음)
+DEFAULT_MAX_RECORDS = 20000
+
+# 집계 가능한 차원
+AGGREGATION_DIMENSIONS = ("agent_role", "output_key", "phase", "session_id", "model")
+
+# 기록 필드 순서 (CSV 헤더)
+RECORD_FIELDS = (
+    "timestamp", "session_id", "phase", "agent_role", "agent_name", "output_key", "model",
+    "prompt_tokens", "candidate_tokens", "cached_tokens", "total_tokens", "cost_usd", "estimated",
+)
+
+
+def agent_role_from_name(agent_name: str) -> str:
+    """
+    에이전트 이름에서 역할 이름을 추출합니다.
+    예: "marketer_agent_phase2" -> "marketer", "critic_summary_agent" -> "critic_summary"
+    """
+    role = agent_name
+    for suffix in ("_phase1", "_phase2"):
+        role = role.removesuffix(suffix)
+    return role.removesuffix("_agent")
+
+
+def phase_from_output_key(output_key: Optional[str]) -> str:
+    """output_key로부터 단계(phase1/phase2)를 판별합니다."""
+    return "phase1" if output_key and "phase1" in output_key else "phase2"
+
+
+def calculate_cost(model: str, prompt_tokens: int, candidate_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    모델 가격표로 호출 비용(USD)을 계산합니다. 캐시된 프롬프트 토큰은 캐시 가격으로 계산합니다.
+
+    Args:
+        model (str): 모델 ID
+        prompt_tokens (int): 프롬프트 토큰 수 (캐시된 토큰 포함)
+        candidate_tokens (int): 응답 토큰 수
+        cached_tokens (int): 캐시된 프롬프트 토큰 수
+
+    Returns:
+        float: 비용 (USD)
+    """
+    pricing = get_model_pricing(model)
+    uncached_prompt_tokens = max(prompt_tokens - cached_tokens, 0)
+    return (
+        uncached_prompt_tokens * pricing["input"]
+        + cached_tokens * pricing["cached_input"]
+        + candidate_tokens * pricing["output"]
+    ) / 1_000_000
+
+
+class TokenLedger:
+    """모델 호출별 토큰 사용량 기록과 차원별 집계를 관리하는 클래스"""
+
+    def __init__(self, max_records: int = DEFAULT_MAX_RECORDS):
+        """
+        토큰 장부 초기화
+
+        Args:
+            max_records (int): 메모리에 보관할 최대 호출 기록 수
+        """
+        self.records: deque = deque(maxlen=max_records)
+        self._totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record_usage(self, session_id: str, agent_name: str, output_key: Optional[str], model: str,
+                     prompt_tokens: int, candidate_tokens: int, cached_tokens: int = 0,
+                     estimated: bool = False) -> Dict[str, Any]:
+        """
+        모델 호출 한 건의 토큰 사용량을 기록합니다.
+
+        Args:
+            session_id (str): 세션 ID
+            agent_name (str): 에이전트 이름
+            output_key (str, optional): 에이전트 output_key
+            model (str): 모델 ID
+            prompt_tokens (int): 프롬프트 토큰 수
+            candidate_tokens (int): 응답 토큰 수
+            cached_tokens (int): 캐시된 프롬프트 토큰 수
+            estimated (bool): 토큰 수가 추정값인지 여부
+
+        Returns:
+            Dict[str, Any]: 기록된 항목
+        """
+        record = {
+            "timestamp": time.time(),
+            "session_id": session_id,
+            "phase": phase_from_output_key(output_key),
+            "agent_role": agent_role_from_name(agent_name),
+            "agent_name": agent_name,
+            "output_key": output_key or "",
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "candidate_tokens": candidate_tokens,
+            "cached_tokens": cached_tokens,
+            "total_tokens": prompt_tokens + candidate_tokens,
+            "cost_usd": calculate_cost(model, prompt_tokens, candidate_tokens, cached_tokens),
+            "estimated": estimated,
+        }
+
+        with self._lock:
+            self.records.append(record)
+            # 기록이 deque에서 밀려나도 집계가 유지되도록 차원별 누적값을 별도로 관리
+            for dimension in AGGREGATION_DIMENSIONS:
+                totals = self._totals.setdefault((dimension, record[dimension]), {
+                    "calls": 0, "prompt_tokens": 0, "candidate_tokens": 0,
+                    "cached_tokens": 0, "total_tokens": 0, "cost_usd": 0.0, "estimated_calls": 0,
+                })
+                totals["calls"] += 1
+                totals["prompt_tokens"] += prompt_tokens
+                totals["candidate_tokens"] += candidate_tokens
+                totals["cached_tokens"] += cached_tokens
+                totals["total_tokens"] += record["total_tokens"]
+                totals["cost_usd"] += record["cost_usd"]
+                totals["estimated_calls"] += int(estimated)
+        return record
+
+    def aggregate(self, dimension: str) -> Dict[str, Dict[str, Any]]:
+        """
+        전체 기록을 한 차원 기준으로 집계합니다.
+
+        Args:
+            dimension (str): agent_role, output_key, phase, session_id, model 중 하나
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 차원 값별 호출 수, 토큰 수, 비용
+        """
+        if dimension not in AGGREGATION_DIMENSIONS:
+            raise ValueError(f"지원되지 않는 집계 차원입니다: {dimension}")
+        with self._lock:
+            return {value: dict(totals) for (dim, value), totals in self._totals.items() if dim == dimension}
+
+    def get_session_records(self, session_id: str) -> List[Dict[str, Any]]:
+        """보관 중인 기록 중 특정 세션의 기록을 반환합니다."""
+        with self._lock:
+            return [record for record in self.records if record["session_id"] == session_id]
+
+    def summarize_session(self, session_id: str, dimension: str = "agent_role") -> Dict[str, Any]:
+        """
+        한 세션의 기록을 지정한 차원으로 집계합니다.
+
+        Args:
+            session_id (str): 세션 ID
+            dimension (str): 세션 내 집계 차원
+
+        Returns:
+            Dict[str, Any]: {"total": 합계, "breakdown": 차원 값별 합계}
+        """
+        total = {"calls": 0, "total_tokens": 0, "cost_usd": 0.0, "estimated_calls": 0}
+        breakdown: Dict[str, Dict[str, Any]] = {}
+        for record in self.get_session_records(session_id):
+            for bucket in (total, breakdown.setdefault(record[dimension], {"calls": 0, "total_tokens": 0, "cost_usd": 0.0, "estimated_calls": 0})):
+                bucket["calls"] += 1
+                bucket["total_tokens"] += record["total_tokens"]
+                bucket["cost_usd"] += record["cost_usd"]
+                bucket["estimated_calls"] += int(record["estimated"])
+        return {"total": total, "breakdown": breakdown}
+
+    def format_session_summary(self, session_id: str) -> Optional[str]:
+        """
+        세션 비용 요약을 채팅 메시지용 마크다운으로 만듭니다.
+
+        Args:
+            session_id (str): 세션 ID
+
+        Returns:
+            Optional[str]: 마크다운 문자열, 기록이 없으면 None
+        """
+        summary = self.summarize_session(session_id)
+        total = summary["total"]
+        if total["calls"] == 0:
+            return None
+
+        lines = [
+            "**💰 토큰 사용량 및 비용 요약**",
+            "",
+            "| 에이전트 | 호출 | 토큰 | 비용(USD) | 비중 |",
+            "|---|---:|---:|---:|---:|",
+        ]
+        sorted_breakdown = sorted(summary["breakdown"].items(), key=lambda item: item[1]["total_tokens"], reverse=True)
+        for role, bucket in sorted_breakdown:
+            share = bucket["total_tokens"] / total["total_tokens"] if total["total_tokens"] else 0
+            lines.append(f"| {role} | {bucket['calls']} | {bucket['total_tokens']:,} | ${bucket['cost_usd']:.4f} | {share:.0%} |")
+        lines.append(f"| **합계** | {total['calls']} | {total['total_tokens']:,} | ${total['cost_usd']:.4f} | 100% |")
+        if total["estimated_calls"]:
+            lines.append("")
+            lines.append(f"_{total['calls']}회 중 {total['estimated_calls']}회는 모델이 사용량 정보를 제공하지 않아 추정값입니다._")
+        return "\n".join(lines)
+
+    def export_jsonl(self, path: str, session_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        보관 중인 기록을 JSON Lines 파일로 내보냅니다.
+
+        Args:
+            path (str): 출력 파일 경로
+            session_ids (Iterable[str], optional): 내보낼 세션 ID 목록. None이면 전체
+
+        Returns:
+            int: 내보낸 기록 수
+        """
+        records = self._select_records(session_ids)
+        _ensure_parent_dir(path)
+        with open(path, "w", encoding="utf-8") as output_file:
+            for record in records:
+                output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(records)
+
+    def export_csv(self, path: str, session_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        보관 중인 기록을 CSV 파일로 내보냅니다.
+
+        Args:
+            path (str): 출력 파일 경로
+            session_ids (Iterable[str], optional): 내보낼 세션 ID 목록. None이면 전체
+
+        Returns:
+            int: 내보낸 기록 수
+        """
+        records = self._select_records(session_ids)
+        _ensure_parent_dir(path)
+        with open(path, "w", encoding="utf-8", newline="") as output_file:
+            writer = csv.DictWriter(output_file, fieldnames=RECORD_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        return len(records)
+
+    def _select_records(self, session_ids: Optional[Iterable[str]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            if session_ids is None:
+                return list(self.records)
+            selected = set(session_ids)
+            return [record for record in self.records if record["session_id"] in selected]
+
+
+def _ensure_parent_dir(path: str) -> None:
+    parent_dir = os.path.dirname(path)
+    if parent_dir:
+        os.makedirs(parent_dir, exist_ok=True)
+
+
+# 애플리케이션 전역 토큰 장부
+token_ledger = TokenLedger()
+
+# 진행 중인 모델 호출의 프롬프트 추정: (invocation_id, agent_name) -> (요청 객체, 프롬프트 글자 수, 추정 토큰 수)
+# 한 호출의 before 콜백들(레이트 리미터, 추적, 토큰 집계)이 프롬프트를 한 번만 렌더링하고 추정하도록 공유하며,
+# 최종 응답에서 _record_response_usage가, 예외로 끝난 호출은 monitored_event_stream이 discard_pending_prompt()로 정리
+_pending_prompts: Dict[Tuple[str, str], Tuple[Any, int, int]] = {}
+_pending_lock = threading.Lock()
+
+
+def _content_text(contents: Iterable[Any]) -> str:
+    texts = []
+    for content in contents:
+        for part in (content.parts or []) if content else []:
+            if part.text:
+                texts.append(part.text)
+    return "\n".join(texts)
+
+
+def request_prompt_text(llm_request: Any) -> str:
+    """모델 요청의 시스템 지시문과 대화 내용 텍스트를 이어 붙입니다."""
+    config = getattr(llm_request, "config", None)
+    system_instruction = getattr(config, "system_instruction", None) if config else None
+    prompt_text = _content_text(getattr(llm_request, "contents", None) or [])
+    if isinstance(system_instruction, str):
+        prompt_text = system_instruction + "\n" + prompt_text
+    return prompt_text
+
+
+def estimate_prompt_tokens(llm_request: Any) -> int:
+    """모델 요청(시스템 지시문과 대화 내용)의 프롬프트 토큰 수를 추정합니다."""
+    return estimate_token_count(request_prompt_text(llm_request))
+
+
+def estimate_call_prompt(callback_context: Any, llm_request: Any) -> Tuple[int, int]:
+    """
+    진행 중인 모델 호출의 프롬프트 글자 수와 추정 토큰 수를 반환합니다.
+    같은 호출의 before 콜백들은 처음 계산한 값을 함께 사용합니다.
+
+    Args:
+        callback_context: ADK CallbackContext
+        llm_request: ADK LlmRequest 객체
+
+    Returns:
+        Tuple[int, int]: (프롬프트 글자 수, 추정 토큰 수)
+    """
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    with _pending_lock:
+        entry = _pending_prompts.get(key)
+    if entry is not None and entry[0] is llm_request:
+        return entry[1], entry[2]
+
+    prompt_text = request_prompt_text(llm_request)
+    estimate = (len(prompt_text), estimate_token_count(prompt_text))
+    with _pending_lock:
+        _pending_prompts[key] = (llm_request, *estimate)
+    return estimate
+
+
+def discard_pending_prompt(invocation_id: str, agent_name: str) -> None:
+    """응답 없이 끝난(예외, 취소) 모델 호출의 프롬프트 추정을 정리합니다 (monitored_event_stream에서 호출)."""
+    with _pending_lock:
+        _pending_prompts.pop((invocation_id, agent_name), None)
+
+
+def estimate_response_tokens(llm_response: Any) -> int:
+    """모델 응답 텍스트의 토큰 수를 추정합니다."""
+    return estimate_token_count(_content_text([llm_response.content]))
+
+
+def _record_prompt_estimate(callback_context: Any, llm_request: Any) -> None:
+    """모델 호출 직전에 프롬프트 토큰 수를 추정해 둡니다 (LlmAgent before_model_callback)."""
+    estimate_call_prompt(callback_context, llm_request)
+    return None
+
+
+def _record_response_usage(callback_context: Any, llm_response: Any) -> None:
+    """최종 모델 응답의 토큰 사용량을 장부에 기록합니다 (LlmAgent after_model_callback)."""
+    if llm_response.partial:
+        return None
+
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    with _pending_lock:
+        entry = _pending_prompts.pop(key, None)
+    estimated_prompt_tokens = entry[2] if entry is not None else 0
+
+    invocation_context = callback_context._invocation_context
+    agent = invocation_context.agent
+    model = agent.canonical_model.model
+
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None and usage.prompt_token_count is not None:
+        prompt_tokens = usage.prompt_token_count or 0
+        candidate_tokens = usage.candidates_token_count or 0
+        cached_tokens = usage.cached_content_token_count or 0
+        estimated = False
+    else:
+        prompt_tokens = estimated_prompt_tokens
+        candidate_tokens = estimate_response_tokens(llm_response)
+        cached_tokens = 0
+        estimated = True
+
+    token_ledger.record_usage(
+        session_id=invocation_context.session.id,
+        agent_name=agent.name,
+        output_key=getattr(agent, "output_key", None),
+        model=model,
+        prompt_tokens=prompt_tokens,
+        candidate_tokens=candidate_tokens,
+        cached_tokens=cached_tokens,
+        estimated=estimated
+    )
+    return None
+
+
+def instrument_agent_token_usage(agent: Any) -> Any:
+    """
+    LlmAgent에 토큰 사용량 기록 콜백을 연결합니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, before=_record_prompt_estimate, after=_record_response_usage)
@@ -0,0 +1,352 @@
+"""
+AIdea Lab 실행 추적(tracing) 모듈
+
+이 모듈은 1단계 워크플로우, 에이전트 실행, 중간 요약, 2단계 퍼실리테이터 라운드마다
+OpenTelemetry 스팬을 열고, 이를 로컬 파일에 OTLP JSON 형식(한 줄에 하나의 ExportTraceServiceRequest)으로
+기록하는 기능을 제공합니다. 호스팅 서비스 없이 세션별/세션 간 가장 느린 단계를 찾는 용도입니다.
+
+추적은 기본적으로 꺼져 있으며 다음 환경 변수로 활성화합니다.
+- AIDEA_TRACING_ENABLED=1: logs/traces.jsonl에 기록
+- AIDEA_TRACE_FILE=<경로>: 지정한 파일에 기록
+
+google-adk가 이미 OpenTelemetry API/SDK에 의존하므로 추가 의존성은 없습니다.
+ADK 자체 스팬(invocation, agent_run, call_llm)도 같은 파일에 기록되며,
+프롬프트/응답 원문을 담는 대용량 속성은 기록하지 않습니다.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.trace import Status, StatusCode
+
+from src.utils.agent_callbacks import attach_model_callbacks
+from src.utils.token_accounting import estimate_call_prompt
+
+TRACING_ENABLED_ENV = "AIDEA_TRACING_ENABLED"
+TRACE_FILE_ENV = "AIDEA_TRACE_FILE"
+DEFAULT_TRACE_FILE = "logs/traces.jsonl"
+SERVICE_NAME = "aidea-lab"
+
+# 파일 크기를 키우기만 하는 ADK의 프롬프트/응답 원문 속성은 기록하지 않음
+EXCLUDED_ATTRIBUTE_PREFIXES = (
+    "gcp.vertex.agent.llm_request",
+    "gcp.vertex.agent.llm_response",
+    "gcp.vertex.agent.tool_call_args",
+    "gcp.vertex.agent.tool_response",
+    "gcp.vertex.agent.data",
+)
+MAX_ATTRIBUTE_STRING_LENGTH = 1024
+
+tracer = trace.get_tracer("aidea-lab")
+
+_tracing_enabled = False
+_configure_lock = threading.Lock()
+
+# 모델 호출 스팬: (invocation_id, agent_name) -> (스팬, 시작 시각, 첫 응답 수신 여부)
+_open_agent_spans: Dict[Tuple[str, str], Tuple[Any, float, bool]] = {}
+_agent_spans_lock = threading.Lock()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """속성 값을 OTLP JSON AnyValue로 변환합니다."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    text = str(value)
+    if len(text) > MAX_ATTRIBUTE_STRING_LENGTH:
+        text = text[:MAX_ATTRIBUTE_STRING_LENGTH] + "..."
+    return {"stringValue": text}
+
+
+def _otlp_attributes(attributes: Optional[Dict[str, Any]]) -> list:
+    """속성 dict를 OTLP JSON KeyValue 목록으로 변환합니다."""
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in (attributes or {}).items()
+        if not key.startswith(EXCLUDED_ATTRIBUTE_PREFIXES)
+    ]
+
+
+def span_to_otlp_json(span: ReadableSpan) -> Dict[str, Any]:
+    """
+    SDK 스팬을 OTLP JSON Span 객체로 변환합니다.
+
+    Args:
+        span (ReadableSpan): 종료된 스팬
+
+    Returns:
+        Dict[str, Any]: OTLP JSON 형식의 스팬
+    """
+    context = span.get_span_context()
+    otlp_span = {
+        "traceId": format(context.trace_id, "032x"),
+        "spanId": format(context.span_id, "016x"),
+        "name": span.name,
+        "kind": span.kind.value + 1,  # OTLP SpanKind는 UNSPECIFIED=0부터 시작
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": span.status.status_code.value},
+    }
+    if span.parent is not None:
+        otlp_span["parentSpanId"] = format(span.parent.span_id, "016x")
+    if span.status.description:
+        otlp_span["status"]["message"] = span.status.description
+    if span.events:
+        otlp_span["events"] = [
+            {"timeUnixNano": str(event.timestamp), "name": event.name, "attributes": _otlp_attributes(event.attributes)}
+            for event in span.events
+        ]
+    return otlp_span
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """스팬 배치를 OTLP JSON(ExportTraceServiceRequest) 한 줄씩 로컬 파일에 추가하는 익스포터"""
+
+    def __init__(self, file_path: str = DEFAULT_TRACE_FILE):
+        """
+        익스포터 초기화
+
+        Args:
+            file_path (str): 추적 파일 경로
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        trace_dir = os.path.dirname(file_path)
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if not spans:
+            return SpanExportResult.SUCCESS
+
+        resource_attributes = _otlp_attributes(dict(spans[0].resource.attributes))
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": resource_attributes},
+                "scopeSpans": [{
+                    "scope": {"name": "aidea-lab"},
+                    "spans": [span_to_otlp_json(span) for span in spans],
+                }],
+            }]
+        }
+        try:
+            with self._lock, open(self.file_path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(json.dumps(request, ensure_ascii=False) + "\n")
+            return SpanExportResult.SUCCESS
+        except OSError as e:
+            print(f"스팬 기록 중 오류 발생: {e}")
+            return SpanExportResult.FAILURE
+
+    def shutdown(self) -> None:
+        pass
+
+
+def configure_tracing(trace_file: Optional[str] = None) -> bool:
+    """
+    로컬 파일 추적을 설정합니다. 여러 번 호출해도 한 번만 설정됩니다.
+
+    Args:
+        trace_file (str, optional): 추적 파일 경로. None이면 환경 변수 설정을 따름
+
+    Returns:
+        bool: 추적이 활성화되었으면 True
+    """
+    global _tracing_enabled
+
+    if trace_file is None:
+        trace_file = os.getenv(TRACE_FILE_ENV)
+        if not trace_file and os.getenv(TRACING_ENABLED_ENV, "").lower() in ("1", "true", "yes"):
+            trace_file = DEFAULT_TRACE_FILE
+    if not trace_file:
+        return _tracing_enabled
+
+    with _configure_lock:
+        if _tracing_enabled:
+            return True
+
+        processor = BatchSpanProcessor(JsonLinesSpanExporter(trace_file))
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+            trace.set_tracer_provider(provider)
+        provider.add_span_processor(processor)
+        atexit.register(processor.shutdown)
+
+        _tracing_enabled = True
+        print(f"Tracing enabled. Spans will be written to '{trace_file}'")
+        return True
+
+
+def is_tracing_enabled() -> bool:
+    """로컬 파일 추적이 활성화되어 있는지 확인합니다."""
+    return _tracing_enabled
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    현재 컨텍스트의 자식 스팬을 열고 닫는 컨텍스트 매니저
+
+    추적이 비활성화되어 있으면 기록되지 않는 스팬이 반환되므로 호출 측에서 분기할 필요가 없습니다.
+    asyncio.run() 등으로 실행되는 코루틴은 현재 컨텍스트를 복사하므로 내부 스팬이 이 스팬의 자식이 됩니다.
+
+    Args:
+        name (str): 스팬 이름
+        **attributes: 스팬 속성 (None 값은 제외)
+    """
+    with tracer.start_as_current_span(name, attributes=_clean_attributes(attributes)) as span:
+        yield span
+
+
+async def traced_event_stream(event_stream: AsyncIterator[Any], name: str, **attributes: Any) -> AsyncIterator[Any]:
+    """
+    ADK Runner 이벤트 스트림을 감싸 하나의 스팬으로 기록합니다.
+
+    첫 이벤트와 첫 텍스트 이벤트까지 걸린 시간, 이벤트 수, 전체 소요 시간과 재시도 횟수(attempt 속성)를 기록합니다.
+
+    Args:
+        event_stream (AsyncIterator): runner.run_async()가 반환한 이벤트 스트림
+        name (str): 스팬 이름 (예: "phase2.facilitator_round")
+        **attributes: 스팬 속성 (session_id, round, retry_count 등)
+
+    Yields:
+        Event: 원본 이벤트
+    """
+    start_time = time.perf_counter()
+    event_count = 0
+    content_seen = False
+    with tracer.start_as_current_span(name, attributes=_clean_attributes(attributes)) as span:
+        try:
+            async for event in event_stream:
+                if event_count == 0:
+                    span.set_attribute("aidea.time_to_first_event_ms", (time.perf_counter() - start_time) * 1000)
+                if not content_seen and event.content and event.content.parts and any(part.text for part in event.content.parts):
+                    content_seen = True
+                    span.set_attribute("aidea.time_to_first_content_ms", (time.perf_counter() - start_time) * 1000)
+                event_count += 1
+                yield event
+        finally:
+            span.set_attribute("aidea.event_count", event_count)
+            span.set_attribute("aidea.duration_ms", (time.perf_counter() - start_time) * 1000)
+
+
+def _clean_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """None 값을 제거하고 짧은 키에 aidea. 접두사를 붙입니다."""
+    return {
+        (key if "." in key else f"aidea.{key}"): value
+        for key, value in attributes.items()
+        if value is not None
+    }
+
+
+def _trace_before_model(callback_context: Any, llm_request: Any) -> None:
+    """모델 호출 직전에 에이전트 스팬을 엽니다 (LlmAgent before_model_callback)."""
+    if not _tracing_enabled:
+        return None
+
+    agent = callback_context._invocation_context.agent
+    prompt_chars, prompt_tokens = estimate_call_prompt(callback_context, llm_request)
+    span = tracer.start_span(
+        f"agent {callback_context.agent_name}",
+        attributes=_clean_attributes({
+            "agent": callback_context.agent_name,
+            "output_key": getattr(agent, "output_key", None),
+            "gen_ai.request.model": getattr(llm_request, "model", None),
+            "prompt_chars": prompt_chars,
+            "prompt_tokens_estimate": prompt_tokens,
+        })
+    )
+
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    with _agent_spans_lock:
+        stale_entry = _open_agent_spans.pop(key, None)
+        _open_agent_spans[key] = (span, time.perf_counter(), False)
+    if stale_entry:
+        # 이전 호출이 응답 없이 실패한 경우
+        _end_failed_span(stale_entry[0], stale_entry[1], None)
+    return None
+
+
+def _end_failed_span(span: Any, start_time: float, error: Optional[BaseException]) -> None:
+    """응답 없이 끝난 모델 호출의 스팬을 오류 상태로 닫습니다."""
+    description = f"{type(error).__name__}: {error}" if error is not None else "model call did not complete"
+    span.set_status(Status(StatusCode.ERROR, description))
+    if error is not None:
+        span.record_exception(error)
+    span.set_attribute("aidea.duration_ms", (time.perf_counter() - start_time) * 1000)
+    span.end()
+
+
+def end_agent_spans(invocation_id: str, agent_name: str, error: Optional[BaseException] = None) -> None:
+    """
+    after_model_callback 없이 끝난 모델 호출(예외, 취소)의 에이전트 스팬을 오류 상태로 닫아 내보냅니다.
+    ADK는 모델 호출이 예외로 끝나면 after_model_callback을 호출하지 않으므로 monitored_event_stream()이 호출합니다.
+    정상 종료한 호출의 스팬은 이미 닫혀 있으므로 아무 일도 하지 않습니다.
+
+    Args:
+        invocation_id (str): 호출의 invocation ID
+        agent_name (str): 에이전트 이름
+        error (BaseException, optional): 호출을 중단시킨 예외 (취소 등으로 알 수 없으면 None)
+    """
+    with _agent_spans_lock:
+        entry = _open_agent_spans.pop((invocation_id, agent_name), None)
+    if entry is not None:
+        _end_failed_span(entry[0], entry[1], error)
+
+
+def _trace_after_model(callback_context: Any, llm_response: Any) -> None:
+    """모델 응답을 받을 때 첫 응답 시간을 기록하고, 최종 응답이면 에이전트 스팬을 닫습니다."""
+    if not _tracing_enabled:
+        return None
+
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    with _agent_spans_lock:
+        entry = _open_agent_spans.get(key)
+        if entry is None:
+            return None
+        span, start_time, first_seen = entry
+        if not first_seen:
+            _open_agent_spans[key] = (span, start_time, True)
+        if not llm_response.partial:
+            _open_agent_spans.pop(key, None)
+
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    if not first_seen:
+        span.set_attribute("aidea.time_to_first_response_ms", elapsed_ms)
+    if llm_response.error_code:
+        span.set_status(Status(StatusCode.ERROR, f"{llm_response.error_code}: {llm_response.error_message}"))
+    if not llm_response.partial:
+        span.set_attribute("aidea.duration_ms", elapsed_ms)
+        span.end()
+    return None
+
+
+def instrument_agent(agent: Any) -> Any:
+    """
+    LlmAgent에 모델 호출 추적 콜백을 연결합니다.
+
+    모델 호출마다 "agent <이름>" 스팬이 열리고, model, output_key, 프롬프트 크기,
+    첫 응답까지의 시간, 전체 소요 시간이 기록됩니다.
+
+    Args:
+        agent: ADK LlmAgent 객체
+
+    Returns:
+        Any: 같은 에이전트 객체
+    """
+    return attach_model_callbacks(agent, before=_trace_before_model, after=_trace_after_model)
@@ -0,0 +1,77 @@
+"""
+에이전트 그래프 캐시를 위한 단위 테스트
+
+이 모듈은 src/orchestrator/main_orchestrator.py의 프로세스 전역 에이전트 그래프 캐시
+(모델과 프롬프트 버전별 워크플로우 재사용, 부분 재실행 워크플로우 분리, 동시 구성)에 대한 단위 테스트를 제공합니다.
+"""
+
+import threading
+
+import pytest
+
+from config.personas import PersonaType
+from src.orchestrator import main_orchestrator
+from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator, clear_agent_graph_cache, get_cached_agent_graph
+
+
+@pytest.fixture(autouse=True)
+def empty_agent_graph_cache():
+    clear_agent_graph_cache()
+    yield
+    clear_agent_graph_cache()
+
+
+class TestAgentGraphCache:
+    """에이전트 그래프 캐시 테스트 스위트"""
+
+    def test_workflows_are_shared_per_model(self):
+        """같은 모델의 워크플로우와 2단계 에이전트는 오케스트레이터 사이에 재사용하고, 모델이나 단계 구성이 다르면 따로 구성하는지 테스트"""
+        # Given
+        first = AIdeaLabOrchestrator(model_name="gemini-2.0-flash")
+        second = AIdeaLabOrchestrator(model_name="gemini-2.0-flash")
+        other_model = AIdeaLabOrchestrator(model_name="gemini-2.5-pro-preview-05-06")
+
+        # When
+        workflow = first.get_phase1_workflow()
+        partial_keys = ["critic_report_phase1_summary", "summary_report_phase1"]
+        partial_workflow = second.get_phase1_workflow(output_keys=partial_keys)
+
+        # Then
+        assert second.get_phase1_workflow() is workflow
+        assert other_model.get_phase1_workflow() is not workflow
+        assert partial_workflow is not workflow
+        assert [agent.output_key for agent in partial_workflow.sub_agents] == partial_keys
+        assert first.get_phase1_workflow(output_keys=reversed(partial_keys)) is partial_workflow
+        assert second.get_phase2_discussion_facilitator() is first.get_phase2_discussion_facilitator()
+        assert second.get_phase2_persona_agent(PersonaType.CRITIC) is first.get_phase2_persona_agent(PersonaType.CRITIC)
+        assert first.get_phase2_persona_agent(PersonaType.CRITIC) is not first.get_phase2_persona_agent(PersonaType.ENGINEER)
+        assert other_model.get_phase2_final_summary_agent() is not first.get_phase2_final_summary_agent()
+
+    def test_concurrent_requests_build_once(self, monkeypatch):
+        """여러 스레드가 같은 그래프를 동시에 요청해도 한 번만 구성하고, 프롬프트 버전이 바뀌면 다시 구성하는지 테스트"""
+        # Given
+        builds = []
+        barrier = threading.Barrier(8)
+        results = []
+
+        def build():
+            builds.append(1)
+            return object()
+
+        def request():
+            barrier.wait()
+            results.append(get_cached_agent_graph(("test_graph",), build))
+
+        # When
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        monkeypatch.setattr(main_orchestrator, "agent_prompt_version", lambda: "changed")
+        rebuilt = get_cached_agent_graph(("test_graph",), build)
+
+        # Then
+        assert len(builds) == 2
+        assert len({id(result) for result in results}) == 1
+        assert rebuilt is not results[0]
@@ -0,0 +1,140 @@
+"""
+API 키 풀을 위한 단위 테스트
+
+이 모듈은 src/utils/api_key_pool.py의 부하 기준 키 배정, 키 상태(할당량 초과, 유효하지 않은 키) 처리,
+세션 전용 키 격리에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+
+from google.adk.agents import Agent
+from google.adk.models import LlmResponse
+from google.adk.runners import Runner
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.utils import api_key_pool, rate_limiter
+from src.utils.api_key_pool import ApiKeyPool, PooledGemini, _KeyedGemini, api_key_fingerprint, use_api_key
+from src.utils import model_router
+from src.utils.model_monitor import AIModelMonitor
+from src.utils.model_router import STREAMING_RUN_CONFIG, ModelRouter, monitored_event_stream
+
+
+class TestApiKeyPool:
+    """ApiKeyPool 테스트 스위트"""
+
+    def test_assigns_least_loaded_key(self):
+        """진행 중이거나 배정된 호출이 가장 적은 키부터 배정하는지 테스트"""
+        # Given
+        pool = ApiKeyPool(["key-a", "key-b", "key-c"])
+
+        # When
+        first = pool.assign_key()
+        pool.start_call(first)
+        second = pool.assign_key()
+        third = pool.assign_key()
+        pool.finish_call(first)
+        fourth = pool.assign_key()
+
+        # Then
+        assert [first["api_key"], second["api_key"], third["api_key"]] == ["key-a", "key-b", "key-c"]
+        assert fourth["api_key"] == "key-a"
+        assert pool.get_stats()[api_key_fingerprint("key-b")]["assigned"] == 1
+
+    def test_throttled_and_invalid_keys_are_skipped(self):
+        """할당량 초과 키는 쉬는 동안, 유효하지 않은 키는 계속 배정에서 제외되는지 테스트"""
+        # Given
+        pool = ApiKeyPool(["key-a", "key-b", "key-c"], config={"throttle_cooldown_seconds": 60.0})
+
+        # When
+        for error in (RuntimeError("429 RESOURCE_EXHAUSTED"), RuntimeError("400 API_KEY_INVALID")):
+            assignment = pool.assign_key()
+            pool.start_call(assignment)
+            pool.finish_call(assignment, error)
+        assigned = {pool.assign_key()["api_key"] for _ in range(3)}
+
+        # Then
+        stats = pool.get_stats()
+        assert assigned == {"key-c"}
+        assert not stats[api_key_fingerprint("key-a")]["healthy"]
+        assert stats[api_key_fingerprint("key-a")]["throttled"] == 1
+        assert not stats[api_key_fingerprint("key-b")]["healthy"]
+
+
+class TestPooledGemini:
+    """PooledGemini 키 선택 테스트 스위트"""
+
+    def test_session_key_is_isolated_from_pool(self, monkeypatch):
+        """세션 전용 키를 지정한 세션은 그 키만, 나머지 세션은 풀의 키를 쓰고 레이트 리미터도 같은 키로 계산하는지 테스트"""
+        # Given
+        monkeypatch.setattr(api_key_pool, "_default_pool", ApiKeyPool(["pool-a", "pool-b"]))
+        monkeypatch.setattr(rate_limiter, "_default_rate_limiter", rate_limiter.RateLimiter())
+        used_keys = []
+
+        async def fake_generate(self, llm_request, stream=False):
+            used_keys.append(self.api_key)
+            await asyncio.sleep(0.05)
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="응답")]))
+
+        monkeypatch.setattr(_KeyedGemini, "generate_content_async", fake_generate)
+        agent = Agent(name="marketer_agent", model="gemini-2.0-flash", instruction="분석하세요")
+        api_key_pool.instrument_agent_api_key(agent)
+        rate_limiter.instrument_agent_rate_limit(agent)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        runner = Runner(agent=agent, app_name="test_app", session_service=manager.session_service)
+
+        async def run(api_key):
+            session_id = manager.create_session()[1]
+            message = types.Content(role="user", parts=[types.Part(text="아이디어")])
+            with use_api_key(api_key):
+                async for _ in monitored_event_stream(runner.run_async(user_id="test_user", session_id=session_id, new_message=message)):
+                    pass
+
+        async def run_all():
+            await asyncio.gather(run("user-key"), run(None), run(None))
+
+        # When
+        asyncio.run(run_all())
+
+        # Then
+        assert isinstance(agent.canonical_model, PooledGemini)
+        assert sorted(used_keys) == ["pool-a", "pool-b", "user-key"]
+        limiter_keys = {api_key_id for api_key_id, _ in rate_limiter.get_rate_limiter().get_stats()}
+        assert limiter_keys == {api_key_fingerprint(key) for key in ("pool-a", "pool-b", "user-key")}
+        assert all(stats["in_flight"] == 0 for stats in api_key_pool.get_api_key_pool().get_stats().values())
+
+    def test_streamed_response_without_final_event_is_completed(self, monkeypatch, tmp_path):
+        """SSE 부분 응답만 오고 최종 응답 없이 끝나도 최종 이벤트와 출력 키가 만들어지고 첫 텍스트까지 시간이 기록되는지 테스트"""
+        # Given: google-adk 0.5 Gemini가 MAX_TOKENS로 끝난 스트림처럼 부분 응답만 보냄
+        monkeypatch.setattr(api_key_pool, "_default_pool", ApiKeyPool(["pool-a"]))
+        monitor = AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))
+        monkeypatch.setattr(model_router, "_default_router", ModelRouter(monitor))
+
+        async def fake_generate(self, llm_request, stream=False):
+            assert stream
+            for chunk in ("첫 조각 ", "둘째 조각"):
+                await asyncio.sleep(0.02)
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True)
+
+        monkeypatch.setattr(_KeyedGemini, "generate_content_async", fake_generate)
+        agent = Agent(name="marketer_agent", model="gemini-2.0-flash", instruction="분석하세요", output_key="report")
+        model_router.instrument_agent_model_monitoring(agent)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        session_id = manager.create_session()[1]
+        runner = Runner(agent=agent, app_name="test_app", session_service=manager.session_service)
+        message = types.Content(role="user", parts=[types.Part(text="아이디어")])
+
+        async def run():
+            return [event async for event in monitored_event_stream(runner.run_async(
+                user_id="test_user", session_id=session_id, new_message=message, run_config=STREAMING_RUN_CONFIG))]
+
+        # When
+        events = asyncio.run(run())
+
+        # Then
+        assert [event.partial for event in events] == [True, True, None]
+        assert events[-1].content.parts[0].text == "첫 조각 둘째 조각"
+        assert manager.get_session(session_id).state["report"] == "첫 조각 둘째 조각"
+        stats = monitor.get_stream_stats("gemini-2.0-flash", role="marketer")
+        assert stats["inter_delta_gap"]["count"] == 1
+        assert stats["time_to_first_content"]["p50"] < stats["stream_duration"]["p50"]
@@ -0,0 +1,81 @@
+"""
+배치 분석 실행기를 위한 단위 테스트
+
+이 모듈은 src/batch_runner.py의 입력 읽기, 이어서 실행할 줄 계산, 동시 실행 제한에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+import io
+import json
+
+from src import batch_runner
+
+
+def _write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+class TestBatchInput:
+    """배치 입력/출력 파일 처리 테스트 스위트"""
+
+    def test_read_ideas_applies_offset_limit_and_skips(self, tmp_path):
+        """오프셋, 최대 개수, 건너뛸 줄을 적용하고 해석할 수 없는 줄을 오류 레코드로 반환하는지 테스트"""
+        # Given
+        input_path = _write_lines(tmp_path / "ideas.jsonl", [
+            '{"idea": "첫 번째"}', '{"idea": "두 번째", "goal": "수익"}', "", "not json",
+            '{"goal": "아이디어 없음"}', '{"idea": "여섯 번째"}',
+        ])
+
+        # When
+        ideas = list(batch_runner.read_ideas(input_path, offset=1, limit=4, skip_indexes={5}))
+
+        # Then
+        assert [index for index, _ in ideas] == [1, 3, 4]
+        assert ideas[0][1]["goal"] == "수익"
+        assert "_error" in ideas[1][1] and "_error" in ideas[2][1]
+
+    def test_completed_indexes_counts_only_successful_lines(self, tmp_path):
+        """이전 출력에서 성공으로 기록된 줄만 완료로 보고, 잘린 마지막 줄은 무시하는지 테스트"""
+        # Given
+        output_path = _write_lines(tmp_path / "results.jsonl", [
+            json.dumps({"index": 0, "status": "ok"}),
+            json.dumps({"index": 1, "status": "error"}),
+            json.dumps({"index": 2, "status": "ok"}),
+            '{"index": 3, "sta',
+        ])
+
+        # When
+        indexes = batch_runner.completed_indexes(output_path)
+
+        # Then
+        assert indexes == {0, 2}
+
+
+class TestRunBatch:
+    """배치 실행 테스트 스위트"""
+
+    def test_runs_ideas_concurrently_up_to_limit(self, tmp_path, monkeypatch):
+        """동시 실행 수를 넘지 않으면서 병렬로 분석하고 모든 결과를 기록하는지 테스트"""
+        # Given
+        input_path = _write_lines(tmp_path / "ideas.jsonl", [json.dumps({"idea": f"아이디어 {i}"}) for i in range(6)])
+        running = {"now": 0, "max": 0}
+
+        async def fake_analyze_idea(index, record, options):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return {"index": index, "status": "ok", "elapsed_seconds": 0.01}
+
+        monkeypatch.setattr(batch_runner, "analyze_idea", fake_analyze_idea)
+        options = batch_runner.parse_args([input_path, "--concurrency", "3"])
+        output = io.StringIO()
+
+        # When
+        counts = asyncio.run(batch_runner.run_batch(options, output, io.StringIO()))
+
+        # Then
+        assert counts == {"ok": 6, "error": 0}
+        assert running["max"] == 3
+        assert sorted(json.loads(line)["index"] for line in output.getvalue().splitlines()) == list(range(6))
@@ -0,0 +1,120 @@
+"""
+블롭 저장소를 위한 단위 테스트
+
+이 모듈은 src/utils/blob_store.py의 BlobStore와 모델 응답 텍스트 등록 콜백에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+import sys
+
+from google.adk.agents import Agent
+from google.adk.models import LlmResponse
+from google.adk.runners import Runner
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.utils import api_key_pool, blob_store
+from src.utils.api_key_pool import ApiKeyPool, _KeyedGemini
+from src.utils.blob_store import BlobStore, instrument_agent_blob_interning, intern_text
+from src.utils.memory_profiler import deep_sizeof
+
+
+class TestBlobStore:
+    """BlobStore 테스트 스위트"""
+
+    def test_equal_texts_share_one_object(self):
+        """같은 내용의 큰 텍스트가 하나의 정규 객체로 합쳐지는지 테스트"""
+        # Given
+        store = BlobStore(min_blob_length=10)
+        first = "보고서 " * 100
+        second = "".join(["보고서 "] * 100)  # 같은 내용, 다른 객체
+        assert first is not second
+
+        # When
+        interned_first = store.intern(first)
+        interned_second = store.intern(second)
+
+        # Then
+        assert interned_first is first
+        assert interned_second is first
+        assert store.stats()["hit_count"] == 1
+        assert store.stats()["saved_chars"] == len(second)
+
+    def test_short_and_non_string_values_are_untouched(self):
+        """짧은 텍스트와 문자열이 아닌 값은 저장하지 않는지 테스트"""
+        store = BlobStore(min_blob_length=10)
+        assert store.intern("짧음") == "짧음"
+        assert store.intern(None) is None
+        assert store.stats()["blob_count"] == 0
+
+    def test_intern_value_recurses_into_history(self):
+        """토론 기록 같은 구조화된 값 안의 문자열도 합쳐지는지 테스트"""
+        # Given
+        store = BlobStore(min_blob_length=10)
+        content = "페르소나 발언 " * 50
+        store.intern(content)
+        history = [{"speaker": "critic_agent", "content": "".join(["페르소나 발언 "] * 50)}]
+
+        # When
+        interned_history = store.intern_value(history)
+
+        # Then
+        assert interned_history[0]["content"] is content
+        assert interned_history[0]["speaker"] == "critic_agent"
+
+    def test_eviction_keeps_store_bounded(self):
+        """최대 용량을 넘으면 오래된 블롭이 제거되는지 테스트"""
+        # Given
+        store = BlobStore(min_blob_length=10, max_blob_chars=250)
+
+        # When
+        for i in range(5):
+            store.intern(str(i) * 100)
+
+        # Then
+        stats = store.stats()
+        assert stats["stored_chars"] <= 250
+        assert store.get(store.digest("4" * 100)) == "4" * 100
+        assert store.get(store.digest("0" * 100)) is None
+
+
+class TestResponseInterning:
+    """instrument_agent_blob_interning 테스트 스위트"""
+
+    def test_event_state_and_messages_share_one_object(self, monkeypatch):
+        """모델 응답 텍스트를 이벤트, state_delta, session.state, UI 메시지가 하나의 객체로 공유하는지 테스트"""
+        # Given
+        monkeypatch.setattr(blob_store, "default_blob_store", BlobStore())
+        monkeypatch.setattr(api_key_pool, "_default_pool", ApiKeyPool(["pool-a"]))
+        report = "시장 분석 보고서 본문입니다. " * 200
+
+        async def fake_generate(self, llm_request, stream=False):
+            # 매 호출마다 새 문자열 객체 생성
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="".join(report))]))
+
+        monkeypatch.setattr(_KeyedGemini, "generate_content_async", fake_generate)
+        agent = Agent(name="marketer_agent", model="gemini-2.0-flash", instruction="분석하세요",
+                      output_key="marketer_report_phase1")
+        instrument_agent_blob_interning(agent)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        runner = Runner(agent=agent, app_name="test_app", session_service=manager.session_service)
+        session_id = manager.create_session()[1]
+
+        async def run():
+            message = types.Content(role="user", parts=[types.Part(text="아이디어")])
+            return [event async for event in runner.run_async(user_id="test_user", session_id=session_id,
+                                                              new_message=message)]
+
+        # When
+        (event,) = asyncio.run(run())
+        session = manager.get_session(session_id)
+        messages = [{"role": "assistant", "content": intern_text("".join(report))}]
+
+        # Then
+        text = event.content.parts[0].text
+        assert text == report and text is not report
+        assert event.actions.state_delta["marketer_report_phase1"] is text
+        assert session.state["marketer_report_phase1"] is text
+        assert messages[0]["content"] is text
+        holders = [event.content.parts[0].text, session.state["marketer_report_phase1"], messages[0]["content"]]
+        assert deep_sizeof(holders) == sys.getsizeof(holders) + sys.getsizeof(text)
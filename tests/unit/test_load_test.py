@@ -0,0 +1,49 @@
+"""
+동시 사용자 부하 테스트를 위한 단위 테스트
+
+이 모듈은 src/load_test.py의 가상 사용자 진행 순서와, 가짜 모델로 실행한 전체 흐름
+(단계별 지연 시간 기록, 전역 서비스 복원)에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+
+from src import load_test
+from src.utils import model_router, rate_limiter
+from src.utils.api_key_pool import get_session_api_key
+
+
+class TestLoadTest:
+    """부하 테스트 스위트"""
+
+    def test_facilitator_script_spreads_user_replies(self):
+        """사용자 질문을 페르소나 발언 사이에 고르게 넣고 최종 요약으로 끝나는지 테스트"""
+        # When
+        script = load_test.build_facilitator_script(rounds=4, user_replies=1)
+        capped = load_test.build_facilitator_script(rounds=1, user_replies=3)
+
+        # Then
+        assert script == ["marketer_agent", "critic_agent", "USER", "engineer_agent", "marketer_agent", "FINAL_SUMMARY"]
+        assert capped == ["marketer_agent", "USER", "FINAL_SUMMARY"]
+
+    def test_concurrent_users_complete_all_stages(self):
+        """가짜 모델로 여러 사용자를 동시에 실행하면 모든 단계의 지연 시간이 기록되고, 끝나면 전역 서비스가 복원되는지 테스트"""
+        # Given
+        options = load_test.parse_args(["--users", "1,3", "--latency", "0", "--rounds", "2", "--user-replies", "1"])
+        previous_router = model_router._default_router
+        previous_limiter = rate_limiter._default_rate_limiter
+
+        # When
+        with load_test.load_test_environment(fake_model=True):
+            run = asyncio.run(load_test.run_load_test(options))
+
+        # Then
+        assert [(level["users"], level["completed"], level["errors"]) for level in run["levels"]] == [(1, 1, 0), (3, 3, 0)]
+        stages = run["levels"][1]["stages"]
+        assert {stage: summary["count"] for stage, summary in stages.items()} == {
+            "submit": 3, "phase1": 3, "transition": 3, "phase2_round": 6, "session": 3
+        }
+        assert run["levels"][1]["model_calls"] > 0
+        assert "phase2_round" in load_test.format_report(run)
+        assert model_router._default_router is previous_router
+        assert rate_limiter._default_rate_limiter is previous_limiter
+        assert get_session_api_key() is None
@@ -0,0 +1,107 @@
+"""
+로컬 중간 요약을 위한 단위 테스트
+
+이 모듈은 src/utils/local_summary.py의 짧은 보고서 요약, 추출 요약, 중간 요약 에이전트 콜백에 대한
+단위 테스트를 제공합니다.
+"""
+
+from types import SimpleNamespace
+
+from src.session_manager import SessionManager
+from src.ui.adk_controller import AdkController
+from src.utils.local_summary import make_local_summary_callback, split_sections, split_sentences, summarize_report_locally
+
+
+COMPACT_REPORT = """## 창의적 가치
+- 반려동물 산책 메이트 매칭은 기존 산책 앱과 차별화되는 기능입니다.
+- 산책 기록 공유는 보호자 커뮤니티 형성에 기여합니다."""
+
+SECTION_DETAILS = {
+    "시장 분석": "1인 가구 증가로 국내 반려동물 양육 인구는 꾸준히 늘고 있습니다. 도심 거주자는 평일 저녁 수요가 많습니다.",
+    "수익 모델": "프리미엄 구독은 월 4,900원으로 시작합니다. 제휴 동물병원 광고가 두 번째 매출원이 됩니다.",
+    "마케팅 전략": "초기에는 지역 인플루언서와 협업합니다. 오프라인 행사에서 체험 쿠폰을 배포합니다.",
+    "경쟁 환경": "기존 앱들은 단순 위치 공유만 제공합니다. 대형 플랫폼이 유사 서비스를 출시할 위험이 있습니다.",
+    "실행 계획": "첫 분기에는 서울 두 개 구에서 시범 운영합니다. 안전 인증 절차를 먼저 마련합니다.",
+}
+CENTRAL_SENTENCE = "산책 매칭 기능은 반려동물 보호자 커뮤니티 성장의 핵심입니다({})."
+# 짧은 테스트 보고서를 긴 보고서로 취급하기 위한 설정
+LONG_REPORT_CONFIG = {"compact_report_max_tokens": 50}
+
+
+def validate(summary):
+    controller = AdkController(SessionManager(app_name="test_app", user_id="test_user"))
+    return controller._validate_agent_response(summary, "marketer_summary_agent", "marketer_report_phase1_summary")
+
+
+class TestSummarizeReportLocally:
+    """summarize_report_locally 테스트 스위트"""
+
+    def test_compact_report_passes_summary_validation(self):
+        """짧은 보고서는 그대로 요약 형식으로 변환되어 응답 검증을 통과하는지 테스트"""
+        # When
+        summary = summarize_report_locally(COMPACT_REPORT)
+
+        # Then
+        assert split_sentences(COMPACT_REPORT)[0].startswith("반려동물 산책 메이트")
+        assert "## 창의적 가치" not in summary
+        assert validate(summary) == summary
+
+    def test_long_report_uses_extractive_summary_when_sections_are_covered(self):
+        """중심 문장이 모든 구획에 있는 긴 보고서는 추출 요약으로 요약하는지 테스트"""
+        # Given
+        report = "\n".join(f"## {title}\n{CENTRAL_SENTENCE.format(title)} {details}"
+                           for title, details in SECTION_DETAILS.items())
+
+        # When
+        summary = summarize_report_locally(report, {**LONG_REPORT_CONFIG, "key_points": 5})
+
+        # Then
+        key_points = summary.split("**종합 요약:**")[0].strip().splitlines()[1:]
+        assert len(split_sections(report)) == 5
+        assert key_points == [f"- {CENTRAL_SENTENCE.format(title)}" for title in SECTION_DETAILS]
+        assert validate(summary) == summary
+
+    def test_falls_back_to_llm_when_selected_sentences_miss_sections(self):
+        """중심 문장이 한 구획에 몰린 긴 보고서는 추출 요약 대신 None을 반환하는지 테스트"""
+        # Given
+        first_section = " ".join(CENTRAL_SENTENCE.format(title) for title in SECTION_DETAILS)
+        report = f"1. **아이디어 개요**\n{first_section}\n" + "\n".join(
+            f"{index}. **{title}**\n{details}" for index, (title, details) in enumerate(SECTION_DETAILS.items(), 2))
+
+        # When
+        summary = summarize_report_locally(report, LONG_REPORT_CONFIG)
+
+        # Then
+        assert len(split_sections(report)) == 6
+        assert summary is None
+        assert summarize_report_locally(report, {**LONG_REPORT_CONFIG, "extractive_min_section_coverage": 0.1})
+
+    def test_falls_back_to_llm_when_not_suitable(self):
+        """문장이 부족하거나 제목 구획이 없는 긴 보고서, llm 모드에서는 None을 반환하는지 테스트"""
+        # Given
+        one_long_sentence = "가" * 3000
+        untitled_report = " ".join(SECTION_DETAILS.values())
+
+        # When / Then
+        assert summarize_report_locally(one_long_sentence) is None
+        assert summarize_report_locally(untitled_report, LONG_REPORT_CONFIG) is None
+        assert summarize_report_locally(COMPACT_REPORT, {"mode": "llm"}) is None
+        assert summarize_report_locally("") is None
+
+
+class TestLocalSummaryCallback:
+    """make_local_summary_callback 테스트 스위트"""
+
+    def test_returns_model_response_from_session_state(self):
+        """세션 상태의 보고서로 만든 요약을 모델 응답으로 반환하는지 테스트"""
+        # Given
+        callback = make_local_summary_callback("marketer_report_phase1")
+        context = SimpleNamespace(state={"marketer_report_phase1": COMPACT_REPORT})
+
+        # When
+        response = callback(callback_context=context, llm_request=None)
+        missing = callback(callback_context=SimpleNamespace(state={}), llm_request=None)
+
+        # Then
+        assert response.content.parts[0].text.startswith("**핵심 포인트:**")
+        assert missing is None
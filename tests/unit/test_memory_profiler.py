@@ -0,0 +1,72 @@
+"""
+단계별 메모리 프로파일링을 위한 단위 테스트
+
+이 모듈은 src/utils/memory_profiler.py의 세션 객체 크기 분석과,
+단계 경계 스냅샷 사이의 할당 위치별 증가량 보고에 대한 단위 테스트를 제공합니다.
+"""
+
+import pytest
+
+from src.session_manager import SessionManager
+from src.utils import memory_profiler
+from src.utils.memory_profiler import configure_memory_profiling, session_size_breakdown, take_phase_snapshot
+
+
+@pytest.fixture(autouse=True)
+def stop_profiling():
+    yield
+    memory_profiler.stop_memory_profiling()
+
+
+class TestMemoryProfiler:
+    """메모리 프로파일러 테스트 스위트"""
+
+    def test_session_size_breakdown(self):
+        """세션 상태 키별 크기, 이벤트, UI 메시지 목록의 크기를 구분해 계산하는지 테스트"""
+        # Given
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        _, session_id = manager.start_new_idea_session("아이디어")
+        manager.update_session_state({"marketer_report_phase1": "보고서 " * 2000})
+        session = manager.get_session(session_id)
+        messages = [{"role": "assistant", "content": "메시지 " * 100} for _ in range(3)]
+
+        # When
+        breakdown = session_size_breakdown(session, messages)
+
+        # Then
+        assert list(breakdown["state_top_keys"])[0] == "marketer_report_phase1"
+        assert breakdown["state_bytes"] > breakdown["state_top_keys"]["marketer_report_phase1"] > 2000 * 3
+        assert breakdown["events"] == len(session.events) > 0
+        assert breakdown["messages"] == 3
+        assert breakdown["messages_bytes"] > 3 * 300
+
+    def test_snapshots_report_growth_between_boundaries(self):
+        """꺼져 있으면 세션을 조회하지 않고, 켜져 있으면 직전 경계 이후 늘어난 할당 위치를 보고하는지 테스트"""
+        # Given
+        lookups = []
+
+        def get_session():
+            lookups.append(1)
+            return None
+
+        # When: 꺼진 상태
+        disabled = take_phase_snapshot("phase1_complete", session=get_session)
+
+        # Then
+        assert disabled is None
+        assert lookups == []
+
+        # Given: 켜진 상태에서 두 경계 사이에 큰 객체를 할당해 유지
+        configure_memory_profiling(enabled=True, top=20)
+        take_phase_snapshot("phase1_complete", session=get_session, session_id="session-1")
+        retained = [bytearray(256 * 1024) for _ in range(4)]
+
+        # When
+        report = take_phase_snapshot("phase2_round", session_id="session-1", round=1)
+
+        # Then
+        assert lookups == [1]
+        assert (report["boundary"], report["session_id"], report["round"]) == ("phase2_round", "session-1", 1)
+        growth = [item for item in report["top_since_previous"] if "test_memory_profiler.py" in item["location"]]
+        assert growth and growth[0]["size_diff_bytes"] >= len(retained) * 256 * 1024
+        assert memory_profiler.get_memory_reports()[-1] is report
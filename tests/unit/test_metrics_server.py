@@ -0,0 +1,99 @@
+"""
+메트릭 노출 엔드포인트를 위한 단위 테스트
+
+이 모듈은 src/utils/metrics_server.py의 Prometheus 텍스트 노출 형식 렌더링과
+백그라운드 HTTP 서버에 대한 단위 테스트를 제공합니다.
+"""
+
+import urllib.request
+
+import pytest
+
+from src.session_manager import SessionManager
+from src.utils import metrics_server, model_router
+from src.utils.model_monitor import AIModelMonitor
+from src.utils.model_router import ModelRouter
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    """임시 로그 파일을 쓰는 모니터를 전역 라우터로 설정하는 픽스처"""
+    monitor = AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))
+    monkeypatch.setattr(model_router, "_default_router", ModelRouter(monitor))
+    return monitor
+
+
+class TestRenderMetrics:
+    """render_metrics 테스트 스위트"""
+
+    def test_exposes_counters_and_histograms(self, monitor):
+        """호출 카운터, 오류 유형, 누적 히스토그램 버킷이 노출되는지 테스트"""
+        # Given
+        monitor.record_api_call("model-a", True, 0.4)
+        monitor.record_api_call("model-a", True, 3.0)
+        monitor.record_api_call("model-a", False, 0.1, "ResourceExhausted")
+        monitor.record_stream_timing("model-a", "marketer", 0.2, 0.3, [], 3.0)
+
+        # When
+        text = metrics_server.render_metrics()
+
+        # Then
+        assert 'aidea_model_calls_total{model="model-a",outcome="success"} 2' in text
+        assert 'aidea_model_calls_total{model="model-a",outcome="error"} 1' in text
+        assert 'aidea_model_errors_total{model="model-a",error_type="ResourceExhausted"} 1' in text
+        assert 'aidea_model_response_seconds_bucket{model="model-a",le="0.5"} 2' in text
+        assert 'aidea_model_response_seconds_bucket{model="model-a",le="+Inf"} 3' in text
+        assert 'aidea_model_time_to_first_content_seconds_count{model="model-a",role="marketer"} 1' in text
+        assert 'aidea_model_time_to_first_event_seconds_count{model="model-a",role="marketer"} 1' in text
+        assert "# TYPE aidea_model_response_seconds histogram" in text
+
+    def test_exposes_sessions_and_app_counters(self, monitor):
+        """활성 세션 수와 애플리케이션 카운터가 노출되는지 테스트"""
+        # Given
+        manager = SessionManager(app_name="metrics_app", user_id="metrics_user")
+        manager.create_session()
+        before = SessionManager.count_active_sessions()
+        metrics_server.increment_counter("aidea_test_rounds_total", "Test rounds.", phase="2")
+
+        # When
+        text = metrics_server.render_metrics()
+
+        # Then
+        assert before >= 1
+        assert f"aidea_active_sessions {before}" in text
+        assert 'aidea_test_rounds_total{phase="2"} 1' in text
+
+
+class TestMetricsServer:
+    """백그라운드 메트릭 서버 테스트 스위트"""
+
+    def test_serves_metrics_over_http(self, monitor):
+        """백그라운드 스레드의 HTTP 서버가 /metrics를 제공하는지 테스트"""
+        # Given
+        monitor.record_api_call("model-b", True, 1.0)
+        port = metrics_server.start_metrics_server(port=0)
+
+        try:
+            # When
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+                content_type = response.headers["Content-Type"]
+
+            # Then
+            assert content_type.startswith("text/plain; version=0.0.4")
+            assert 'aidea_model_calls_total{model="model-b",outcome="success"} 1' in body
+            assert metrics_server.start_metrics_server(port=0) == port
+        finally:
+            metrics_server.stop_metrics_server()
+
+    def test_malformed_port_setting_disables_server(self, monkeypatch):
+        """AIDEA_METRICS_PORT 값이 잘못되어도 예외 없이 서버를 시작하지 않는지 테스트"""
+        # Given
+        monkeypatch.setenv(metrics_server.METRICS_PORT_ENV, "abc")
+
+        # When
+        port = metrics_server.start_metrics_server()
+
+        # Then
+        assert port is None
+        assert metrics_server._server is None
@@ -0,0 +1,65 @@
+"""
+마이크로벤치마크를 위한 단위 테스트
+
+이 모듈은 src/microbenchmark.py의 기준값 비교와 고정 데이터,
+벤치마크 대상 함수의 비정상 입력 처리에 대한 단위 테스트를 제공합니다.
+"""
+
+from config.prompts import optimize_context_length
+from src import microbenchmark
+
+
+class TestBaselineComparison:
+    """기준값 비교 테스트 스위트"""
+
+    def test_regressions_are_scaled_by_calibration(self):
+        """기준값을 보정 작업 시간 비율로 맞춘 뒤, 허용 배율과 최소 차이를 모두 넘는 항목만 회귀로 판단하는지 테스트"""
+        # Given: 이 기계가 기준값을 잰 기계보다 2배 느림
+        baseline = {"calibration_us": 100.0, "results": {"slow": 100.0, "scaled": 100.0, "tiny": 1.0}}
+        run = {"calibration_us": 200.0, "results": {"slow": 500.0, "scaled": 350.0, "tiny": 5.0, "new": 1.0}}
+
+        # When
+        comparisons = microbenchmark.compare_to_baseline(run, baseline, threshold=2.0)
+
+        # Then
+        by_name = {comparison["name"]: comparison for comparison in comparisons}
+        assert set(by_name) == {"slow", "scaled", "tiny"}
+        assert by_name["scaled"]["baseline_us"] == 200.0
+        assert [name for name, comparison in by_name.items() if comparison["regressed"]] == ["slow"]
+
+    def test_stored_baseline_covers_all_cases(self):
+        """저장된 기준값에 모든 벤치마크 항목이 있는지 테스트 (항목을 추가하면 --update-baseline 필요)"""
+        # When
+        baseline = microbenchmark.load_baseline()
+
+        # Then
+        assert baseline is not None
+        assert set(microbenchmark.get_benchmark_cases()) <= set(baseline["results"])
+
+
+class TestBenchmarkedFunctions:
+    """벤치마크 대상 함수 테스트 스위트"""
+
+    def test_adversarial_facilitator_outputs_are_parsed(self):
+        """비정상 퍼실리테이터 응답에서도 유효한 JSON을 찾는지 테스트"""
+        # Given
+        controller = microbenchmark._new_discussion_controller()
+
+        # When
+        parsed = {name: controller._parse_facilitator_response(text)
+                  for name, text in microbenchmark.build_facilitator_outputs().items()}
+
+        # Then
+        assert {result["next_agent"] for result in parsed.values()} == {"critic_agent"}
+        assert controller._clean_json_text("```json\n{}" + " " * 1000 + "\n```") == "{}"
+
+    def test_optimize_context_length_keeps_duplicate_lines_in_order(self):
+        """선택된 줄과 같은 내용의 줄은 모두 원래 순서대로 남기는지 테스트"""
+        # Given: 중요도가 같은 줄은 원래 순서대로 채우므로 첫 빈 줄까지 선택되고 긴 줄에서 멈춤
+        text = "\n".join(["### 핵심 목표", "", "**중요** 결과", "보통 줄 " * 30, ""])
+
+        # When
+        optimized = optimize_context_length(text, max_tokens=10)
+
+        # Then
+        assert optimized.split("\n") == ["### 핵심 목표", "", "**중요** 결과", ""]
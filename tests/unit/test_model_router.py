@@ -0,0 +1,165 @@
+"""
+자동 모델 선택을 위한 단위 테스트
+
+이 모듈은 src/utils/model_router.py의 ModelRouter와 AIModelMonitor의
+최근 성능 지표(p95 응답 시간, 오류율) 및 스트림 지연 지표에 대한 단위 테스트를 제공합니다.
+"""
+
+import random
+
+from google.adk.events import Event
+from google.genai import types
+
+from config.models import ModelType
+from src.utils.model_monitor import AIModelMonitor
+from src.utils.model_router import ModelRouter
+
+
+FLASH = ModelType.GEMINI_2_5_FLASH_PREVIEW_0417.value
+PRO = ModelType.GEMINI_2_5_PRO_PREVIEW_0506.value
+
+
+def record_calls(monitor, model, count, response_time, success=True):
+    for _ in range(count):
+        monitor.record_api_call(model, success, response_time, None if success else "ResourceExhausted")
+
+
+class TestAIModelMonitorRecentStats:
+    """AIModelMonitor 최근 성능 지표 테스트 스위트"""
+
+    def test_p95_reflects_tail_latency(self, tmp_path):
+        """평균이 낮아도 꼬리 지연이 p95에 반영되는지 테스트"""
+        # Given
+        monitor = AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))
+        record_calls(monitor, FLASH, 18, 1.0)
+        record_calls(monitor, FLASH, 2, 30.0)
+
+        # When
+        stats = monitor.get_recent_stats(FLASH)
+
+        # Then
+        assert stats["samples"] == 20
+        assert stats["p95_response_time"] == 30.0
+        assert stats["error_rate"] == 0
+
+    def test_error_rate_uses_recent_window(self, tmp_path):
+        """누적 성공률이 높아도 최근 실패가 오류율에 반영되는지 테스트"""
+        # Given
+        monitor = AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))
+        record_calls(monitor, FLASH, 100, 1.0)
+        record_calls(monitor, FLASH, 10, 0.5, success=False)
+
+        # When
+        stats = monitor.get_recent_stats(FLASH, window=20)
+
+        # Then
+        assert stats["error_rate"] == 0.5
+
+
+class TestModelRouter:
+    """ModelRouter 테스트 스위트"""
+
+    def make_router(self, tmp_path, **config):
+        monitor = AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))
+        router = ModelRouter(monitor, config={"exploration_rate": 0.0, **config}, rng=random.Random(0))
+        return monitor, router
+
+    def test_uses_preferred_model_without_data(self, tmp_path):
+        """통계가 없으면 사용자가 선택한 모델을 사용하는지 테스트"""
+        # Given
+        _, router = self.make_router(tmp_path)
+
+        # When
+        model, reason = router.select_model("marketer", PRO)
+
+        # Then
+        assert (model, reason) == (PRO, "insufficient_data")
+
+    def test_shifts_away_from_degraded_model(self, tmp_path):
+        """선호 모델의 오류율이 높아지면 다른 모델로 전환하는지 테스트"""
+        # Given
+        monitor, router = self.make_router(tmp_path)
+        record_calls(monitor, FLASH, 10, 2.0)
+        record_calls(monitor, PRO, 5, 8.0)
+        record_calls(monitor, PRO, 5, 1.0, success=False)
+
+        # When
+        model, reason = router.select_model("critic", PRO)
+
+        # Then
+        assert (model, reason) == (FLASH, "best_score")
+
+    def test_prefers_lower_tail_latency(self, tmp_path):
+        """오류율이 같으면 p95 응답 시간이 낮은 모델을 선택하는지 테스트"""
+        # Given
+        monitor, router = self.make_router(tmp_path)
+        record_calls(monitor, FLASH, 10, 40.0)
+        record_calls(monitor, PRO, 10, 5.0)
+
+        # When
+        model, _ = router.select_model("engineer", FLASH)
+
+        # Then
+        assert model == PRO
+
+    def test_quality_floor_excludes_models(self, tmp_path):
+        """품질 하한보다 낮은 모델은 성능이 좋아도 선택하지 않는지 테스트"""
+        # Given
+        monitor, router = self.make_router(tmp_path, quality_floor={"default": 0.7, "final_summary": 0.85})
+        record_calls(monitor, FLASH, 10, 1.0)
+        record_calls(monitor, PRO, 10, 50.0)
+
+        # When
+        summary_model, _ = router.select_model("final_summary", FLASH)
+        persona_model, _ = router.select_model("marketer", PRO)
+
+        # Then
+        assert summary_model == PRO
+        assert persona_model == FLASH
+
+    def test_exploration_keeps_sampling_other_models(self, tmp_path):
+        """탐색 비율만큼 다른 후보에도 트래픽을 보내는지 테스트"""
+        # Given
+        monitor, router = self.make_router(tmp_path, exploration_rate=0.2)
+        record_calls(monitor, FLASH, 10, 1.0)
+        record_calls(monitor, PRO, 10, 50.0)
+
+        # When
+        reasons = [router.select_model("marketer", FLASH)[1] for _ in range(500)]
+
+        # Then
+        assert 50 < reasons.count("exploration") < 150
+
+
+class TestStreamTimings:
+    """이벤트 스트림 지연 지표 테스트 스위트"""
+
+    def test_records_first_content_and_gaps_per_role(self, tmp_path):
+        """부분 응답 이벤트 도착 시각으로 첫 텍스트까지 시간과 간격이 역할별로 기록되는지 테스트"""
+        # Given
+        from src.utils import model_router
+        monitor = AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))
+        call = {
+            "model": FLASH, "agent_name": "marketer_agent_phase2", "start_time": 100.0, "finished": True,
+            "first_event_time": None, "first_content_time": None, "last_content_time": None,
+            "last_event_time": None, "inter_delta_gaps": [],
+        }
+        scope = [call]
+        partial_event = Event(author="marketer_agent_phase2", partial=True,
+                              content=types.Content(role="model", parts=[types.Part(text="조각")]))
+        final_event = Event(author="marketer_agent_phase2",
+                            content=types.Content(role="model", parts=[types.Part(text="조각조각조각")]))
+
+        # When
+        for arrival in (100.5, 101.0, 101.5):
+            model_router._track_stream_event(scope, partial_event, arrival)
+        model_router._track_stream_event(scope, final_event, 101.75)
+        model_router._record_stream_timings(monitor, scope)
+
+        # Then: 부분 응답 뒤의 최종 이벤트는 간격에 포함되지 않음
+        stats = monitor.get_stream_stats(FLASH, role="marketer")
+        assert stats["time_to_first_event"]["p50"] == 0.5
+        assert stats["time_to_first_content"]["p50"] == 0.5
+        assert stats["inter_delta_gap"]["count"] == 2
+        assert stats["stream_duration"]["max"] == 1.75
+        assert monitor.get_stream_stats(FLASH, role="critic")["time_to_first_content"]["count"] == 0
@@ -0,0 +1,207 @@
+"""
+1단계 분석 결과 캐시를 위한 단위 테스트
+
+이 모듈은 src/session_store/phase1_cache.py의 캐시 키 계산, TTL, 크기 기반 제거, 유사 입력 조회와
+AdkController의 캐시 적중 처리에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+
+import pytest
+from google.genai import types
+
+from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator
+from src.session_manager import SessionManager
+from src.session_store import phase1_cache as phase1_cache_module
+from src.session_store.phase1_cache import (
+    Phase1ResultCache,
+    phase1_cache_key,
+    phase1_similarity_text,
+    phase1_variant_key,
+)
+from src.ui.adk_controller import AdkController
+
+
+PHASE1_OUTPUTS = {
+    "marketer_report_phase1": "마케터 보고서",
+    "marketer_report_phase1_summary": "마케터 요약",
+    "critic_report_phase1": "비평가 보고서",
+    "critic_report_phase1_summary": "비평가 요약",
+    "engineer_report_phase1": "엔지니어 보고서",
+    "engineer_report_phase1_summary": "엔지니어 요약",
+    "summary_report_phase1": "최종 요약",
+}
+
+
+class TestPhase1CacheKey:
+    """phase1_cache_key 테스트 스위트"""
+
+    def test_whitespace_differences_share_key(self):
+        """공백만 다른 입력은 같은 키를 갖는지 테스트"""
+        assert phase1_cache_key("  반려동물  산책 앱 ", "수익화", model="m") == phase1_cache_key("반려동물 산책 앱", "수익화 ", model="m")
+
+    def test_model_and_prompt_changes_change_key(self, monkeypatch):
+        """모델이나 프롬프트 템플릿이 바뀌면 키가 달라지는지 테스트"""
+        # Given
+        original = phase1_cache_key("아이디어", model="model-a")
+
+        # When
+        other_model = phase1_cache_key("아이디어", model="model-b")
+        monkeypatch.setattr(phase1_cache_module, "MARKETER_PROMPT", "변경된 프롬프트")
+        changed_prompt = phase1_cache_key("아이디어", model="model-a")
+        monkeypatch.setattr(phase1_cache_module, "PHASE1_INTERMEDIATE_SUMMARY_PROMPT", "변경된 요약 프롬프트 {report_content}")
+        changed_summary_prompt = phase1_cache_key("아이디어", model="model-a")
+
+        # Then
+        assert original != other_model
+        assert original != changed_prompt
+        assert changed_prompt != changed_summary_prompt
+
+
+class TestPhase1ResultCache:
+    """Phase1ResultCache 테스트 스위트"""
+
+    def test_round_trip_preserves_order(self, tmp_path):
+        """저장한 출력이 표시 순서 그대로 조회되는지 테스트"""
+        # Given
+        cache = Phase1ResultCache(str(tmp_path / "cache.sqlite3"))
+
+        # When
+        cache.put("key", PHASE1_OUTPUTS)
+        cached = cache.get("key")
+
+        # Then
+        assert list(cached.items()) == list(PHASE1_OUTPUTS.items())
+        assert cache.get("missing") is None
+        assert cache.stats()["hit_count"] == 1
+        assert cache.stats()["miss_count"] == 1
+
+    def test_expired_entries_are_dropped(self, tmp_path):
+        """TTL이 지난 항목은 조회되지 않고 삭제되는지 테스트"""
+        # Given
+        cache = Phase1ResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=-1)
+        cache.put("key", PHASE1_OUTPUTS)
+
+        # When
+        cached = cache.get("key")
+
+        # Then
+        assert cached is None
+        assert cache.stats()["entry_count"] == 0
+
+    def test_evicts_least_recently_used_over_size_limit(self, tmp_path):
+        """크기 상한을 넘으면 가장 오래 사용되지 않은 항목부터 제거되는지 테스트"""
+        # Given
+        entry = {"summary_report_phase1": "가" * 100}
+        cache = Phase1ResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=700)
+        cache.put("first", entry)
+        cache.put("second", entry)
+        assert cache.get("first") is not None  # first를 최근 사용으로 갱신
+
+        # When
+        cache.put("third", entry)
+
+        # Then
+        assert cache.get("second") is None
+        assert cache.get("first") is not None
+        assert cache.get("third") is not None
+
+    def test_find_similar_matches_same_variant_only(self, tmp_path):
+        """유사 입력 조회가 같은 실행 구성의 항목만 반환하고 재시작 후에도 동작하는지 테스트"""
+        # Given
+        db_path = str(tmp_path / "cache.sqlite3")
+        idea = "동네 주민끼리 남는 식재료를 나누는 공유 냉장고 앱을 만들고 싶습니다. 유통기한이 임박한 재료를 등록하면 근처 이웃에게 알림을 보냅니다."
+        Phase1ResultCache(db_path).put(
+            "key", PHASE1_OUTPUTS,
+            input_text=phase1_similarity_text(idea, "지역 커뮤니티 활성화"),
+            variant=phase1_variant_key("model-a")
+        )
+        cache = Phase1ResultCache(db_path)  # 파일에서 색인을 다시 생성
+
+        # When
+        query_text = phase1_similarity_text(idea.replace("만들고 싶습니다", "만들고 싶어요!"), "지역 커뮤니티 활성화")
+        match = cache.find_similar(query_text, phase1_variant_key("model-a"))
+        other_model = cache.find_similar(query_text, phase1_variant_key("model-b"))
+
+        # Then
+        assert match[0] == "key"
+        assert 0.8 <= match[1] < 1.0
+        assert match[2] == idea
+        assert other_model is None
+        assert cache.stats()["hit_count"] == 0
+
+    def test_find_similar_rejects_different_idea_with_same_details(self, tmp_path):
+        """추가 정보가 같아도 아이디어의 핵심 단어가 다르면 유사 항목으로 보지 않는지 테스트"""
+        # Given
+        cache = Phase1ResultCache(str(tmp_path / "cache.sqlite3"))
+        details = ("중고 거래의 신뢰 문제 해결", "초기 예산 500만원, 3개월 내 출시", "신뢰, 편의성")
+        cache.put("key", PHASE1_OUTPUTS, input_text=phase1_similarity_text("대학생 대상 중고 교재 거래 앱", *details),
+                  variant="variant")
+
+        # When
+        candidates = [cache.find_similar(phase1_similarity_text(idea, *details), "variant")
+                      for idea in ("직장인 대상 중고 교재 거래 앱", "대학생 대상 중고 가구 거래 앱", "대학생 대상 중고 교재 대여 앱")]
+        same_idea = cache.find_similar(phase1_similarity_text("대학생 대상 중고교재 거래앱!", *details), "variant")
+
+        # Then
+        assert candidates == [None, None, None]
+        assert same_idea == ("key", 1.0, "대학생 대상 중고 교재 거래 앱")
+
+
+class TestAdkControllerPhase1Cache:
+    """AdkController 1단계 캐시 연동 테스트 스위트"""
+
+    def test_cache_hit_fills_session_state_without_running_agents(self, tmp_path, monkeypatch):
+        """캐시 적중 시 에이전트를 실행하지 않고 세션 상태를 채우는지 테스트"""
+        # Given
+        cache = Phase1ResultCache(str(tmp_path / "cache.sqlite3"))
+        cache.put("key", PHASE1_OUTPUTS)
+        monkeypatch.setattr("src.ui.adk_controller.get_phase1_cache", lambda: cache)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        _, session_id = manager.start_new_idea_session("아이디어")
+        controller = AdkController(manager)
+        input_content = types.Content(role="user", parts=[types.Part(text="아이디어: 아이디어")])
+
+        # When
+        success, results, outputs = asyncio.run(
+            controller.execute_phase1_workflow(session_id, input_content, AIdeaLabOrchestrator(), cache_key="key")
+        )
+
+        # Then
+        assert success and controller.phase1_cache_hit
+        assert [result["output_key"] for result in results] == list(PHASE1_OUTPUTS)
+        assert outputs == set(PHASE1_OUTPUTS)
+        state = manager.get_session(session_id).state
+        assert state["summary_report_phase1"] == "최종 요약"
+        assert state["initial_idea"] == "아이디어"
+
+    def test_near_duplicate_is_offered_and_reused_only_when_chosen(self, tmp_path, monkeypatch):
+        """키가 다른 유사 입력은 세션 상태를 바꾸지 않고 제안만 하며, 재사용을 선택하면 결과를 채우는지 테스트"""
+        # Given
+        idea = "동네 주민끼리 남는 식재료를 나누는 공유 냉장고 앱을 만들고 싶습니다. 유통기한이 임박한 재료를 등록하면 근처 이웃에게 알림을 보냅니다."
+        cache = Phase1ResultCache(str(tmp_path / "cache.sqlite3"))
+        cache.put("old-key", PHASE1_OUTPUTS, input_text=phase1_similarity_text(idea), variant="variant")
+        monkeypatch.setattr("src.ui.adk_controller.get_phase1_cache", lambda: cache)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        _, session_id = manager.start_new_idea_session(idea)
+        controller = AdkController(manager)
+        input_content = types.Content(role="user", parts=[types.Part(text=f"아이디어: {idea}")])
+        similarity_text = phase1_similarity_text(idea + " 어떨까요?")
+
+        # When
+        offer = controller.find_similar_phase1_result("new-key", similarity_text, "variant")
+        exact = controller.find_similar_phase1_result("old-key", similarity_text, "variant")
+        state_before_choice = dict(manager.get_session(session_id).state)
+        success, _, _ = asyncio.run(controller.execute_phase1_workflow(
+            session_id, input_content, AIdeaLabOrchestrator(), cache_key="new-key",
+            similarity_text=similarity_text, cache_variant="variant", reuse_similar=offer
+        ))
+
+        # Then
+        assert offer[0] == "old-key" and offer[2] == idea
+        assert 0.8 <= offer[1] < 1.0
+        assert exact is None
+        assert "summary_report_phase1" not in state_before_choice
+        assert success and controller.phase1_cache_hit
+        assert controller.phase1_cache_similarity == offer[1]
+        assert manager.get_session(session_id).state["summary_report_phase1"] == "최종 요약"
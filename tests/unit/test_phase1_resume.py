@@ -0,0 +1,100 @@
+"""
+1단계 부분 재실행을 위한 단위 테스트
+
+이 모듈은 AIdeaLabOrchestrator의 재실행 단계 계산과 부분 워크플로우 구성,
+AdkController의 유효한 출력 판별과 재실행 처리에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+
+from google.genai import types
+
+from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator
+from src.session_manager import SessionManager
+from src.ui.adk_controller import FALLBACK_RESPONSE_TEMPLATE, SUMMARY_FALLBACK_RESPONSE, AdkController
+
+
+VALID_SUMMARY = "**핵심 포인트:**\n- 시장 수요가 충분합니다.\n\n**종합 요약:**\n수요는 있으나 경쟁이 치열합니다."
+VALID_REPORT = "이 아이디어는 명확한 타깃 고객층과 수익 모델을 갖추고 있습니다."
+
+VALID_OUTPUTS = {
+    "marketer_report_phase1": VALID_REPORT,
+    "marketer_report_phase1_summary": VALID_SUMMARY,
+    "critic_report_phase1": VALID_REPORT,
+    "critic_report_phase1_summary": VALID_SUMMARY,
+    "engineer_report_phase1": VALID_REPORT,
+    "engineer_report_phase1_summary": VALID_SUMMARY,
+    "summary_report_phase1": VALID_REPORT,
+}
+
+
+class TestPhase1StagesToRun:
+    """1단계 재실행 단계 계산 테스트 스위트"""
+
+    def test_missing_report_reruns_its_summary_and_final_summary(self):
+        """보고서가 누락되면 해당 보고서, 중간 요약, 최종 요약만 다시 실행하는지 테스트"""
+        # Given
+        orchestrator = AIdeaLabOrchestrator()
+        valid_keys = [key for key in VALID_OUTPUTS if key not in ("critic_report_phase1", "summary_report_phase1")]
+
+        # When
+        stages = orchestrator.get_phase1_stages_to_run(valid_keys)
+
+        # Then
+        assert stages == ["critic_report_phase1", "critic_report_phase1_summary", "summary_report_phase1"]
+
+    def test_complete_outputs_need_no_stages_and_partial_workflow_keeps_order(self):
+        """모든 출력이 유효하면 재실행할 단계가 없고, 부분 워크플로우가 지정한 단계만 순서대로 포함하는지 테스트"""
+        # Given
+        orchestrator = AIdeaLabOrchestrator()
+
+        # When
+        stages = orchestrator.get_phase1_stages_to_run(VALID_OUTPUTS)
+        workflow = orchestrator.get_phase1_workflow(output_keys=["summary_report_phase1", "engineer_report_phase1_summary"])
+
+        # Then
+        assert stages == []
+        assert [agent.output_key for agent in workflow.sub_agents] == ["engineer_report_phase1_summary", "summary_report_phase1"]
+
+
+class TestAdkControllerPhase1Resume:
+    """AdkController 1단계 부분 재실행 테스트 스위트"""
+
+    def test_fallback_and_invalid_outputs_are_not_kept(self):
+        """대체 응답, 형식이 맞지 않는 요약, 누락된 출력은 유효한 출력에서 제외되는지 테스트"""
+        # Given
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        _, session_id = manager.start_new_idea_session("아이디어")
+        manager.update_session_state({
+            **VALID_OUTPUTS,
+            "critic_report_phase1": FALLBACK_RESPONSE_TEMPLATE.format(agent_name="critic_agent"),
+            "engineer_report_phase1_summary": SUMMARY_FALLBACK_RESPONSE,
+            "marketer_report_phase1_summary": "요약 형식을 따르지 않은 충분히 긴 응답입니다.",
+            "summary_report_phase1": "",
+        })
+        controller = AdkController(manager)
+
+        # When
+        valid_outputs = controller.get_valid_phase1_outputs(session_id, AIdeaLabOrchestrator())
+
+        # Then
+        assert set(valid_outputs) == {"marketer_report_phase1", "critic_report_phase1_summary", "engineer_report_phase1"}
+
+    def test_resume_with_complete_outputs_skips_workflow(self):
+        """재실행 시 모든 출력이 유효하면 워크플로우를 실행하지 않고 성공을 반환하는지 테스트"""
+        # Given
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        _, session_id = manager.start_new_idea_session("아이디어")
+        manager.update_session_state(VALID_OUTPUTS)
+        controller = AdkController(manager)
+        input_content = types.Content(role="user", parts=[types.Part(text="아이디어: 아이디어")])
+
+        # When
+        success, results, outputs = asyncio.run(controller.execute_phase1_workflow(
+            session_id, input_content, AIdeaLabOrchestrator(), resume=True
+        ))
+
+        # Then
+        assert success
+        assert results == []
+        assert outputs == set(VALID_OUTPUTS)
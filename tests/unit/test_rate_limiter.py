@@ -0,0 +1,125 @@
+"""
+레이트 리미터를 위한 단위 테스트
+
+이 모듈은 src/utils/rate_limiter.py의 토큰 버킷 대기, 세션 간 공정한 차례 배분,
+할당량 초과 보고 처리, 예외로 끝난 호출의 예약 정리에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+import time
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.utils import api_key_pool, model_router, rate_limiter
+from src.utils.api_key_pool import ApiKeyPool, _KeyedGemini
+from src.utils.model_monitor import AIModelMonitor
+from src.utils.model_router import ModelRouter, monitored_event_stream
+from src.utils.rate_limiter import RateLimiter, is_rate_limit_error
+
+MODEL = "test-model"
+
+
+class TestRateLimiter:
+    """RateLimiter 테스트 스위트"""
+
+    def test_calls_beyond_burst_wait_for_refill(self, monkeypatch):
+        """버킷 용량을 넘는 호출은 채워지는 속도에 맞춰 대기하는지 테스트"""
+        # Given: 분당 600회 * 0.9 = 초당 9회, 버킷 용량 9회
+        monkeypatch.setenv("AIDEA_RATE_LIMIT_RPM", "600")
+        limiter = RateLimiter({"burst_seconds": 1.0, "poll_interval_seconds": 0.005})
+
+        async def run():
+            return await asyncio.gather(*(limiter.acquire(MODEL, 10, session_id=f"s{i}", api_key_id="key") for i in range(12)))
+
+        # When
+        started_at = time.monotonic()
+        waits = asyncio.run(run())
+        elapsed = time.monotonic() - started_at
+
+        # Then
+        assert sum(1 for wait in waits if wait < 0.01) == 9
+        assert elapsed >= 0.3
+        assert limiter.get_stats()[("key", MODEL)]["granted"] == 12
+
+    def test_sessions_take_turns(self, monkeypatch):
+        """한 세션이 여러 호출을 먼저 대기열에 넣어도 다른 세션이 차례를 받는지 테스트"""
+        # Given: 버킷 용량 1회
+        monkeypatch.setenv("AIDEA_RATE_LIMIT_RPM", "1200")
+        limiter = RateLimiter({"burst_seconds": 0.01, "poll_interval_seconds": 0.005})
+        order = []
+
+        async def call(session_id, index):
+            await limiter.acquire(MODEL, 10, session_id=session_id, api_key_id="key")
+            order.append(f"{session_id}{index}")
+
+        async def run():
+            await limiter.acquire(MODEL, 10, session_id="x", api_key_id="key")  # 버킷을 비움
+            tasks = [asyncio.create_task(call("a", index)) for index in range(4)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(call("b", 0)))
+            await asyncio.gather(*tasks)
+
+        # When
+        asyncio.run(run())
+
+        # Then
+        assert order[:3] == ["a0", "b0", "a1"]
+
+    def test_throttle_report_pauses_and_slows_bucket(self):
+        """할당량 초과 보고 후 재개 시점까지 대기하고 속도 배율이 낮아지는지 테스트"""
+        # Given
+        limiter = RateLimiter({"throttle_cooldown_seconds": 0.2, "poll_interval_seconds": 0.005})
+
+        # When
+        limiter.report_throttled(MODEL, api_key_id="key")
+        limiter.report_throttled(MODEL, api_key_id="key")
+        waited = asyncio.run(limiter.acquire(MODEL, 10, session_id="s", api_key_id="key"))
+
+        # Then
+        stats = limiter.get_stats()[("key", MODEL)]
+        assert waited >= 0.19
+        assert stats["throttled"] == 1
+        assert stats["rate_scale"] == 0.8
+        assert is_rate_limit_error("429 RESOURCE_EXHAUSTED") and not is_rate_limit_error("500 INTERNAL")
+
+    @pytest.mark.parametrize("error_message, refunded", [("500 INTERNAL", True), ("429 RESOURCE_EXHAUSTED", False)])
+    def test_failed_call_reservation_is_released(self, monkeypatch, tmp_path, error_message, refunded):
+        """예외로 끝난 호출의 예약이 정리되고, 할당량 초과가 아니면 출력 토큰 예약분이 반환되는지 테스트"""
+        # Given
+        monkeypatch.setattr(api_key_pool, "_default_pool", ApiKeyPool(["pool-a"]))
+        monkeypatch.setattr(rate_limiter, "_default_rate_limiter", RateLimiter())
+        monkeypatch.setattr(rate_limiter, "_reservations", {})
+        monkeypatch.setattr(model_router, "_default_router", ModelRouter(AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))))
+
+        async def fake_generate(self, llm_request, stream=False):
+            raise RuntimeError(error_message)
+            yield  # 비동기 제너레이터로 만들기 위한 문장
+
+        monkeypatch.setattr(_KeyedGemini, "generate_content_async", fake_generate)
+        agent = Agent(name="marketer_agent", model="gemini-2.0-flash", instruction="분석하세요")
+        rate_limiter.instrument_agent_rate_limit(agent)
+        model_router.instrument_agent_model_monitoring(agent)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        session_id = manager.create_session()[1]
+        runner = Runner(agent=agent, app_name="test_app", session_service=manager.session_service)
+        message = types.Content(role="user", parts=[types.Part(text="아이디어")])
+
+        async def run():
+            async for _ in monitored_event_stream(runner.run_async(user_id="test_user", session_id=session_id, new_message=message)):
+                pass
+
+        # When
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+
+        # Then
+        (bucket,) = rate_limiter.get_rate_limiter()._buckets.values()
+        assert rate_limiter._reservations == {}
+        if refunded:
+            assert bucket.tokens >= bucket.token_capacity - 100
+        else:
+            assert bucket.tokens <= 0
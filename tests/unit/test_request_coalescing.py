@@ -0,0 +1,117 @@
+"""
+동일 모델 요청 병합을 위한 단위 테스트
+
+이 모듈은 src/utils/request_coalescing.py의 요청 지문, 병합 대상 판별,
+진행 중인 요청의 응답 공유와 리더 실패 처리에 대한 단위 테스트를 제공합니다.
+"""
+
+import asyncio
+
+from google.adk.agents import Agent
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import Runner
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.utils.model_router import monitored_event_stream
+from src.utils.request_coalescing import (
+    get_in_flight_request_count,
+    instrument_agent_request_coalescing,
+    is_coalescible,
+    request_fingerprint,
+)
+
+
+class FakeLlm(BaseLlm):
+    """호출 수를 세고, fail_first이면 첫 호출에서 예외를 일으키는 테스트용 모델"""
+
+    calls: int = 0
+    fail_first: bool = False
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        call_number = self.calls
+        await asyncio.sleep(0.1)
+        if self.fail_first and call_number == 1:
+            raise RuntimeError("500 INTERNAL")
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=f"응답 {call_number}")]))
+
+
+def _request(text, temperature=0.0):
+    return LlmRequest(
+        model="fake",
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+        config=types.GenerateContentConfig(temperature=temperature, system_instruction="지시문"),
+    )
+
+
+def _run_concurrently(model, session_count):
+    agent = instrument_agent_request_coalescing(Agent(
+        name="critic_summary_agent", model=model, instruction="요약하세요", output_key="critic_report_phase1_summary",
+        generate_content_config=types.GenerateContentConfig(temperature=0.0),
+    ))
+    manager = SessionManager(app_name="test_app", user_id="test_user")
+    session_ids = [manager.create_session()[1] for _ in range(session_count)]
+    runner = Runner(agent=agent, app_name="test_app", session_service=manager.session_service)
+
+    async def run(session_id):
+        message = types.Content(role="user", parts=[types.Part(text="같은 아이디어")])
+        async for _ in monitored_event_stream(runner.run_async(user_id="test_user", session_id=session_id, new_message=message)):
+            pass
+
+    async def run_all():
+        await asyncio.gather(*(run(session_id) for session_id in session_ids), return_exceptions=True)
+
+    asyncio.run(run_all())
+    return [manager.get_session(session_id).state.get("critic_report_phase1_summary") for session_id in session_ids]
+
+
+class TestRequestFingerprint:
+    """요청 지문과 병합 대상 판별 테스트 스위트"""
+
+    def test_fingerprint_and_sampling_rules(self, monkeypatch):
+        """같은 요청은 같은 지문을 갖고, temperature > 0 요청은 허용한 역할만 병합하는지 테스트"""
+        # Given
+        monkeypatch.delenv("AIDEA_COALESCE_SAMPLED_ROLES", raising=False)
+
+        # When / Then
+        assert request_fingerprint(_request("아이디어")) == request_fingerprint(_request("아이디어"))
+        assert request_fingerprint(_request("아이디어")) != request_fingerprint(_request("다른 아이디어"))
+        assert request_fingerprint(_request("아이디어")) != request_fingerprint(_request("아이디어", temperature=0.5))
+        assert is_coalescible("marketer_agent", _request("아이디어"))
+        assert not is_coalescible("marketer_agent", _request("아이디어", temperature=0.7))
+        monkeypatch.setenv("AIDEA_COALESCE_SAMPLED_ROLES", "marketer")
+        assert is_coalescible("marketer_agent", _request("아이디어", temperature=0.7))
+        assert not is_coalescible("critic_agent", _request("아이디어", temperature=0.7))
+
+
+class TestRequestCoalescing:
+    """진행 중인 요청 병합 테스트 스위트"""
+
+    def test_identical_concurrent_requests_share_one_call(self):
+        """동시에 실행된 같은 요청들이 한 번의 모델 호출 결과를 공유하는지 테스트"""
+        # Given
+        model = FakeLlm(model="fake")
+
+        # When
+        outputs = _run_concurrently(model, session_count=3)
+
+        # Then
+        assert model.calls == 1
+        assert outputs == ["응답 1"] * 3
+        assert get_in_flight_request_count() == 0
+
+    def test_followers_call_model_when_leader_fails(self):
+        """리더 호출이 실패하면 기다리던 호출들이 직접 모델을 호출하는지 테스트"""
+        # Given
+        model = FakeLlm(model="fake", fail_first=True)
+
+        # When
+        outputs = _run_concurrently(model, session_count=2)
+
+        # Then: 리더 세션은 실패, 팔로워 세션은 직접 호출한 응답을 받음
+        assert model.calls == 2
+        assert outputs.count(None) == 1
+        assert "응답 2" in outputs
+        assert get_in_flight_request_count() == 0
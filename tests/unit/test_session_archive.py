@@ -0,0 +1,91 @@
+"""
+세션 아카이브 내보내기/불러오기를 위한 단위 테스트
+
+이 모듈은 src/session_store/archive.py와 SessionManager의 export/import API에 대한
+단위 테스트를 제공합니다.
+"""
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.session_store import SessionArchive, SessionArchiveFormatError, encode_session_archive
+
+
+LONG_REPORT = "엔지니어 보고서 내용입니다. " * 500
+
+
+@pytest.fixture
+def populated_session_manager():
+    """보고서와 이벤트가 채워진 세션을 가진 SessionManager를 제공하는 픽스처"""
+    manager = SessionManager(app_name="test_app", user_id="test_user")
+    manager.start_new_idea_session("테스트 아이디어", user_goal="목표")
+    session = manager.get_session()
+    manager.session_service.append_event(session, Event(
+        author="engineer_agent",
+        content=types.Content(role="model", parts=[types.Part(text=LONG_REPORT)]),
+        actions=EventActions(state_delta={"engineer_report_phase1": LONG_REPORT})
+    ))
+    manager.update_session_state({"summary_report_phase1": "짧은 요약"})
+    return manager
+
+
+class TestSessionArchive:
+    """SessionArchive 인코딩/디코딩 테스트 스위트"""
+
+    def test_large_fields_decode_lazily(self, populated_session_manager):
+        """큰 상태 값이 접근 시점에만 디코딩되는지 테스트"""
+        # Given
+        session = populated_session_manager.get_session()
+        data = encode_session_archive(session)
+
+        # When
+        archive = SessionArchive(data)
+
+        # Then
+        assert len(data) < len(LONG_REPORT.encode("utf-8"))
+        assert archive.state.is_decoded("initial_idea")
+        assert not archive.state.is_decoded("engineer_report_phase1")
+        assert archive.state["engineer_report_phase1"] == LONG_REPORT
+        assert archive.state.is_decoded("engineer_report_phase1")
+        assert archive.event_count == len(session.events)
+
+    def test_rejects_unknown_format(self):
+        """아카이브가 아닌 데이터를 거부하는지 테스트"""
+        with pytest.raises(SessionArchiveFormatError):
+            SessionArchive(b"not an archive at all")
+
+
+class TestSessionManagerArchive:
+    """SessionManager export/import 테스트 스위트"""
+
+    def test_export_and_import_round_trip(self, populated_session_manager, tmp_path):
+        """내보낸 세션을 다른 SessionManager로 불러와도 상태와 이벤트가 동일한지 테스트"""
+        # Given
+        original = populated_session_manager.get_session()
+        path = str(tmp_path / "session.aidea")
+        other_manager = SessionManager(app_name="test_app", user_id="test_user")
+
+        # When
+        assert populated_session_manager.export_session(path)
+        imported_id = other_manager.import_session(path)
+
+        # Then
+        imported = other_manager.get_session(imported_id)
+        assert imported_id == original.id
+        assert imported.state == original.state
+        assert [event.id for event in imported.events] == [event.id for event in original.events]
+
+    def test_export_all_sessions(self, populated_session_manager, tmp_path):
+        """모든 세션을 세션별 파일로 내보내는지 테스트"""
+        # Given
+        populated_session_manager.start_new_idea_session("두 번째 아이디어")
+
+        # When
+        paths = populated_session_manager.export_all_sessions(str(tmp_path / "archives"))
+
+        # Then
+        assert len(paths) == 2
+        ideas = {SessionManager.open_session_archive(path).state["initial_idea"] for path in paths}
+        assert ideas == {"테스트 아이디어", "두 번째 아이디어"}
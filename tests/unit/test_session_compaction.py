@@ -0,0 +1,124 @@
+"""
+세션 이벤트 압축 기능을 위한 단위 테스트
+
+이 모듈은 src/session_store/compaction.py와 SessionManager의 압축 연동에 대한
+단위 테스트를 제공합니다.
+"""
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.session_store.compaction import (
+    compact_events,
+    is_snapshot_event,
+    CompactingInMemorySessionService,
+)
+
+
+def _content_event(text, state_delta=None):
+    """콘텐츠를 가진 테스트 이벤트 생성"""
+    return Event(
+        author="marketer_agent",
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {})
+    )
+
+
+def _state_event(state_delta):
+    """상태 전용 테스트 이벤트 생성"""
+    return Event(author="aidea-lab", actions=EventActions(state_delta=state_delta), content=None)
+
+
+def _replay_state(events):
+    """이벤트 목록의 state_delta를 순서대로 재생한 상태 반환"""
+    state = {}
+    for event in events:
+        if event.actions and event.actions.state_delta:
+            state.update(event.actions.state_delta)
+    return state
+
+
+@pytest.fixture
+def compacting_session_manager():
+    """낮은 압축 임계값을 가진 SessionManager 인스턴스를 제공하는 픽스처"""
+    return SessionManager(
+        app_name="test_app",
+        user_id="test_user",
+        event_compaction_threshold=10,
+        keep_recent_content_events=2
+    )
+
+
+class TestCompactEvents:
+    """compact_events 함수 테스트 스위트"""
+
+    def test_compaction_keeps_recent_content_events_and_state(self):
+        """최근 콘텐츠 이벤트를 보존하고 재생 상태가 동일한지 테스트"""
+        # Given
+        events = []
+        for i in range(5):
+            events.append(_state_event({"history": list(range(i)), f"key_{i}": i}))
+            events.append(_content_event(f"reply {i}", {"last_reply": f"reply {i}"}))
+
+        # When
+        compacted = compact_events(events, keep_recent_content_events=2)
+
+        # Then
+        assert is_snapshot_event(compacted[0])
+        assert compacted[1:] == events[-3:]  # 최근 2개 콘텐츠 이벤트 + 사이의 상태 이벤트
+        assert _replay_state(compacted) == _replay_state(events)
+
+    def test_compaction_skips_when_nothing_to_fold(self):
+        """접을 이벤트가 없으면 원본을 그대로 반환하는지 테스트"""
+        # Given
+        events = [_content_event("a"), _content_event("b")]
+
+        # When
+        compacted = compact_events(events, keep_recent_content_events=2)
+
+        # Then
+        assert compacted is events
+
+
+class TestSessionManagerCompaction:
+    """SessionManager 이벤트 압축 연동 테스트 스위트"""
+
+    def test_uses_compacting_service_by_default(self):
+        """기본 SessionManager가 압축 세션 서비스를 사용하는지 테스트"""
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        assert isinstance(manager.session_service, CompactingInMemorySessionService)
+
+    def test_event_log_is_bounded_and_state_unchanged(self, compacting_session_manager):
+        """상태 업데이트가 많아도 이벤트 수가 제한되고 상태가 유지되는지 테스트"""
+        # Given
+        _, session_id = compacting_session_manager.create_session(initial_state={"initial_idea": "idea"})
+
+        # When
+        for i in range(50):
+            compacting_session_manager.update_session_state({"counter": i, f"key_{i}": i})
+
+        # Then
+        session = compacting_session_manager.get_session(session_id)
+        assert len(session.events) <= 10
+        assert session.state["counter"] == 49
+        assert session.state["key_0"] == 0
+        assert session.state["initial_idea"] == "idea"
+
+    def test_manual_compaction(self):
+        """임계값과 관계없이 수동 압축이 동작하는지 테스트"""
+        # Given
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        _, session_id = manager.create_session()
+        for i in range(5):
+            manager.update_session_state({"counter": i})
+
+        # When
+        removed_count = manager.compact_session_events(session_id)
+
+        # Then
+        session = manager.get_session(session_id)
+        assert removed_count == 4
+        assert len(session.events) == 1
+        assert session.state["counter"] == 4
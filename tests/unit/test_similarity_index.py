@@ -0,0 +1,69 @@
+"""
+유사 아이디어 색인을 위한 단위 테스트
+
+이 모듈은 src/utils/similarity_index.py의 MinHashLSHIndex와 jaccard_similarity에 대한 단위 테스트를 제공합니다.
+"""
+
+from src.utils.similarity_index import MinHashLSHIndex, jaccard_similarity, normalize_for_similarity
+
+
+IDEA = "반려동물 보호자를 위한 산책 동행 매칭 앱. 근처에 사는 산책 메이트를 찾아주고 산책 기록을 공유합니다."
+
+
+class TestMinHashLSHIndex:
+    """MinHashLSHIndex 테스트 스위트"""
+
+    def test_punctuation_and_whitespace_are_ignored(self):
+        """공백과 문장부호만 다른 텍스트는 같은 서명을 갖는지 테스트"""
+        # Given
+        index = MinHashLSHIndex()
+
+        # When
+        original = index.signature(IDEA)
+        reformatted = index.signature("  반려동물 보호자를 위한,  산책 동행 매칭 앱!!\n근처에 사는 산책 메이트를 찾아주고 산책 기록을 공유합니다 ")
+
+        # Then
+        assert normalize_for_similarity("A, b!") == "ab"
+        assert (original == reformatted).all()
+
+    def test_finds_near_duplicate_and_ignores_unrelated_text(self):
+        """몇 단어만 다른 텍스트는 찾고, 관련 없는 텍스트와 다른 태그는 제외하는지 테스트"""
+        # Given
+        index = MinHashLSHIndex()
+        index.add("walk", IDEA, tag="model-a")
+        index.add("walk-other-model", IDEA, tag="model-b")
+        index.add("budget", "대학생을 위한 가계부 자동 분류 서비스와 소비 습관 리포트", tag="model-a")
+
+        # When
+        matches = index.query(IDEA.replace("공유합니다", "공유하는 기능을 제공합니다"), threshold=0.7, tag="model-a")
+
+        # Then
+        assert [key for key, _ in matches] == ["walk"]
+        assert 0.7 <= matches[0][1] < 1.0
+        assert index.query("완전히 다른 주제의 온라인 요리 강의 플랫폼", threshold=0.5, tag="model-a") == []
+
+    def test_memory_is_bounded_by_max_entries(self):
+        """항목 수 상한을 넘으면 가장 오래된 항목과 그 버킷이 제거되는지 테스트"""
+        # Given
+        index = MinHashLSHIndex(max_entries=2)
+
+        # When
+        for number in range(3):
+            index.add(f"idea-{number}", f"{IDEA} 버전 {number}")
+
+        # Then
+        assert len(index) == 2
+        assert "idea-0" not in index
+        assert all(key != "idea-0" for key, _ in index.query(IDEA, threshold=0.0))
+        assert sum(len(bucket) for buckets in index._buckets for bucket in buckets.values()) == 2 * index.bands
+
+
+class TestJaccardSimilarity:
+    """jaccard_similarity 테스트 스위트"""
+
+    def test_exact_similarity_of_short_texts(self):
+        """짧은 텍스트의 문자 3-gram 자카드 유사도를 정확히 계산하는지 테스트"""
+        # When / Then
+        assert jaccard_similarity("중고 교재 거래", "중고교재거래!") == 1.0
+        assert jaccard_similarity("가나다라", "가나다마") == 1 / 3
+        assert jaccard_similarity("", "") == 0.0
@@ -0,0 +1,173 @@
+"""
+SQLite 공유 세션 서비스를 위한 단위 테스트
+
+이 모듈은 src/session_store/sqlite_session_service.py와 SessionManager의
+공유 저장소 연동에 대한 단위 테스트를 제공합니다.
+"""
+
+import threading
+import time
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.session_store import SqliteSessionService
+from src.session_store.sqlite_session_service import CHANGE_PRUNE_INTERVAL
+
+
+APP_NAME = "test_app"
+USER_ID = "test_user"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """테스트용 SQLite 데이터베이스 경로를 제공하는 픽스처"""
+    return str(tmp_path / "sessions.db")
+
+
+@pytest.fixture
+def sqlite_service(db_path):
+    """SqliteSessionService 인스턴스를 제공하는 픽스처"""
+    service = SqliteSessionService(db_path, change_poll_interval=0.05)
+    yield service
+    service.close()
+
+
+def _state_event(state_delta):
+    """상태 전용 테스트 이벤트 생성"""
+    return Event(author=APP_NAME, actions=EventActions(state_delta=state_delta), content=None)
+
+
+class TestSqliteSessionService:
+    """SqliteSessionService 테스트 스위트"""
+
+    def test_state_and_events_round_trip(self, sqlite_service):
+        """상태와 이벤트가 저장소에 저장되고 다시 읽히는지 테스트"""
+        # Given
+        session = sqlite_service.create_session(app_name=APP_NAME, user_id=USER_ID, state={"initial_idea": "아이디어"})
+        event = Event(
+            author="marketer_agent",
+            content=types.Content(role="model", parts=[types.Part(text="보고서")]),
+            actions=EventActions(state_delta={"marketer_report_phase1": "보고서", "temp:scratch": 1})
+        )
+
+        # When
+        sqlite_service.append_event(session, event)
+        loaded = sqlite_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session.id)
+
+        # Then
+        assert loaded.state["initial_idea"] == "아이디어"
+        assert loaded.state["marketer_report_phase1"] == "보고서"
+        assert "temp:scratch" not in loaded.state
+        assert len(loaded.events) == 1
+        assert loaded.events[0].content.parts[0].text == "보고서"
+
+    def test_concurrent_appends_from_separate_services(self, db_path):
+        """여러 워커(서비스 인스턴스)가 동시에 같은 세션에 이벤트를 추가해도 유실이 없는지 테스트"""
+        # Given
+        services = [SqliteSessionService(db_path) for _ in range(4)]
+        session_id = services[0].create_session(app_name=APP_NAME, user_id=USER_ID).id
+        appends_per_worker = 10
+
+        def worker(index, service):
+            for i in range(appends_per_worker):
+                session = service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+                service.append_event(session, _state_event({f"worker_{index}_{i}": i}))
+
+        # When
+        threads = [threading.Thread(target=worker, args=(index, service)) for index, service in enumerate(services)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Then
+        loaded = services[0].get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+        assert len(loaded.events) == len(services) * appends_per_worker
+        for index in range(len(services)):
+            for i in range(appends_per_worker):
+                assert loaded.state[f"worker_{index}_{i}"] == i
+        for service in services:
+            service.close()
+
+    def test_change_listener_receives_changes_from_other_instance(self, db_path, sqlite_service):
+        """다른 인스턴스에서 발생한 세션 변경이 리스너로 전달되는지 테스트"""
+        # Given
+        received = []
+        sqlite_service.add_change_listener(received.append)
+        other_worker = SqliteSessionService(db_path)
+        time.sleep(0.1)
+
+        # When
+        session = other_worker.create_session(app_name=APP_NAME, user_id=USER_ID)
+        other_worker.append_event(session, _state_event({"counter": 1}))
+        deadline = time.time() + 3
+        while len(received) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+
+        # Then
+        assert [change["change_type"] for change in received] == ["created", "event_appended"]
+        assert all(change["session_id"] == session.id for change in received)
+        other_worker.close()
+
+    def test_expired_change_records_are_pruned(self, db_path):
+        """보존 기간이 지난 변경 기록이 주기적으로 삭제되어 session_changes가 계속 늘어나지 않는지 테스트"""
+        # Given
+        service = SqliteSessionService(db_path, change_retention_seconds=0)
+        session = service.create_session(app_name=APP_NAME, user_id=USER_ID)
+
+        # When
+        for i in range(CHANGE_PRUNE_INTERVAL * 2):
+            service.append_event(session, _state_event({"counter": i}))
+
+        # Then
+        row_count = service._connection().execute("SELECT COUNT(*) FROM session_changes").fetchone()[0]
+        assert row_count < CHANGE_PRUNE_INTERVAL
+        assert service.get_latest_change_id() == CHANGE_PRUNE_INTERVAL * 2 + 1
+        service.close()
+
+    def test_compaction_bounds_stored_events(self, db_path):
+        """압축 임계값을 넘으면 저장된 이벤트가 줄어들고 상태가 유지되는지 테스트"""
+        # Given
+        service = SqliteSessionService(db_path, event_compaction_threshold=10, keep_recent_content_events=2)
+        session = service.create_session(app_name=APP_NAME, user_id=USER_ID)
+
+        # When
+        for i in range(30):
+            service.append_event(session, _state_event({"counter": i, f"key_{i}": i}))
+
+        # Then
+        loaded = service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session.id)
+        assert len(loaded.events) <= 10
+        assert loaded.state["counter"] == 29
+        assert loaded.state["key_0"] == 0
+        service.close()
+
+
+class TestSessionManagerSharedStore:
+    """SessionManager 공유 저장소 연동 테스트 스위트"""
+
+    def test_session_visible_from_other_manager(self, db_path):
+        """한 워커에서 만든 세션을 다른 워커의 SessionManager가 읽을 수 있는지 테스트"""
+        # Given
+        first_worker = SessionManager(APP_NAME, USER_ID, session_db_path=db_path)
+        second_worker = SessionManager(APP_NAME, USER_ID, session_db_path=db_path)
+
+        # When
+        _, session_id = first_worker.start_new_idea_session("공유 아이디어", user_goal="목표")
+        first_worker.transition_to_phase2()
+        session = second_worker.get_session(session_id)
+
+        # Then
+        assert first_worker.is_shared_store()
+        assert session.state["initial_idea"] == "공유 아이디어"
+        assert session.state["user_goal"] == "목표"
+        assert session.state["current_phase"] == "phase2"
+
+    def test_env_var_selects_shared_store(self, db_path, monkeypatch):
+        """환경 변수로 공유 저장소가 선택되는지 테스트"""
+        monkeypatch.setenv("AIDEA_SESSION_DB_PATH", db_path)
+        manager = SessionManager(APP_NAME, USER_ID)
+        assert isinstance(manager.session_service, SqliteSessionService)
@@ -0,0 +1,58 @@
+"""
+시작 시간 벤치마크와 지연 생성을 위한 단위 테스트
+
+이 모듈은 src/startup_benchmark.py의 importtime 출력 해석과 요약,
+AIdeaLabOrchestrator의 기본 워크플로우 에이전트 지연 생성에 대한 단위 테스트를 제공합니다.
+"""
+
+from src import startup_benchmark
+from src.orchestrator.main_orchestrator import AIdeaLabOrchestrator
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     pkg.sub.leaf
+import time:       300 |        420 |   pkg.sub
+import time:        80 |        500 | pkg
+import time:      1000 |       1000 | other
+some unrelated warning line
+"""
+
+
+class TestImportProfile:
+    """importtime 출력 해석과 요약 테스트 스위트"""
+
+    def test_parse_and_summarize_importtime(self):
+        """모듈별 자체/누적 시간과 깊이를 해석하고, 상위 모듈과 패키지별 합계를 요약하는지 테스트"""
+        # When
+        entries = startup_benchmark.parse_importtime(IMPORTTIME_OUTPUT)
+        summary = startup_benchmark.summarize_imports(entries, top=2)
+
+        # Then
+        assert [(entry["module"], entry["depth"]) for entry in entries] == [
+            ("pkg.sub.leaf", 2), ("pkg.sub", 1), ("pkg", 0), ("other", 0)
+        ]
+        assert summary["total_ms"] == 1.5
+        assert [entry["module"] for entry in summary["top_cumulative"]] == ["other", "pkg"]
+        assert [entry["module"] for entry in summary["top_self"]] == ["other", "pkg.sub"]
+        assert summary["packages"] == {"other": 1.0, "pkg": 0.5}
+
+
+class TestLazyOrchestrator:
+    """오케스트레이터 지연 생성 테스트 스위트"""
+
+    def test_default_workflow_agents_are_built_on_first_use(self):
+        """생성 시에는 기본 워크플로우 에이전트를 만들지 않고, 처음 접근할 때 만들어 재사용하는지 테스트"""
+        # Given
+        orchestrator = AIdeaLabOrchestrator(model_name="gemini-2.0-flash")
+
+        # Then: 생성 직후에는 에이전트가 없음
+        assert "workflow_agent" not in vars(orchestrator)
+        assert "marketer_agent" not in vars(orchestrator)
+
+        # When
+        workflow_agent = orchestrator.get_workflow_agent()
+
+        # Then
+        assert [agent.name for agent in workflow_agent.sub_agents][-1] == "summary_agent"
+        assert len(workflow_agent.sub_agents) == 4
+        assert orchestrator.get_workflow_agent() is workflow_agent
+        assert orchestrator.get_summary_agent() is orchestrator.summary_agent
@@ -0,0 +1,81 @@
+"""
+구조화 로깅을 위한 단위 테스트
+
+이 모듈은 src/utils/structured_logging.py의 컴포넌트별 레벨, 지연 필드, 샘플링과
+백그라운드 기록에 대한 단위 테스트를 제공합니다.
+"""
+
+import io
+import json
+import threading
+
+import pytest
+
+from src.utils import structured_logging
+from src.utils.structured_logging import configure_logging, flush_logging, get_logger
+
+
+@pytest.fixture(autouse=True)
+def reset_logging():
+    yield
+    # 다음 사용 시 환경 변수 설정으로 다시 설정되도록 정리
+    structured_logging.shutdown_logging()
+
+
+class TestStructuredLogging:
+    """구조화 로깅 테스트 스위트"""
+
+    def test_lazy_fields_are_built_only_when_enabled(self, monkeypatch):
+        """꺼진 레벨의 지연 필드는 만들지 않고, 켜진 컴포넌트의 로그는 백그라운드 스레드가 JSON 한 줄로 기록하는지 테스트"""
+        # Given
+        output = io.StringIO()
+        configure_logging(level="INFO", component_levels={"test.verbose": "DEBUG"}, json_format=True,
+                          stream=output, force=True)
+        monkeypatch.setattr(structured_logging, "MAX_FIELD_LENGTH", 10)
+        built = []
+        writer_threads = []
+        original_format = structured_logging.StructuredFormatter.format
+
+        def recording_format(self, record):
+            writer_threads.append(threading.current_thread())
+            return original_format(self, record)
+
+        monkeypatch.setattr(structured_logging.StructuredFormatter, "format", recording_format)
+
+        def payload():
+            built.append(1)
+            return "가" * 50
+
+        # When
+        get_logger("test.quiet").debug("skipped", prompt=payload)
+        get_logger("test.verbose").debug("built", prompt=payload, length=50)
+        get_logger("test.quiet").info("kept")
+        flush_logging()
+
+        # Then
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert len(built) == 1
+        assert [(record["component"], record["event"]) for record in records] == [("test.verbose", "built"), ("test.quiet", "kept")]
+        assert records[0]["prompt"] == "가" * 10 + "... (50 chars)"
+        assert records[0]["length"] == 50
+        assert threading.current_thread() not in writer_threads
+
+    def test_debug_sampling_per_component(self):
+        """샘플링 비율이 하위 컴포넌트에도 적용되고, DEBUG보다 높은 레벨은 샘플링하지 않는지 테스트"""
+        # Given
+        output = io.StringIO()
+        configure_logging(level="DEBUG", sample_rates={"test.stream": 0.0}, stream=output, force=True)
+        stream_logger = get_logger("test.stream.facilitator")
+
+        # When
+        for _ in range(20):
+            stream_logger.debug("delta", text="조각")
+        stream_logger.warning("retry", attempt=2)
+        get_logger("test.other").debug("kept")
+        flush_logging()
+
+        # Then
+        lines = output.getvalue().splitlines()
+        assert len(lines) == 2
+        assert "WARNING [test.stream.facilitator] retry attempt=2" in lines[0]
+        assert "DEBUG [test.other] kept" in lines[1]
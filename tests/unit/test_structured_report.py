@@ -0,0 +1,93 @@
+"""
+구조화된 페르소나 보고서를 위한 단위 테스트
+
+이 모듈은 src/utils/structured_report.py의 보고서 해석, 중간 요약 생성, 에이전트 콜백에 대한
+단위 테스트를 제공합니다.
+"""
+
+from types import SimpleNamespace
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from src.session_manager import SessionManager
+from src.ui.adk_controller import AdkController
+from src.utils.structured_report import (
+    make_structured_report_callback,
+    make_structured_summary_callback,
+    parse_structured_report,
+)
+
+
+STRUCTURED_REPORT = """<key_points>
+- 산책 메이트 매칭이 핵심 차별점입니다
+1. 1인 가구 반려동물 보호자가 주요 타겟입니다
+</key_points>
+<summary>
+매칭 기능 중심의 반려동물 산책 서비스로 성장 가능성이 큽니다.
+</summary>
+<analysis>
+## 창의적 가치
+산책 메이트 매칭은 기존 산책 앱과 차별화됩니다.
+"""
+
+
+def model_response(text):
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+class TestParseStructuredReport:
+    """parse_structured_report 테스트 스위트"""
+
+    def test_parses_sections_including_unclosed_last_tag(self):
+        """세 구간을 해석하고 닫는 태그가 없는 마지막 구간도 읽는지 테스트"""
+        # When
+        sections = parse_structured_report(STRUCTURED_REPORT)
+
+        # Then
+        assert sections["summary"] == "매칭 기능 중심의 반려동물 산책 서비스로 성장 가능성이 큽니다."
+        assert sections["analysis"].startswith("## 창의적 가치")
+
+    def test_missing_section_returns_none(self):
+        """구간이 없거나 자유 형식 보고서면 None을 반환하는지 테스트"""
+        assert parse_structured_report("<summary>요약</summary><analysis>분석</analysis>") is None
+        assert parse_structured_report("## 자유 형식 보고서\n내용") is None
+
+
+class TestStructuredReportCallbacks:
+    """구조화 보고서 콜백 테스트 스위트"""
+
+    def test_report_callback_derives_summary_for_summarizer(self):
+        """보고서 본문은 분석 구간으로 바뀌고, 요약 에이전트가 모델 호출 없이 검증을 통과하는 요약을 반환하는지 테스트"""
+        # Given
+        context = SimpleNamespace(state={})
+        response = model_response(STRUCTURED_REPORT)
+
+        # When
+        make_structured_report_callback("marketer_report_phase1_summary")(callback_context=context, llm_response=response)
+        summary_response = make_structured_summary_callback("marketer_report_phase1_summary")(
+            callback_context=context, llm_request=None
+        )
+
+        # Then
+        assert response.content.parts[0].text.startswith("## 창의적 가치")
+        summary = summary_response.content.parts[0].text
+        assert "- 1인 가구 반려동물 보호자가 주요 타겟입니다" in summary
+        controller = AdkController(SessionManager(app_name="test_app", user_id="test_user"))
+        assert controller._validate_agent_response(summary, "marketer_summary_agent", "marketer_report_phase1_summary") == summary
+
+    def test_unstructured_report_falls_back_to_summarizer(self):
+        """형식을 따르지 않은 응답은 그대로 두고 이전 요약을 비워 요약 단계가 실행되는지 테스트"""
+        # Given
+        context = SimpleNamespace(state={"marketer_report_phase1_summary_structured": "이전 실행의 요약"})
+        response = model_response("## 자유 형식 보고서\n내용")
+
+        # When
+        make_structured_report_callback("marketer_report_phase1_summary")(callback_context=context, llm_response=response)
+        summary_response = make_structured_summary_callback("marketer_report_phase1_summary")(
+            callback_context=context, llm_request=None
+        )
+
+        # Then
+        assert response.content.parts[0].text == "## 자유 형식 보고서\n내용"
+        assert summary_response is None
@@ -0,0 +1,172 @@
+"""
+토큰 및 비용 집계를 위한 단위 테스트
+
+이 모듈은 src/utils/token_accounting.py의 TokenLedger와 모델 호출 콜백의 프롬프트 추정 공유/정리에 대한
+단위 테스트를 제공합니다.
+"""
+
+import asyncio
+import csv
+import json
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import LlmResponse
+from google.adk.runners import Runner
+from google.genai import types
+
+from config.models import ModelType
+from src.session_manager import SessionManager
+from src.utils import api_key_pool, model_router, rate_limiter, token_accounting, tracing
+from src.utils.api_key_pool import ApiKeyPool, _KeyedGemini
+from src.utils.model_monitor import AIModelMonitor
+from src.utils.model_router import ModelRouter, monitored_event_stream
+from src.utils.token_accounting import TokenLedger, agent_role_from_name, calculate_cost
+
+
+FLASH = ModelType.GEMINI_2_5_FLASH_PREVIEW_0417.value
+
+
+class TestTokenLedger:
+    """TokenLedger 테스트 스위트"""
+
+    def test_aggregate_by_dimension(self):
+        """역할, 단계, 세션 차원별로 토큰과 호출 수가 집계되는지 테스트"""
+        # Given
+        ledger = TokenLedger()
+
+        # When
+        ledger.record_usage("s1", "marketer_agent_phase1", "marketer_report_phase1", FLASH, 1000, 200)
+        ledger.record_usage("s1", "marketer_agent_phase2", "marketer_response_phase2", FLASH, 500, 100)
+        ledger.record_usage("s2", "critic_agent", "critic_report_phase1", FLASH, 300, 50)
+
+        # Then
+        by_role = ledger.aggregate("agent_role")
+        assert by_role["marketer"]["calls"] == 2
+        assert by_role["marketer"]["total_tokens"] == 1800
+        assert ledger.aggregate("phase")["phase1"]["calls"] == 2
+        assert ledger.aggregate("session_id")["s2"]["total_tokens"] == 350
+        with pytest.raises(ValueError):
+            ledger.aggregate("unknown")
+
+    def test_totals_survive_record_eviction(self):
+        """보관 한도를 넘어 기록이 제거되어도 누적 집계가 유지되는지 테스트"""
+        # Given
+        ledger = TokenLedger(max_records=2)
+
+        # When
+        for _ in range(5):
+            ledger.record_usage("s1", "engineer_agent", "engineer_report_phase1", FLASH, 10, 10)
+
+        # Then
+        assert len(ledger.records) == 2
+        assert ledger.aggregate("agent_role")["engineer"]["calls"] == 5
+
+    def test_format_session_summary_marks_estimates(self):
+        """세션 비용 요약에 역할별 행과 추정값 안내가 포함되는지 테스트"""
+        # Given
+        ledger = TokenLedger()
+        ledger.record_usage("s1", "marketer_agent_phase1", "marketer_report_phase1", FLASH, 1000, 200, estimated=True)
+        ledger.record_usage("s1", "facilitator_agent", "facilitator_response", FLASH, 400, 40)
+
+        # When
+        summary = ledger.format_session_summary("s1")
+
+        # Then
+        assert "| marketer | 1 | 1,200 |" in summary
+        assert "| facilitator | 1 | 440 |" in summary
+        assert "2회 중 1회" in summary
+        assert ledger.format_session_summary("missing") is None
+
+    def test_export_jsonl_and_csv(self, tmp_path):
+        """세션별 기록을 JSONL과 CSV로 내보내는지 테스트"""
+        # Given
+        ledger = TokenLedger()
+        ledger.record_usage("s1", "marketer_agent_phase1", "marketer_report_phase1", FLASH, 100, 20)
+        ledger.record_usage("s2", "critic_agent", "critic_report_phase1", FLASH, 100, 20)
+
+        # When
+        jsonl_count = ledger.export_jsonl(str(tmp_path / "usage.jsonl"), session_ids=["s1"])
+        csv_count = ledger.export_csv(str(tmp_path / "out" / "usage.csv"))
+
+        # Then
+        assert jsonl_count == 1
+        exported = json.loads((tmp_path / "usage.jsonl").read_text(encoding="utf-8"))
+        assert exported["agent_role"] == "marketer"
+        assert csv_count == 2
+        with open(tmp_path / "out" / "usage.csv", encoding="utf-8") as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        assert [row["session_id"] for row in rows] == ["s1", "s2"]
+
+
+class TestCostCalculation:
+    """비용 계산 도우미 테스트 스위트"""
+
+    def test_cached_tokens_use_cached_price(self):
+        """캐시된 프롬프트 토큰이 캐시 가격으로 계산되는지 테스트"""
+        # When
+        uncached = calculate_cost(FLASH, 1_000_000, 0)
+        cached = calculate_cost(FLASH, 1_000_000, 0, cached_tokens=1_000_000)
+
+        # Then
+        assert uncached == pytest.approx(0.15)
+        assert cached == pytest.approx(0.0375)
+        assert calculate_cost("unknown-model", 1000, 1000) == 0
+
+    def test_agent_role_from_name(self):
+        """에이전트 이름에서 역할 이름을 추출하는지 테스트"""
+        assert agent_role_from_name("marketer_agent_phase2") == "marketer"
+        assert agent_role_from_name("critic_summary_agent") == "critic_summary"
+        assert agent_role_from_name("facilitator_agent") == "facilitator"
+
+
+class TestModelCallCallbacks:
+    """모델 호출 콜백의 프롬프트 추정 테스트 스위트"""
+
+    def test_prompt_estimated_once_and_cleared_when_call_raises(self, monkeypatch, tmp_path):
+        """레이트 리미터, 추적, 토큰 집계 콜백이 프롬프트를 한 번만 렌더링하고, 예외로 끝난 호출의 추정도 정리되는지 테스트"""
+        # Given
+        monkeypatch.setattr(api_key_pool, "_default_pool", ApiKeyPool(["pool-a"]))
+        monkeypatch.setattr(rate_limiter, "_default_rate_limiter", rate_limiter.RateLimiter())
+        monkeypatch.setattr(model_router, "_default_router", ModelRouter(AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))))
+        monkeypatch.setattr(tracing, "_tracing_enabled", True)
+        monkeypatch.setattr(token_accounting, "token_ledger", TokenLedger())
+        monkeypatch.setattr(token_accounting, "_pending_prompts", {})
+        rendered = []
+        original_prompt_text = token_accounting.request_prompt_text
+        monkeypatch.setattr(token_accounting, "request_prompt_text",
+                            lambda llm_request: rendered.append(1) or original_prompt_text(llm_request))
+        outcomes = [RuntimeError("503 UNAVAILABLE"), "응답"]
+
+        async def fake_generate(self, llm_request, stream=False):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=outcome)]))
+
+        monkeypatch.setattr(_KeyedGemini, "generate_content_async", fake_generate)
+        agent = Agent(name="marketer_agent", model="gemini-2.0-flash", instruction="분석하세요")
+        rate_limiter.instrument_agent_rate_limit(agent)
+        tracing.instrument_agent(agent)
+        token_accounting.instrument_agent_token_usage(agent)
+        model_router.instrument_agent_model_monitoring(agent)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        runner = Runner(agent=agent, app_name="test_app", session_service=manager.session_service)
+
+        async def run():
+            session_id = manager.create_session()[1]
+            message = types.Content(role="user", parts=[types.Part(text="아이디어")])
+            async for _ in monitored_event_stream(runner.run_async(user_id="test_user", session_id=session_id, new_message=message)):
+                pass
+
+        # When: 첫 호출은 예외로 끝나 after_model_callback이 호출되지 않음
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+        pending_after_failure = dict(token_accounting._pending_prompts)
+        asyncio.run(run())
+
+        # Then
+        assert pending_after_failure == {}
+        assert token_accounting._pending_prompts == {}
+        assert len(rendered) == 2
+        assert len(token_accounting.token_ledger.records) == 1
@@ -0,0 +1,117 @@
+"""
+실행 추적 모듈을 위한 단위 테스트
+
+이 모듈은 src/utils/tracing.py의 OTLP JSON 익스포터와 에이전트 계측에 대한
+단위 테스트를 제공합니다.
+"""
+
+import asyncio
+import json
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.genai import types
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from src.session_manager import SessionManager
+from src.utils import api_key_pool, model_router, tracing
+from src.utils.api_key_pool import ApiKeyPool, _KeyedGemini
+from src.utils.model_monitor import AIModelMonitor
+from src.utils.model_router import ModelRouter, monitored_event_stream
+from src.utils.tracing import JsonLinesSpanExporter, instrument_agent
+
+
+class TestJsonLinesSpanExporter:
+    """JsonLinesSpanExporter 테스트 스위트"""
+
+    def test_writes_otlp_json_with_parent_links(self, tmp_path):
+        """스팬이 부모 관계와 함께 OTLP JSON 한 줄로 기록되는지 테스트"""
+        # Given
+        trace_file = tmp_path / "traces.jsonl"
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(JsonLinesSpanExporter(str(trace_file))))
+        test_tracer = provider.get_tracer("test")
+
+        # When
+        with test_tracer.start_as_current_span("phase1.workflow", attributes={"aidea.session_id": "s1"}):
+            with test_tracer.start_as_current_span("agent marketer_agent", attributes={
+                "aidea.prompt_chars": 120,
+                "gcp.vertex.agent.llm_request": "{...프롬프트 원문...}",
+            }):
+                pass
+        provider.shutdown()
+
+        # Then
+        lines = trace_file.read_text(encoding="utf-8").splitlines()
+        spans = [json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"][0] for line in lines]
+        child, parent = spans
+        assert child["name"] == "agent marketer_agent"
+        assert child["parentSpanId"] == parent["spanId"]
+        assert child["traceId"] == parent["traceId"]
+        assert {"key": "aidea.prompt_chars", "value": {"intValue": "120"}} in child["attributes"]
+        assert all(attr["key"] != "gcp.vertex.agent.llm_request" for attr in child["attributes"])
+        assert int(parent["endTimeUnixNano"]) >= int(parent["startTimeUnixNano"])
+
+
+class TestInstrumentAgent:
+    """instrument_agent 테스트 스위트"""
+
+    def test_appends_callbacks_once_and_keeps_existing(self):
+        """기존 콜백을 유지하면서 추적 콜백을 한 번만 추가하는지 테스트"""
+        # Given
+        def existing_callback(callback_context, llm_request):
+            return None
+
+        agent = Agent(name="test_agent", model="gemini-2.0-flash", before_model_callback=existing_callback)
+
+        # When
+        instrument_agent(agent)
+        instrument_agent(agent)
+
+        # Then
+        assert len(agent.before_model_callback) == 2
+        assert agent.before_model_callback[0] is existing_callback
+        assert len(agent.after_model_callback) == 1
+
+    def test_span_of_failed_model_call_is_ended_with_error(self, monkeypatch, tmp_path):
+        """모델 호출이 예외로 끝나 after_model_callback이 호출되지 않아도 스팬이 오류 상태로 내보내지는지 테스트"""
+        # Given
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+        monkeypatch.setattr(tracing, "_tracing_enabled", True)
+        monkeypatch.setattr(tracing, "_open_agent_spans", {})
+        monkeypatch.setattr(api_key_pool, "_default_pool", ApiKeyPool(["pool-a"]))
+        monkeypatch.setattr(model_router, "_default_router", ModelRouter(AIModelMonitor(log_file_path=str(tmp_path / "perf.json"))))
+
+        async def fake_generate(self, llm_request, stream=False):
+            raise ConnectionError("network unreachable")
+            yield  # 비동기 생성기로 만들기 위한 도달하지 않는 yield
+
+        monkeypatch.setattr(_KeyedGemini, "generate_content_async", fake_generate)
+        agent = Agent(name="marketer_agent", model="gemini-2.0-flash", instruction="분석하세요")
+        instrument_agent(agent)
+        model_router.instrument_agent_model_monitoring(agent)
+        manager = SessionManager(app_name="test_app", user_id="test_user")
+        runner = Runner(agent=agent, app_name="test_app", session_service=manager.session_service)
+
+        async def run():
+            session_id = manager.create_session()[1]
+            message = types.Content(role="user", parts=[types.Part(text="아이디어")])
+            async for _ in monitored_event_stream(runner.run_async(user_id="test_user", session_id=session_id, new_message=message)):
+                pass
+
+        # When
+        with pytest.raises(ConnectionError):
+            asyncio.run(run())
+
+        # Then
+        (span,) = [span for span in exporter.get_finished_spans() if span.name == "agent marketer_agent"]
+        assert span.status.status_code == StatusCode.ERROR
+        assert "ConnectionError" in span.status.description
+        assert tracing._open_agent_spans == {}
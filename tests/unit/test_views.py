@@ -0,0 +1,157 @@
+"""
+채팅 메시지 렌더링을 위한 단위 테스트
+
+이 모듈은 src/ui/views.py의 최근 메시지 윈도우, 이전 메시지 페이지, 페이지 미리보기 캐시와
+유사 아이디어 결과 재사용 확인 화면에 대한 단위 테스트를 제공합니다. 렌더링은 streamlit.testing.v1.AppTest로 실행합니다.
+"""
+
+from streamlit.testing.v1 import AppTest
+
+from src.ui.views import CHAT_HISTORY_PAGE_SIZE, CHAT_PREVIEW_LENGTH, CHAT_RECENT_WINDOW
+
+
+def chat_script():
+    from src.ui.views import render_chat_messages
+    render_chat_messages()
+
+
+def make_messages(count):
+    return [{"role": "user" if index % 2 == 0 else "assistant", "content": f"메시지 {index}", "avatar": "🤖"}
+            for index in range(count)]
+
+
+def run_chat(messages, **state):
+    app = AppTest.from_function(chat_script)
+    app.session_state["messages"] = messages
+    for key, value in state.items():
+        app.session_state[key] = value
+    return app.run()
+
+
+def preview_lines(app):
+    return app.markdown[0].value.splitlines()
+
+
+class TestRenderChatMessages:
+    """render_chat_messages 테스트 스위트"""
+
+    def test_short_conversation_renders_all_messages(self):
+        """메시지가 윈도우 이하이면 접힌 영역 없이 모두 렌더링하는지 테스트"""
+        # When
+        app = run_chat(make_messages(CHAT_RECENT_WINDOW))
+
+        # Then
+        assert len(app.chat_message) == CHAT_RECENT_WINDOW
+        assert len(app.expander) == 0
+
+    def test_only_recent_window_rendered_in_full(self):
+        """최근 윈도우만 전체 내용으로 렌더링하고 이전 메시지는 미리보기로 접는지 테스트"""
+        # Given
+        messages = make_messages(CHAT_RECENT_WINDOW + 5)
+
+        # When
+        app = run_chat(messages)
+        full_app = run_chat(messages, chat_render_full=True)
+
+        # Then
+        assert len(app.chat_message) == CHAT_RECENT_WINDOW
+        assert app.chat_message[0].markdown[0].value == "메시지 5"
+        assert app.expander[0].label == "📜 이전 메시지 5개"
+        assert preview_lines(app) == [f"- 🤖 메시지 {index}" for index in range(5)]
+        assert len(full_app.chat_message) == len(messages)
+
+
+class TestCollapsedHistory:
+    """_render_collapsed_history 테스트 스위트"""
+
+    def test_pages_cover_history_without_overlap(self):
+        """기본으로 마지막 페이지를 보여주고, 각 페이지가 이전 메시지 범위 안에서 끊기는지 테스트"""
+        # Given: 이전 메시지 2.5 페이지
+        history = CHAT_HISTORY_PAGE_SIZE * 2 + CHAT_HISTORY_PAGE_SIZE // 2
+        app = run_chat(make_messages(history + CHAT_RECENT_WINDOW))
+
+        # When
+        last_page = preview_lines(app)
+        page_input = app.number_input(key="chat_history_page")
+        first_page = preview_lines(page_input.set_value(1).run())
+
+        # Then
+        assert (page_input.min, page_input.max) == (1, 3)
+        assert last_page == [f"- 🤖 메시지 {index}" for index in range(CHAT_HISTORY_PAGE_SIZE * 2, history)]
+        assert first_page == [f"- 🤖 메시지 {index}" for index in range(CHAT_HISTORY_PAGE_SIZE)]
+
+    def test_show_full_renders_selected_page(self):
+        """전체 내용 보기를 선택하면 선택한 페이지의 메시지를 전체 내용으로 렌더링하는지 테스트"""
+        # Given
+        app = run_chat(make_messages(CHAT_HISTORY_PAGE_SIZE + 3 + CHAT_RECENT_WINDOW))
+
+        # When
+        app = app.checkbox(key="chat_history_show_full").check().run()
+
+        # Then
+        assert len(app.chat_message) == 3 + CHAT_RECENT_WINDOW
+        assert app.chat_message[0].markdown[0].value == f"메시지 {CHAT_HISTORY_PAGE_SIZE}"
+
+
+class TestHistoryPagePreview:
+    """_get_history_page_preview 테스트 스위트"""
+
+    def test_long_message_is_truncated_to_one_line(self):
+        """긴 메시지의 공백을 한 줄로 합치고 미리보기 길이로 자르는지 테스트"""
+        # Given
+        messages = [{"role": "user", "content": "첫 줄\n\n둘째   줄 " + "가" * 300}] + make_messages(CHAT_RECENT_WINDOW)
+
+        # When
+        app = run_chat(messages)
+
+        # Then
+        (line,) = preview_lines(app)
+        assert line == "- 🧑‍💻 " + ("첫 줄 둘째 줄 " + "가" * 300)[:CHAT_PREVIEW_LENGTH] + "…"
+
+    def test_only_full_pages_are_cached(self):
+        """가득 찬 페이지만 캐시하고, 늘어나는 마지막 페이지는 캐시 항목을 만들지 않는지 테스트"""
+        # Given: 가득 찬 페이지 2개와 1개 메시지의 마지막 페이지
+        messages = make_messages(CHAT_HISTORY_PAGE_SIZE * 2 + 1 + CHAT_RECENT_WINDOW)
+        full_page = (CHAT_HISTORY_PAGE_SIZE, CHAT_HISTORY_PAGE_SIZE * 2)
+        app = run_chat(messages, chat_preview_cache={full_page: "- 캐시된 미리보기"})
+
+        # When: 마지막 페이지를 보는 동안 대화가 이어져 마지막 페이지가 여러 번 늘어남
+        for _ in range(3):
+            messages.append({"role": "assistant", "content": "새 메시지"})
+            app.run()
+        last_page = preview_lines(app)
+        page_input = app.number_input(key="chat_history_page")
+        cached_page = preview_lines(page_input.set_value(2).run())
+        first_page = preview_lines(app.number_input(key="chat_history_page").set_value(1).run())
+
+        # Then
+        assert len(last_page) == 4
+        assert cached_page == ["- 캐시된 미리보기"]
+        assert len(first_page) == CHAT_HISTORY_PAGE_SIZE
+        assert set(app.session_state["chat_preview_cache"]) == {full_page, (0, CHAT_HISTORY_PAGE_SIZE)}
+
+
+def similar_offer_script():
+    from src.ui.views import render_phase1_similar_offer_view
+    render_phase1_similar_offer_view()
+
+
+class TestPhase1SimilarOfferView:
+    """render_phase1_similar_offer_view 테스트 스위트"""
+
+    def test_shows_previous_idea_and_records_choice(self):
+        """이전 아이디어와 유사도를 보여주고, 재사용을 선택하면 선택을 기록하고 분석 대기 단계로 돌아가는지 테스트"""
+        # Given
+        app = AppTest.from_function(similar_offer_script)
+        app.session_state["analysis_phase"] = "phase1_similar_offer"
+        app.session_state["phase1_similar_offer"] = ("old-key", 0.86, "대학생 대상 중고 교재 거래 앱")
+        app.run()
+
+        # When
+        app.button(key="reuse_similar_phase1_button").click().run()
+
+        # Then
+        assert "86%" in app.info[0].value
+        assert app.markdown[0].value == "**이전 아이디어:** 대학생 대상 중고 교재 거래 앱"
+        assert app.session_state["phase1_similar_choice"] == "reuse"
+        assert app.session_state["analysis_phase"] == "phase1_pending_start"